@@ -1,172 +1,193 @@
-from pywinauto import Application, ElementNotFoundError
-import win32gui 
+import os
+
+from vortex_driver import create_driver, ElementNotFoundError
+
+# 界面驱动：默认pywinauto，设置环境变量 VORTEX_UI_DRIVER=simulated 可使用模拟后端
+driver = create_driver({"ui_driver": os.environ.get("VORTEX_UI_DRIVER", "pywinauto"), "backend": "uia"})
 
 #连接VORTEX Client应用
-hwnd = win32gui.FindWindow(None, "VORTEX Client")
+hwnd = driver.find_window("VORTEX Client")
 if not hwnd:
     raise Exception("❌ 未找到标题为'VORTEX Client'的窗口，请确认程序已启动！")
 
 # 连接主窗口（UIA后端）
-app = Application(backend="uia").connect(handle=hwnd)
-dlg = app.window(handle=hwnd)
-dlg.wait('visible enabled', timeout=10)
-dlg.set_focus()
-vortex_pid = dlg.process_id()  # 获取VORTEX进程PID（关键！）
-print(f"✅ 成功连接VORTEX主窗口：句柄={hex(hwnd)}，标题={dlg.window_text()}，PID={vortex_pid}")
+dlg = driver.connect(hwnd)
+driver.wait(dlg, 'visible enabled', timeout=10)
+driver.set_focus(dlg)
+vortex_pid = driver.process_id(dlg)  # 获取VORTEX进程PID（关键！）
+print(f"✅ 成功连接VORTEX主窗口：句柄={hex(hwnd)}，标题={driver.window_text(dlg)}，PID={vortex_pid}")
 
 # ---------------- 2. 定位目标子窗口 ----------------
 try:
-    vortex_window = dlg.window(
+    vortex_window = driver.child(
+        dlg,
         title_re=".*pro103，8.*",  # 模糊匹配子窗口标题
         control_type="Window"            # 限定为窗口类型
     )
-    vortex_window.wait('visible', timeout=5)
-    print(f"✅ 定位到目标窗口：标题={vortex_window.window_text()}，句柄={hex(vortex_window.handle)}")
+    driver.wait(vortex_window, 'visible', timeout=5)
+    print(f"✅ 定位到目标窗口：标题={driver.window_text(vortex_window)}，句柄={hex(driver.handle_of(vortex_window))}")
 except ElementNotFoundError as e:
     print(f"❌ 目标子窗口定位失败：{e}")
     exit(1)
 
 # ---------------- 3. 格式转换核心操作 ----------------
 # 3.1 定位并点击【导出】
-site_detect_ctrl = vortex_window.child_window(
+site_detect_ctrl = driver.child(
+    vortex_window,
     control_type="Button",    # 控件类型
     title="导出"        
 )
-site_detect_ctrl.wait('visible enabled', timeout=5)
-site_detect_ctrl.click_input()
+driver.wait(site_detect_ctrl, 'visible enabled', timeout=5)
+driver.click(site_detect_ctrl)
 print(f"✅ 点击【导出】成功")
 
 # 3.2 定位并点击【点云】
-option_window = dlg.window(
+option_window = driver.child(
+        dlg,
         title_re=".*选项.*",  # 模糊匹配子窗口标题
         control_type="Window"            # 限定为窗口类型
     )
-option_window.wait('visible', timeout=5)
-print(f"✅ 定位到目标窗口：标题={option_window.window_text()}，句柄={hex(option_window.handle)}")
+driver.wait(option_window, 'visible', timeout=5)
+print(f"✅ 定位到目标窗口：标题={driver.window_text(option_window)}，句柄={hex(driver.handle_of(option_window))}")
 
-site_detect_ctrl = option_window.child_window(
+site_detect_ctrl = driver.child(
+    option_window,
     control_type="Pane",    # 控件类型
     title="点云"        
 )
-site_detect_ctrl.wait('visible enabled', timeout=2)
-site_detect_ctrl.click_input()
+driver.wait(site_detect_ctrl, 'visible enabled', timeout=2)
+driver.click(site_detect_ctrl)
 print(f"✅ 点击【点云】成功")
 
 # 3.3 选择输出格式
-export_window = dlg.window(
+export_window = driver.child(
+        dlg,
         title_re=".*点云导出.*",  # 模糊匹配子窗口标题
         control_type="Window"            # 限定为窗口类型
     )
-export_window.wait('visible', timeout=5)
-print(f"✅ 定位到目标窗口：标题={export_window.window_text()}，句柄={hex(export_window.handle)}")
+driver.wait(export_window, 'visible', timeout=5)
+print(f"✅ 定位到目标窗口：标题={driver.window_text(export_window)}，句柄={hex(driver.handle_of(export_window))}")
 
-site1_checkbox = export_window.child_window(
+site1_checkbox = driver.child(
+    export_window,
     control_type="RadioButton", # 单选按钮类型
     title="pts" 
 )
-site1_checkbox.wait('visible enabled', timeout=2)
-site1_checkbox.click_input()  #点击
+driver.wait(site1_checkbox, 'visible enabled', timeout=2)
+driver.click(site1_checkbox)  #点击
 print(f"✅ 点击【pts】单选框状态成功")
 
 # 3.4 是否启用点云抽稀
-site1_checkbox = export_window.child_window(
+site1_checkbox = driver.child(
+    export_window,
     control_type="CheckBox", # 复选框类型
     title="启用" 
 )
-site1_checkbox.wait('visible enabled', timeout=2)
-site1_checkbox.toggle()  #切换状态
+driver.wait(site1_checkbox, 'visible enabled', timeout=2)
+driver.toggle(site1_checkbox)  #切换状态
 print(f"✅ 切换【启用】复选框状态成功")
 
 # 3.5 选择输出类型
-site1_checkbox = export_window.child_window(
+site1_checkbox = driver.child(
+    export_window,
     control_type="RadioButton", # 单选按钮类型
     title="单站" 
 )
-site1_checkbox.wait('visible enabled', timeout=2)
-site1_checkbox.click_input()  #点击
+driver.wait(site1_checkbox, 'visible enabled', timeout=2)
+driver.click(site1_checkbox)  #点击
 print(f"✅ 点击【单站】单选框状态成功")
 
 # 3.6 选择贴图
-site1_checkbox = export_window.child_window(
+site1_checkbox = driver.child(
+    export_window,
     control_type="RadioButton", # 单选按钮类型
     title="反射率" 
 )
-site1_checkbox.wait('visible enabled', timeout=2)
-site1_checkbox.click_input()  #点击
+driver.wait(site1_checkbox, 'visible enabled', timeout=2)
+driver.click(site1_checkbox)  #点击
 print(f"✅ 点击【反射率】单选框状态成功")
 
 # 3.7 是否点云降噪
-site1_checkbox = export_window.child_window(
+site1_checkbox = driver.child(
+    export_window,
     control_type="CheckBox", # 复选框类型
     title="点云降噪" 
 )
-site1_checkbox.wait('visible enabled', timeout=2)
-site1_checkbox.toggle()  #切换状态
+driver.wait(site1_checkbox, 'visible enabled', timeout=2)
+driver.toggle(site1_checkbox)  #切换状态
 print(f"✅ 切换【点云降噪】复选框状态成功")
 
 # 3.8 是否点云厚度优化
-site1_checkbox = export_window.child_window(
+site1_checkbox = driver.child(
+    export_window,
     control_type="CheckBox", # 复选框类型
     title="点云厚度优化" 
 )
-site1_checkbox.wait('visible enabled', timeout=2)
-site1_checkbox.toggle()  #切换状态
+driver.wait(site1_checkbox, 'visible enabled', timeout=2)
+driver.toggle(site1_checkbox)  #切换状态
 print(f"✅ 切换【点云厚度优化】复选框状态成功")
 
 # 3.9 定位并点击【导出】
-site_detect_ctrl = export_window.child_window(
+site_detect_ctrl = driver.child(
+    export_window,
     control_type="Pane",    # 控件类型
     title="导出",
     auto_id="uiButton3"        
 )
-site_detect_ctrl.wait('visible enabled', timeout=2)
-site_detect_ctrl.click_input()
+driver.wait(site_detect_ctrl, 'visible enabled', timeout=2)
+driver.click(site_detect_ctrl)
 print(f"✅ 点击【导出】成功")
 
 # 3.10 选择文件输出路径（此电脑→F盘→）
-Browser_window = dlg.window(
+Browser_window = driver.child(
+        dlg,
         title_re=".*浏览文件夹.*",  # 模糊匹配子窗口标题
         control_type="Window"            # 限定为窗口类型
     )
-Browser_window.wait('visible', timeout=5)
-print(f"✅ 定位到目标窗口：标题={Browser_window.window_text()}，句柄={hex(Browser_window.handle)}")
+driver.wait(Browser_window, 'visible', timeout=5)
+print(f"✅ 定位到目标窗口：标题={driver.window_text(Browser_window)}，句柄={hex(driver.handle_of(Browser_window))}")
 
-site_detect_ctrl = Browser_window.child_window(
+site_detect_ctrl = driver.child(
+    Browser_window,
     control_type="TreeItem",    # 控件类型
     title="此电脑"     
 )
-site_detect_ctrl.wait('visible enabled', timeout=2)
-site_detect_ctrl.click_input()
+driver.wait(site_detect_ctrl, 'visible enabled', timeout=2)
+driver.click(site_detect_ctrl)
 print(f"✅ 点击【此电脑】成功")
 
-site_detect_ctrl = Browser_window.child_window(
+site_detect_ctrl = driver.child(
+    Browser_window,
     control_type="TreeItem",    # 控件类型
     title="新加卷 (F:)"     
 )
-site_detect_ctrl.wait('visible enabled', timeout=2)
-site_detect_ctrl.click_input()
+driver.wait(site_detect_ctrl, 'visible enabled', timeout=2)
+driver.click(site_detect_ctrl)
 print(f"✅ 点击【F盘】成功")
 
-site_detect_ctrl = Browser_window.child_window(
+site_detect_ctrl = driver.child(
+    Browser_window,
     control_type="Button",    # 控件类型
     title="新建文件夹(M)"     
 )
-site_detect_ctrl.wait('visible enabled', timeout=2)
-site_detect_ctrl.click_input()
+driver.wait(site_detect_ctrl, 'visible enabled', timeout=2)
+driver.click(site_detect_ctrl)
 print(f"✅ 点击【新建文件夹】成功")
 
-site_detect_ctrl = Browser_window.child_window(
+site_detect_ctrl = driver.child(
+    Browser_window,
     control_type="Edit",    # 控件类型
     auto_id="1"     
 )
-site_detect_ctrl.wait('visible enabled', timeout=7)
-site_detect_ctrl.set_text("pts+单站+反射率")
+driver.wait(site_detect_ctrl, 'visible enabled', timeout=7)
+driver.set_text(site_detect_ctrl, "pts+单站+反射率")
 print(f"✅ 【文件夹命名】成功")
 
-site_detect_ctrl = Browser_window.child_window(
+site_detect_ctrl = driver.child(
+    Browser_window,
     control_type="Button",    # 控件类型
     title="确定"        
 )
-site_detect_ctrl.wait('visible enabled', timeout=2)
-site_detect_ctrl.click_input()
+driver.wait(site_detect_ctrl, 'visible enabled', timeout=2)
+driver.click(site_detect_ctrl)
 print(f"✅ 点击【确定】成功")
\ No newline at end of file
@@ -0,0 +1,398 @@
+"""
+导出文件校验
+
+在转换完成后找到输出文件夹中的点云文件并流式解析，不把整个文件读入内存：
+    .pts       按块读取文本（pandas C解析器分块），支持多站点各自的点数行
+    .las/.laz  解析文件头；未压缩的LAS用numpy内存映射结构化数组分块统计点坐标
+    .e57       按页读取XML段得到点数和包围盒，逐个检查二进制段的段头和数据包头
+输出每个文件的字节数、点数、包围盒和发现的问题。
+
+read_points按块读出坐标（N×3的float64数组），供点云质量分析使用。
+"""
+import itertools
+import os
+import struct
+import time
+import xml.etree.ElementTree as ET
+from typing import Any, Dict, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+POINT_CLOUD_EXTENSIONS = (".pts", ".las", ".laz", ".e57")
+
+
+def find_artifacts(folder: str) -> List[str]:
+    """输出文件夹（含子文件夹）中的点云文件"""
+    found = []
+    for root, _dirs, files in os.walk(folder):
+        for name in sorted(files):
+            if name.lower().endswith(POINT_CLOUD_EXTENSIONS):
+                found.append(os.path.join(root, name))
+    return found
+
+
+def _bounds(mins, maxs) -> Optional[List[float]]:
+    if mins is None:
+        return None
+    return [round(float(v), 6) for v in list(mins) + list(maxs)]
+
+
+# ==================== PTS ====================
+def _pts_chunks(path: str, chunk_rows: int) -> Iterator[np.ndarray]:
+    """按块读取PTS前三列，点数行的y、z为NaN"""
+    reader = pd.read_csv(path, sep=" ", header=None, usecols=[0, 1, 2], names=["x", "y", "z"],
+                         dtype=np.float64, engine="c", chunksize=chunk_rows, skipinitialspace=True)
+    for chunk in reader:
+        yield chunk.to_numpy()
+
+
+def read_pts_points(path: str, chunk_rows: int = 1_000_000) -> Iterator[np.ndarray]:
+    """按块读出PTS中的点坐标（跳过点数行和无法解析的行）"""
+    for values in _pts_chunks(path, chunk_rows):
+        values = values[~np.isnan(values).any(axis=1)]
+        if len(values):
+            yield values
+
+
+def verify_pts(path: str, chunk_rows: int = 1_000_000) -> Dict[str, Any]:
+    """
+    分块解析PTS文本
+
+    每个站点以一行点数开头，后面每行"x y z [强度 r g b]"。只读取前三列，
+    只有一列的行视为点数行，累计为声明点数。
+    """
+    info = {"点数": 0, "声明点数": 0, "包围盒": None, "问题": []}
+    mins = maxs = None
+    for values in _pts_chunks(path, chunk_rows):
+        header_rows = np.isnan(values[:, 1])
+        if header_rows.any():
+            info["声明点数"] += int(values[header_rows, 0].sum())
+            values = values[~header_rows]
+        if np.isnan(values).any():
+            info["问题"].append("存在无法解析的坐标")
+            values = values[~np.isnan(values).any(axis=1)]
+        if not len(values):
+            continue
+        info["点数"] += len(values)
+        chunk_min, chunk_max = values.min(axis=0), values.max(axis=0)
+        mins = chunk_min if mins is None else np.minimum(mins, chunk_min)
+        maxs = chunk_max if maxs is None else np.maximum(maxs, chunk_max)
+
+    info["包围盒"] = _bounds(mins, maxs)
+    if info["声明点数"] and info["声明点数"] != info["点数"]:
+        info["问题"].append(f"点数行声明{info['声明点数']}个点，实际{info['点数']}个")
+    return info
+
+
+# ==================== LAS ====================
+LAS_HEADER = struct.Struct("<4sHH16sBB32s32sHHHIIBHI20s3d3d6d")
+
+
+def read_las_header(path: str) -> Dict[str, Any]:
+    """LAS文件头（1.0-1.4）"""
+    with open(path, "rb") as f:
+        data = f.read(375)
+    if len(data) < LAS_HEADER.size or data[:4] != b"LASF":
+        raise ValueError("不是LAS文件（缺少LASF签名）")
+    fields = LAS_HEADER.unpack_from(data)
+    (_sig, _source, _encoding, _guid, major, minor, _system, _software, _day, _year,
+     header_size, point_offset, _vlrs, point_format, record_length, legacy_count, _by_return) = fields[:17]
+    scale, offset, extent = fields[17:20], fields[20:23], fields[23:29]
+    count = legacy_count
+    if (major, minor) >= (1, 4) and header_size >= 255 and len(data) >= 255:
+        count = struct.unpack_from("<Q", data, 247)[0] or legacy_count
+    return {
+        "版本": f"{major}.{minor}",
+        "头大小": header_size,
+        "点数据偏移": point_offset,
+        "点格式": point_format & 0x3F,
+        "压缩": bool(point_format & 0x80),
+        "记录长度": record_length,
+        "点数": count,
+        "缩放": scale,
+        "偏移": offset,
+        # 文件头中依次为 max x, min x, max y, min y, max z, min z
+        "包围盒": [extent[1], extent[3], extent[5], extent[0], extent[2], extent[4]],
+    }
+
+
+def _las_records(path: str, header: Dict[str, Any], count: int) -> np.memmap:
+    """内存映射点记录：每条记录前12字节为X、Y、Z的int32，其余字段按记录长度跳过"""
+    dtype = np.dtype({"names": ["X", "Y", "Z"], "formats": ["<i4", "<i4", "<i4"],
+                      "offsets": [0, 4, 8], "itemsize": header["记录长度"]})
+    return np.memmap(path, dtype=dtype, mode="r", offset=header["点数据偏移"], shape=(count,))
+
+
+def read_las_points(path: str, chunk_points: int = 1_000_000) -> Iterator[np.ndarray]:
+    """按块读出LAS点坐标（已按文件头的缩放和偏移换算为米），不支持LAZ"""
+    header = read_las_header(path)
+    if header["压缩"] or path.lower().endswith(".laz"):
+        raise ValueError("LAZ压缩点记录无法直接读取")
+    available = (os.path.getsize(path) - header["点数据偏移"]) // header["记录长度"]
+    count = min(available, header["点数"])
+    if not count:
+        return
+    points = _las_records(path, header, count)
+    scale, offset = np.array(header["缩放"]), np.array(header["偏移"])
+    for start in range(0, count, chunk_points):
+        block = points[start:start + chunk_points]
+        yield np.column_stack([block["X"], block["Y"], block["Z"]]) * scale + offset
+    del points
+
+
+def verify_las(path: str, chunk_points: int = 2_000_000) -> Dict[str, Any]:
+    """解析LAS文件头，未压缩时内存映射点记录并分块计算实际包围盒"""
+    header = read_las_header(path)
+    size = os.path.getsize(path)
+    info = {"点数": header["点数"], "声明点数": header["点数"], "包围盒": header["包围盒"],
+            "版本": header["版本"], "点格式": header["点格式"], "问题": []}
+    if header["压缩"] or path.lower().endswith(".laz"):
+        info["说明"] = "LAZ压缩点记录未解码，点数和包围盒取自文件头"
+        return info
+
+    available = (size - header["点数据偏移"]) // header["记录长度"] if header["记录长度"] else 0
+    if available < header["点数"]:
+        info["问题"].append(f"文件头声明{header['点数']}个点，文件中只有{available}条完整记录")
+    count = min(available, header["点数"])
+    info["点数"] = count
+    if not count:
+        info["包围盒"] = None
+        return info
+
+    points = _las_records(path, header, count)
+    mins = np.full(3, np.iinfo(np.int32).max, dtype=np.int64)
+    maxs = np.full(3, np.iinfo(np.int32).min, dtype=np.int64)
+    for start in range(0, count, chunk_points):
+        block = points[start:start + chunk_points]
+        for axis, name in enumerate("XYZ"):
+            column = block[name]
+            mins[axis] = min(mins[axis], column.min())
+            maxs[axis] = max(maxs[axis], column.max())
+    del points
+
+    scale, offset = np.array(header["缩放"]), np.array(header["偏移"])
+    actual = _bounds(mins * scale + offset, maxs * scale + offset)
+    info["包围盒"] = actual
+    tolerance = np.abs(scale).max()
+    if not np.allclose(actual, header["包围盒"], atol=tolerance * 2):
+        info["问题"].append(f"文件头包围盒{[round(v, 3) for v in header['包围盒']]}与点记录不一致")
+    return info
+
+
+# ==================== E57 ====================
+E57_HEADER = struct.Struct("<8sIIQQQQ")
+E57_NAMESPACE = "{http://www.astm.org/COMMIT/E57/2010-e57-v1.0}"
+
+
+class PagedReader:
+    """E57按页存储：每页最后4字节为CRC，逻辑地址需要跳过这些字节"""
+    def __init__(self, f, page_size: int):
+        self.f = f
+        self.page_size = page_size
+        self.payload = page_size - 4
+
+    def to_logical(self, physical: int) -> int:
+        return physical // self.page_size * self.payload + physical % self.page_size
+
+    def read(self, logical: int, length: int) -> bytes:
+        chunks = []
+        while length > 0:
+            page, in_page = divmod(logical, self.payload)
+            take = min(length, self.payload - in_page)
+            self.f.seek(page * self.page_size + in_page)
+            data = self.f.read(take)
+            if len(data) < take:
+                raise ValueError("E57文件被截断")
+            chunks.append(data)
+            logical += take
+            length -= take
+        return b"".join(chunks)
+
+
+def verify_e57(path: str) -> Dict[str, Any]:
+    """读取E57的XML段（点数、包围盒），检查每个点云二进制段的段头和数据包头"""
+    size = os.path.getsize(path)
+    info = {"点数": 0, "声明点数": 0, "包围盒": None, "扫描数": 0, "数据包": 0, "问题": []}
+    with open(path, "rb") as f:
+        header = f.read(E57_HEADER.size)
+        if len(header) < E57_HEADER.size or header[:8] != b"ASTM-E57":
+            raise ValueError("不是E57文件（缺少ASTM-E57签名）")
+        _sig, major, minor, physical_length, xml_offset, xml_length, page_size = E57_HEADER.unpack(header)
+        info["版本"] = f"{major}.{minor}"
+        if physical_length != size:
+            info["问题"].append(f"文件头记录长度{physical_length}字节，实际{size}字节")
+        reader = PagedReader(f, page_size)
+        root = ET.fromstring(reader.read(reader.to_logical(xml_offset), xml_length))
+
+        mins = maxs = None
+        for scan in root.iter(f"{E57_NAMESPACE}vectorChild"):
+            points = scan.find(f"{E57_NAMESPACE}points")
+            if points is None:
+                continue
+            info["扫描数"] += 1
+            count = int(points.get("recordCount", 0))
+            info["声明点数"] += count
+            bounds = scan.find(f"{E57_NAMESPACE}cartesianBounds")
+            if bounds is not None:
+                values = [float(bounds.findtext(f"{E57_NAMESPACE}{axis}{edge}", "nan"))
+                          for edge in ("Minimum", "Maximum") for axis in "xyz"]
+                scan_min, scan_max = np.array(values[:3]), np.array(values[3:])
+                mins = scan_min if mins is None else np.minimum(mins, scan_min)
+                maxs = scan_max if maxs is None else np.maximum(maxs, scan_max)
+            problem = _check_e57_section(reader, int(points.get("fileOffset", 0)), size, info)
+            if problem:
+                info["问题"].append(f"第{info['扫描数']}个扫描: {problem}")
+            else:
+                info["点数"] += count
+    info["包围盒"] = _bounds(mins, maxs)
+    return info
+
+
+def _check_e57_section(reader: PagedReader, physical_offset: int, size: int, info: Dict[str, Any]) -> Optional[str]:
+    """检查压缩向量二进制段：段头、数据包类型和长度都在段内"""
+    if not 0 < physical_offset < size:
+        return f"二进制段偏移{physical_offset}超出文件"
+    section_start = reader.to_logical(physical_offset)
+    section_id, section_length, data_offset, _index_offset = struct.unpack(
+        "<B7xQQQ", reader.read(section_start, 32))
+    if section_id != 1:
+        return f"二进制段类型{section_id}不是压缩向量"
+    section_end = section_start + section_length
+    if section_end > reader.to_logical(size):
+        return "二进制段超出文件末尾"
+    position = reader.to_logical(data_offset)
+    while position < section_end:
+        packet_type, _flags, length_minus_1 = struct.unpack("<BBH", reader.read(position, 4))
+        if packet_type not in (0, 1, 2):
+            return f"逻辑偏移{position}处的数据包类型{packet_type}无效"
+        if packet_type == 1:
+            info["数据包"] += 1
+        position += length_minus_1 + 1
+    if position != section_end:
+        return "数据包长度与段长度不一致"
+    return None
+
+
+def read_e57_points(path: str, chunk_points: int = 1_000_000) -> Iterator[np.ndarray]:
+    """
+    按块读出E57中的点坐标
+
+    只支持cartesianX/Y/Z为Float类型、没有其他字段的原型（位压缩编解码器对浮点数就是原始字节）；
+    ScaledInteger等需要按位解包的字段会抛出ValueError。
+    """
+    with open(path, "rb") as f:
+        header = f.read(E57_HEADER.size)
+        if len(header) < E57_HEADER.size or header[:8] != b"ASTM-E57":
+            raise ValueError("不是E57文件（缺少ASTM-E57签名）")
+        _sig, _major, _minor, _length, xml_offset, xml_length, page_size = E57_HEADER.unpack(header)
+        reader = PagedReader(f, page_size)
+        root = ET.fromstring(reader.read(reader.to_logical(xml_offset), xml_length))
+        for scan in root.iter(f"{E57_NAMESPACE}vectorChild"):
+            points = scan.find(f"{E57_NAMESPACE}points")
+            if points is None:
+                continue
+            prototype = points.find(f"{E57_NAMESPACE}prototype")
+            dtypes = []
+            for field in prototype:
+                name = field.tag.replace(E57_NAMESPACE, "")
+                if name not in ("cartesianX", "cartesianY", "cartesianZ") or field.get("type") != "Float":
+                    raise ValueError(f"不支持的点字段: {name} ({field.get('type')})")
+                dtypes.append("<f4" if field.get("precision") == "single" else "<f8")
+            yield from _e57_section_points(reader, int(points.get("fileOffset")), int(points.get("recordCount")),
+                                           dtypes, chunk_points)
+
+
+def _e57_section_points(reader: PagedReader, physical_offset: int, count: int, dtypes: List[str],
+                        chunk_points: int) -> Iterator[np.ndarray]:
+    """遍历二进制段的数据包，把x/y/z三个字节流拼接成点坐标块"""
+    section_start = reader.to_logical(physical_offset)
+    _section_id, section_length, data_offset, _index_offset = struct.unpack(
+        "<B7xQQQ", reader.read(section_start, 32))
+    section_end = section_start + section_length
+    position = reader.to_logical(data_offset)
+    itemsizes = [np.dtype(dtype).itemsize for dtype in dtypes]
+    pending = [bytearray() for _ in dtypes]
+    emitted = 0
+
+    def take(n: int) -> np.ndarray:
+        columns = []
+        for axis, (dtype, itemsize) in enumerate(zip(dtypes, itemsizes)):
+            columns.append(np.frombuffer(bytes(pending[axis][:n * itemsize]), dtype=dtype))
+            del pending[axis][:n * itemsize]
+        return np.column_stack(columns).astype(np.float64, copy=False)
+
+    while position < section_end and emitted < count:
+        packet_type, _flags, length_minus_1 = struct.unpack("<BBH", reader.read(position, 4))
+        if packet_type == 1:
+            packet = reader.read(position, length_minus_1 + 1)
+            streams = struct.unpack_from("<H", packet, 4)[0]
+            lengths = struct.unpack_from(f"<{streams}H", packet, 6)
+            cursor = 6 + 2 * streams
+            for axis, length in enumerate(lengths[:len(dtypes)]):
+                pending[axis] += packet[cursor:cursor + length]
+                cursor += length
+            ready = min(len(buffer) // itemsize for buffer, itemsize in zip(pending, itemsizes))
+            while ready >= chunk_points:
+                yield take(chunk_points)
+                emitted += chunk_points
+                ready -= chunk_points
+        elif packet_type not in (0, 2):
+            raise ValueError(f"逻辑偏移{position}处的数据包类型{packet_type}无效")
+        position += length_minus_1 + 1
+    remaining = min(len(buffer) // itemsize for buffer, itemsize in zip(pending, itemsizes))
+    remaining = min(remaining, count - emitted)
+    if remaining > 0:
+        yield take(remaining)
+
+
+# ==================== 校验入口 ====================
+VERIFIERS = {".pts": verify_pts, ".las": verify_las, ".laz": verify_las, ".e57": verify_e57}
+
+
+POINT_READERS = {".pts": read_pts_points, ".las": read_las_points, ".e57": read_e57_points}
+
+
+def read_points(paths: List[str], chunk_points: int = 1_000_000) -> Iterator[np.ndarray]:
+    """依次按块读出多个点云文件的坐标"""
+    return itertools.chain.from_iterable(
+        POINT_READERS[os.path.splitext(path)[1].lower()](path, chunk_points) for path in paths)
+
+
+def verify_file(path: str) -> Dict[str, Any]:
+    """校验单个文件，解析失败记为问题"""
+    start = time.perf_counter()
+    extension = os.path.splitext(path)[1].lower()
+    result = {"文件": os.path.basename(path), "格式": extension.lstrip("."), "字节数": os.path.getsize(path)}
+    try:
+        result.update(VERIFIERS[extension](path))
+    except Exception as e:
+        result.update({"点数": 0, "包围盒": None, "问题": [f"解析失败: {e}"]})
+    result["解析耗时"] = round(time.perf_counter() - start, 3)
+    return result
+
+
+def verify_output_folder(folder: str, expected_format: Optional[str] = None,
+                         conversion_seconds: Optional[float] = None) -> Dict[str, Any]:
+    """
+    校验输出文件夹中的所有点云文件
+
+    Returns:
+        {"文件": [...], "点数", "字节数", "写入速率"(点/秒), "写入MB/s", "问题": [...]}
+    """
+    files = [verify_file(path) for path in find_artifacts(folder)] if os.path.isdir(folder) else []
+    problems = [f"{item['文件']}: {problem}" for item in files for problem in item["问题"]]
+    if not os.path.isdir(folder):
+        problems.append(f"输出文件夹不存在: {folder}")
+    elif not files:
+        problems.append("输出文件夹中没有点云文件")
+    elif expected_format and not any(item["格式"] == expected_format.lower() for item in files):
+        problems.append(f"没有{expected_format}格式的输出文件")
+
+    points = sum(item.get("点数") or 0 for item in files)
+    size = sum(item["字节数"] for item in files)
+    summary = {"文件": files, "点数": points, "字节数": size, "写入速率": None, "写入MB/s": None, "问题": problems}
+    if conversion_seconds:
+        summary["写入速率"] = round(points / conversion_seconds, 1)
+        summary["写入MB/s"] = round(size / 1e6 / conversion_seconds, 3)
+    return summary
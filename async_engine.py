@@ -0,0 +1,141 @@
+"""
+asyncio执行核心
+
+一个事件循环驱动所有VORTEX实例：
+    界面操作   阻塞调用，在每个实例专用的单线程执行器中运行（UIA的COM对象始终在同一线程中使用，
+               线程数等于实例数）
+    等待       等待成功窗口、资源采样、输出文件夹监视和进度看板都是事件循环中的协程，不各占一个线程
+
+TaskScope负责结构化关闭：作用域结束（正常结束、出错或被取消）时取消其中仍在运行的任务并等待它们退出，
+后台任务中未处理的异常写入日志，不会无声丢失。
+"""
+import asyncio
+import concurrent.futures
+import contextvars
+import functools
+import logging
+from typing import Any, Awaitable, Callable, Coroutine, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+
+class TaskScope:
+    """
+    后台任务作用域
+
+    用法:
+        async with TaskScope() as tasks:
+            await AsyncProgressServer(progress).start(tasks)    # 在事件循环中spawn
+            # 在实例线程中（例如界面步骤开始采样时）
+            sampler = ResourceSampler(pid).start(tasks)         # spawn_threadsafe
+            summary = sampler.stop()                            # cancel_threadsafe，等待任务退出
+        # 离开作用域时取消其余任务并等待它们退出
+    """
+    def __init__(self):
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def __aenter__(self) -> "TaskScope":
+        self.loop = asyncio.get_running_loop()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    def spawn(self, coro: Coroutine, name: Optional[str] = None) -> asyncio.Task:
+        """在事件循环线程中创建任务"""
+        task = self.loop.create_task(coro, name=name)
+        self._tasks.add(task)
+        task.add_done_callback(self._done)
+        return task
+
+    def spawn_threadsafe(self, coro: Coroutine, name: Optional[str] = None) -> asyncio.Task:
+        """在其他线程中创建任务（等到任务创建后返回）"""
+        if self._in_loop():
+            return self.spawn(coro, name)
+
+        async def create():
+            return self.spawn(coro, name)
+        return asyncio.run_coroutine_threadsafe(create(), self.loop).result()
+
+    async def cancel(self, task: asyncio.Task):
+        """取消任务并等待它退出"""
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    def cancel_threadsafe(self, task: asyncio.Task, timeout: Optional[float] = None):
+        """
+        在其他线程中取消任务，等到任务退出后返回
+
+        在事件循环线程中调用时无法阻塞等待，只发出取消请求。
+        """
+        if self._in_loop():
+            task.cancel()
+            return
+        if self.loop.is_closed():
+            return
+        asyncio.run_coroutine_threadsafe(self.cancel(task), self.loop).result(timeout)
+
+    async def close(self):
+        """取消所有仍在运行的任务并等待退出"""
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _in_loop(self) -> bool:
+        try:
+            return asyncio.get_running_loop() is self.loop
+        except RuntimeError:
+            return False
+
+    def _done(self, task: asyncio.Task):
+        self._tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(f"后台任务 {task.get_name()} 出错: {task.exception()!r}")
+
+
+class InstanceThread:
+    """
+    一个VORTEX实例专用的单线程执行器
+
+    该实例的界面调用都在同一线程中按顺序执行；线程创建时调用initializer（例如驱动的init_thread）。
+    调用在调用方的上下文副本中执行，上下文变量（例如进度看板的current_worker）在线程中同样可见。
+    """
+    def __init__(self, name: str, initializer: Optional[Callable[[], None]] = None):
+        self.name = name
+        self._pool = concurrent.futures.ThreadPoolExecutor(1, thread_name_prefix=name, initializer=initializer)
+
+    async def __call__(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """在实例线程中执行func(*args, **kwargs)并等待结果"""
+        loop = asyncio.get_running_loop()
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(self._pool, functools.partial(context.run, func, *args, **kwargs))
+
+    def close(self):
+        """等待已提交的调用结束后关闭线程"""
+        self._pool.shutdown(wait=True)
+
+
+async def run_all(coros: List[Awaitable[Any]], names: Optional[List[str]] = None) -> List[Any]:
+    """
+    并发运行多个协程并按顺序返回结果
+
+    任一个出错时取消其余的、等待它们退出后重新抛出该异常；自身被取消时同样先取消并等待所有协程。
+    """
+    names = names or [None] * len(coros)
+    tasks = [asyncio.ensure_future(coro) for coro in coros]
+    for task, name in zip(tasks, names):
+        if name:
+            task.set_name(name)
+    try:
+        done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+        failed = [task for task in done if not task.cancelled() and task.exception() is not None]
+        if failed:
+            raise failed[0].exception()
+        return [task.result() for task in tasks]
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,161 @@
+"""
+性能基线
+
+指定版本的完整运行按配置元组存入本地SQLite文件，新一次运行逐配置与固定版本的基线比较：
+耗时中位数变慢超过阈值、且置换检验显著时判定为回归；样本不足以检验时只报告无法判定。
+"""
+import functools
+import json
+import os
+import sqlite3
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    build TEXT,
+    created TEXT NOT NULL,
+    journal TEXT
+);
+CREATE TABLE IF NOT EXISTS samples (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    config TEXT NOT NULL,
+    case_id TEXT,
+    duration REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS samples_run_config ON samples(run_id, config);
+"""
+
+
+def config_text(key: Sequence[str]) -> str:
+    """配置元组在数据库中的键"""
+    return json.dumps(list(key), ensure_ascii=False)
+
+
+class BaselineStore:
+    """按运行和配置存储转换耗时的SQLite文件"""
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        self.path = path
+        self._conn = sqlite3.connect(path)
+        self._conn.executescript(SCHEMA)
+
+    def record_run(self, samples: Dict[Tuple[str, ...], List[Tuple[str, float]]],
+                   build: Optional[str] = None, journal: Optional[str] = None) -> int:
+        """
+        保存一次运行
+
+        Args:
+            samples: {配置元组: [(用例ID, 转换耗时), ...]}
+        """
+        with self._conn:
+            cursor = self._conn.execute("INSERT INTO runs (build, created, journal) VALUES (?, ?, ?)",
+                                        (build, datetime.now().isoformat(), journal))
+            run_id = cursor.lastrowid
+            self._conn.executemany(
+                "INSERT INTO samples (run_id, config, case_id, duration) VALUES (?, ?, ?, ?)",
+                [(run_id, config_text(key), case_id, duration)
+                 for key, values in samples.items() for case_id, duration in values])
+        return run_id
+
+    def baseline_run(self, build: Optional[str]) -> Optional[Dict[str, Any]]:
+        """基线运行：指定build的最近一次运行；未指定build时没有基线"""
+        if not build:
+            return None
+        row = self._conn.execute("SELECT id, build, created FROM runs WHERE build = ? "
+                                 "ORDER BY id DESC LIMIT 1", (build,)).fetchone()
+        return {"id": row[0], "build": row[1], "created": row[2]} if row else None
+
+    def durations(self, run_id: int) -> Dict[Tuple[str, ...], List[float]]:
+        """一次运行中各配置的转换耗时"""
+        result: Dict[Tuple[str, ...], List[float]] = {}
+        for config, duration in self._conn.execute(
+                "SELECT config, duration FROM samples WHERE run_id = ?", (run_id,)):
+            result.setdefault(tuple(json.loads(config)), []).append(duration)
+        return result
+
+    def close(self):
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def permutation_test(current: Sequence[float], baseline: Sequence[float], resamples: int = 5000,
+                     seed: int = 0) -> float:
+    """
+    单侧置换检验：当前耗时中位数大于基线中位数的p值
+
+    在"两组来自同一分布"的假设下随机重新分组，统计中位数差不小于实际差的比例。
+    """
+    current = np.asarray(current, dtype=float)
+    baseline = np.asarray(baseline, dtype=float)
+    observed = np.median(current) - np.median(baseline)
+    pooled = np.concatenate([current, baseline])
+    rng = np.random.default_rng(seed)
+    # 每行是pooled的一个随机排列，前len(current)个作为"当前"组
+    order = np.argsort(rng.random((resamples, len(pooled))), axis=1)
+    shuffled = pooled[order]
+    diffs = np.median(shuffled[:, :len(current)], axis=1) - np.median(shuffled[:, len(current):], axis=1)
+    return float((np.sum(diffs >= observed - 1e-12) + 1) / (resamples + 1))
+
+
+@functools.lru_cache(maxsize=None)
+def smallest_p_value(current_count: int, baseline_count: int) -> float:
+    """
+    给定两组样本数时置换检验能得到的最小p值（两组完全分开、当前组全部更慢时的p值）
+
+    中位数统计量在小样本下有大量并列，例如3对3时最小只能到约0.10，此时无论变慢多少都不可能显著。
+    """
+    return permutation_test(np.arange(current_count) + baseline_count, np.arange(baseline_count))
+
+
+def compare_runs(current: Dict[Tuple[str, ...], List[float]], baseline: Dict[Tuple[str, ...], List[float]],
+                 threshold: float = 0.1, alpha: float = 0.05, min_samples: int = 3) -> List[Dict[str, Any]]:
+    """
+    逐配置比较当前运行与基线
+
+    任一组样本少于min_samples，或该样本数下能得到的最小p值不小于alpha时无法检验（检验="样本不足"）。
+    
+    状态:
+        回归      中位数变慢超过threshold，且检验显著
+        改善      中位数变快超过threshold，且可以检验
+        无法判定  无法检验，且中位数变化超过threshold（单次样本的波动就可能超过阈值）
+        持平      其余情况（包括变慢超过阈值但检验不显著）
+        新增      基线中没有该配置
+    """
+    comparisons = []
+    for key in sorted(current):
+        values = current[key]
+        entry = {"配置": list(key), "次数": len(values), "当前中位数": float(np.median(values)),
+                 "基线次数": 0, "基线中位数": None, "变化": None, "p值": None, "检验": None, "状态": "新增"}
+        base = baseline.get(key)
+        if base:
+            entry.update({"基线次数": len(base), "基线中位数": float(np.median(base))})
+            change = entry["当前中位数"] / entry["基线中位数"] - 1 if entry["基线中位数"] else 0.0
+            entry["变化"] = change
+            testable = len(values) >= min_samples and len(base) >= min_samples \
+                and smallest_p_value(len(values), len(base)) < alpha
+            if testable:
+                entry["检验"] = "置换检验"
+                entry["p值"] = permutation_test(values, base)
+            else:
+                entry["检验"] = "样本不足"
+            if abs(change) <= threshold:
+                entry["状态"] = "持平"
+            elif not testable:
+                entry["状态"] = "无法判定"
+            elif change < 0:
+                entry["状态"] = "改善"
+            else:
+                entry["状态"] = "回归" if entry["p值"] < alpha else "持平"
+        comparisons.append(entry)
+    return comparisons
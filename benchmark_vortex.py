@@ -0,0 +1,1173 @@
+"""
+基于模拟VORTEX后端的性能基准
+
+不需要Windows桌面，可在Linux/CI上运行完整的数据驱动测试流程并统计耗时:
+    python benchmark_vortex.py pipeline --cases 5 --time-scale 0.05
+    python benchmark_vortex.py completion
+    python benchmark_vortex.py parallel --instances 4 --cases 8
+    python benchmark_vortex.py engine --instances 4 --cases 8
+    python benchmark_vortex.py schedule --cases 16
+    python benchmark_vortex.py lookup --cases 8
+    python benchmark_vortex.py snapshot --repeats 20
+    python benchmark_vortex.py reports --cases 1000 2000 5000 10000
+    python benchmark_vortex.py progress --cases 6
+    python benchmark_vortex.py resources --duration 3 --rate 50
+    python benchmark_vortex.py trials --cases 4 --repeat 8 --warmup 1
+    python benchmark_vortex.py regression --cases 4 --repeat 4
+    python benchmark_vortex.py timeouts --cases 4 --history 3
+    python benchmark_vortex.py runtime --runs 2000
+    python benchmark_vortex.py artifacts --points 2000000
+    python benchmark_vortex.py quality --points 200000
+    python benchmark_vortex.py watch --size 50 --seconds 2
+    python benchmark_vortex.py io --size 200
+"""
+import argparse
+import importlib.util
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import threading
+import tracemalloc
+import urllib.request
+from datetime import datetime
+from typing import Any, Dict, List
+
+import numpy as np
+import pandas as pd
+
+from resource_sampler import GAUGE_METRICS, ResourceSampler, SampleBuffer
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_CSV = os.path.join(REPO_DIR, "test_cases", "all_test_cases_complete.csv")
+
+
+def load_harness():
+    """加载format2.0.py（文件名含点号，不能直接import）"""
+    spec = importlib.util.spec_from_file_location("format2_0", os.path.join(REPO_DIR, "format2.0.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def make_test_manager(harness, work_dir: str, time_scale: float, **overrides):
+    """在work_dir中创建使用模拟后端的测试管理器，日志和报告都写到work_dir"""
+    config = {
+        "ui_driver": "simulated",
+        "simulation": {"time_scale": time_scale},
+        "check_interval": 0.5 * time_scale,
+        **overrides,
+    }
+    config_file = os.path.join(work_dir, "test_config.json")
+    with open(config_file, "w", encoding="utf-8") as f:
+        json.dump(config, f, ensure_ascii=False)
+
+    os.chdir(work_dir)
+    return harness.DataDrivenPointCloudTest(config_file)
+
+
+def exports_to(output_dir: str, drive: str = "F", **simulation) -> Dict[str, Any]:
+    """
+    make_test_manager的覆盖项：模拟后端把drive盘映射到output_dir
+
+    执行器在浏览文件夹窗口中点击drive盘，模拟后端把导出文件写到output_dir下的输出文件夹，
+    执行器也在output_dir下查找输出。
+    """
+    return {"output_base_dir": output_dir, "output_drive": drive,
+            "simulation": {**simulation, "drives": {drive: output_dir}}}
+
+
+def summarize_steps(results: List[Dict[str, Any]]) -> Dict[str, float]:
+    """各步骤的平均耗时"""
+    per_step: Dict[str, List[float]] = {}
+    for result in results:
+        for step, seconds in result["步骤耗时"].items():
+            per_step.setdefault(step, []).append(seconds)
+    return {step: statistics.mean(values) for step, values in per_step.items()}
+
+
+def bench_pipeline(args):
+    """运行CSV中的前N个用例，输出每个用例和每个步骤的耗时"""
+    harness = load_harness()
+    with tempfile.TemporaryDirectory() as work_dir:
+        test_manager = make_test_manager(harness, work_dir, args.time_scale)
+        test_cases = harness.CSVDataReader.read_test_cases(args.csv)[:args.cases]
+
+        start = time.perf_counter()
+        harness.run_test_cases(test_manager, test_cases)
+        total = time.perf_counter() - start
+        results = list(harness.iter_case_results(test_manager.all_results))
+        os.chdir(REPO_DIR)
+
+    print("\n" + "=" * 60)
+    print(f"模拟后端流程基准 (time_scale={args.time_scale}, 用例数={len(results)})")
+    for result in results:
+        print(f"  {result['用例ID']}: {result['状态']}, 总耗时={result['持续时间']:.3f}秒, "
+              f"转换耗时={result['转换耗时'] or 0:.3f}秒")
+    print("各步骤平均耗时:")
+    for step, seconds in summarize_steps(results).items():
+        print(f"  {step}: {seconds:.3f}秒")
+    wait_saved: Dict[str, float] = {}
+    for result in results:
+        for name, seconds in result["等待节省"].items():
+            wait_saved[name] = wait_saved.get(name, 0.0) + seconds
+    print("条件等待相对固定延迟节省:")
+    for name, seconds in wait_saved.items():
+        print(f"  {name}: {seconds:.3f}秒")
+    print(f"总耗时: {total:.3f}秒")
+    print(f"会话统计: {test_manager.session.stats}")
+    print(f"模拟后端统计: {test_manager.driver.sim.stats}")
+
+
+def bench_parallel(args):
+    """同一批用例分别在1个实例上串行执行和在N个模拟实例上并行执行，比较总耗时"""
+    harness = load_harness()
+    test_cases = harness.CSVDataReader.read_test_cases(args.csv)[:args.cases]
+
+    print("\n" + "=" * 60)
+    print(f"并行执行基准 (time_scale={args.time_scale}, 用例数={len(test_cases)})")
+    totals = {}
+    for instances in [1, args.instances]:
+        with tempfile.TemporaryDirectory() as work_dir:
+            test_manager = make_test_manager(
+                harness, work_dir, args.time_scale,
+                simulation={"time_scale": args.time_scale, "instances": instances},
+                parallel_workers=0)
+            start = time.perf_counter()
+            harness.run_test_cases(test_manager, test_cases)
+            totals[instances] = time.perf_counter() - start
+            results = test_manager.all_results
+            case_results = list(harness.iter_case_results(results))
+            os.chdir(REPO_DIR)
+
+        per_instance: Dict[str, int] = {}
+        for result in case_results:
+            per_instance[result["执行实例"]] = per_instance.get(result["执行实例"], 0) + 1
+        print(f"  {instances}个实例: 总耗时={totals[instances]:.3f}秒, 通过={results['passed_cases']}/"
+              f"{results['total_cases']}, 各实例用例数={per_instance}")
+    print(f"加速比: {totals[1] / totals[args.instances]:.2f}x")
+
+
+def bench_engine(args):
+    """
+    同一批用例分别用线程执行和asyncio执行核心在N个模拟实例上运行，
+    开启资源采样、输出文件夹监视和进度看板，比较总耗时、峰值线程数和结果
+    """
+    harness = load_harness()
+    test_cases = harness.CSVDataReader.read_test_cases(args.csv)[:args.cases]
+
+    print("\n" + "=" * 60)
+    print(f"执行核心基准 (time_scale={args.time_scale}, 实例数={args.instances}, 用例数={len(test_cases)})")
+    totals = {}
+    for engine in ["线程", "asyncio"]:
+        with tempfile.TemporaryDirectory() as work_dir:
+            test_manager = make_test_manager(
+                harness, work_dir, args.time_scale,
+                **exports_to(os.path.join(work_dir, "exports"), time_scale=args.time_scale,
+                             instances=args.instances, artifact_points=args.points, stream_output=True),
+                parallel_workers=0, async_engine=engine == "asyncio",
+                output_watch=True, output_watch_interval=0.05, output_stable_time=0.1, output_final_wait=1.0,
+                resource_sample_interval=0.05, progress_server=True, progress_port=args.port)
+            done = threading.Event()
+            peak_threads = [threading.active_count()]
+
+            def count_threads():
+                while not done.wait(0.01):
+                    peak_threads.append(threading.active_count())
+
+            counter = threading.Thread(target=count_threads, daemon=True)
+            counter.start()
+            start = time.perf_counter()
+            harness.run_test_cases(test_manager, test_cases)
+            totals[engine] = time.perf_counter() - start
+            done.set()
+            counter.join()
+            results = test_manager.all_results
+            case_results = list(harness.iter_case_results(results))
+            os.chdir(REPO_DIR)
+
+        watched = [r for r in case_results if r.get("输出监视", {}).get("完成") is not None]
+        sampled = [r for r in case_results if r["资源占用"].get("采样次数")]
+        conversion = statistics.mean(r["转换耗时"] for r in case_results if r["转换耗时"])
+        print(f"  {engine}: 总耗时={totals[engine]:.3f}秒, 通过={results['passed_cases']}/{results['total_cases']}, "
+              f"峰值线程数={max(peak_threads) - 1}, 平均转换耗时={conversion:.3f}秒, "
+              f"有资源采样={len(sampled)}, 输出监视判定写完={len(watched)}")
+    print(f"asyncio相对线程执行: {(totals['asyncio'] - totals['线程']) / totals['线程'] * 100:+.1f}%")
+
+
+def expected_export_settings(test_case: Dict[str, Any]) -> Dict[str, str]:
+    """用例在模拟后端中应当产生的导出设置（抽稀方式以最后点击的为准）"""
+    settings = {
+        "输出格式": test_case["输出格式"],
+        "启用": test_case["点云抽稀"],
+        "输出类型": test_case["输出类型"],
+        "贴图选择": test_case["贴图选择"],
+        "点云降噪": test_case["点云降噪"],
+        "点云厚度优化": test_case["点云厚度优化"],
+    }
+    if test_case["点云抽稀"] == "启用":
+        settings["抽稀方式"] = "随机抽稀" if test_case["随机抽稀"] == "启用" else "体素抽稀"
+    return settings
+
+
+def bench_schedule(args):
+    """比较原顺序与按配置差异重排+复用导出设置的配置点击数和耗时，并校验实际导出设置"""
+    harness = load_harness()
+    test_cases = harness.CSVDataReader.read_test_cases(args.csv)[:args.cases]
+
+    print("\n" + "=" * 60)
+    print(f"用例排序基准 (time_scale={args.time_scale}, 用例数={len(test_cases)})")
+    for label, reorder in [("原顺序", False), ("重排+复用设置", True)]:
+        with tempfile.TemporaryDirectory() as work_dir:
+            test_manager = make_test_manager(
+                harness, work_dir, args.time_scale,
+                simulation={"time_scale": args.time_scale, "persist_dialog_state": reorder},
+                reorder_test_cases=reorder, persist_dialog_state=reorder)
+            harness.run_test_cases(test_manager, test_cases)
+            results = test_manager.all_results
+            case_results = list(harness.iter_case_results(results))
+            os.chdir(REPO_DIR)
+
+        by_folder = {c["文件夹"]: c["设置"] for c in test_manager.driver.sim.instances[0].conversions}
+        cases_by_id = {tc["用例ID"]: tc for tc in test_cases}
+        mismatched = [r["用例ID"] for r in case_results
+                      if by_folder.get(r["输出文件夹"]) != expected_export_settings(cases_by_id[r["用例ID"]])]
+        configure = statistics.mean(r["步骤耗时"].get("配置导出设置", 0.0) for r in case_results)
+        clicks = results["配置点击"]
+        print(f"  {label}: 配置点击 预计={clicks['预计点击']} 实际={clicks['实际点击']} "
+              f"(相对原始{clicks['原始点击']}次 预计节省={clicks['预计节省']} 实际节省={clicks['实际节省']}), "
+              f"配置导出设置平均耗时={configure:.3f}秒, 总耗时={results['total_duration']:.3f}秒, "
+              f"设置不符={mismatched or '无'}")
+
+
+def bench_lookup(args):
+    """比较逐个查找控件与按窗口一次解析并缓存控件时，每个用例配置导出设置的查找开销"""
+    harness = load_harness()
+    test_cases = harness.CSVDataReader.read_test_cases(args.csv)[:args.cases]
+
+    print("\n" + "=" * 60)
+    print(f"控件查找基准 (time_scale={args.time_scale}, 用例数={len(test_cases)})")
+    for label, cached in [("逐个查找", False), ("控件缓存", True)]:
+        with tempfile.TemporaryDirectory() as work_dir:
+            test_manager = make_test_manager(harness, work_dir, args.time_scale, control_cache=cached)
+            sim = test_manager.driver.sim
+            searches = nodes = 0
+            results = []
+            for test_case in test_cases:
+                executor = harness.TestCaseExecutor(test_manager, test_case)
+                # 只统计配置导出设置一步的控件树搜索
+                original = executor._configure_export_settings
+
+                def measured(original=original):
+                    nonlocal searches, nodes
+                    before = dict(sim.stats)
+                    try:
+                        return original()
+                    finally:
+                        searches += sim.stats["tree_searches"] - before["tree_searches"]
+                        nodes += sim.stats["nodes_visited"] - before["nodes_visited"]
+                executor._configure_export_settings = measured
+                executor.execute()
+                results.append(executor.result)
+                test_manager.session.wait_until_idle(test_manager.config["wait_ceilings"]["用例间隔"])
+            os.chdir(REPO_DIR)
+
+        count = len(results)
+        configure = statistics.mean(r["步骤耗时"].get("配置导出设置", 0.0) for r in results)
+        cache = {key: sum(r["控件缓存"].get(key, 0) for r in results) for key in ["命中", "未命中", "遍历", "失效"]}
+        print(f"  {label}: 配置导出设置平均耗时={configure * 1000:.1f}毫秒/用例, "
+              f"控件树搜索={searches / count:.1f}次/用例, 访问节点={nodes / count:.0f}个/用例, "
+              f"通过={sum(r['状态'] == '通过' for r in results)}/{count}, 缓存统计={cache}")
+
+
+def bench_snapshot(args):
+    """在模拟的点云导出窗口上比较N次单独查找与一次快照加N次索引查找"""
+    harness = load_harness()
+    from vortex_driver import create_driver
+    from vortex_sim import SimulatedVortex
+
+    sim = SimulatedVortex(time_scale=1.0, latencies={"node_search": args.node_cost, "click": 0.0,
+                                                     "dialog_open": 0.0, "connect": 0.0},
+                          filler_controls=args.filler)
+    driver = create_driver({"ui_driver": "simulated"}, simulator=sim)
+    dlg = driver.connect(driver.find_window("VORTEX Client"))
+    target = driver.child(dlg, title_re=".*建模.*", control_type="Window")
+    driver.click(driver.child(target, control_type="Button", title="导出"))
+    driver.click(driver.child(driver.child(dlg, title_re=".*选项.*", control_type="Window"),
+                              control_type="Pane", title="点云"))
+    export_window = driver.child(dlg, title_re=".*点云导出.*", control_type="Window")
+    # 抽稀方式在启用点云抽稀前不在控件树中，只比较始终存在的控件
+    selectors = [selector for selector in harness.EXPORT_DIALOG_SELECTORS
+                 if selector["title"] not in harness.THINNING_MODE_TITLES]
+
+    def individual():
+        return [driver.handle_of(driver.child(export_window, **selector)) is None for selector in selectors]
+
+    def snapshot():
+        snap = driver.snapshot(export_window)
+        return [snap.find(**selector).element for selector in selectors]
+
+    print("\n" + "=" * 60)
+    print(f"控件树快照基准 (控件数={len(selectors)}, 每节点耗时={args.node_cost * 1e6:.0f}微秒, 重复={args.repeats}次)")
+    for label, func in [("单独查找", individual), ("快照+索引", snapshot)]:
+        before = dict(sim.stats)
+        start = time.perf_counter()
+        for _ in range(args.repeats):
+            func()
+        elapsed = (time.perf_counter() - start) / args.repeats
+        searches = (sim.stats["tree_searches"] - before["tree_searches"]) / args.repeats
+        nodes = (sim.stats["nodes_visited"] - before["nodes_visited"]) / args.repeats
+        print(f"  {label}: {elapsed * 1000:.2f}毫秒/次, 控件树遍历={searches:.0f}次, 访问节点={nodes:.0f}个")
+
+    snap = driver.snapshot(export_window)
+    start = time.perf_counter()
+    for _ in range(args.repeats):
+        for selector in selectors:
+            snap.find(**selector)
+    per_hit = (time.perf_counter() - start) / (args.repeats * len(selectors))
+    print(f"  快照大小={len(snap)}个控件, 单次索引查找={per_hit * 1e6:.2f}微秒, "
+          f"布局缺失={snap.missing(selectors) or '无'}")
+
+
+def synthetic_result(index: int) -> Dict[str, Any]:
+    """构造一个与执行器输出结构相同的用例结果"""
+    formats, types, textures = ["pts", "e57", "las"], ["单站", "合并", "单站+合并"], ["彩图", "反射率", "反射率+彩图"]
+    config = {
+        "用例ID": f"TC{index + 1:05d}", "输出格式": formats[index % 3], "点云抽稀": "不启用",
+        "体素抽稀": "", "随机抽稀": "", "输出类型": types[index // 3 % 3], "贴图选择": textures[index // 9 % 3],
+        "点云降噪": "启用", "点云厚度优化": "不启用", "预期结果": "成功", "备注": f"组合{index + 1}",
+        "row_index": index + 2,
+    }
+    steps = [{"步骤": name, "状态": "通过", "详情": "", "时间": "2026-01-01T00:00:00"}
+             for name in ["连接VORTEX", "定位目标窗口", "点击导出按钮", "选择点云选项", "选择输出格式",
+                          "选择输出类型", "选择贴图选择", "配置导出设置", "选择输出路径", "监控转换过程"]]
+    return {
+        "用例ID": config["用例ID"], "配置": config, "状态": "通过" if index % 17 else "失败", "步骤": steps,
+        "开始时间": "2026-01-01T00:00:00", "结束时间": "2026-01-01T00:01:20", "持续时间": 80.0,
+        "转换开始时间": "2026-01-01T00:00:10", "转换结束时间": "2026-01-01T00:01:15",
+        "转换耗时": 65.0 + index % 7, "错误信息": None, "输出文件夹": f"格式-{config['输出格式']}_{index}",
+        "步骤耗时": {step["步骤"]: 0.5 for step in steps}, "会话": {"节省耗时": 0.3},
+        "等待节省": {"用例间隔": 2.5}, "执行实例": "0x10000", "配置点击": {"点击": 4, "节省": 1},
+        "控件缓存": {"命中": 6, "未命中": 1, "遍历": 1, "失效": 0},
+        "完成检测": {"方式": "事件", "检查次数": 2, "检测延迟": 0.004},
+        "阶段": [{"阶段": name, "开始": start, "耗时": seconds, "不确定度": 0.004 if name == "转换" else None}
+                 for name, start, seconds in [("连接", 0.0, 0.5), ("打开窗口", 0.5, 1.5), ("配置", 2.0, 3.0),
+                                              ("选择路径", 5.0, 5.0), ("转换", 10.0, 65.0 + index % 7)]],
+    }
+
+
+def bench_reports(args):
+    """用合成结果测量结果日志写入和报告生成的耗时与内存峰值（应与用例数无关）"""
+    harness = load_harness()
+    print("\n" + "=" * 60)
+    print("结果日志与报告生成基准")
+    for count in args.cases:
+        with tempfile.TemporaryDirectory() as work_dir:
+            os.chdir(work_dir)
+            os.makedirs("reports")
+            all_results = {"total_cases": count, "passed_cases": 0, "failed_cases": 0, "error_cases": 0,
+                           "start_time": "2026-01-01T00:00:00", "end_time": "2026-01-01T06:00:00",
+                           "total_duration": 21600.0}
+
+            tracemalloc.start()
+            start = time.perf_counter()
+            with harness.ResultJournal("reports/results.jsonl") as journal:
+                for i in range(count):
+                    journal.append(synthetic_result(i))
+            all_results["journal"] = journal.path
+            journal_time = time.perf_counter() - start
+            _, journal_peak = tracemalloc.get_traced_memory()
+
+            tracemalloc.reset_peak()
+            start = time.perf_counter()
+            reporter = harness.DataDrivenTestReporter()
+            html_file = reporter.generate_html_report(all_results)
+            csv_file = reporter.generate_csv_summary(all_results)
+            report_time = time.perf_counter() - start
+            _, report_peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            sizes = {name: os.path.getsize(path) / 1e6 for name, path in
+                     [("日志", journal.path), ("HTML", html_file), ("CSV", csv_file)]}
+            os.chdir(REPO_DIR)
+
+        print(f"  {count}个用例: 写日志={journal_time:.2f}秒(峰值{journal_peak / 1e6:.2f}MB), "
+              f"生成报告={report_time:.2f}秒(每用例{report_time / count * 1e6:.0f}微秒, 峰值{report_peak / 1e6:.2f}MB), "
+              f"文件大小={', '.join(f'{k}={v:.1f}MB' for k, v in sizes.items())}")
+
+
+def bench_progress(args):
+    """同一批用例分别在关闭和开启进度看板时执行，看板开启时另一线程持续请求/status.json"""
+    harness = load_harness()
+    test_cases = harness.CSVDataReader.read_test_cases(args.csv)[:args.cases]
+
+    print("\n" + "=" * 60)
+    print(f"进度看板开销基准 (time_scale={args.time_scale}, 用例数={len(test_cases)}, "
+          f"请求间隔={args.poll_interval}秒)")
+    totals = {}
+    for enabled in [False, True]:
+        with tempfile.TemporaryDirectory() as work_dir:
+            test_manager = make_test_manager(harness, work_dir, args.time_scale,
+                                             progress_server=enabled, progress_port=args.port)
+            done = threading.Event()
+            requests, snapshots = [], []
+
+            def poll():
+                url = f"http://127.0.0.1:{args.port}/status.json"
+                while not done.wait(args.poll_interval):
+                    start = time.perf_counter()
+                    try:
+                        with urllib.request.urlopen(url, timeout=1) as response:
+                            snapshots.append(json.loads(response.read().decode("utf-8")))
+                    except OSError:
+                        continue
+                    requests.append(time.perf_counter() - start)
+
+            poller = threading.Thread(target=poll, daemon=True) if enabled else None
+            if poller:
+                poller.start()
+            start = time.perf_counter()
+            harness.run_test_cases(test_manager, test_cases)
+            totals[enabled] = time.perf_counter() - start
+            done.set()
+            if poller:
+                poller.join()
+            os.chdir(REPO_DIR)
+
+        label = "开启" if enabled else "关闭"
+        print(f"  看板{label}: 总耗时={totals[enabled]:.3f}秒", end="")
+        if requests:
+            print(f", 请求{len(requests)}次, 平均响应={statistics.mean(requests) * 1000:.2f}毫秒")
+            converting = [s for s in snapshots if any(w["转换已耗时"] for w in s["实例"].values())]
+            sample = (converting or snapshots)[-1]
+            print(f"  快照示例: {json.dumps(sample, ensure_ascii=False)}")
+        else:
+            print()
+    print(f"开销: {(totals[True] - totals[False]) / totals[False] * 100:+.1f}%")
+
+
+# 资源采样基准用的本地假进程：占用CPU、逐步分配内存并写文件，模拟转换时的负载
+DUMMY_WORKLOAD = """
+import os, sys, tempfile, threading, time
+duration = float(sys.argv[1])
+blocks = []
+def spin():
+    end = time.time() + duration
+    while time.time() < end:
+        sum(i * i for i in range(10000))
+threads = [threading.Thread(target=spin) for _ in range(2)]
+for thread in threads:
+    thread.start()
+with tempfile.TemporaryFile() as f:
+    end = time.time() + duration
+    while time.time() < end:
+        blocks.append(bytearray(4 * 1024 * 1024))
+        f.write(os.urandom(1024 * 1024))
+        f.flush()
+        os.fsync(f.fileno())
+        time.sleep(0.2)
+for thread in threads:
+    thread.join()
+"""
+
+
+# 输出监视基准用的本地写文件进程：在给定时间内分块写入，打印首次写入和关闭的perf_counter时刻；
+# hang为1时写到一半后保持文件打开不再写入
+OUTPUT_WRITER = """
+import json, os, sys, time
+path, size_mb, seconds, pieces, hang = sys.argv[1], float(sys.argv[2]), float(sys.argv[3]), int(sys.argv[4]), sys.argv[5] == "1"
+block = os.urandom(int(size_mb * 1e6 / pieces))
+times = {}
+with open(path, "wb") as f:
+    start = time.perf_counter()
+    for index in range(pieces):
+        f.write(block)
+        f.flush()
+        times.setdefault("首字节", time.perf_counter())
+        if hang and index == pieces // 2:
+            print(json.dumps(times), flush=True)
+            time.sleep(3600)
+        time.sleep(max(start + seconds * (index + 1) / pieces - time.perf_counter(), 0))
+times["关闭"] = time.perf_counter()
+print(json.dumps(times), flush=True)
+"""
+
+
+def bench_watch(args):
+    """用本地写文件进程测量输出监视的时刻误差和挂起检测，再在模拟流程中记录每个用例的写入过程"""
+    from output_watcher import Inotify, OutputWatcher
+
+    print("\n" + "=" * 60)
+    print(f"输出监视基准: {args.size}MB在{args.seconds}秒内分{args.pieces}块写入")
+    methods = [True, False] if Inotify.available() else [False]
+    for use_inotify in methods:
+        with tempfile.TemporaryDirectory() as folder:
+            writer = subprocess.Popen([sys.executable, "-c", OUTPUT_WRITER, os.path.join(folder, "out.bin"),
+                                       str(args.size), str(args.seconds), str(args.pieces), "0"],
+                                      stdout=subprocess.PIPE, text=True)
+            watcher = OutputWatcher(folder, interval=args.interval, stable_time=args.stable_time,
+                                    pid=writer.pid, use_inotify=use_inotify).start()
+            origin = watcher.started
+            written = json.loads(writer.communicate()[0])
+            final = watcher.wait_final(args.seconds + args.stable_time + 5)
+            detected = time.perf_counter()
+            watch = watcher.stop(origin=origin)
+        first_error = (origin + watch["首字节"] - written["首字节"]) * 1000
+        final_error = (origin + watch["完成"] - written["关闭"]) * 1000 if final else float("nan")
+        print(f"  {watch['方式']}: 首字节误差 {first_error:+.1f}毫秒, 写完时刻误差 {final_error:+.1f}毫秒, "
+              f"判定写完滞后 {detected - written['关闭']:.2f}秒, 平均 {watch['平均MB/s']}MB/s "
+              f"(名义 {args.size / args.seconds:.1f}MB/s), 峰值 {watch['峰值MB/s']}MB/s")
+
+    # 写到一半停止增长（文件保持打开），检测挂起
+    stall_timeout = 0.5
+    for use_inotify in methods:
+        with tempfile.TemporaryDirectory() as folder:
+            writer = subprocess.Popen([sys.executable, "-c", OUTPUT_WRITER, os.path.join(folder, "out.bin"),
+                                       str(args.size), str(args.seconds), str(args.pieces), "1"],
+                                      stdout=subprocess.PIPE, text=True)
+            watcher = OutputWatcher(folder, interval=args.interval, stable_time=args.stable_time,
+                                    pid=writer.pid, use_inotify=use_inotify).start()
+            json.loads(writer.stdout.readline())
+            stopped = time.perf_counter()
+            while not watcher.stalled(stall_timeout) and time.perf_counter() - stopped < 10:
+                time.sleep(0.01)
+            latency = time.perf_counter() - stopped
+            watch = watcher.stop()
+            writer.kill()
+            writer.wait()
+        print(f"  挂起检测({watch['方式']}): 停止写入后 {latency:.2f}秒判定停止增长（阈值{stall_timeout}秒）, "
+              f"已写 {watch['字节数'] / 1e6:.1f}MB, 完成={watch['完成']}")
+
+    # 模拟流程：转换期间逐步写出文件，比较写完时刻与成功窗口出现时刻
+    harness = load_harness()
+    with tempfile.TemporaryDirectory() as work_dir:
+        output_dir = os.path.join(work_dir, "outputs")
+        test_manager = make_test_manager(
+            harness, work_dir, args.time_scale, output_watch=True,
+            output_watch_interval=args.interval, output_stable_time=args.stable_time,
+            **exports_to(output_dir, time_scale=args.time_scale, artifact_points=args.points, stream_output=True))
+        test_cases = harness.CSVDataReader.read_test_cases(args.csv)[:args.cases]
+        harness.run_test_cases(test_manager, test_cases)
+        results = list(harness.iter_case_results(test_manager.all_results))
+        os.chdir(REPO_DIR)
+    for result in results:
+        watch = result["输出监视"]
+        print(f"  {result['用例ID']}: {result['状态']}, 转换耗时 {result['转换耗时']:.3f}秒, "
+              f"首字节 {watch.get('首字节')}秒, 写完 {watch.get('完成')}秒, 窗口滞后 {watch.get('窗口滞后')}秒, "
+              f"{watch.get('字节数', 0) / 1e6:.2f}MB, 平均 {watch.get('平均MB/s')}MB/s")
+
+
+# IO统计基准用的本地负载进程：写文件（每块fsync）、纯计算或空等；完成后输出一行并等待标准输入关闭，
+# 以便在进程退出前读取它的IO计数和CPU时间
+SYNTHETIC_LOAD = """
+import os, sys, time
+kind, folder, size_mb, seconds = sys.argv[1], sys.argv[2], float(sys.argv[3]), float(sys.argv[4])
+end = time.perf_counter() + seconds
+if kind == "写文件":
+    block = os.urandom(1024 * 1024)
+    with open(os.path.join(folder, "out.bin"), "wb") as f:
+        for _ in range(int(size_mb)):
+            f.write(block)
+            f.flush()
+            os.fsync(f.fileno())
+elif kind == "计算":
+    with open(os.path.join(folder, "out.txt"), "w") as f:
+        while time.perf_counter() < end:
+            f.write(str(sum(i * i for i in range(20000))))
+else:
+    time.sleep(seconds)
+print("done", flush=True)
+sys.stdin.read()
+"""
+
+
+def bench_io(args):
+    """对写文件、纯计算和空等三种本地进程做IO统计并分类"""
+    if not ResourceSampler.available():
+        print("未安装psutil，跳过IO统计基准")
+        return
+    harness = load_harness()
+    from output_watcher import folder_size
+
+    print("\n" + "=" * 60)
+    print("IO统计基准")
+    for kind in ["写文件", "计算", "空等"]:
+        with tempfile.TemporaryDirectory() as folder:
+            process = subprocess.Popen([sys.executable, "-c", SYNTHETIC_LOAD, kind, folder, str(args.size),
+                                        str(args.seconds)],
+                                       stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+            sampler = ResourceSampler(process.pid, interval=0.1).start()
+            start = time.perf_counter()
+            process.stdout.readline()
+            seconds = time.perf_counter() - start
+            usage = sampler.stop()
+            process.stdin.close()
+            process.wait()
+            accounting = harness.io_accounting(usage, folder_size(folder), seconds)
+        print(f"  {kind}: {seconds:.2f}秒, {harness.format_io_accounting(accounting)}, "
+              f"CPU时间{usage.get('CPU秒')}秒, IO等待{usage.get('IO等待秒', 'N/A')}秒")
+
+
+def bench_resources(args):
+    """对本地假进程采样，输出峰值/平均值和每次采样的开销"""
+    if not ResourceSampler.available():
+        print("未安装psutil，跳过资源采样基准")
+        return
+
+    print("\n" + "=" * 60)
+    print(f"资源采样基准 (假进程运行{args.duration}秒, 采样间隔={args.interval}秒)")
+    for interval in [args.interval, 1.0 / args.rate]:
+        process = subprocess.Popen([sys.executable, "-c", DUMMY_WORKLOAD, str(args.duration)])
+        try:
+            sampler = ResourceSampler(process.pid, interval).start()
+            start = time.perf_counter()
+            process.wait()
+            elapsed = time.perf_counter() - start
+            summary = sampler.stop()
+        finally:
+            if process.poll() is None:
+                process.kill()
+        print(f"  {1 / interval:.0f}Hz: 实际采样率={summary['采样次数'] / elapsed:.1f}Hz, "
+              f"汇总: {json.dumps(summary, ensure_ascii=False)}")
+
+    # 单次采样的耗时（在采样线程中，不占用执行线程）
+    sampler = ResourceSampler(os.getpid(), interval=3600).start()
+    start = time.perf_counter()
+    for _ in range(args.repeats):
+        sampler._sample()
+    per_sample = (time.perf_counter() - start) / args.repeats
+    sampler.stop()
+    print(f"  每次采样耗时: {per_sample * 1e6:.0f}微秒 "
+          f"({args.rate}Hz时占用采样进程{per_sample * args.rate * 100:.2f}%的一个CPU核)")
+
+    # 长时间运行: 按rate采样long_run秒，缓冲区内存固定，导出向量化
+    count = int(args.long_run * args.rate)
+    values = np.random.default_rng(0).random((count, len(GAUGE_METRICS))) * 100
+    for mode in ["compact", "ring"]:
+        buffer = SampleBuffer(GAUGE_METRICS, capacity=args.capacity, mode=mode)
+        start = time.perf_counter()
+        for i in range(count):
+            buffer.append(values[i], timestamp=buffer.start_perf + i / args.rate)
+        append_time = time.perf_counter() - start
+        with tempfile.TemporaryDirectory() as work_dir:
+            start = time.perf_counter()
+            path = buffer.export(os.path.join(work_dir, "samples.csv"))
+            export_time = time.perf_counter() - start
+            size = os.path.getsize(path) / 1e3
+        print(f"  {mode}: {count}个样本({args.long_run:.0f}秒@{args.rate}Hz) -> {len(buffer)}桶"
+              f"(每桶{buffer.bucket_size if mode == 'compact' else 1}个样本), 缓冲区={buffer.nbytes / 1e3:.0f}KB, "
+              f"追加={append_time / count * 1e6:.1f}微秒/样本, 导出CSV={export_time * 1000:.0f}毫秒({size:.0f}KB)")
+    legacy = [{"timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3], "elapsed_time(s)": i / args.rate,
+               **dict(zip(GAUGE_METRICS, row))} for i, row in enumerate(values[:10000])]
+    print(f"  对比: 原实现每个样本一个dict，10000个样本约{sys.getsizeof(legacy) / 1e3 + sum(sys.getsizeof(d) for d in legacy) / 1e3:.0f}KB"
+          f"(不含键值对象)，{count}个样本按比例约{(sys.getsizeof(legacy) + sum(sys.getsizeof(d) for d in legacy)) * count / 10000 / 1e6:.0f}MB")
+
+
+def bench_trials(args):
+    """以基准模式(--repeat/--warmup)运行main()，转换耗时带随机波动，输出各配置的统计和区间重叠情况"""
+    harness = load_harness()
+    test_cases = pd.read_csv(args.csv, encoding="utf-8").head(args.cases)
+    with tempfile.TemporaryDirectory() as work_dir:
+        csv_file = os.path.join(work_dir, "cases.csv")
+        test_cases.to_csv(csv_file, index=False, encoding="utf-8")
+        config_file = os.path.join(work_dir, "test_config.json")
+        with open(config_file, "w", encoding="utf-8") as f:
+            json.dump({
+                "ui_driver": "simulated", "csv_file": csv_file, "check_interval": 0.5 * args.time_scale,
+                "simulation": {"time_scale": args.time_scale, "conversion_jitter": args.jitter},
+            }, f, ensure_ascii=False)
+        os.chdir(work_dir)
+        start = time.perf_counter()
+        harness.main(["--config", config_file, "--repeat", str(args.repeat), "--warmup", str(args.warmup)])
+        total = time.perf_counter() - start
+        os.chdir(REPO_DIR)
+
+    print("\n" + "=" * 60)
+    print(f"重复试验基准 (用例数={args.cases}, 每个配置{args.warmup}次预热+{args.repeat}次试验, "
+          f"转换耗时波动={args.jitter:.0%}, 总耗时={total:.1f}秒)")
+
+
+def bench_regression(args):
+    """同一基线数据库上先后运行两个"版本"，第二个版本中随机抽稀的转换变慢，检查回归检测和退出码"""
+    harness = load_harness()
+    test_cases = pd.read_csv(args.csv, encoding="utf-8").head(args.cases)
+    builds = [("build-A", {}), ("build-B", {"随机抽稀": 10.0 * (1 + args.slowdown)})]
+    with tempfile.TemporaryDirectory() as work_dir:
+        csv_file = os.path.join(work_dir, "cases.csv")
+        test_cases.to_csv(csv_file, index=False, encoding="utf-8")
+        os.chdir(work_dir)
+        exit_codes = {}
+        for build, conversion_extra in builds:
+            config_file = os.path.join(work_dir, f"{build}.json")
+            with open(config_file, "w", encoding="utf-8") as f:
+                json.dump({
+                    "ui_driver": "simulated", "csv_file": csv_file, "check_interval": 0.5 * args.time_scale,
+                    "baseline_record_simulated": True,
+                    "simulation": {"time_scale": args.time_scale, "conversion_jitter": args.jitter,
+                                   "conversion_extra": conversion_extra, "seed": len(exit_codes)},
+                }, f, ensure_ascii=False)
+            # build-B与固定的build-A基线比较
+            exit_codes[build] = harness.main(["--config", config_file, "--repeat", str(args.repeat),
+                                              "--build", build, "--baseline", "build-A"])
+        os.chdir(REPO_DIR)
+
+    print("\n" + "=" * 60)
+    print(f"回归检测基准 (用例数={args.cases}, 每个配置{args.repeat}次, build-B中随机抽稀变慢{args.slowdown:.0%})")
+    for build, code in exit_codes.items():
+        print(f"  {build}: 退出码={code}")
+
+
+def bench_timeouts(args):
+    """
+    先执行history轮建立历史结果日志，再让其中一个转换卡住，分别用固定超时和自适应超时执行，
+    比较发现卡住所用的时间、其余用例是否误判，以及预测与实际的总耗时
+    """
+    harness = load_harness()
+    test_cases = harness.CSVDataReader.read_test_cases(args.csv)[:args.cases]
+    simulation = {"time_scale": args.time_scale, "conversion_jitter": 0.1}
+
+    print("\n" + "=" * 60)
+    print(f"自适应超时基准 (time_scale={args.time_scale}, 用例数={len(test_cases)}, 历史轮数={args.history}, "
+          f"固定超时={args.timeout}秒, 卡住第{args.hang}个转换)")
+    with tempfile.TemporaryDirectory() as work_dir:
+        for round_index in range(args.history):
+            test_manager = make_test_manager(harness, work_dir, args.time_scale,
+                                             simulation=dict(simulation, seed=round_index))
+            harness.run_test_cases(test_manager, test_cases)
+            # 结果日志按秒命名，避免同一秒内的两轮写入同一个文件
+            time.sleep(1.0)
+
+        for adaptive in [False, True]:
+            test_manager = make_test_manager(
+                harness, work_dir, args.time_scale, timeout=args.timeout, adaptive_timeouts=adaptive,
+                simulation=dict(simulation, seed=args.history, hang_conversions=[args.hang]))
+            start = time.perf_counter()
+            harness.run_test_cases(test_manager, test_cases)
+            total = time.perf_counter() - start
+            results = list(harness.iter_case_results(test_manager.all_results))
+            hung = results[args.hang - 1]
+            others = [r for r in results if r is not hung]
+            label = "自适应超时" if adaptive else "固定超时"
+            print(f"  {label}: 总耗时={total:.2f}秒, 卡住用例 {hung['用例ID']} {hung['状态']}于"
+                  f"{hung['步骤耗时'].get('监控转换过程', 0):.2f}秒, "
+                  f"其余通过={sum(r['状态'] == '通过' for r in others)}/{len(others)}")
+            if adaptive:
+                prediction = test_manager.all_results["耗时预测"]
+                print(f"    预计={prediction['预计']}秒 ({prediction['有历史']}/{prediction['用例数']}有历史), "
+                      f"实际={prediction['实际']}秒, 超出步骤上限={prediction['超出上限']}, "
+                      f"判定卡住={prediction['判定卡住']}")
+                print(f"    卡住用例: {harness.format_timeout_bounds(hung)}")
+                print(f"    示例: {harness.format_timeout_bounds(others[0])}")
+            time.sleep(1.0)
+        os.chdir(REPO_DIR)
+
+
+def true_conversion_seconds(frame: pd.DataFrame, interaction: float) -> np.ndarray:
+    """模拟后端的转换耗时（未缩放、无波动），另加e57与随机抽稀同时启用时的交互耗时"""
+    import runtime_model
+    import vortex_sim
+    extra = vortex_sim.DEFAULT_CONVERSION_EXTRA
+    seconds = np.full(len(frame), vortex_sim.DEFAULT_LATENCIES["conversion"])
+    for column in runtime_model.PARAMETERS:
+        values = frame[column]
+        seconds += np.where(values == "启用", extra.get(column, 0.0), values.map(extra).fillna(0.0))
+    return seconds + interaction * ((frame["输出格式"] == "e57") & (frame["随机抽稀"] == "启用")).to_numpy()
+
+
+def bench_runtime(args):
+    """
+    按模拟后端的耗时规则生成runs份历史汇总CSV（只覆盖部分配置，含失败和注入的异常结果），
+    测量读取和拟合耗时，与真实值比较边际耗时、未测配置的预测和异常检出，并比较分片的最长完成时间
+    """
+    import runtime_model
+    rng = np.random.default_rng(args.seed)
+    configs = runtime_model.all_configurations()
+    configs.insert(0, "用例ID", [f"TC{i + 1:04d}" for i in range(len(configs))])
+    tested = configs.iloc[np.sort(rng.choice(len(configs), int(len(configs) * args.coverage), replace=False))]
+    truth = true_conversion_seconds(tested, args.interaction)
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        injected = set()
+        for run in range(args.runs):
+            rows = rng.integers(0, len(tested), args.per_run)
+            frame = tested.iloc[rows].reset_index(drop=True)
+            seconds = truth[rows] * np.maximum(1.0 + rng.normal(0.0, args.jitter, len(rows)), 0.1)
+            failed = rng.random(len(rows)) < 0.02
+            frame["状态"] = np.where(failed, "失败", "通过")
+            frame["转换耗时(秒)"] = np.where(failed, "N/A", np.char.mod("%.2f", seconds))
+            frame["开始时间"] = [f"2026-01-01T00:00:00.{run:06d}-{k}" for k in range(len(rows))]
+            if run < args.anomalies:
+                k = int(np.flatnonzero(~failed)[0])
+                frame.loc[k, "转换耗时(秒)"] = f"{seconds[k] * 3:.2f}"
+                injected.add((frame.loc[k, "用例ID"], frame.loc[k, "开始时间"]))
+            frame.to_csv(os.path.join(work_dir, f"test_summary_{run:06d}.csv"), index=False, encoding="utf-8")
+
+        start = time.perf_counter()
+        frame = runtime_model.load_summaries(runtime_model.find_summaries(work_dir))
+        load_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        model = runtime_model.RuntimeModel(interactions=not args.no_interactions).fit(frame)
+        fit_seconds = time.perf_counter() - start
+
+    score = model.score()
+    print("\n" + "=" * 60)
+    print(f"转换耗时模型基准 (历史汇总={args.runs}份×{args.per_run}行, 覆盖配置={len(tested)}/{len(configs)}, "
+          f"波动={args.jitter:.0%}, e57×随机抽稀交互={args.interaction}秒, 交互项={'否' if args.no_interactions else '是'})")
+    print(f"  读取: {load_seconds:.2f}秒 ({score['结果数']}个通过的结果), 拟合: {fit_seconds * 1000:.1f}毫秒, "
+          f"R²={score['R2']}, RMSE={score['RMSE']}秒")
+
+    # 真实边际耗时：同样把历史配置中的一个参数改为各取值后求平均真实耗时
+    counts = model.results.groupby("用例ID").size()
+    history = tested.set_index("用例ID").loc[counts.index].reset_index()
+    expected = {}
+    for name, levels in runtime_model.FACTORS.items():
+        averages = {}
+        for level in levels:
+            changed = history.copy()
+            for column, value in (runtime_model.THINNING_MODES[level].items() if name == "抽稀组合"
+                                  else [(name, level)]):
+                changed[column] = value
+            averages[level] = np.average(true_conversion_seconds(changed, args.interaction), weights=counts)
+        cheapest = min(averages.values())
+        expected.update({(name, level): average - cheapest for level, average in averages.items()})
+    costs = model.marginal_costs()
+    errors = [abs(row["边际耗时(秒)"] - expected[(row["参数"], row["取值"])]) for _, row in costs.iterrows()]
+    print(f"  边际耗时: 最大误差={max(errors):.2f}秒")
+    for _, row in costs[costs["参数"].isin(["输出格式", "抽稀组合"])].iterrows():
+        print(f"    {row['参数']}={row['取值']}: 估计+{row['边际耗时(秒)']:.2f}秒, "
+              f"真实+{expected[(row['参数'], row['取值'])]:.2f}秒")
+
+    untested = model.untested()
+    actual = true_conversion_seconds(untested, args.interaction)
+    error = np.abs(untested["预测耗时"].to_numpy() - actual)
+    print(f"  未测配置: {len(untested)}个, 预测平均绝对误差={error.mean():.2f}秒, 最大={error.max():.2f}秒, "
+          f"含外推组合的配置={int((untested['外推'] > 0).sum())}个")
+
+    flagged = set(zip(*[model.anomalies(args.anomaly_z)[column] for column in ("用例ID", "开始时间")]))
+    print(f"  异常结果: 注入{len(injected)}个, 检出{len(flagged)}个, 命中{len(flagged & injected)}个 (|z|≥{args.anomaly_z})")
+
+    all_actual = true_conversion_seconds(configs, args.interaction)
+    parts, _ = runtime_model.shard(model.predict(configs), args.shards)
+    lpt = max(all_actual[part].sum() for part in parts)
+    round_robin = max(all_actual[i::args.shards].sum() for i in range(args.shards))
+    print(f"  完整组合分成{args.shards}份: 按预测耗时贪心分片 最长{lpt:.0f}秒, 轮流分配 最长{round_robin:.0f}秒, "
+          f"理想{all_actual.sum() / args.shards:.0f}秒")
+
+
+def bench_artifacts(args):
+    """模拟转换写出各格式的点云文件并校验；再对大文件测量流式校验的速度和内存峰值"""
+    harness = load_harness()
+    import vortex_sim
+
+    print("\n" + "=" * 60)
+    print("输出文件校验基准")
+    test_cases = harness.CSVDataReader.read_test_cases(args.csv)
+    # 每种输出格式一个用例（CSV中没有的格式由第一个用例改写）
+    by_format = {}
+    for test_case in test_cases:
+        by_format.setdefault(test_case["输出格式"], test_case)
+    for index, fmt in enumerate(["pts", "las", "e57"]):
+        if fmt not in by_format:
+            by_format[fmt] = dict(test_cases[0], 用例ID=f"FMT{index + 1:02d}", 输出格式=fmt)
+    with tempfile.TemporaryDirectory() as work_dir:
+        output_dir = os.path.join(work_dir, "outputs")
+        test_manager = make_test_manager(
+            harness, work_dir, args.time_scale, verify_outputs=True,
+            **exports_to(output_dir, time_scale=args.time_scale, artifact_points=50000))
+        harness.run_test_cases(test_manager, list(by_format.values()))
+        results = list(harness.iter_case_results(test_manager.all_results))
+        os.chdir(REPO_DIR)
+    for result in results:
+        check = result["输出校验"]
+        print(f"  {result['用例ID']} ({result['配置']['输出格式']}): {result['状态']}, "
+              f"{harness.format_output_check(check)}")
+
+    points = vortex_sim.sample_points(args.points)
+    with tempfile.TemporaryDirectory() as work_dir:
+        for fmt in ["las", "e57", "pts"]:
+            path = os.path.join(work_dir, f"large.{fmt}")
+            vortex_sim.write_artifact(path, points)
+            sampler = ResourceSampler(os.getpid(), interval=0.02).start()
+            start = time.perf_counter()
+            info = harness.verify_output_folder(work_dir, fmt)["文件"][-1]
+            elapsed = time.perf_counter() - start
+            usage = sampler.stop()
+            os.remove(path)
+            peak = usage.get("内存MB", {}).get("峰值")
+            print(f"  {fmt}: {info['字节数'] / 1e6:.0f}MB, {info['点数']}个点, 校验{elapsed:.2f}秒 "
+                  f"({info['字节数'] / 1e6 / elapsed:.0f}MB/s), 进程内存峰值{peak}MB, 问题={info['问题']}")
+
+
+# 点云质量基准中的抽稀/降噪/厚度优化组合
+QUALITY_VARIANTS = [
+    {"点云抽稀": "不启用", "体素抽稀": "", "随机抽稀": "", "点云降噪": "不启用", "点云厚度优化": "不启用"},
+    {"点云抽稀": "启用", "体素抽稀": "启用", "随机抽稀": "", "点云降噪": "不启用", "点云厚度优化": "不启用"},
+    {"点云抽稀": "启用", "体素抽稀": "", "随机抽稀": "启用", "点云降噪": "不启用", "点云厚度优化": "不启用"},
+    {"点云抽稀": "不启用", "体素抽稀": "", "随机抽稀": "", "点云降噪": "启用", "点云厚度优化": "不启用"},
+    {"点云抽稀": "不启用", "体素抽稀": "", "随机抽稀": "", "点云降噪": "不启用", "点云厚度优化": "启用"},
+]
+
+
+def bench_quality(args):
+    """模拟转换导出不同抽稀/降噪/厚度优化设置的点云，分析质量指标并按配置汇总"""
+    harness = load_harness()
+    import vortex_sim
+    from artifact_verifier import read_points
+    from point_metrics import analyze_points
+
+    print("\n" + "=" * 60)
+    print("点云质量分析基准")
+    base = harness.CSVDataReader.read_test_cases(args.csv)[0]
+    test_cases = [dict(base, 用例ID=f"Q{index + 1:02d}", 输出格式=args.format, **variant)
+                  for index, variant in enumerate(QUALITY_VARIANTS)]
+    with tempfile.TemporaryDirectory() as work_dir:
+        output_dir = os.path.join(work_dir, "outputs")
+        test_manager = make_test_manager(
+            harness, work_dir, args.time_scale, point_metrics=True,
+            **exports_to(output_dir, time_scale=args.time_scale, artifact_points=args.points))
+        harness.run_test_cases(test_manager, test_cases)
+        results = list(harness.iter_case_results(test_manager.all_results))
+        os.chdir(REPO_DIR)
+    for result in results:
+        print(f"  {result['用例ID']}: {result['状态']}, {harness.format_point_metrics(result['点云指标'])}")
+    print("  按配置汇总（缩减比例相对不抽稀配置）:")
+    for entry in harness.summarize_point_quality(results):
+        reduction = f"{entry['缩减比例'] * 100:.1f}%" if entry["缩减比例"] is not None else "-"
+        print(f"    {harness.config_label(entry['配置'])}: 点数{entry['点数']:.0f}, "
+              f"缩减{reduction}, 离群{entry['离群比例'] * 100:.2f}%, 厚度{entry['厚度'] * 1000:.2f}毫米, "
+              f"转换{entry['转换耗时']:.3f}秒")
+
+    # 大文件的分析耗时和内存峰值
+    points = vortex_sim.scene_points(args.large_points, {})
+    with tempfile.TemporaryDirectory() as work_dir:
+        path = os.path.join(work_dir, f"large.{args.format}")
+        vortex_sim.write_artifact(path, points)
+        del points
+        sampler = ResourceSampler(os.getpid(), interval=0.02).start()
+        metrics = analyze_points(lambda: read_points([path]))
+        usage = sampler.stop()
+    print(f"  {args.large_points}点的{args.format}文件: 分析{metrics['分析耗时']:.2f}秒 "
+          f"({args.large_points / metrics['分析耗时']:.0f}点/秒), 进程内存峰值"
+          f"{usage.get('内存MB', {}).get('峰值')}MB, {metrics['最近邻方法']}")
+
+
+def legacy_poll(driver, dlg, check_interval: float, timeout: float) -> float:
+    """原实现：每次循环重建MessageForm规格并搜索控件树，固定间隔休眠"""
+    start = time.perf_counter()
+    while time.perf_counter() - start < timeout:
+        success_window = driver.child(dlg, auto_id="MessageForm")
+        if driver.exists(success_window) and driver.is_visible(success_window):
+            return time.perf_counter()
+        time.sleep(check_interval)
+    return float("nan")
+
+
+def completion_durations(duration: float, trials: int, check_interval: float) -> List[float]:
+    """同一配置重复转换，耗时在±10%内波动；另加不同的小数部分，避免全部落在固定轮询的时刻上"""
+    return [duration * (1 + 0.1 * ((i * 7) % 5 - 2) / 2) + (i * 0.37) % check_interval for i in range(trials)]
+
+
+def completion_trials(sim, mode: str, durations: List[float], check_interval: float,
+                      timeout: float) -> Dict[str, Any]:
+    """用一种完成检测方式依次等待durations中的转换，返回检测误差、控件树搜索次数和CPU时间"""
+    from vortex_driver import PollSchedule, create_driver
+
+    driver = create_driver({"ui_driver": "simulated"}, simulator=sim)
+    dlg = driver.connect(driver.find_window("VORTEX Client"))
+    instance = sim.instances[0]
+
+    def detect(history: List[float]) -> float:
+        if mode == "固定轮询":
+            return legacy_poll(driver, dlg, check_interval, timeout)
+        # 与执行器一样，用历史转换耗时的均值作为预期耗时
+        expected = statistics.mean(history) if history else None
+        schedule = PollSchedule(max_interval=check_interval, expected_duration=expected)
+        wait = driver.wait_for_window(dlg, timeout, schedule=schedule,
+                                      use_events=(mode == "窗口事件"), auto_id="MessageForm")
+        return wait["检测时间"]
+
+    errors, cpu, searches, history = [], 0.0, 0, []
+    for duration in durations:
+        sim.latencies["conversion"] = duration
+        searches_before = sim.stats["tree_searches"]
+        cpu_before = time.process_time()
+        conversion = instance.start_conversion("bench", {})
+        detected_at = detect(history)
+        cpu += time.process_time() - cpu_before
+        searches += sim.stats["tree_searches"] - searches_before
+        errors.append(detected_at - conversion["结束"])
+        history.append(conversion["结束"] - conversion["开始"])
+        driver.click(driver.child(driver.child(dlg, auto_id="MessageForm"), control_type="Button", title="确定"))
+        time.sleep(sim.delay("window_close"))
+    return {"误差": errors, "控件树搜索": searches, "CPU": cpu}
+
+
+def bench_completion(args):
+    """比较固定间隔轮询、自适应轮询和窗口事件三种完成检测方式的计时误差和CPU开销"""
+    from vortex_sim import SimulatedVortex
+
+    sim = SimulatedVortex(time_scale=1.0, latencies={"node_search": 0.0})
+    durations = completion_durations(args.duration, args.trials, args.check_interval)
+    print("\n" + "=" * 60)
+    print(f"完成检测基准 (check_interval={args.check_interval}秒, 转换耗时={', '.join(f'{d:.2f}' for d in durations)}秒)")
+    for mode in ["固定轮询", "自适应轮询", "窗口事件"]:
+        trials = completion_trials(sim, mode, durations, args.check_interval, args.timeout)
+        errors = trials["误差"]
+        print(f"  {mode}: 平均检测误差={statistics.mean(errors) * 1000:.1f}毫秒, "
+              f"最大检测误差={max(errors) * 1000:.1f}毫秒, 控件树搜索={trials['控件树搜索']}次, "
+              f"CPU={trials['CPU'] * 1000:.1f}毫秒")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="基于模拟VORTEX后端的性能基准")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    pipeline = subparsers.add_parser("pipeline", help="完整测试流程")
+    pipeline.add_argument("--csv", default=DEFAULT_CSV, help="测试用例CSV文件")
+    pipeline.add_argument("--cases", type=int, default=5, help="运行的用例数")
+    pipeline.add_argument("--time-scale", type=float, default=0.05, help="模拟延迟缩放系数")
+    pipeline.set_defaults(func=bench_pipeline)
+
+    parallel = subparsers.add_parser("parallel", help="多实例并行执行")
+    parallel.add_argument("--csv", default=DEFAULT_CSV, help="测试用例CSV文件")
+    parallel.add_argument("--cases", type=int, default=8, help="运行的用例数")
+    parallel.add_argument("--instances", type=int, default=4, help="模拟的VORTEX实例数")
+    parallel.add_argument("--time-scale", type=float, default=0.05, help="模拟延迟缩放系数")
+    parallel.set_defaults(func=bench_parallel)
+
+    engine = subparsers.add_parser("engine", help="线程执行与asyncio执行核心对比")
+    engine.add_argument("--csv", default=DEFAULT_CSV, help="测试用例CSV文件")
+    engine.add_argument("--cases", type=int, default=8, help="运行的用例数")
+    engine.add_argument("--instances", type=int, default=4, help="模拟的VORTEX实例数")
+    engine.add_argument("--time-scale", type=float, default=0.05, help="模拟延迟缩放系数")
+    engine.add_argument("--points", type=int, default=100000, help="模拟导出的点数")
+    engine.add_argument("--port", type=int, default=8767, help="进度看板端口")
+    engine.set_defaults(func=bench_engine)
+
+    schedule = subparsers.add_parser("schedule", help="用例重排与导出设置复用")
+    schedule.add_argument("--csv", default=DEFAULT_CSV, help="测试用例CSV文件")
+    schedule.add_argument("--cases", type=int, default=16, help="运行的用例数")
+    schedule.add_argument("--time-scale", type=float, default=0.02, help="模拟延迟缩放系数")
+    schedule.set_defaults(func=bench_schedule)
+
+    lookup = subparsers.add_parser("lookup", help="控件查找缓存")
+    lookup.add_argument("--csv", default=DEFAULT_CSV, help="测试用例CSV文件")
+    lookup.add_argument("--cases", type=int, default=8, help="运行的用例数")
+    lookup.add_argument("--time-scale", type=float, default=0.02, help="模拟延迟缩放系数")
+    lookup.set_defaults(func=bench_lookup)
+
+    snapshot = subparsers.add_parser("snapshot", help="控件树快照与单独查找对比")
+    snapshot.add_argument("--repeats", type=int, default=20, help="重复次数")
+    snapshot.add_argument("--node-cost", type=float, default=0.0002, help="每访问一个节点的耗时（秒）")
+    snapshot.add_argument("--filler", type=int, default=30, help="每个窗口中的无关控件数")
+    snapshot.set_defaults(func=bench_snapshot)
+
+    reports = subparsers.add_parser("reports", help="结果日志与报告生成")
+    reports.add_argument("--cases", type=int, nargs="+", default=[1000, 2000, 5000, 10000], help="合成用例数")
+    reports.set_defaults(func=bench_reports)
+
+    progress = subparsers.add_parser("progress", help="进度看板开销")
+    progress.add_argument("--csv", default=DEFAULT_CSV, help="测试用例CSV文件")
+    progress.add_argument("--cases", type=int, default=6, help="运行的用例数")
+    progress.add_argument("--time-scale", type=float, default=0.05, help="模拟延迟缩放系数")
+    progress.add_argument("--port", type=int, default=8765, help="看板端口")
+    progress.add_argument("--poll-interval", type=float, default=0.05, help="请求/status.json的间隔（秒）")
+    progress.set_defaults(func=bench_progress)
+
+    resources = subparsers.add_parser("resources", help="进程资源采样")
+    resources.add_argument("--duration", type=float, default=3.0, help="假进程运行时间（秒）")
+    resources.add_argument("--interval", type=float, default=0.5, help="采样间隔（秒）")
+    resources.add_argument("--repeats", type=int, default=200, help="测量采样开销的次数")
+    resources.add_argument("--rate", type=int, default=50, help="高频采样率（Hz）")
+    resources.add_argument("--long-run", type=float, default=10000, help="长时间运行模拟的秒数")
+    resources.add_argument("--capacity", type=int, default=4096, help="缓冲区桶数")
+    resources.set_defaults(func=bench_resources)
+
+    trials = subparsers.add_parser("trials", help="重复试验统计")
+    trials.add_argument("--csv", default=DEFAULT_CSV, help="测试用例CSV文件")
+    trials.add_argument("--cases", type=int, default=4, help="配置数")
+    trials.add_argument("--repeat", type=int, default=8, help="每个配置的试验次数")
+    trials.add_argument("--warmup", type=int, default=1, help="每个配置的预热次数")
+    trials.add_argument("--jitter", type=float, default=0.05, help="模拟转换耗时的相对波动")
+    trials.add_argument("--time-scale", type=float, default=0.02, help="模拟延迟缩放系数")
+    trials.set_defaults(func=bench_trials)
+
+    regression = subparsers.add_parser("regression", help="性能基线与回归检测")
+    regression.add_argument("--csv", default=DEFAULT_CSV, help="测试用例CSV文件")
+    regression.add_argument("--cases", type=int, default=4, help="配置数")
+    regression.add_argument("--repeat", type=int, default=4, help="每个配置的试验次数")
+    regression.add_argument("--slowdown", type=float, default=0.3, help="第二个版本中随机抽稀额外耗时的增加比例")
+    regression.add_argument("--jitter", type=float, default=0.03, help="模拟转换耗时的相对波动")
+    regression.add_argument("--time-scale", type=float, default=0.02, help="模拟延迟缩放系数")
+    regression.set_defaults(func=bench_regression)
+
+    timeouts = subparsers.add_parser("timeouts", help="根据历史耗时的自适应超时")
+    timeouts.add_argument("--csv", default=DEFAULT_CSV, help="测试用例CSV文件")
+    timeouts.add_argument("--cases", type=int, default=4, help="运行的用例数")
+    timeouts.add_argument("--history", type=int, default=5,
+                          help="建立历史的执行轮数（每个配置至少timeout_min_samples轮才有超时上限）")
+    timeouts.add_argument("--hang", type=int, default=2, help="卡住的转换序号（从1开始）")
+    timeouts.add_argument("--timeout", type=float, default=30, help="固定的转换超时（秒）")
+    timeouts.add_argument("--time-scale", type=float, default=0.05, help="模拟延迟缩放系数")
+    timeouts.set_defaults(func=bench_timeouts)
+
+    runtime = subparsers.add_parser("runtime", help="转换耗时回归模型")
+    runtime.add_argument("--runs", type=int, default=2000, help="历史汇总CSV份数")
+    runtime.add_argument("--per-run", type=int, default=30, help="每份汇总的用例数")
+    runtime.add_argument("--coverage", type=float, default=0.6, help="历史中出现过的配置比例")
+    runtime.add_argument("--jitter", type=float, default=0.1, help="转换耗时的相对波动")
+    runtime.add_argument("--interaction", type=float, default=6.0, help="e57与随机抽稀同时启用时的额外耗时（秒）")
+    runtime.add_argument("--anomalies", type=int, default=20, help="注入的异常结果数（耗时×3）")
+    runtime.add_argument("--anomaly-z", type=float, default=3.5, help="异常结果的稳健z分数阈值")
+    runtime.add_argument("--shards", type=int, default=4, help="分片数")
+    runtime.add_argument("--no-interactions", action="store_true", help="只拟合主效应")
+    runtime.add_argument("--seed", type=int, default=0, help="随机种子")
+    runtime.set_defaults(func=bench_runtime)
+
+    artifacts = subparsers.add_parser("artifacts", help="输出文件流式校验")
+    artifacts.add_argument("--csv", default=DEFAULT_CSV, help="测试用例CSV文件")
+    artifacts.add_argument("--points", type=int, default=2000000, help="大文件的点数")
+    artifacts.add_argument("--time-scale", type=float, default=0.02, help="模拟延迟缩放系数")
+    artifacts.set_defaults(func=bench_artifacts)
+
+    quality = subparsers.add_parser("quality", help="点云质量指标")
+    quality.add_argument("--csv", default=DEFAULT_CSV, help="测试用例CSV文件")
+    quality.add_argument("--points", type=int, default=200000, help="每次模拟导出的点数（抽稀前）")
+    quality.add_argument("--large-points", type=int, default=2000000, help="分析耗时测试的点数")
+    quality.add_argument("--format", default="las", choices=["pts", "las", "e57"], help="导出格式")
+    quality.add_argument("--time-scale", type=float, default=0.02, help="模拟延迟缩放系数")
+    quality.set_defaults(func=bench_quality)
+
+    watch = subparsers.add_parser("watch", help="输出文件夹监视")
+    watch.add_argument("--csv", default=DEFAULT_CSV, help="测试用例CSV文件")
+    watch.add_argument("--size", type=float, default=50, help="写文件进程写入的MB数")
+    watch.add_argument("--seconds", type=float, default=2.0, help="写入持续时间")
+    watch.add_argument("--pieces", type=int, default=40, help="分块数")
+    watch.add_argument("--interval", type=float, default=0.05, help="监视间隔")
+    watch.add_argument("--stable-time", type=float, default=0.3, help="大小稳定判定时间")
+    watch.add_argument("--cases", type=int, default=3, help="模拟流程的用例数")
+    watch.add_argument("--points", type=int, default=200000, help="模拟导出的点数")
+    watch.add_argument("--time-scale", type=float, default=0.1, help="模拟延迟缩放系数")
+    watch.set_defaults(func=bench_watch)
+
+    io = subparsers.add_parser("io", help="转换期间的IO统计和负载分类")
+    io.add_argument("--size", type=float, default=200, help="写文件进程写入的MB数")
+    io.add_argument("--seconds", type=float, default=2.0, help="计算和空等进程的持续时间")
+    io.set_defaults(func=bench_io)
+
+    completion = subparsers.add_parser("completion", help="转换完成检测方式对比")
+    completion.add_argument("--duration", type=float, default=4.0, help="转换耗时基准值（秒）")
+    completion.add_argument("--trials", type=int, default=6, help="每种方式的转换次数")
+    completion.add_argument("--check-interval", type=float, default=0.5, help="轮询间隔上限（秒）")
+    completion.add_argument("--timeout", type=float, default=60, help="单次等待超时（秒）")
+    completion.set_defaults(func=bench_completion)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
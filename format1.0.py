@@ -1,11 +1,11 @@
-from pywinauto import Application, ElementNotFoundError
-import win32gui 
 import time
 import json
 import os
 from datetime import datetime
 import logging
 
+from vortex_driver import create_driver, ElementNotFoundError
+
 # ==================== 配置部分 ====================
 class PointCloudConversionTest:
     def __init__(self):
@@ -19,7 +19,8 @@ class PointCloudConversionTest:
             'texture': '反射率',
             'output_path': 'F:\\e57+合并+反射率',
             'timeout': 1000,
-            'check_interval': 0.5
+            'check_interval': 0.5,
+            'ui_driver': 'pywinauto'
         }
         
         # 测试结果
@@ -57,7 +58,7 @@ class PointCloudConversionTestCase:
     def __init__(self, test_manager):
         self.tm = test_manager
         self.logger = test_manager.logger
-        self.app = None
+        self.driver = create_driver(test_manager.test_config)
         self.dlg = None
         
     def setup(self):
@@ -73,16 +74,15 @@ class PointCloudConversionTestCase:
         """步骤1: 连接到VORTEX Client应用"""
         self.logger.info("\n--- 步骤1: 连接VORTEX Client应用 ---")
         try:
-            hwnd = win32gui.FindWindow(None, "VORTEX Client")
+            hwnd = self.driver.find_window("VORTEX Client")
             if not hwnd:
                 raise Exception("未找到标题为'VORTEX Client'的窗口")
             
-            self.app = Application(backend="uia").connect(handle=hwnd)
-            self.dlg = self.app.window(handle=hwnd)
-            self.dlg.wait('visible enabled', timeout=10)
-            self.dlg.set_focus()
+            self.dlg = self.driver.connect(hwnd)
+            self.driver.wait(self.dlg, 'visible enabled', timeout=10)
+            self.driver.set_focus(self.dlg)
             
-            vortex_pid = self.dlg.process_id()
+            vortex_pid = self.driver.process_id(self.dlg)
             self.logger.info(f"✅ 成功连接VORTEX主窗口: 句柄={hex(hwnd)}, PID={vortex_pid}")
             
             self.tm.test_results['steps'].append({
@@ -107,20 +107,21 @@ class PointCloudConversionTestCase:
         """步骤2: 定位目标子窗口"""
         self.logger.info("\n--- 步骤2: 定位目标子窗口 ---")
         try:
-            vortex_window = self.dlg.window(
+            vortex_window = self.driver.child(
+                self.dlg,
                 title_re=".*RE小房间-常规.*",
                 control_type="Window"
             )
-            vortex_window.wait('visible', timeout=5)
+            self.driver.wait(vortex_window, 'visible', timeout=5)
             
-            self.logger.info(f"✅ 定位到目标窗口: {vortex_window.window_text()}")
+            self.logger.info(f"✅ 定位到目标窗口: {self.driver.window_text(vortex_window)}")
             self.vortex_window = vortex_window
             
             self.tm.test_results['steps'].append({
                 'step': 2,
                 'description': '定位目标子窗口',
                 'status': 'PASS',
-                'details': f"窗口标题: {vortex_window.window_text()}"
+                'details': f"窗口标题: {self.driver.window_text(vortex_window)}"
             })
             return True
             
@@ -159,24 +160,24 @@ class PointCloudConversionTestCase:
                 
                 # 特殊窗口处理
                 if desc == '点击【点云】选项':
-                    option_window = self.dlg.window(title_re=".*选项.*", control_type="Window")
-                    option_window.wait('visible', timeout=5)
+                    option_window = self.driver.child(self.dlg, title_re=".*选项.*", control_type="Window")
+                    self.driver.wait(option_window, 'visible', timeout=5)
                     self.option_window = option_window
                     window = option_window
                     
                 elif desc == '选择e57格式':
-                    export_window = self.dlg.window(title_re=".*点云导出.*", control_type="Window")
-                    export_window.wait('visible', timeout=5)
+                    export_window = self.driver.child(self.dlg, title_re=".*点云导出.*", control_type="Window")
+                    self.driver.wait(export_window, 'visible', timeout=5)
                     self.export_window = export_window
                     window = export_window
                 
-                control = window.child_window(control_type=ctrl_type, title=title)
-                control.wait('visible enabled', timeout=2)
+                control = self.driver.child(window, control_type=ctrl_type, title=title)
+                self.driver.wait(control, 'visible enabled', timeout=2)
                 
                 if ctrl_type == 'CheckBox':
-                    control.toggle()
+                    self.driver.toggle(control)
                 else:
-                    control.click_input()
+                    self.driver.click(control)
                 
                 self.logger.info(f"✅ {desc}成功")
                 self.tm.test_results['steps'].append({
@@ -203,34 +204,35 @@ class PointCloudConversionTestCase:
         
         try:
             # 定位浏览文件夹窗口
-            browser_window = self.dlg.window(
+            browser_window = self.driver.child(
+                self.dlg,
                 title_re=".*浏览文件夹.*",
                 control_type="Window"
             )
-            browser_window.wait('visible', timeout=5)
+            self.driver.wait(browser_window, 'visible', timeout=5)
             self.logger.info(f"✅ 定位到浏览文件夹窗口")
             
             # 点击此电脑
-            browser_window.child_window(control_type="TreeItem", title="此电脑").click_input()
+            self.driver.click(self.driver.child(browser_window, control_type="TreeItem", title="此电脑"))
             self.logger.info("✅ 点击【此电脑】成功")
             
             # 点击F盘
-            browser_window.child_window(control_type="TreeItem", title="新加卷 (F:)").click_input()
+            self.driver.click(self.driver.child(browser_window, control_type="TreeItem", title="新加卷 (F:)"))
             self.logger.info("✅ 点击【F盘】成功")
             
             # 新建文件夹
-            browser_window.child_window(control_type="Button", title="新建文件夹(M)").click_input()
+            self.driver.click(self.driver.child(browser_window, control_type="Button", title="新建文件夹(M)"))
             self.logger.info("✅ 点击【新建文件夹】成功")
             
             # 输入文件夹名
-            edit = browser_window.child_window(control_type="Edit", auto_id="1")
-            edit.wait('visible enabled', timeout=7)
+            edit = self.driver.child(browser_window, control_type="Edit", auto_id="1")
+            self.driver.wait(edit, 'visible enabled', timeout=7)
             folder_name = f"e57+{self.tm.test_config['export_type']}+{self.tm.test_config['texture']}"
-            edit.set_text(folder_name)
+            self.driver.set_text(edit, folder_name)
             self.logger.info(f"✅ 文件夹命名为: {folder_name}")
             
             # 点击确定
-            browser_window.child_window(control_type="Button", title="确定").click_input()
+            self.driver.click(self.driver.child(browser_window, control_type="Button", title="确定"))
             self.logger.info("✅ 点击【确定】成功")
             
             self.tm.test_results['steps'].append({
@@ -265,8 +267,8 @@ class PointCloudConversionTestCase:
         
         while not convert_success and (time.time() - start_time) < timeout:
             try:
-                success_window = self.dlg.window(auto_id="MessageForm")
-                if success_window.exists() and success_window.is_visible():
+                success_window = self.driver.child(self.dlg, auto_id="MessageForm")
+                if self.driver.exists(success_window) and self.driver.is_visible(success_window):
                     convert_success = True
                     self.logger.info("🎉 检测到【格式转换成功】窗口出现！")
                     
@@ -310,10 +312,10 @@ class PointCloudConversionTestCase:
         self.logger.info("尝试关闭转换成功窗口...")
         
         methods = [
-            ("发送回车键", lambda: window.type_keys('{ENTER}')),
-            ("发送空格键", lambda: window.type_keys(' ')),
-            ("调用close()方法", lambda: window.close()),
-            ("发送Alt+F4", lambda: window.type_keys('%{F4}')),
+            ("发送回车键", lambda: self.driver.type_keys(window, '{ENTER}')),
+            ("发送空格键", lambda: self.driver.type_keys(window, ' ')),
+            ("调用close()方法", lambda: self.driver.close(window)),
+            ("发送Alt+F4", lambda: self.driver.type_keys(window, '%{F4}')),
         ]
         
         for method_name, method in methods:
@@ -321,7 +323,7 @@ class PointCloudConversionTestCase:
                 method()
                 self.logger.info(f"✅ 使用{method_name}关闭窗口成功")
                 time.sleep(1)
-                if not window.exists():
+                if not self.driver.exists(window):
                     return True
             except Exception as e:
                 self.logger.debug(f"⚠️ {method_name}失败: {e}")
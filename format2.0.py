@@ -1,15 +1,64 @@
-from pywinauto import Application, ElementNotFoundError
-import win32gui 
+import argparse
+import asyncio
+import glob
+import html
 import time
 import csv
 import os
 import json
-from datetime import datetime
+import queue
+import threading
+from collections import deque
+from contextlib import nullcontext
+from datetime import datetime, timedelta
 import logging
+import numpy as np
 import pandas as pd
-from typing import Dict, List, Any, Optional
+import re
+import sys
+from typing import Awaitable, Callable, Dict, List, Any, Optional, Sequence
 import traceback
 
+from vortex_driver import create_driver, PollSchedule, SelectorCache, wait_until
+from result_journal import ResultJournal, read_journal, read_latest
+from progress_server import AsyncProgressServer, ProgressServer, RunProgress, current_worker
+from resource_sampler import ResourceSampler
+from phase_timer import PHASE_COLORS, PhaseTimer, perf_ns
+from baseline_store import BaselineStore, compare_runs
+from artifact_verifier import find_artifacts, read_points, verify_output_folder
+from point_metrics import analyze_points
+from output_watcher import OutputWatcher, folder_size
+from async_engine import InstanceThread, TaskScope, run_all
+from timeout_model import CASE, CONVERSION, TimeoutModel
+from runtime_model import RuntimeModel, find_summaries, load_summaries, longest_first
+
+# 原流程中的固定延迟（秒），条件等待以此为默认上限，并据此计算节省的时间
+FIXED_DELAYS = {
+    "此电脑展开": 1.0,
+    "选择盘符": 1.0,
+    "新建文件夹": 2.0,
+    "关闭提示窗口": 1.0,
+    "用例间隔": 3.0,
+}
+
+# 用例之间应当已经关闭的弹窗
+POPUP_SELECTORS = [
+    {"auto_id": "MessageForm"},
+    {"title_re": ".*选项.*", "control_type": "Window"},
+    {"title_re": ".*点云导出.*", "control_type": "Window"},
+    {"title_re": ".*浏览文件夹.*", "control_type": "Window"},
+]
+
+# 点云导出窗口中需要操作的控件，打开窗口后一次快照全部解析并校验布局
+THINNING_MODE_TITLES = ["体素抽稀", "随机抽稀"]  # 启用点云抽稀后才出现
+EXPORT_DIALOG_SELECTORS = (
+    [{"control_type": "RadioButton", "title": title}
+     for title in ["pts", "e57", "las"] + THINNING_MODE_TITLES + ["单站", "合并", "单站+合并",
+                   "灰阶图", "反射率", "彩图", "反射率+彩图", "反射率+灰阶图"]] +
+    [{"control_type": "CheckBox", "title": title} for title in ["启用", "点云降噪", "点云厚度优化"]] +
+    [{"control_type": "Pane", "title": "导出", "auto_id": "uiButton3"}]
+)
+
 # ==================== 配置部分 ====================
 class DataDrivenPointCloudTest:
     def __init__(self, config_file: str = "test_config.json"):
@@ -23,17 +72,35 @@ class DataDrivenPointCloudTest:
         self.load_config(config_file)
         self.setup_directories()
         
+        # 界面驱动（pywinauto或模拟后端）
+        self.driver = create_driver(self.config)
+        
+        # 并行执行时保护结果和历史耗时；真实桌面上同一时刻只能有一个实例接收鼠标键盘输入
+        self.results_lock = threading.Lock()
+        self.input_lock = threading.RLock() if self.config["serialize_ui_input"] else nullcontext()
+        
+        # 跨用例复用的VORTEX连接会话
+        self.session = VortexSession(self)
+        
+        # 执行进度快照，供进度看板读取
+        self.progress = RunProgress()
+        
         # 存储所有测试用例结果
         self.all_results = {
             "total_cases": 0,
             "passed_cases": 0,
             "failed_cases": 0,
             "error_cases": 0,
-            "test_cases": [],
+            "journal": None,  # 用例结果逐条写入的JSONL日志
             "start_time": None,
             "end_time": None,
             "total_duration": 0
         }
+        
+        # 各配置的历史转换耗时，用于估计预期耗时
+        self.conversion_history: Dict[tuple, List[float]] = {}
+        # 从之前运行拟合的超时模型（adaptive_timeouts关闭时为空模型，所有步骤使用固定超时）
+        self.timeout_model = TimeoutModel()
 
     def setup_logging(self):
         """配置日志系统"""
@@ -46,7 +113,7 @@ class DataDrivenPointCloudTest:
         
         logging.basicConfig(
             level=logging.INFO,
-            format='%(asctime)s - %(levelname)s - %(message)s',
+            format='%(asctime)s - %(threadName)s - %(levelname)s - %(message)s',
             handlers=[
                 logging.FileHandler(log_file, encoding='utf-8'),
                 logging.StreamHandler()
@@ -60,17 +127,69 @@ class DataDrivenPointCloudTest:
             "vortex_window_title": "VORTEX Client",
             "target_window_pattern": ".*建模_20251231025100.*",
             "timeout": 1200,
+            "adaptive_timeouts": False,
+            "timeout_quantile": 0.99,
+            "timeout_margin": 1.5,
+            "timeout_min_samples": 5,
+            "timeout_floor": 2.0,
+            "timeout_history_files": 20,
             "check_interval": 0.5,
+            "check_band_fraction": 0.4,
+            "use_window_events": True,
+            "event_safety_interval": 5.0,
              "csv_file": r"D:\study\test_vortexclient\test_cases\all_test_cases_complete.csv",
             "output_base_dir": "F:\\",
+            "output_drive": None,
+            "verify_outputs": False,
+            "point_metrics": False,
+            "metrics_voxel_size": 0.05,
+            "metrics_thickness_voxel": 0.5,
+            "metrics_sample_size": 2000,
             "backend": "uia",
             "wait_after_enable_thinning": 1.0,
+            "wait_ceilings": dict(FIXED_DELAYS),
+            "condition_poll_interval": 0.05,
+            "ui_driver": "pywinauto",
+            "simulation": {},
+            "parallel_workers": 1,
+            "serialize_ui_input": True,
+            "async_engine": False,
+            "reorder_test_cases": False,
+            "runtime_order": False,
+            "persist_dialog_state": False,
+            "control_cache": True,
+            "journal_dir": "reports",
+            "journal_fsync_every": 10,
+            "journal_fsync_interval": 5.0,
+            "checkpoint_file": os.path.join("reports", "checkpoint.json"),
+            "progress_server": False,
+            "progress_host": "127.0.0.1",
+            "progress_port": 8765,
+            "resource_sampling": True,
+            "resource_sample_interval": 0.5,
+            "output_watch": False,
+            "output_watch_interval": 0.2,
+            "output_stable_time": 2.0,
+            "output_stall_timeout": 300,
+            "output_final_wait": 10.0,
+            "io_cpu_bound_cores": 0.75,
+            "io_bound_mbps": 50.0,
+            "io_wait_share": 0.2,
+            "trial_confidence": 0.95,
+            "trial_bootstrap_resamples": 2000,
+            "baseline_db": os.path.join("reports", "baseline.sqlite"),
+            "baseline_build": None,
+            "baseline_record_simulated": False,
+            "regression_threshold": 0.10,
+            "regression_alpha": 0.05,
+            "regression_min_samples": 3,
         }
         
         try:
             if os.path.exists(config_file):
                 with open(config_file, 'r', encoding='utf-8') as f:
-                    self.config = json.load(f)
+                    # 配置文件中未给出的项使用默认值
+                    self.config = {**default_config, **json.load(f)}
                 self.logger.info(f"已加载配置文件: {config_file}")
             else:
                 self.config = default_config
@@ -79,6 +198,22 @@ class DataDrivenPointCloudTest:
             self.logger.error(f"加载配置文件失败: {e}")
             self.config = default_config
 
+    def record_conversion_time(self, test_case: Dict[str, Any], seconds: float):
+        """记录一次转换耗时"""
+        with self.results_lock:
+            self.conversion_history.setdefault(config_key(test_case), []).append(seconds)
+
+    def expected_conversion_time(self, test_case: Dict[str, Any]) -> Optional[float]:
+        """预期转换耗时：本次运行同配置的均值，没有时依次用之前运行的预测和本次运行全部转换的均值"""
+        with self.results_lock:
+            same_config = list(self.conversion_history.get(config_key(test_case), []))
+            history = same_config or [t for times in self.conversion_history.values() for t in times]
+        if not same_config:
+            predicted = self.timeout_model.predict(CONVERSION, config_key(test_case))
+            if predicted is not None:
+                return predicted
+        return sum(history) / len(history) if history else None
+
     def setup_directories(self):
         """创建必要的目录"""
         directories = ["logs", "reports", "screenshots", "outputs", "test_cases"]
@@ -86,6 +221,264 @@ class DataDrivenPointCloudTest:
             if not os.path.exists(directory):
                 os.makedirs(directory)
 
+# ==================== VORTEX会话 ====================
+class VortexSession:
+    """
+    跨测试用例复用的VORTEX连接会话
+    
+    首次使用时连接主窗口并定位目标窗口，之后缓存app/dlg/目标窗口，
+    每个用例只做轻量的存活检查，检查失败时才重新连接。
+    并行执行时每个工作线程持有一个绑定到指定实例主窗口句柄的会话。
+    """
+    def __init__(self, test_manager, hwnd: Optional[int] = None):
+        self.tm = test_manager
+        self.logger = test_manager.logger
+        self.driver = test_manager.driver
+        self.bound_hwnd = hwnd
+        self.dlg = None
+        self.vortex_window = None
+        self.hwnd = None
+        self.pid = None
+        self.target_hwnd = None
+        self.target_title = None
+        # 上一个用例在点击导出窗口中设置的控件状态（程序记住导出设置时使用）
+        self.dialog_state = None
+        # 按窗口句柄缓存的导出窗口控件
+        self.controls = SelectorCache(self.driver)
+        
+        # 冷启动耗时，用于估算复用节省的时间
+        self.cold_costs = {"主窗口": None, "目标窗口": None}
+        self.stats = {
+            "新建": 0,
+            "复用": 0,
+            "重连": 0,
+            "节省耗时": 0.0
+        }
+
+    def ensure_main_window(self) -> Dict[str, Any]:
+        """确保主窗口连接可用，返回本次连接的模式和耗时"""
+        start = time.perf_counter()
+        
+        if self.dlg is not None and self._main_window_alive():
+            mode = "复用"
+        else:
+            mode = "重连" if self.hwnd else "新建"
+            self._connect_main_window()
+        
+        # 每个用例都需要把主窗口切到前台
+        self.driver.set_focus(self.dlg)
+        return self._record("主窗口", mode, time.perf_counter() - start)
+
+    def ensure_target_window(self) -> Dict[str, Any]:
+        """确保目标窗口可用，返回本次定位的模式和耗时"""
+        start = time.perf_counter()
+        
+        if self.vortex_window is not None and self._target_window_alive():
+            mode = "复用"
+        else:
+            mode = "重连" if self.target_title else "新建"
+            self._locate_target_window()
+        
+        return self._record("目标窗口", mode, time.perf_counter() - start)
+
+    def wait_until_idle(self, timeout: float) -> float:
+        """等待上一个用例留下的弹窗全部关闭，返回实际等待时间"""
+        start = time.perf_counter()
+        if self.dlg is not None:
+            popups = [self.driver.child(self.dlg, **selector) for selector in POPUP_SELECTORS]
+            wait_until(lambda: not any(self.driver.exists(popup) for popup in popups),
+                       timeout, self.tm.config["condition_poll_interval"])
+        return time.perf_counter() - start
+
+    def invalidate(self):
+        """丢弃缓存的窗口，下次使用时重新连接"""
+        self.dialog_state = None
+        self.dlg = None
+        self.vortex_window = None
+        self.target_hwnd = None
+
+    def _connect_main_window(self):
+        """查找并连接VORTEX主窗口"""
+        title = self.tm.config["vortex_window_title"]
+        if self.bound_hwnd:
+            # 绑定实例的会话不能换到其他实例上
+            if not self.driver.is_window_alive(self.bound_hwnd):
+                raise Exception(f"VORTEX实例窗口已关闭: {hex(self.bound_hwnd)}")
+            hwnd = self.bound_hwnd
+        else:
+            hwnd = self.driver.find_window(title)
+        if not hwnd:
+            raise Exception(f"未找到标题为'{title}'的窗口")
+        
+        self.dlg = self.driver.connect(hwnd)
+        self.driver.wait(self.dlg, 'visible enabled', timeout=10)
+        self.hwnd = hwnd
+        try:
+            self.pid = self.driver.process_id(self.dlg)
+        except Exception:
+            self.pid = None
+        # 主窗口变化后，目标窗口也必须重新定位
+        self.vortex_window = None
+        self.target_hwnd = None
+
+    def _locate_target_window(self):
+        """在主窗口下定位目标窗口，并按句柄缓存"""
+        spec = self.driver.child(
+            self.dlg,
+            title_re=self.tm.config["target_window_pattern"],
+            control_type="Window"
+        )
+        self.driver.wait(spec, 'visible', timeout=5)
+        
+        self.target_title = self.driver.window_text(spec)
+        self.target_hwnd = self.driver.handle_of(spec)
+        # 按句柄构造的窗口规格无需再次搜索UIA树
+        if self.target_hwnd:
+            self.vortex_window = self.driver.window_from_handle(self.dlg, self.target_hwnd)
+        else:
+            self.vortex_window = spec
+
+    def _main_window_alive(self) -> bool:
+        """检查缓存的主窗口句柄是否仍然有效"""
+        return self.driver.is_window_alive(self.hwnd)
+
+    def _target_window_alive(self) -> bool:
+        """检查缓存的目标窗口是否仍然存在且标题匹配"""
+        if not self.target_hwnd:
+            return False
+        try:
+            if not self.driver.is_window_alive(self.target_hwnd):
+                return False
+            title = self.driver.window_title(self.target_hwnd)
+            return re.match(self.tm.config["target_window_pattern"], title) is not None
+        except Exception:
+            return False
+
+    def _record(self, target: str, mode: str, elapsed: float) -> Dict[str, Any]:
+        """记录连接统计，复用时按冷启动耗时估算节省的时间"""
+        saved = 0.0
+        if mode == "复用":
+            self.stats["复用"] += 1
+            if self.cold_costs[target] is not None:
+                saved = max(self.cold_costs[target] - elapsed, 0.0)
+                self.stats["节省耗时"] += saved
+        else:
+            self.stats[mode] += 1
+            if self.cold_costs[target] is None:
+                self.cold_costs[target] = elapsed
+        
+        return {"模式": mode, "耗时": round(elapsed, 3), "节省耗时": round(saved, 3)}
+
+# 决定一次导出行为的参数（CSV列）
+CONFIG_PARAMETERS = ["输出格式", "点云抽稀", "体素抽稀", "随机抽稀",
+                     "输出类型", "贴图选择", "点云降噪", "点云厚度优化"]
+
+
+def config_key(test_case: Dict[str, Any]) -> tuple:
+    """用例的配置元组，相同配置的用例具有相同的键"""
+    return tuple(test_case.get(param, "") for param in CONFIG_PARAMETERS)
+
+
+def config_label(key: Sequence[str]) -> str:
+    """配置元组的显示文本：按CONFIG_PARAMETERS的顺序列出全部取值，空值显示为"-"，不同配置的文本互不相同"""
+    return " / ".join(value or "-" for value in key)
+
+
+def output_drive(config: Dict[str, Any]) -> str:
+    """
+    浏览文件夹窗口中要点击的盘符
+
+    导出流程在所选盘符的根目录下新建输出文件夹，output_base_dir必须是该盘的根目录（如"F:\\"），
+    盘符从中取得；output_base_dir是不带盘符的本地目录时（例如模拟后端把某个盘映射到的目录），
+    由output_drive指明它代表的盘符。两者都给出盘符时必须一致。
+    """
+    base = config["output_base_dir"]
+    configured = (config.get("output_drive") or "").rstrip(":").upper()
+    match = re.match(r"([A-Za-z]):", base)
+    if match is None:
+        if not configured:
+            raise ValueError(f"output_base_dir不带盘符，需要用output_drive指明它代表的盘符: {base}")
+        return configured
+    if base[2:].strip("\\/"):
+        raise ValueError(f"输出文件夹建在盘符根目录下，output_base_dir必须是盘符根目录: {base}")
+    letter = match.group(1).upper()
+    if configured and configured != letter:
+        raise ValueError(f"output_drive({configured})与output_base_dir的盘符({letter})不一致")
+    return letter
+
+# ==================== 用例排序 ====================
+# 点云导出窗口中的单选组和复选框（设置名 -> 复选框标题）
+RADIO_SETTINGS = ["输出格式", "输出类型", "贴图选择"]
+CHECKBOX_SETTINGS = {"点云抽稀": "启用", "点云降噪": "点云降噪", "点云厚度优化": "点云厚度优化"}
+
+
+def dialog_settings(test_case: Dict[str, Any]) -> Dict[str, Any]:
+    """用例需要在点云导出窗口中设置的控件状态"""
+    thinning = test_case["点云抽稀"] == "启用"
+    return {
+        "输出格式": test_case["输出格式"],
+        "点云抽稀": thinning,
+        "抽稀方式": tuple(mode for mode in ("体素抽稀", "随机抽稀")
+                         if thinning and test_case[mode] == "启用"),
+        "输出类型": test_case["输出类型"],
+        "贴图选择": test_case["贴图选择"],
+        "点云降噪": test_case["点云降噪"] == "启用",
+        "点云厚度优化": test_case["点云厚度优化"] == "启用",
+    }
+
+
+def changed_settings(settings: Dict[str, Any], previous: Optional[Dict[str, Any]]) -> List[str]:
+    """
+    从previous切换到settings需要操作的设置
+
+    previous为None表示新打开的导出窗口：单选按钮每次都点击，复选框只勾选需要启用的。
+    抽稀方式只在抽稀选项刚出现或需要的抽稀方式变化时点击。
+    """
+    changes = []
+    for name in RADIO_SETTINGS:
+        if previous is None or previous[name] != settings[name]:
+            changes.append(name)
+    for name in CHECKBOX_SETTINGS:
+        if (settings[name] if previous is None else previous[name] != settings[name]):
+            changes.append(name)
+    if settings["点云抽稀"] and (previous is None or not previous["点云抽稀"]
+                                 or previous["抽稀方式"] != settings["抽稀方式"]):
+        changes.append("抽稀方式")
+    return changes
+
+
+def settings_clicks(settings: Dict[str, Any], previous: Optional[Dict[str, Any]] = None) -> int:
+    """从previous切换到settings需要的点击次数"""
+    return sum(len(settings["抽稀方式"]) if name == "抽稀方式" else 1
+               for name in changed_settings(settings, previous))
+
+
+def sequence_clicks(test_cases: List[Dict[str, Any]], persistent: bool) -> int:
+    """按顺序执行用例需要的配置点击总数；persistent表示程序记住上一次的导出设置"""
+    total, previous = 0, None
+    for test_case in test_cases:
+        settings = dialog_settings(test_case)
+        total += settings_clicks(settings, previous)
+        if persistent:
+            previous = settings
+    return total
+
+
+def schedule_test_cases(test_cases: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    重排用例使相邻用例的配置差异最小
+
+    贪心最近邻（汉明路径启发式）：从新窗口点击最少的用例开始，每次选取与上一个用例
+    切换点击最少的用例，点击数相同时保持原顺序。
+    """
+    remaining = [(test_case, dialog_settings(test_case)) for test_case in test_cases]
+    ordered, previous = [], None
+    while remaining:
+        best = min(range(len(remaining)), key=lambda i: settings_clicks(remaining[i][1], previous))
+        test_case, previous = remaining.pop(best)
+        ordered.append(test_case)
+    return ordered
+
 # ==================== CSV数据读取器 ====================
 class CSVDataReader:
     @staticmethod
@@ -148,21 +541,75 @@ class CSVDataReader:
         except Exception as e:
             raise Exception(f"读取CSV文件失败: {e}")
 
+    @staticmethod
+    def read_summary(summary_file: str) -> List[Dict[str, Any]]:
+        """
+        读取之前生成的test_summary_*.csv，转换为与结果日志相同结构的用例结果
+        
+        汇总CSV中没有步骤详情，转换后的结果只包含配置、状态和耗时等列。
+        """
+        def number(value):
+            try:
+                return float(value)
+            except (TypeError, ValueError):
+                return None
+        
+        results = []
+        with open(summary_file, 'r', encoding='utf-8-sig', newline='') as f:
+            for row in csv.DictReader(f):
+                config = {column: row.get(column, "") for column in
+                          ["输出格式", "点云抽稀", "体素抽稀", "随机抽稀", "输出类型",
+                           "贴图选择", "点云降噪", "点云厚度优化", "备注"]}
+                config["用例ID"] = row["用例ID"]
+                results.append({
+                    "用例ID": row["用例ID"],
+                    "配置": config,
+                    "状态": row["状态"],
+                    "步骤": [],
+                    "开始时间": row.get("开始时间"),
+                    "结束时间": row.get("结束时间"),
+                    "持续时间": number(row.get("总耗时(秒)")),
+                    "转换开始时间": row.get("转换开始时间"),
+                    "转换结束时间": row.get("转换结束时间"),
+                    "转换耗时": number(row.get("转换耗时(秒)")),
+                    "错误信息": None,
+                    "输出文件夹": row.get("输出文件夹"),
+                    "来源": summary_file
+                })
+        return results
+
 # ==================== 测试用例执行器 ====================
+# 不操作界面的步骤，执行时不占用界面输入锁
+BACKGROUND_STEPS = ("监控转换过程", "校验输出文件", "分析点云质量")
+
+
 class TestCaseExecutor:
-    def __init__(self, test_manager, test_case: Dict[str, Any]):
+    def __init__(self, test_manager, test_case: Dict[str, Any], session: Optional[VortexSession] = None,
+                 tasks: Optional[TaskScope] = None):
         self.tm = test_manager
         self.logger = test_manager.logger
         self.test_case = test_case
-        self.app = None
+        self.key = config_key(test_case)
+        self.current_step = None
+        self.driver = test_manager.driver
+        # 并行执行时使用工作线程自己的会话
+        self.session = session or test_manager.session
         self.dlg = None
         self.vortex_window = None
         
-        # 计时相关
+        # 计时相关（阶段和转换耗时基于perf_counter_ns，datetime只用于显示）
+        self.timer = PhaseTimer()
         self.conversion_start_time = None
+        self.conversion_start_perf = None
+        self.conversion_start_ns = None
         self.conversion_end_time = None
         self.conversion_duration = None
         
+        # 转换期间的VORTEX进程资源采样和输出文件夹监视（asyncio执行核心中作为tasks中的任务运行）
+        self.tasks = tasks
+        self.resource_sampler = None
+        self.output_watcher = None
+        
         # 测试结果
         self.result = {
             "用例ID": test_case["用例ID"],
@@ -176,107 +623,218 @@ class TestCaseExecutor:
             "转换结束时间": None,
             "转换耗时": None,
             "错误信息": None,
-            "输出文件夹": None
+            "输出文件夹": None,
+            "步骤耗时": {},
+            "会话": {},
+            "等待节省": {},
+            "执行实例": None,
+            "配置点击": {},
+            "控件缓存": {},
+            "资源占用": {},
+            "阶段": [],
+            "阶段耗时": {},
+            "试验": test_case.get("试验"),
+            "输出校验": {},
+            "点云指标": {},
+            "输出监视": {},
+            "IO统计": {},
+            "预测耗时": None,
+            "超时上限": {},
+            "超出上限": []
         }
 
     def execute(self) -> bool:
         """执行单个测试用例"""
-        self.result["开始时间"] = datetime.now().isoformat()
-        
+        self._begin_case()
         try:
-            self.logger.info(f"\n{'='*60}")
-            self.logger.info(f"开始执行测试用例: {self.test_case['用例ID']}")
-            self.logger.info(f"配置: {json.dumps(self.test_case, indent=2, ensure_ascii=False)}")
-            
-            # 执行所有步骤
-            steps = [
-                self._connect_to_vortex,
-                self._locate_target_window,
-                self._click_export_button,
-                self._select_point_cloud_option,
-                self._configure_export_settings,
-                self._select_output_path,
-                self._monitor_conversion_process
-            ]
-            
-            for step_func in steps:
-                if not step_func():
-                    self.result["状态"] = "失败"
+            for step_name, phase, step_func in self._steps():
+                step_start = self._enter_step(step_name, phase)
+                # 界面操作独占输入，等待转换时释放，其他实例可以继续配置
+                ui_lock = nullcontext() if step_name in BACKGROUND_STEPS else self.tm.input_lock
+                with ui_lock:
+                    step_ok = step_func()
+                if not self._leave_step(step_name, step_start, step_ok):
                     break
             else:
                 self.result["状态"] = "通过"
             
         except Exception as e:
-            self.logger.error(f"测试用例执行异常: {e}")
-            self.logger.error(traceback.format_exc())
-            self.result["状态"] = "错误"
-            self.result["错误信息"] = str(e)
+            self._record_exception(e)
         
         finally:
-            self.result["结束时间"] = datetime.now().isoformat()
-            if self.result["开始时间"] and self.result["结束时间"]:
-                start = datetime.fromisoformat(self.result["开始时间"])
-                end = datetime.fromisoformat(self.result["结束时间"])
-                self.result["持续时间"] = (end - start).total_seconds()
-            
-            # 记录转换耗时
-            if self.conversion_start_time and self.conversion_end_time:
-                self.result["转换开始时间"] = self.conversion_start_time.isoformat()
-                self.result["转换结束时间"] = self.conversion_end_time.isoformat()
-                self.result["转换耗时"] = (self.conversion_end_time - self.conversion_start_time).total_seconds()
-            
-            self.logger.info(f"测试用例 {self.test_case['用例ID']} 执行完成，状态: {self.result['状态']}")
-            
-            # 清理资源
-            self._cleanup()
-            
-            return self.result["状态"] == "通过"
+            return self._finish_case()
+
+    async def execute_async(self, ui: Callable[..., Awaitable[Any]]) -> bool:
+        """
+        在事件循环中执行单个测试用例（asyncio执行核心）
+
+        每个步骤是一个协程：界面步骤通过ui(func, *args)在本实例的线程中执行，
+        监控转换过程在事件循环中等待成功窗口，等待期间不占用线程；
+        资源采样和输出文件夹监视是self.tasks中的任务。
+        """
+        self._begin_case()
+        try:
+            for step_name, phase, step_func in self._steps():
+                step_start = self._enter_step(step_name, phase)
+                if step_name == "监控转换过程":
+                    step_ok = await self._monitor_conversion_async(ui)
+                elif step_name in BACKGROUND_STEPS:
+                    step_ok = await ui(step_func)
+                else:
+                    step_ok = await ui(self._with_input_lock, step_func)
+                if not self._leave_step(step_name, step_start, step_ok):
+                    break
+            else:
+                self.result["状态"] = "通过"
+        
+        except Exception as e:
+            self._record_exception(e)
+        
+        finally:
+            # 被取消时同样停止采样和监视、记录阶段，然后继续传播取消
+            passed = await ui(self._finish_case)
+        return passed
+
+    def _steps(self) -> List[tuple]:
+        """本用例要执行的步骤: [(步骤名, 所属阶段, 函数), ...]，监控转换过程内部切换转换/检测/关闭阶段"""
+        steps = [
+            ("连接VORTEX", "连接", self._connect_to_vortex),
+            ("定位目标窗口", "连接", self._locate_target_window),
+            ("点击导出按钮", "打开窗口", self._click_export_button),
+            ("选择点云选项", "打开窗口", self._select_point_cloud_option),
+            ("配置导出设置", "配置", self._configure_export_settings),
+            ("选择输出路径", "选择路径", self._select_output_path),
+            ("监控转换过程", None, self._monitor_conversion_process)
+        ]
+        if self.tm.config["verify_outputs"]:
+            steps.append(("校验输出文件", "校验", self._verify_outputs))
+        if self.tm.config["point_metrics"]:
+            steps.append(("分析点云质量", "分析", self._analyze_point_quality))
+        return steps
+
+    def _begin_case(self):
+        self.result["开始时间"] = datetime.now().isoformat()
+        self.result["预测耗时"] = self.tm.timeout_model.predict(CASE, self.key)
+        self.tm.progress.start_case(self.test_case["用例ID"])
+        self.logger.info(f"\n{'='*60}")
+        self.logger.info(f"开始执行测试用例: {self.test_case['用例ID']}"
+                         + (f"，预测耗时: {self.result['预测耗时']:.2f}秒" if self.result["预测耗时"] else ""))
+        self.logger.info(f"配置: {json.dumps(self.test_case, indent=2, ensure_ascii=False)}")
+
+    def _enter_step(self, step_name: str, phase: Optional[str]) -> float:
+        """开始一个步骤，返回开始时刻"""
+        self.tm.progress.update(步骤=step_name)
+        self.current_step = step_name
+        if phase and phase != self.timer.current:
+            self.timer.begin(phase)
+        return time.perf_counter()
+
+    def _leave_step(self, step_name: str, step_start: float, step_ok: bool) -> bool:
+        """记录步骤耗时，步骤失败时把用例标记为失败，返回是否继续"""
+        elapsed = round(time.perf_counter() - step_start, 3)
+        self.result["步骤耗时"][step_name] = elapsed
+        bound = self.tm.timeout_model.bound(step_name, self.key)
+        if step_ok and bound is not None and elapsed > bound:
+            # 步骤已完成，只记录超出历史上限，不判定失败
+            self.result["超出上限"].append(step_name)
+            self.logger.warning(f"步骤 {step_name} 耗时 {elapsed:.2f}秒，超出历史上限 {bound:.2f}秒")
+        if not step_ok:
+            self.result["状态"] = "失败"
+        return step_ok
+
+    def _wait_timeout(self, default: float) -> float:
+        """当前步骤中控件等待的超时：固定超时与该步骤历史耗时上限中的较小者"""
+        bound = self.tm.timeout_model.bound(self.current_step, self.key)
+        if bound is None or bound >= default:
+            return default
+        self.result["超时上限"][self.current_step] = bound
+        return bound
+
+    def _with_input_lock(self, step_func: Callable[[], bool]) -> bool:
+        with self.tm.input_lock:
+            return step_func()
+
+    def _record_exception(self, e: Exception):
+        self.logger.error(f"测试用例执行异常: {e}")
+        self.logger.error(traceback.format_exc())
+        self.result["状态"] = "错误"
+        self.result["错误信息"] = str(e)
+        # 异常可能来自失效的窗口，下个用例重新连接
+        self.session.invalidate()
+
+    def _finish_case(self) -> bool:
+        """停止采样和监视，记录耗时和阶段，返回用例是否通过"""
+        self._stop_resource_sampling()
+        self._stop_output_watch()
+        self.result["结束时间"] = datetime.now().isoformat()
+        if self.result["开始时间"] and self.result["结束时间"]:
+            start = datetime.fromisoformat(self.result["开始时间"])
+            end = datetime.fromisoformat(self.result["结束时间"])
+            self.result["持续时间"] = (end - start).total_seconds()
+        
+        # 记录转换耗时和各阶段耗时
+        self.timer.end()
+        self.result["阶段"] = self.timer.phases()
+        self.result["阶段耗时"] = self.timer.durations()
+        if self.conversion_start_time and self.conversion_end_time:
+            self.result["转换开始时间"] = self.conversion_start_time.isoformat()
+            self.result["转换结束时间"] = self.conversion_end_time.isoformat()
+            self.result["转换耗时"] = round(self.conversion_duration, 6)
+        
+        self.logger.info(f"测试用例 {self.test_case['用例ID']} 执行完成，状态: {self.result['状态']}")
+        
+        # 清理资源
+        self._cleanup()
+        
+        return self.result["状态"] == "通过"
 
     def _connect_to_vortex(self) -> bool:
-        """连接到VORTEX应用"""
+        """连接到VORTEX应用（复用会话中的连接）"""
+        session = self.session
         try:
-            hwnd = win32gui.FindWindow(None, self.tm.config["vortex_window_title"])
-            if not hwnd:
-                raise Exception(f"未找到标题为'{self.tm.config['vortex_window_title']}'的窗口")
-            
-            self.app = Application(backend=self.tm.config["backend"]).connect(handle=hwnd)
-            self.dlg = self.app.window(handle=hwnd)
-            self.dlg.wait('visible enabled', timeout=10)
-            self.dlg.set_focus()
+            info = session.ensure_main_window()
+            self.dlg = session.dlg
+            self.result["会话"]["主窗口"] = info
+            self.result["执行实例"] = hex(session.hwnd)
+            self.tm.progress.update(进程=session.pid)
             
-            self._add_step("连接VORTEX", "通过", f"句柄: {hex(hwnd)}")
+            self._add_step("连接VORTEX", "通过", f"句柄: {hex(session.hwnd)}, 连接: {info['模式']}")
             return True
             
         except Exception as e:
+            session.invalidate()
             self._add_step("连接VORTEX", "失败", str(e))
             return False
 
     def _locate_target_window(self) -> bool:
-        """定位目标窗口"""
+        """定位目标窗口（复用会话中的目标窗口）"""
+        session = self.session
         try:
-            self.vortex_window = self.dlg.window(
-                title_re=self.tm.config["target_window_pattern"],
-                control_type="Window"
-            )
-            self.vortex_window.wait('visible', timeout=5)
+            info = session.ensure_target_window()
+            self.vortex_window = session.vortex_window
+            self.result["会话"]["目标窗口"] = info
+            self.result["会话"]["节省耗时"] = round(
+                sum(v["节省耗时"] for v in self.result["会话"].values() if isinstance(v, dict)), 3)
             
             self._add_step("定位目标窗口", "通过", 
-                          f"窗口标题: {self.vortex_window.window_text()}")
+                          f"窗口标题: {session.target_title}, 定位: {info['模式']}")
             return True
             
-        except ElementNotFoundError as e:
+        except Exception as e:
+            session.invalidate()
             self._add_step("定位目标窗口", "失败", str(e))
             return False
 
     def _click_export_button(self) -> bool:
         """点击导出按钮"""
         try:
-            export_button = self.vortex_window.child_window(
+            export_button = self.driver.child(
+                self.vortex_window,
                 control_type="Button",
                 title="导出"
             )
-            export_button.wait('visible enabled', timeout=5)
-            export_button.click_input()
+            self.driver.wait(export_button, 'visible enabled', timeout=self._wait_timeout(5))
+            self.driver.click(export_button)
             
             self._add_step("点击导出按钮", "通过")
             return True
@@ -289,19 +847,21 @@ class TestCaseExecutor:
         """选择点云选项"""
         try:
             # 定位选项窗口
-            option_window = self.dlg.window(
+            option_window = self.driver.child(
+                self.dlg,
                 title_re=".*选项.*",
                 control_type="Window"
             )
-            option_window.wait('visible', timeout=5)
+            self.driver.wait(option_window, 'visible', timeout=self._wait_timeout(5))
             
             # 点击点云选项
-            point_cloud_option = option_window.child_window(
+            point_cloud_option = self.driver.child(
+                option_window,
                 control_type="Pane",
                 title="点云"
             )
-            point_cloud_option.wait('visible enabled', timeout=2)
-            point_cloud_option.click_input()
+            self.driver.wait(point_cloud_option, 'visible enabled', timeout=self._wait_timeout(2))
+            self.driver.click(point_cloud_option)
             
             self._add_step("选择点云选项", "通过")
             return True
@@ -312,13 +872,32 @@ class TestCaseExecutor:
 
     def _configure_export_settings(self) -> bool:
         """配置导出设置（根据CSV参数）"""
+        cache_before = dict(self.session.controls.stats)
         try:
             # 定位导出窗口
-            export_window = self.dlg.window(
+            export_window = self.driver.child(
+                self.dlg,
                 title_re=".*点云导出.*",
                 control_type="Window"
             )
-            export_window.wait('visible', timeout=5)
+            self.driver.wait(export_window, 'visible', timeout=self._wait_timeout(5))
+            
+            # 对窗口拍一次快照解析全部控件（窗口句柄不变时复用），并校验窗口布局
+            if self.tm.config["control_cache"]:
+                missing = [selector for selector in
+                           self.session.controls.prefetch(export_window, EXPORT_DIALOG_SELECTORS)
+                           if selector["title"] not in THINNING_MODE_TITLES]
+                if missing:
+                    raise Exception(f"点云导出窗口布局不符，缺少控件: "
+                                    f"{', '.join(selector['title'] for selector in missing)}")
+            
+            # 程序记住导出设置时，只操作与上一个用例不同的控件
+            settings = dialog_settings(self.test_case)
+            previous = self.session.dialog_state if self.tm.config["persist_dialog_state"] else None
+            changes = changed_settings(settings, previous)
+            # 配置中途失败时窗口状态未知，下个用例重新完整设置
+            self.session.dialog_state = None
+            self._config_clicks = 0
             
             # 1. 选择输出格式
             format_mapping = {
@@ -326,26 +905,32 @@ class TestCaseExecutor:
                 "e57": "e57",
                 "las": "las"
             }
-            format_title = format_mapping.get(self.test_case["输出格式"], "e57")
-            self._select_radio_button(export_window, format_title, "输出格式")
+            if "输出格式" in changes:
+                format_title = format_mapping.get(self.test_case["输出格式"], "e57")
+                self._select_radio_button(export_window, format_title, "输出格式")
             
             # 2. 配置点云抽稀
-            if self.test_case["点云抽稀"] == "启用":
-                # 点击启用复选框
-                self._toggle_checkbox(export_window, "启用", "点云抽稀")
-                
+            if "点云抽稀" in changes:
+                self._set_checkbox(export_window, "启用", settings["点云抽稀"], "点云抽稀")
+            
+            if "抽稀方式" in changes:
                 # 等待抽稀选项出现
-                time.sleep(self.tm.config.get("wait_after_enable_thinning", 1.0))
+                thinning_radios = [
+                    self.driver.child(export_window, control_type="RadioButton", title=title)
+                    for title in ("体素抽稀", "随机抽稀")
+                ]
+                self._wait_condition(
+                    "抽稀选项",
+                    lambda: any(self.driver.exists(radio) for radio in thinning_radios),
+                    self.tm.config["wait_after_enable_thinning"]
+                )
                 
                 # 配置体素抽稀 - 如果是启用状态，就点击单选按钮
                 if self.test_case["体素抽稀"] == "启用":
                     try:
-                        voxel_radio = export_window.child_window(
-                            control_type="RadioButton",
-                            title="体素抽稀"
-                        )
-                        voxel_radio.wait('visible enabled', timeout=2)
-                        voxel_radio.click_input()
+                        self._use_control(export_window, self._wait_and_click,
+                                          control_type="RadioButton", title="体素抽稀")
+                        self._config_clicks += 1
                         self._add_step("配置体素抽稀", "通过", "启用体素抽稀")
                     except Exception as e:
                         self.logger.error(f"点击体素抽稀失败: {e}")
@@ -355,12 +940,9 @@ class TestCaseExecutor:
                 # 配置随机抽稀 - 如果是启用状态，就点击单选按钮
                 if self.test_case["随机抽稀"] == "启用":
                     try:
-                        random_radio = export_window.child_window(
-                            control_type="RadioButton",
-                            title="随机抽稀"
-                        )
-                        random_radio.wait('visible enabled', timeout=2)
-                        random_radio.click_input()
+                        self._use_control(export_window, self._wait_and_click,
+                                          control_type="RadioButton", title="随机抽稀")
+                        self._config_clicks += 1
                         self._add_step("配置随机抽稀", "通过", "启用随机抽稀")
                     except Exception as e:
                         self.logger.error(f"点击随机抽稀失败: {e}")
@@ -373,35 +955,40 @@ class TestCaseExecutor:
                 "合并": "合并",
                 "单站+合并": "单站+合并"
             }
-            output_type_title = output_type_mapping.get(self.test_case["输出类型"], "合并")
-            self._select_radio_button(export_window, output_type_title, "输出类型")
+            if "输出类型" in changes:
+                output_type_title = output_type_mapping.get(self.test_case["输出类型"], "合并")
+                self._select_radio_button(export_window, output_type_title, "输出类型")
             
             # 4. 选择贴图
             texture_mapping = {
                 "灰阶图": "灰阶图",
                 "反射率": "反射率",
+                "彩图": "彩图",
                 "反射率+彩图": "反射率+彩图",
                 "反射率+灰阶图": "反射率+灰阶图"
             }
-            texture_title = texture_mapping.get(self.test_case["贴图选择"], "反射率")
-            self._select_radio_button(export_window, texture_title, "贴图选择")
+            if "贴图选择" in changes:
+                texture_title = texture_mapping.get(self.test_case["贴图选择"], "反射率")
+                self._select_radio_button(export_window, texture_title, "贴图选择")
             
             # 5. 配置点云降噪
-            if self.test_case["点云降噪"] == "启用":
-                self._toggle_checkbox(export_window, "点云降噪", "点云降噪")
+            if "点云降噪" in changes:
+                self._set_checkbox(export_window, "点云降噪", settings["点云降噪"], "点云降噪")
             
             # 6. 配置点云厚度优化
-            if self.test_case["点云厚度优化"] == "启用":
-                self._toggle_checkbox(export_window, "点云厚度优化", "点云厚度优化")
+            if "点云厚度优化" in changes:
+                self._set_checkbox(export_window, "点云厚度优化", settings["点云厚度优化"], "点云厚度优化")
+            
+            full_clicks = settings_clicks(settings)
+            self.result["配置点击"] = {"点击": self._config_clicks,
+                                      "节省": max(full_clicks - self._config_clicks, 0)}
+            if previous is not None:
+                self.logger.info(f"复用上一个用例的导出设置，配置点击 {self._config_clicks}/{full_clicks} 次")
             
             # 7. 点击导出按钮
-            export_button = export_window.child_window(
-                control_type="Pane",
-                title="导出",
-                auto_id="uiButton3"
-            )
-            export_button.wait('visible enabled', timeout=2)
-            export_button.click_input()
+            self._use_control(export_window, self._wait_and_click,
+                              control_type="Pane", title="导出", auto_id="uiButton3")
+            self.session.dialog_state = settings
             
             self._add_step("配置导出设置", "通过")
             return True
@@ -409,39 +996,55 @@ class TestCaseExecutor:
         except Exception as e:
             self._add_step("配置导出设置", "失败", str(e))
             return False
+        
+        finally:
+            self.result["控件缓存"] = {key: value - cache_before[key]
+                                      for key, value in self.session.controls.stats.items()}
+
+    def _use_control(self, parent_window, action: Callable[[Any], Any], **selector):
+        """对控件执行action：优先使用缓存的控件，失效时清空缓存后重新查找一次"""
+        if not self.tm.config["control_cache"]:
+            return action(self.driver.child(parent_window, **selector))
+        
+        controls = self.session.controls
+        element = controls.get(**selector)
+        if element is not None:
+            try:
+                return action(element)
+            except Exception as e:
+                self.logger.warning(f"缓存的控件已失效，重新查找: {selector} ({e})")
+                controls.invalidate()
+        return action(controls.lookup(parent_window, **selector))
+
+    def _wait_and_click(self, element):
+        """等待控件可用后点击"""
+        self.driver.wait(element, 'visible enabled', timeout=self._wait_timeout(2))
+        self.driver.click(element)
 
     def _select_radio_button(self, parent_window, title: str, step_name: str):
         """选择单选按钮"""
-        radio_button = parent_window.child_window(
-            control_type="RadioButton",
-            title=title
-        )
-        radio_button.wait('visible enabled', timeout=2)
-        radio_button.click_input()
+        self._use_control(parent_window, self._wait_and_click, control_type="RadioButton", title=title)
+        self._config_clicks += 1
         self._add_step(f"选择{step_name}", "通过", f"选择: {title}")
 
-    def _toggle_checkbox(self, parent_window, title: str, step_name: str):
-        """切换复选框状态"""
-        checkbox = parent_window.child_window(
-            control_type="CheckBox",
-            title=title
-        )
-        checkbox.wait('visible enabled', timeout=2)
+    def _set_checkbox(self, parent_window, title: str, enabled: bool, step_name: str):
+        """把复选框设置为指定状态"""
+        def set_state(checkbox) -> bool:
+            self.driver.wait(checkbox, 'visible enabled', timeout=self._wait_timeout(2))
+            # 先检查当前状态，获取失败时返回None，继续执行toggle
+            current_state = self.driver.get_toggle_state(checkbox)
+            # 如果已经是目标状态，不需要切换
+            if current_state is not None and (current_state == 1) == enabled:  # 1表示选中
+                return False
+            self.driver.toggle(checkbox)
+            return True
         
-        # 先检查当前状态
-        try:
-            # 尝试获取选中状态
-            if hasattr(checkbox, 'get_toggle_state'):
-                current_state = checkbox.get_toggle_state()
-                # 如果已经是选中状态，不需要切换
-                if current_state == 1:  # 1表示选中
-                    self._add_step(f"配置{step_name}", "通过", f"已启用: {title}")
-                    return
-        except:
-            pass  # 如果获取状态失败，继续执行toggle
-        
-        checkbox.toggle()
-        self._add_step(f"配置{step_name}", "通过", f"状态: {title}")
+        if not self._use_control(parent_window, set_state, control_type="CheckBox", title=title):
+            self._add_step(f"配置{step_name}", "通过", f"已{'启用' if enabled else '禁用'}: {title}")
+            return
+        
+        self._config_clicks += 1
+        self._add_step(f"配置{step_name}", "通过", f"状态: {title}{'' if enabled else '（取消）'}")
 
     def _select_output_path(self) -> bool:
         """选择输出路径"""
@@ -451,36 +1054,43 @@ class TestCaseExecutor:
             self.result["输出文件夹"] = folder_name
             
             # 定位浏览文件夹窗口
-            browser_window = self.dlg.window(
+            browser_window = self.driver.child(
+                self.dlg,
                 title_re=".*浏览文件夹.*",
                 control_type="Window"
             )
-            browser_window.wait('visible', timeout=5)
-            
-            # 点击此电脑
-            browser_window.child_window(control_type="TreeItem", title="此电脑").click_input()
-            time.sleep(1)
+            self.driver.wait(browser_window, 'visible', timeout=self._wait_timeout(5))
             
-            # 点击D盘
-            browser_window.child_window(control_type="TreeItem", title="Data (D:)").click_input()
-            time.sleep(1)
+            # 点击此电脑，等待树节点展开出输出目录所在的盘符
+            drive_letter = output_drive(self.tm.config)
+            self.driver.click(self.driver.child(browser_window, control_type="TreeItem", title="此电脑"))
+            drive = self.driver.child(browser_window, control_type="TreeItem", title_re=rf".*\({drive_letter}:\)$")
+            self._wait_condition("此电脑展开", lambda: self.driver.exists(drive))
             
-            # 新建文件夹
-            browser_window.child_window(control_type="Button", title="新建文件夹(M)").click_input()
-            time.sleep(2)
+            # 点击盘符，等待新建文件夹按钮可用（选中此电脑时不能新建文件夹，按钮为灰色）
+            self.driver.click(drive)
+            new_folder = self.driver.child(browser_window, control_type="Button", title="新建文件夹(M)")
+            self._wait_condition("选择盘符", lambda: self.driver.is_enabled(new_folder))
             
-            # 输入文件夹名
-            edit = browser_window.child_window(control_type="Edit", auto_id="1")
-            edit.wait('visible enabled', timeout=7)
-            edit.set_text(folder_name)
+            # 新建文件夹，等待名称编辑框出现
+            self.driver.click(new_folder)
+            edit = self.driver.child(browser_window, control_type="Edit", auto_id="1")
+            self._wait_condition("新建文件夹", lambda: self.driver.exists(edit))
+            self.driver.wait(edit, 'visible enabled', timeout=self._wait_timeout(7))
+            self.driver.set_text(edit, folder_name)
             
             # 点击确定 - 开始记录转换时间
-            ok_button = browser_window.child_window(control_type="Button", title="确定")
-            ok_button.wait('visible enabled', timeout=2)
-            ok_button.click_input()
+            ok_button = self.driver.child(browser_window, control_type="Button", title="确定")
+            self.driver.wait(ok_button, 'visible enabled', timeout=self._wait_timeout(2))
+            self._start_output_watch()
+            self.driver.click(ok_button)
             
             # 记录转换开始时间
+            self.conversion_start_ns = self.timer.begin("转换")
             self.conversion_start_time = datetime.now()
+            self.conversion_start_perf = self.conversion_start_ns / 1e9
+            self.tm.progress.update(转换开始=self.conversion_start_perf)
+            self._start_resource_sampling()
             self.result["转换开始时间"] = self.conversion_start_time.isoformat()
             self.logger.info(f"⏱️ 转换计时开始: {self.conversion_start_time.strftime('%Y-%m-%d %H:%M:%S')}")
             
@@ -519,6 +1129,7 @@ class TestCaseExecutor:
         texture_map = {
             "灰阶图": "灰度",
             "反射率": "反射",
+            "彩图": "彩图",
             "反射率+彩图": "反射+彩图",
             "反射率+灰阶图": "反射+灰度"
         }
@@ -546,74 +1157,251 @@ class TestCaseExecutor:
         return folder_name
 
     def _monitor_conversion_process(self) -> bool:
-        """监控转换过程"""
+        """监控转换过程（优先订阅窗口打开事件，否则自适应轮询）"""
         try:
-            timeout = self.tm.config["timeout"]
-            check_interval = self.tm.config["check_interval"]
-            convert_success = False
-            
+            wait = self.driver.wait_for_window(self.dlg, **self._conversion_wait_options())
+        except Exception as e:
+            self._add_step("监控转换过程", "失败", str(e))
+            return False
+        return self._handle_conversion_wait(wait)
+
+    async def _monitor_conversion_async(self, ui: Callable[..., Awaitable[Any]]) -> bool:
+        """监控转换过程的协程版本：每次检查在实例线程中执行，两次检查之间在事件循环中等待"""
+        try:
+            wait = await self.driver.wait_for_window_async(self.dlg, run=ui, **self._conversion_wait_options())
+        except Exception as e:
+            self._add_step("监控转换过程", "失败", str(e))
+            return False
+        return await ui(self._handle_conversion_wait, wait)
+
+    def _conversion_wait_options(self) -> Dict[str, Any]:
+        """等待成功窗口的参数：剩余超时、轮询排程、事件设置和回调"""
+        timeout = self.tm.config["timeout"]
+        learned = self.tm.timeout_model.estimate(CONVERSION, self.key)
+        if learned and learned["上限"] is not None and learned["上限"] < timeout:
+            # 超过历史上限即判定为卡住，不必等满固定超时
+            timeout = learned["上限"]
+            self.result["超时上限"][CONVERSION] = timeout
+            self.logger.info(f"开始监控转换过程，超时时间: {timeout}秒（历史上限，{learned['范围']}{learned['样本数']}次，"
+                             f"预测 {learned['预测']}秒）")
+        else:
             self.logger.info(f"开始监控转换过程，超时时间: {timeout}秒")
+        
+        # 超时和预期耗时都从点击确定开始计算
+        already_elapsed = time.perf_counter() - self.conversion_start_perf
+        expected = self.tm.expected_conversion_time(self.test_case)
+        schedule = PollSchedule(
+            max_interval=self.tm.config["check_interval"],
+            expected_duration=expected - already_elapsed if expected else None,
+            band_fraction=self.tm.config["check_band_fraction"]
+        )
+        return {
+            "timeout": timeout - already_elapsed,
+            "schedule": schedule,
+            "use_events": self.tm.config["use_window_events"],
+            "event_safety_interval": self.tm.config["event_safety_interval"],
+            "on_wait": self._print_conversion_progress,
+            "should_stop": self._output_stalled,
+            "auto_id": "MessageForm",
+        }
+
+    def _handle_conversion_wait(self, wait: Dict[str, Any]) -> bool:
+        """根据等待结果记录转换耗时、关闭成功窗口并等待输出文件写完"""
+        try:
+            self.result["完成检测"] = {
+                "方式": wait["方式"],
+                "检查次数": wait["检查次数"],
+                "检测延迟": round(wait["检测延迟"], 4) if wait["检测延迟"] is not None else None
+            }
             
-            while not convert_success and ((datetime.now() - self.conversion_start_time).total_seconds() if self.conversion_start_time else 0) < timeout:
-                try:
-                    success_window = self.dlg.window(auto_id="MessageForm")
-                    if success_window.exists() and success_window.is_visible():
-                        convert_success = True
-                        
-                        # 记录转换结束时间
-                        self.conversion_end_time = datetime.now()
-                        conversion_duration = (self.conversion_end_time - self.conversion_start_time).total_seconds()
-                        
-                        # 获取窗口信息
-                        try:
-                            window_text = success_window.window_text()
-                            self.logger.info(f"检测到成功窗口: {window_text}")
-                        except:
-                            pass
-                        
-                        self.logger.info(f"✅ 格式转换成功！转换耗时: {conversion_duration:.2f}秒")
-                        
-                        # 尝试关闭成功窗口
-                        self._close_success_window(success_window)
-                        break
-                    
-                    if self.conversion_start_time:
-                        elapsed = (datetime.now() - self.conversion_start_time).total_seconds()
-                        print(f"等待转换完成... 已耗时: {elapsed:.1f}秒", end="\r")
-                    
-                except ElementNotFoundError:
-                    if self.conversion_start_time:
-                        elapsed = (datetime.now() - self.conversion_start_time).total_seconds()
-                        print(f"等待转换完成... 已耗时: {elapsed:.1f}秒", end="\r")
-                
-                time.sleep(check_interval)
-            
-            if not convert_success:
-                elapsed_time = (datetime.now() - self.conversion_start_time).total_seconds() if self.conversion_start_time else 0
-                self._add_step("监控转换过程", "失败", f"超时，耗时: {elapsed_time:.2f}秒")
+            self._stop_resource_sampling()
+            success_window = wait["元素"]
+            if success_window is None:
+                elapsed_time = time.perf_counter() - self.conversion_start_perf
+                if wait["中止"]:
+                    self._stop_output_watch()
+                    self._add_step("监控转换过程", "失败",
+                                   f"成功窗口未出现，输出文件已超过{self.tm.config['output_stall_timeout']}秒没有增长"
+                                   f"（{self.result['输出监视'].get('字节数', 0) / 1e6:.1f}MB），判定为挂起，"
+                                   f"耗时: {elapsed_time:.2f}秒")
+                elif CONVERSION in self.result["超时上限"]:
+                    self._add_step("监控转换过程", "失败",
+                                   f"超过历史上限 {self.result['超时上限'][CONVERSION]}秒"
+                                   f"（预测 {self.tm.timeout_model.predict(CONVERSION, self.key)}秒），"
+                                   f"判定为卡住，耗时: {elapsed_time:.2f}秒")
+                else:
+                    self._add_step("监控转换过程", "失败", f"超时，耗时: {elapsed_time:.2f}秒")
                 return False
-            else:
-                conversion_duration = (self.conversion_end_time - self.conversion_start_time).total_seconds()
-                self._add_step("监控转换过程", "通过", f"转换耗时: {conversion_duration:.2f}秒")
-                return True
+            
+            # 以窗口出现时刻作为转换结束时间，出现到检测到之间为检测阶段（转换结束时刻的不确定度）
+            appeared_ns = perf_ns(wait["出现时间"])
+            self.timer.begin("检测", at_ns=appeared_ns)
+            self.timer.set_uncertainty("转换", wait["检测延迟"])
+            self.timer.begin("关闭", at_ns=perf_ns(wait["检测时间"]))
+            conversion_duration = (appeared_ns - self.conversion_start_ns) / 1e9
+            self.conversion_duration = conversion_duration
+            self.conversion_end_time = self.conversion_start_time + timedelta(seconds=conversion_duration)
+            self.tm.record_conversion_time(self.test_case, conversion_duration)
+            
+            # 获取窗口信息
+            try:
+                window_text = self.driver.window_text(success_window)
+                self.logger.info(f"检测到成功窗口: {window_text}")
+            except Exception:
+                pass
+            
+            self.logger.info(f"✅ 格式转换成功！转换耗时: {conversion_duration:.2f}秒 "
+                             f"(检测方式: {wait['方式']}, 检测延迟: {wait['检测延迟'] * 1000:.1f}毫秒)")
+            
+            # 尝试关闭成功窗口
+            with self.tm.input_lock:
+                self._close_success_window(success_window)
+            self.timer.end()
+            
+            # 等待输出文件写完，得到独立于成功窗口的写入结束时刻
+            if self.output_watcher is not None:
+                self.output_watcher.wait_final(self.tm.config["output_final_wait"])
+                self._stop_output_watch(window_appeared=wait["出现时间"])
+            self._account_io()
+            
+            self._add_step("监控转换过程", "通过", f"转换耗时: {conversion_duration:.2f}秒")
+            return True
                 
         except Exception as e:
             self._add_step("监控转换过程", "失败", str(e))
             return False
 
+    def _output_folder(self) -> str:
+        """本用例的输出文件夹：在output_base_dir所在盘符（见output_drive）的根目录下新建"""
+        return os.path.join(self.tm.config["output_base_dir"], self.result["输出文件夹"])
+
+    def _verify_outputs(self) -> bool:
+        """流式解析输出文件夹中的点云文件，检查点数、包围盒和文件结构"""
+        folder = self._output_folder()
+        try:
+            summary = verify_output_folder(folder, self.test_case["输出格式"], self.conversion_duration)
+        except Exception as e:
+            self._add_step("校验输出文件", "失败", str(e))
+            return False
+        self.result["输出校验"] = summary
+        
+        details = (f"{len(summary['文件'])}个文件, {summary['点数']}个点, {summary['字节数'] / 1e6:.1f}MB"
+                   + (f", 写入速率 {summary['写入速率']:.0f}点/秒" if summary["写入速率"] else ""))
+        if summary["问题"]:
+            self._add_step("校验输出文件", "失败", f"{details}; " + "; ".join(summary["问题"]))
+            return False
+        self.logger.info(f"输出文件校验通过: {details}")
+        self._add_step("校验输出文件", "通过", details)
+        return True
+    
+    def _analyze_point_quality(self) -> bool:
+        """按块读取导出的点云，计算点间距、体素占用、离群比例和表面厚度"""
+        folder = self._output_folder()
+        extension = f".{self.test_case['输出格式'].lower()}"
+        paths = [path for path in find_artifacts(folder) if path.lower().endswith(extension)]
+        if not paths:
+            self._add_step("分析点云质量", "失败", f"{folder} 中没有{extension}文件")
+            return False
+        try:
+            metrics = analyze_points(lambda: read_points(paths),
+                                     voxel_size=self.tm.config["metrics_voxel_size"],
+                                     thickness_voxel=self.tm.config["metrics_thickness_voxel"],
+                                     sample_size=self.tm.config["metrics_sample_size"])
+        except Exception as e:
+            self._add_step("分析点云质量", "失败", str(e))
+            return False
+        self.result["点云指标"] = metrics
+        details = format_point_metrics(metrics)
+        self.logger.info(f"点云质量: {details}")
+        self._add_step("分析点云质量", "通过", details)
+        return True
+
+    def _start_resource_sampling(self):
+        """转换开始时开始采样VORTEX进程的资源占用"""
+        if not self.tm.config["resource_sampling"] or not self.session.pid:
+            return
+        self.resource_sampler = ResourceSampler(
+            self.session.pid, self.tm.config["resource_sample_interval"]).start(self.tasks)
+
+    def _stop_resource_sampling(self):
+        """转换结束（或用例中止）时停止采样，峰值和平均值写入结果"""
+        if self.resource_sampler is None:
+            return
+        self.result["资源占用"] = self.resource_sampler.stop()
+        self.resource_sampler = None
+        usage = self.result["资源占用"]
+        if usage.get("采样次数"):
+            self.logger.info(f"转换期间资源占用: CPU峰值 {usage['CPU%']['峰值']}%, "
+                             f"内存峰值 {usage['内存MB']['峰值']}MB, "
+                             f"读取 {usage.get('读取MB', 'N/A')}MB, 写入 {usage.get('写入MB', 'N/A')}MB")
+
+    def _start_output_watch(self):
+        """点击确定之前开始监视输出文件夹（所点击盘符下新建的文件夹）"""
+        if not self.tm.config["output_watch"]:
+            return
+        self.output_watcher = OutputWatcher(
+            self._output_folder(),
+            interval=self.tm.config["output_watch_interval"],
+            stable_time=self.tm.config["output_stable_time"],
+            pid=self.session.pid).start(self.tasks)
+
+    def _output_stalled(self) -> bool:
+        """输出文件已开始写入但长时间没有增长"""
+        timeout = self.tm.config["output_stall_timeout"]
+        return self.output_watcher is not None and bool(timeout) and self.output_watcher.stalled(timeout)
+
+    def _stop_output_watch(self, window_appeared: Optional[float] = None):
+        """停止监视，时间换算为相对转换开始的秒数写入结果"""
+        if self.output_watcher is None:
+            return
+        watch = self.output_watcher.stop(origin=self.conversion_start_perf)
+        self.output_watcher = None
+        if window_appeared is not None and watch["完成"] is not None:
+            # 正值表示成功窗口在文件写完之后才出现
+            watch["窗口滞后"] = round(window_appeared - self.conversion_start_perf - watch["完成"], 4)
+        self.result["输出监视"] = watch
+        if watch["首字节"] is not None:
+            self.logger.info(f"输出文件监视({watch['方式']}): 首字节 {watch['首字节']:.2f}秒, "
+                             f"写完 {watch['完成'] if watch['完成'] is not None else 'N/A'}秒, "
+                             f"{watch['字节数'] / 1e6:.1f}MB, 平均 {watch['平均MB/s'] or 0:.2f}MB/s, "
+                             f"峰值 {watch['峰值MB/s']:.2f}MB/s")
+
+    def _account_io(self):
+        """转换期间的读写量、输出大小和吞吐，并判断转换是CPU密集还是IO密集"""
+        usage = self.result["资源占用"]
+        if not usage.get("采样次数") or not self.conversion_duration:
+            return
+        output_bytes = self.result["输出监视"].get("字节数")
+        if output_bytes is None:
+            output_bytes = folder_size(self._output_folder())
+        config = self.tm.config
+        self.result["IO统计"] = io_accounting(usage, output_bytes, self.conversion_duration,
+                                            cpu_bound_cores=config["io_cpu_bound_cores"],
+                                            io_bound_mbps=config["io_bound_mbps"],
+                                            io_wait_share=config["io_wait_share"])
+        self.logger.info(f"IO统计: {format_io_accounting(self.result['IO统计'])}")
+
+    def _print_conversion_progress(self, _wait_elapsed: float):
+        """打印转换进度"""
+        elapsed = time.perf_counter() - self.conversion_start_perf
+        if self.output_watcher is not None:
+            self.tm.progress.update(输出=self.output_watcher.live())
+        print(f"等待转换完成... 已耗时: {elapsed:.1f}秒", end="\r")
+
     def _close_success_window(self, window) -> bool:
         """关闭成功窗口"""
         try:
             # 尝试查找并点击确定按钮
             try:
                 # 先尝试通过标题查找
-                ok_button = window.child_window(
+                ok_button = self.driver.child(
+                    window,
                     control_type="Button",
                     title="确定"
                 )
-                if ok_button.exists():
-                    ok_button.wait('visible enabled', timeout=2)
-                    ok_button.click_input()
+                if self.driver.exists(ok_button):
+                    self.driver.wait(ok_button, 'visible enabled', timeout=2)
+                    self.driver.click(ok_button)
                     self.logger.info("点击确定按钮成功")
                     return True
             except:
@@ -621,17 +1409,16 @@ class TestCaseExecutor:
             
             # 尝试多种关闭方式
             methods = [
-                ("回车键", lambda: window.type_keys('{ENTER}')),
-                ("空格键", lambda: window.type_keys(' ')),
-                ("close方法", lambda: window.close()),
-                ("Alt+F4", lambda: window.type_keys('%{F4}')),
+                ("回车键", lambda: self.driver.type_keys(window, '{ENTER}')),
+                ("空格键", lambda: self.driver.type_keys(window, ' ')),
+                ("close方法", lambda: self.driver.close(window)),
+                ("Alt+F4", lambda: self.driver.type_keys(window, '%{F4}')),
             ]
             
             for method_name, method in methods:
                 try:
                     method()
-                    time.sleep(1)
-                    if not window.exists():
+                    if self._wait_condition("关闭提示窗口", lambda: not self.driver.exists(window)):
                         self.logger.info(f"成功关闭窗口: {method_name}")
                         return True
                 except:
@@ -639,7 +1426,7 @@ class TestCaseExecutor:
             
             # 如果以上方法都失败，尝试点击窗口任意位置
             try:
-                window.click_input()
+                self.driver.click(window)
                 self.logger.info("点击窗口任意位置")
                 return True
             except:
@@ -651,6 +1438,28 @@ class TestCaseExecutor:
             self.logger.warning(f"关闭窗口失败: {e}")
             return False
 
+    def _wait_condition(self, name: str, condition: Callable[[], bool],
+                        fixed_delay: Optional[float] = None) -> bool:
+        """
+        等待界面条件满足，替代原来的固定延迟
+        
+        最长等待配置中wait_ceilings[name]秒（默认为原固定延迟），
+        并把相对原固定延迟节省的时间累加到结果的"等待节省"中。
+        """
+        if fixed_delay is None:
+            fixed_delay = FIXED_DELAYS[name]
+        ceiling = self.tm.config["wait_ceilings"].get(name, fixed_delay)
+        
+        start = time.perf_counter()
+        satisfied = wait_until(condition, ceiling, self.tm.config["condition_poll_interval"])
+        elapsed = time.perf_counter() - start
+        
+        saved = self.result["等待节省"].get(name, 0.0) + max(fixed_delay - elapsed, 0.0)
+        self.result["等待节省"][name] = round(saved, 3)
+        if not satisfied:
+            self.logger.warning(f"等待条件[{name}]在{ceiling}秒内未满足，继续执行")
+        return satisfied
+
     def _add_step(self, description: str, status: str, details: str = ""):
         """添加测试步骤"""
         step = {
@@ -662,14 +1471,552 @@ class TestCaseExecutor:
         self.result["步骤"].append(step)
 
     def _cleanup(self):
-        """清理资源"""
+        """清理资源（连接由会话持有，这里只释放本用例的引用）"""
+        self.dlg = None
+        self.vortex_window = None
+
+# ==================== 断点续跑 ====================
+class RunCheckpoint:
+    """
+    断点文件
+    
+    记录本次运行的结果日志、用例CSV，以及每个已完成用例的状态和输出文件夹。
+    每个用例结束后整体重写（先写临时文件再替换），中途崩溃时文件始终完整。
+    """
+    def __init__(self, path: str, journal: Optional[str] = None, csv_file: Optional[str] = None,
+                 cases: Optional[Dict[str, Dict[str, Any]]] = None):
+        self.path = path
+        self.journal = journal
+        self.csv_file = csv_file
+        self.cases = cases or {}
+
+    @classmethod
+    def load(cls, path: str) -> "RunCheckpoint":
+        """读取断点文件"""
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return cls(path, data.get("journal"), data.get("csv_file"), data.get("cases", {}))
+
+    def record(self, result: Dict[str, Any]):
+        """记录一个已完成的用例并保存"""
+        self.cases[result["用例ID"]] = {
+            "状态": result["状态"],
+            "输出文件夹": result.get("输出文件夹"),
+            "结束时间": result.get("结束时间")
+        }
+        self.save()
+
+    def save(self):
+        directory = os.path.dirname(self.path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        data = {
+            "journal": self.journal,
+            "csv_file": self.csv_file,
+            "updated": datetime.now().isoformat(),
+            "cases": self.cases
+        }
+        temp_file = self.path + ".tmp"
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_file, self.path)
+
+
+def load_previous_statuses(source: str) -> Dict[str, str]:
+    """从之前运行的结果日志（.jsonl）或汇总CSV读取每个用例的最终状态"""
+    if source.endswith(".jsonl"):
+        results = read_latest(source)
+    else:
+        results = CSVDataReader.read_summary(source)
+    return {result["用例ID"]: result["状态"] for result in results}
+
+# ==================== 重复试验 ====================
+def expand_trials(test_cases: List[Dict[str, Any]], repeat: int, warmup: int = 0) -> List[Dict[str, Any]]:
+    """
+    每个配置执行warmup次预热和repeat次正式试验
+    
+    按轮次交替执行各配置（先全部预热轮，再逐轮正式试验），避免环境随时间的漂移集中在某个配置上。
+    每次试验的用例ID为"<用例ID>#<轮次>"（预热为"#w<轮次>"），结果中的"试验"记录所属用例。
+    """
+    trials = []
+    rounds = [(f"w{n}", True) for n in range(1, warmup + 1)] + [(str(n), False) for n in range(1, repeat + 1)]
+    for label, is_warmup in rounds:
+        for test_case in test_cases:
+            trials.append({
+                **test_case,
+                "用例ID": f"{test_case['用例ID']}#{label}",
+                "试验": {"用例": test_case["用例ID"], "轮次": label, "预热": is_warmup},
+            })
+    return trials
+
+
+def bootstrap_ci(values: List[float], confidence: float = 0.95, resamples: int = 2000,
+                 statistic=np.median, seed: int = 0) -> tuple:
+    """statistic的自助法(bootstrap)百分位置信区间"""
+    data = np.asarray(values, dtype=float)
+    if len(data) < 2:
+        return (float(data[0]), float(data[0])) if len(data) else (None, None)
+    rng = np.random.default_rng(seed)
+    estimates = statistic(rng.choice(data, size=(resamples, len(data)), replace=True), axis=1)
+    tail = (1 - confidence) / 2 * 100
+    low, high = np.percentile(estimates, [tail, 100 - tail])
+    return float(low), float(high)
+
+
+def summarize_trials(results, confidence: float = 0.95, resamples: int = 2000) -> List[Dict[str, Any]]:
+    """
+    按用例汇总正式试验的转换耗时（预热和没有转换耗时的试验不计入）
+    
+    每个用例给出中位数、P90、标准差和中位数的bootstrap置信区间，
+    并列出置信区间与之重叠的用例——这些用例之间的快慢差异不可信。
+    """
+    durations: Dict[str, List[float]] = {}
+    warmups: Dict[str, int] = {}
+    for result in results:
+        trial = result.get("试验")
+        if not trial:
+            continue
+        case_id = trial["用例"]
+        if trial["预热"]:
+            warmups[case_id] = warmups.get(case_id, 0) + 1
+        elif result.get("转换耗时"):
+            durations.setdefault(case_id, []).append(result["转换耗时"])
+    
+    stats = []
+    for case_id in sorted(set(durations) | set(warmups)):
+        values = np.asarray(durations.get(case_id, []), dtype=float)
+        entry = {"用例ID": case_id, "预热": warmups.get(case_id, 0), "次数": len(values),
+                 "平均": None, "中位数": None, "P90": None, "标准差": None, "置信区间": (None, None)}
+        if len(values):
+            entry.update({
+                "平均": float(values.mean()),
+                "中位数": float(np.median(values)),
+                "P90": float(np.percentile(values, 90)),
+                "标准差": float(values.std(ddof=1)) if len(values) > 1 else 0.0,
+                "置信区间": bootstrap_ci(values, confidence, resamples),
+            })
+        stats.append(entry)
+    
+    # 置信区间重叠的用例（按下限排序后只需与后面下限不超过本用例上限的比较）
+    with_ci = sorted((entry for entry in stats if entry["置信区间"][0] is not None),
+                     key=lambda entry: entry["置信区间"][0])
+    for entry in stats:
+        entry["区间重叠"] = []
+    for i, entry in enumerate(with_ci):
+        for other in with_ci[i + 1:]:
+            if other["置信区间"][0] > entry["置信区间"][1]:
+                break
+            entry["区间重叠"].append(other["用例ID"])
+            other["区间重叠"].append(entry["用例ID"])
+    return stats
+
+# ==================== 性能基线 ====================
+def conversion_samples(results) -> Dict[tuple, List[tuple]]:
+    """按配置元组收集通过用例的转换耗时（预热试验不计入）"""
+    samples: Dict[tuple, List[tuple]] = {}
+    for result in results:
+        if result["状态"] != "通过" or not result.get("转换耗时"):
+            continue
+        if (result.get("试验") or {}).get("预热"):
+            continue
+        samples.setdefault(config_key(result["配置"]), []).append((result["用例ID"], result["转换耗时"]))
+    return samples
+
+
+def baseline_record_refusal(all_results: Dict[str, Any], config: Dict[str, Any], build: Optional[str],
+                            comparisons: List[Dict[str, Any]], partial: bool = False,
+                            promote: bool = False) -> Optional[str]:
+    """
+    本次运行不能存为基线的原因，可以存入时返回None
+    
+    只存入指定了版本的完整运行：续跑/重跑只包含部分用例，有失败或错误的运行耗时不可比，
+    模拟后端的耗时不代表真实版本（baseline_record_simulated开启时除外）。
+    存在回归或无法判定的配置时默认不存入，避免变慢的版本成为下一次比较的基线；promote强制存入。
+    """
+    if not build:
+        return "未指定--build"
+    if partial:
+        return "续跑/重跑只包含部分用例"
+    if all_results["failed_cases"] or all_results["error_cases"] or not all_results["passed_cases"]:
+        return "存在失败或错误的用例"
+    if config["ui_driver"] == "simulated" and not config["baseline_record_simulated"]:
+        return "模拟后端的运行"
+    if not promote:
+        states = {entry["状态"] for entry in comparisons}
+        if "回归" in states:
+            return "存在回归（确认后用--promote存入）"
+        if "无法判定" in states:
+            return "存在无法判定的配置（增加--repeat，或确认后用--promote存入）"
+    return None
+
+
+def check_regressions(test_manager: DataDrivenPointCloudTest, build: Optional[str] = None,
+                      partial: bool = False, promote: bool = False) -> Dict[str, Any]:
+    """
+    与基线数据库中固定版本（配置中的baseline_build）的最近一次运行逐配置比较转换耗时，
+    满足条件时把本次运行存入数据库（见baseline_record_refusal）
+    
+    未指定baseline_build时不比较。比较结果记录到all_results["回归检测"]，供报告使用。
+    """
+    config = test_manager.config
+    samples = conversion_samples(iter_case_results(test_manager.all_results))
+    current = {key: [duration for _, duration in values] for key, values in samples.items()}
+    
+    with BaselineStore(config["baseline_db"]) as store:
+        baseline_run = store.baseline_run(config["baseline_build"])
+        comparisons = compare_runs(
+            current, store.durations(baseline_run["id"]) if baseline_run else {},
+            threshold=config["regression_threshold"], alpha=config["regression_alpha"],
+            min_samples=config["regression_min_samples"]) if baseline_run else []
+        refusal = baseline_record_refusal(test_manager.all_results, config, build, comparisons, partial, promote)
+        run_id = store.record_run(samples, build=build, journal=test_manager.all_results["journal"]) \
+            if refusal is None else None
+    
+    regression = {
+        "基线": baseline_run,
+        "基线版本": config["baseline_build"],
+        "本次运行": {"id": run_id, "build": build, "未存入原因": refusal},
+        "阈值": config["regression_threshold"],
+        "比较": comparisons,
+        "回归数": sum(1 for entry in comparisons if entry["状态"] == "回归"),
+        "无法判定数": sum(1 for entry in comparisons if entry["状态"] == "无法判定"),
+    }
+    test_manager.all_results["回归检测"] = regression
+    return regression
+
+# ==================== 自适应超时 ====================
+def load_timeout_model(config: Dict[str, Any], logger: logging.Logger) -> TimeoutModel:
+    """
+    从最近的结果日志(results_*.jsonl)和汇总CSV(test_summary_*.csv)拟合超时模型
+
+    最多读取timeout_history_files个文件（按修改时间从新到旧）；日志中有步骤耗时，先于汇总CSV读取，
+    同一次执行（用例ID和开始时间相同）只计一次。
+    """
+    model = TimeoutModel(quantile=config["timeout_quantile"], margin=config["timeout_margin"],
+                         min_samples=config["timeout_min_samples"], floor=config["timeout_floor"])
+    journals = glob.glob(os.path.join(config["journal_dir"], "results_*.jsonl"))
+    summaries = glob.glob(os.path.join("reports", "test_summary_*.csv"))
+    recent = set(sorted(journals + summaries, key=os.path.getmtime, reverse=True)[:config["timeout_history_files"]])
+    seen = set()
+    for path in [path for path in journals + summaries if path in recent]:
         try:
-            # 如果应用还在运行，尝试关闭所有子窗口
-            if hasattr(self, 'app') and self.app:
-                # 这里可以添加更多清理逻辑
-                pass
-        except:
-            pass
+            results = read_journal(path) if path.endswith(".jsonl") else CSVDataReader.read_summary(path)
+            for result in results:
+                execution = (result.get("用例ID"), result.get("开始时间"))
+                if execution in seen:
+                    continue
+                seen.add(execution)
+                model.add_result(config_key(result["配置"]), result)
+        except Exception as e:
+            logger.warning(f"读取历史结果失败: {path} ({e})")
+    return model
+
+
+def format_timeout_bounds(result: Dict[str, Any]) -> str:
+    """用例的预测耗时、实际使用的历史超时上限和超出上限的步骤，用于HTML报告"""
+    parts = []
+    if result.get("预测耗时"):
+        parts.append(f"预测 {result['预测耗时']:.2f}秒, 实际 {result.get('持续时间') or 0:.2f}秒")
+    if result.get("超时上限"):
+        parts.append("超时上限 " + ", ".join(f"{step}={bound:.2f}秒" for step, bound in result["超时上限"].items()))
+    if result.get("超出上限"):
+        parts.append("超出上限: " + ", ".join(result["超出上限"]))
+    return "; ".join(parts)
+
+
+def prediction_summary(all_results: Dict[str, Any], predicted: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    运行结束后的预测与实际耗时对比，以及超出历史上限的用例数
+    
+    预计总耗时只包含有历史的用例，误差因此只比较这些用例：各用例预测耗时之和与实际持续时间之和。
+    """
+    exceeded, stuck = 0, 0
+    predicted_sum, actual_sum = 0.0, 0.0
+    for result in iter_case_results(all_results):
+        if result.get("超出上限"):
+            exceeded += 1
+        if CONVERSION in (result.get("超时上限") or {}) and result.get("状态") != "通过" \
+                and not result.get("转换耗时"):
+            stuck += 1
+        if result.get("预测耗时") is not None and result.get("持续时间") is not None:
+            predicted_sum += result["预测耗时"]
+            actual_sum += result["持续时间"]
+    return {
+        **predicted,
+        "实际": round(all_results["total_duration"], 1),
+        "有历史预测": round(predicted_sum, 1),
+        "有历史实际": round(actual_sum, 1),
+        "误差": round(actual_sum / predicted_sum - 1, 3) if predicted_sum > 0 else None,
+        "超出上限": exceeded,
+        "判定卡住": stuck,
+    }
+
+
+def format_prediction(prediction: Dict[str, Any]) -> str:
+    """预测与实际耗时的简短描述，用于控制台和HTML报告"""
+    text = (f"预计耗时 {prediction['预计']:.1f}秒（{prediction['有历史']}/{prediction['用例数']}个用例有历史），"
+            f"实际 {prediction['实际']:.1f}秒")
+    if prediction["误差"] is not None:
+        text += (f"；有历史的用例预测 {prediction['有历史预测']:.1f}秒、实际 {prediction['有历史实际']:.1f}秒"
+                 f"（{prediction['误差'] * 100:+.1f}%）")
+    return text + f"；超出步骤上限 {prediction['超出上限']} 个用例，判定卡住 {prediction['判定卡住']} 个"
+
+# ==================== 耗时模型排序 ====================
+def order_by_predicted_runtime(test_cases: List[Dict[str, Any]], logger) -> List[Dict[str, Any]]:
+    """
+    用reports中所有汇总CSV拟合转换耗时模型（runtime_model.py），把用例按预测耗时从长到短排列
+
+    并行执行时各实例从共享队列取用例，长用例先执行可以避免最后只剩一个长用例在运行；
+    没有可用的历史时保持原顺序。
+    """
+    summaries = find_summaries("reports")
+    try:
+        model = RuntimeModel().fit(load_summaries(summaries))
+    except ValueError:
+        logger.info("没有可用的历史转换耗时，用例保持原顺序")
+        return test_cases
+    predicted = model.predict(pd.DataFrame(test_cases))
+    score = model.score()
+    logger.info(f"转换耗时模型: 汇总CSV {len(summaries)} 份, 结果 {score['结果数']} 个, R²={score['R2']}, "
+                f"预测总转换耗时 {np.nansum(predicted):.1f}秒")
+    ordered = [test_cases[i] for i in longest_first(predicted)]
+    logger.info(f"用例已按预测转换耗时从长到短排列: {', '.join(tc['用例ID'] for tc in ordered)}")
+    return ordered
+
+# ==================== 点云质量 ====================
+def unthinned_key(test_case: Dict[str, Any]) -> tuple:
+    """同一配置关闭点云抽稀后的配置元组"""
+    return config_key(dict(test_case, 点云抽稀="不启用", 体素抽稀="", 随机抽稀=""))
+
+
+def summarize_point_quality(results) -> List[Dict[str, Any]]:
+    """
+    按配置汇总通过用例的点云质量指标和转换耗时（各取中位数）
+    
+    启用抽稀的配置与关闭抽稀、其余设置相同的配置比较，缩减比例 = 1 - 点数 / 不抽稀点数。
+    """
+    groups: Dict[tuple, Dict[str, Any]] = {}
+    for result in results:
+        metrics = result.get("点云指标")
+        if result["状态"] != "通过" or not metrics or (result.get("试验") or {}).get("预热"):
+            continue
+        group = groups.setdefault(config_key(result["配置"]), {
+            "配置": result["配置"], "点数": [], "转换耗时": [], "点间距": [], "离群比例": [], "厚度": []})
+        group["点数"].append(metrics["点数"])
+        group["转换耗时"].append(result.get("转换耗时"))
+        group["点间距"].append((metrics.get("点间距") or {}).get("中位数"))
+        group["离群比例"].append(metrics.get("离群比例"))
+        group["厚度"].append((metrics.get("厚度") or {}).get("中位数"))
+    
+    def median(values):
+        values = [value for value in values if value is not None]
+        return float(np.median(values)) if values else None
+    
+    rows = {}
+    for key, group in groups.items():
+        rows[key] = {
+            "配置": list(key),
+            "次数": len(group["点数"]),
+            "点数": median(group["点数"]),
+            "缩减比例": None,
+            "点间距": median(group["点间距"]),
+            "离群比例": median(group["离群比例"]),
+            "厚度": median(group["厚度"]),
+            "转换耗时": median(group["转换耗时"]),
+        }
+    for key, group in groups.items():
+        baseline = rows.get(unthinned_key(group["配置"]))
+        if group["配置"]["点云抽稀"] == "启用" and baseline and baseline["点数"]:
+            rows[key]["缩减比例"] = round(1 - rows[key]["点数"] / baseline["点数"], 4)
+    return [rows[key] for key in sorted(rows)]
+
+
+def point_metrics_csv_values(metrics: Dict[str, Any], reduction: Optional[float]) -> List[Any]:
+    """点云质量对应CSV列的值，没有分析的用例留空"""
+    if not metrics:
+        return ["", "", "", ""]
+    return [(metrics.get("点间距") or {}).get("中位数", ""),
+            "" if metrics.get("离群比例") is None else metrics["离群比例"],
+            (metrics.get("厚度") or {}).get("中位数", ""),
+            "" if reduction is None else reduction]
+
+
+def format_point_metrics(metrics: Dict[str, Any]) -> str:
+    """点云质量指标的简短描述，用于日志和HTML报告"""
+    if not metrics:
+        return ""
+    parts = [f"{metrics['点数']}点", f"{metrics['占用体素']}个{metrics['体素大小'] * 100:g}厘米体素"]
+    if metrics.get("点间距"):
+        spacing = metrics["点间距"]
+        parts.append(f"点间距中位数 {spacing['中位数'] * 1000:.1f}毫米 (P10 {spacing['P10'] * 1000:.1f}, "
+                     f"P90 {spacing['P90'] * 1000:.1f})")
+    if metrics.get("离群比例") is not None:
+        parts.append(f"离群比例 {metrics['离群比例'] * 100:.2f}%")
+    if metrics.get("厚度"):
+        parts.append(f"厚度 {metrics['厚度']['中位数'] * 1000:.2f}毫米")
+    return ", ".join(parts) + f" (分析{metrics.get('分析耗时', 0):.2f}秒, {metrics.get('最近邻方法')})"
+
+# ==================== 结果汇总 ====================
+def iter_case_results(all_results: Dict[str, Any]):
+    """
+    逐个读取用例结果：有结果日志时从日志流式读取（同一用例以最后一次结果为准），
+    否则读取内存中的test_cases
+    """
+    if all_results.get("journal"):
+        return read_latest(all_results["journal"])
+    return iter(all_results.get("test_cases", []))
+
+
+def summarize_results(results) -> Dict[str, Any]:
+    """遍历一次用例结果，计算报告和控制台总结用到的汇总值"""
+    conversion_count, conversion_sum = 0, 0.0
+    conversion_min, conversion_max = None, None
+    wait_saved = 0.0
+    clicks = {"实际点击": 0, "实际节省": 0}
+    phase_sums: Dict[str, float] = {}
+    phase_counts: Dict[str, int] = {}
+    loads: Dict[str, Dict[str, Any]] = {}
+    
+    for test_case in results:
+        conversion_time = test_case.get("转换耗时")
+        if conversion_time:
+            conversion_count += 1
+            conversion_sum += conversion_time
+            conversion_min = conversion_time if conversion_min is None else min(conversion_min, conversion_time)
+            conversion_max = conversion_time if conversion_max is None else max(conversion_max, conversion_time)
+        wait_saved += sum(test_case.get("等待节省", {}).values())
+        if test_case.get("配置点击"):
+            clicks["实际点击"] += test_case["配置点击"]["点击"]
+            clicks["实际节省"] += test_case["配置点击"]["节省"]
+        for phase, seconds in test_case.get("阶段耗时", {}).items():
+            phase_sums[phase] = phase_sums.get(phase, 0.0) + seconds
+            phase_counts[phase] = phase_counts.get(phase, 0) + 1
+        accounting = test_case.get("IO统计")
+        if accounting:
+            load = loads.setdefault(test_case["配置"]["输出格式"], {
+                "用例数": 0, "CPU密集": 0, "IO密集": 0, "未饱和": 0, "写入MB/s": 0.0, "CPU核数": 0.0})
+            load["用例数"] += 1
+            load[accounting["负载类型"]] += 1
+            load["写入MB/s"] += accounting["写入MB/s"]
+            load["CPU核数"] += accounting["CPU核数"] or 0.0
+    
+    for load in loads.values():
+        load["写入MB/s"] = round(load["写入MB/s"] / load["用例数"], 3)
+        load["CPU核数"] = round(load["CPU核数"] / load["用例数"], 3)
+    
+    return {
+        "转换耗时": {
+            "次数": conversion_count,
+            "平均": conversion_sum / conversion_count if conversion_count else 0,
+            "最短": conversion_min,
+            "最长": conversion_max,
+        },
+        "等待节省": wait_saved,
+        "配置点击": clicks,
+        "阶段耗时": {phase: phase_sums[phase] / phase_counts[phase] for phase in phase_sums},
+        "负载分类": loads,
+    }
+
+# 资源占用在CSV汇总中的列：(列名, 指标, 统计)
+RESOURCE_COLUMNS = [
+    ("CPU峰值(%)", "CPU%", "峰值"), ("CPU平均(%)", "CPU%", "平均"),
+    ("内存峰值(MB)", "内存MB", "峰值"), ("内存平均(MB)", "内存MB", "平均"),
+    ("线程峰值", "线程", "峰值"), ("句柄峰值", "句柄", "峰值"),
+    ("IO读取(MB)", "读取MB", None), ("IO写入(MB)", "写入MB", None),
+    ("CPU时间(秒)", "CPU秒", None), ("IO等待(秒)", "IO等待秒", None),
+]
+# IO统计在CSV汇总中的列：(列名, 字段)
+IO_COLUMNS = [("输出(MB)", "输出MB"), ("读取(MB/s)", "读取MB/s"), ("写入(MB/s)", "写入MB/s"),
+              ("占用核数", "CPU核数"), ("IO等待占比", "IO等待占比"), ("负载类型", "负载类型")]
+RESOURCE_CSV_COLUMNS = [column for column, _, _ in RESOURCE_COLUMNS]
+
+
+def resource_csv_values(usage: Dict[str, Any]) -> List[Any]:
+    """资源占用对应CSV列的值，没有采样的指标留空"""
+    values = []
+    for _, metric, stat in RESOURCE_COLUMNS:
+        value = usage.get(metric)
+        if stat is not None:
+            value = value.get(stat) if value else None
+        values.append("" if value is None else value)
+    return values
+
+
+def io_accounting(usage: Dict[str, Any], output_bytes: int, seconds: float, cpu_bound_cores: float = 0.75,
+                  io_bound_mbps: float = 50.0, io_wait_share: float = 0.2) -> Dict[str, Any]:
+    """
+    转换期间的IO统计和负载分类
+    
+    读写量来自VORTEX进程的IO计数，输出量为输出文件夹的大小，吞吐按转换耗时计算。
+    负载类型:
+        CPU密集  进程CPU时间/转换耗时（平均占用的核数）≥ cpu_bound_cores
+        IO密集   否则IO等待占转换耗时的比例 ≥ io_wait_share（仅Linux有IO等待），
+                 或读写吞吐 ≥ io_bound_mbps
+        未饱和   两者都不满足，转换进程大部分时间既不计算也不读写
+    """
+    read_mb = usage.get("读取MB")
+    write_mb = max(usage.get("写入MB") or 0.0, output_bytes / 1e6)
+    cores = usage["CPU秒"] / seconds if usage.get("CPU秒") is not None else None
+    wait_share = usage["IO等待秒"] / seconds if usage.get("IO等待秒") is not None else None
+    throughput = ((read_mb or 0.0) + write_mb) / seconds
+    
+    if cores is not None and cores >= cpu_bound_cores:
+        kind, reason = "CPU密集", f"平均占用{cores:.2f}核"
+    elif wait_share is not None and wait_share >= io_wait_share:
+        kind, reason = "IO密集", f"IO等待占{wait_share * 100:.0f}%"
+    elif throughput >= io_bound_mbps:
+        kind, reason = "IO密集", f"读写{throughput:.1f}MB/s"
+    else:
+        kind, reason = "未饱和", f"平均占用{cores or 0:.2f}核, 读写{throughput:.1f}MB/s"
+    return {
+        "读取MB": read_mb,
+        "写入MB": usage.get("写入MB"),
+        "输出MB": round(output_bytes / 1e6, 3),
+        "读取MB/s": round(read_mb / seconds, 3) if read_mb is not None else None,
+        "写入MB/s": round(write_mb / seconds, 3),
+        "CPU核数": round(cores, 3) if cores is not None else None,
+        "IO等待占比": round(wait_share, 3) if wait_share is not None else None,
+        "负载类型": kind,
+        "依据": reason,
+    }
+
+
+def format_io_accounting(accounting: Dict[str, Any]) -> str:
+    """IO统计的简短描述，用于日志和HTML报告"""
+    if not accounting:
+        return ""
+    read = f"读取{accounting['读取MB']}MB ({accounting['读取MB/s']}MB/s), " if accounting["读取MB"] is not None else ""
+    return (f"{accounting['负载类型']}（{accounting['依据']}）: {read}输出{accounting['输出MB']}MB, "
+            f"写入{accounting['写入MB/s']}MB/s")
+
+
+def format_resource_usage(usage: Dict[str, Any]) -> str:
+    """资源占用的简短描述，用于HTML报告"""
+    if not usage.get("采样次数"):
+        return ""
+    parts = [f"{column}={value}" for column, value in zip(RESOURCE_CSV_COLUMNS, resource_csv_values(usage))
+             if value != ""]
+    return f"{', '.join(parts)} (采样{usage['采样次数']}次)"
+
+def format_output_check(check: Dict[str, Any]) -> str:
+    """输出文件校验结果的简短描述，用于HTML报告"""
+    if not check:
+        return ""
+    files = ", ".join(f"{item['文件']}({item.get('点数') or 0}点, 包围盒 {item.get('包围盒')})" for item in check["文件"])
+    rate = f", 写入速率 {check['写入速率']:.0f}点/秒" if check.get("写入速率") else ""
+    problems = f", 问题: {'; '.join(check['问题'])}" if check["问题"] else ""
+    return f"{files or '无文件'}, 共{check['字节数'] / 1e6:.1f}MB{rate}{problems}"
+
+def format_output_watch(watch: Dict[str, Any]) -> str:
+    """输出文件夹监视结果的简短描述，时间相对转换开始"""
+    if not watch or watch.get("首字节") is None:
+        return ""
+    final = f"{watch['完成']:.2f}秒" if watch.get("完成") is not None else "未写完"
+    lag = f", 成功窗口滞后{watch['窗口滞后']:.3f}秒" if watch.get("窗口滞后") is not None else ""
+    return (f"首字节 {watch['首字节']:.2f}秒, 写完 {final}{lag}, {watch['字节数'] / 1e6:.1f}MB, "
+            f"平均 {watch['平均MB/s'] or 0:.2f}MB/s, 峰值 {watch['峰值MB/s']:.2f}MB/s ({watch['方式']})")
 
 # ==================== 报告生成器 ====================
 class DataDrivenTestReporter:
@@ -688,13 +2035,10 @@ class DataDrivenTestReporter:
         error = all_results["error_cases"]
         pass_rate = (passed / total * 100) if total > 0 else 0
         
-        # 计算平均转换时间
-        conversion_times = []
-        for test_case in all_results["test_cases"]:
-            if test_case.get("转换耗时"):
-                conversion_times.append(test_case["转换耗时"])
-        
-        avg_conversion_time = sum(conversion_times) / len(conversion_times) if conversion_times else 0
+        # 计算平均转换时间和各阶段平均耗时（先遍历一次结果日志）
+        summary = summarize_results(iter_case_results(all_results))
+        avg_conversion_time = summary["转换耗时"]["平均"]
+        phase_means = [(phase, round(seconds, 3)) for phase, seconds in summary["阶段耗时"].items()]
         
         # 生成状态颜色
         status_colors = {
@@ -732,12 +2076,77 @@ class DataDrivenTestReporter:
                 .config-cell {{ max-width: 80px; overflow: hidden; text-overflow: ellipsis; white-space: nowrap; }}
                 .config-cell:hover {{ overflow: visible; white-space: normal; background: white; z-index: 100; position: relative; }}
                 .time-cell {{ font-family: monospace; }}
+                .waterfall {{ margin: 10px 0; }}
+                .waterfall-row {{ display: flex; align-items: center; height: 22px; }}
+                .waterfall-label {{ width: 80px; font-size: 13px; }}
+                .waterfall-track {{ position: relative; flex: 1; height: 14px; background: #e9ecef; }}
+                .waterfall-bar {{ position: absolute; height: 100%; min-width: 1px; }}
+                .waterfall-uncertainty {{ position: absolute; height: 100%; background: repeating-linear-gradient(45deg, rgba(0,0,0,0.25), rgba(0,0,0,0.25) 2px, transparent 2px, transparent 4px); }}
+                .waterfall-value {{ width: 150px; padding-left: 8px; font-family: monospace; font-size: 12px; }}
             </style>
             <script>
+                var statusColors = {json.dumps(status_colors, ensure_ascii=False)};
+                var phaseColors = {json.dumps(PHASE_COLORS, ensure_ascii=False)};
+                
+                function escapeHtml(value) {{
+                    return String(value === null || value === undefined ? '' : value)
+                        .replace(/&/g, '&amp;').replace(/</g, '&lt;').replace(/>/g, '&gt;');
+                }}
+                
+                // 阶段瀑布图，phases为[阶段, 开始(秒), 耗时(秒), 不确定度(秒)]
+                function renderWaterfall(phases) {{
+                    var total = 0;
+                    phases.forEach(function(phase) {{ total = Math.max(total, phase[1] + phase[2]); }});
+                    if (!total) {{
+                        return '';
+                    }}
+                    var html = '<div class="waterfall">';
+                    phases.forEach(function(phase) {{
+                        var left = phase[1] / total * 100, width = phase[2] / total * 100;
+                        html += '<div class="waterfall-row"><div class="waterfall-label">' + escapeHtml(phase[0]) + '</div>' +
+                                '<div class="waterfall-track"><div class="waterfall-bar" style="left: ' + left + '%; width: ' + width +
+                                '%; background: ' + (phaseColors[phase[0]] || '#6c757d') + ';"></div>';
+                        if (phase[3]) {{
+                            html += '<div class="waterfall-uncertainty" style="left: ' + (left + width) + '%; width: ' +
+                                    (phase[3] / total * 100) + '%;" title="不确定度"></div>';
+                        }}
+                        html += '</div><div class="waterfall-value">' + phase[2].toFixed(3) + '秒' +
+                                (phase[3] ? ' ±' + (phase[3] * 1000).toFixed(1) + '毫秒' : '') + '</div></div>';
+                    }});
+                    return html + '</div>';
+                }}
+                
+                // 详情和步骤表以JSON嵌入页面，首次展开时才渲染
+                function renderDetails(caseId, details) {{
+                    var data = JSON.parse(document.getElementById('data-' + caseId).textContent);
+                    var html = '<h4>测试配置详情:</h4><ul>';
+                    data.details.forEach(function(item) {{
+                        html += '<li><strong>' + escapeHtml(item[0]) + ':</strong> ' + escapeHtml(item[1]) + '</li>';
+                    }});
+                    html += '</ul>';
+                    if (data.phases.length) {{
+                        html += '<h4>阶段耗时:</h4>' + renderWaterfall(data.phases);
+                    }}
+                    html += '<h4>测试步骤:</h4><table><tr><th>步骤</th><th>状态</th><th>详情</th><th>时间</th></tr>';
+                    data.steps.forEach(function(step) {{
+                        html += '<tr><td>' + escapeHtml(step[0]) + '</td>' +
+                                '<td style="color: ' + (statusColors[step[1]] || '#6c757d') + '; font-weight: bold;">' + escapeHtml(step[1]) + '</td>' +
+                                '<td>' + escapeHtml(step[2]) + '</td><td>' + escapeHtml(step[3]) + '</td></tr>';
+                    }});
+                    if (data.error) {{
+                        html += '<tr><td colspan="4" style="color: #dc3545;"><strong>错误信息:</strong> ' + escapeHtml(data.error) + '</td></tr>';
+                    }}
+                    details.innerHTML = html + '</table>';
+                    details.setAttribute('data-rendered', '1');
+                }}
+                
                 function toggleDetails(caseId) {{
                     var details = document.getElementById('details-' + caseId);
                     var button = document.getElementById('button-' + caseId);
-                    if (details.style.display === 'none') {{
+                    if (details.style.display !== 'block') {{
+                        if (!details.getAttribute('data-rendered')) {{
+                            renderDetails(caseId, details);
+                        }}
                         details.style.display = 'block';
                         button.textContent = '收起详情';
                     }} else {{
@@ -786,11 +2195,30 @@ class DataDrivenTestReporter:
                     <p>{pass_rate:.2f}% ({passed}/{total})</p>
                 </div>
                 
+                <h4>平均阶段耗时</h4>
+                <div id="phase-summary"></div>
+                <script>
+                    (function() {{
+                        var start = 0, phases = [];
+                        {json.dumps(phase_means, ensure_ascii=False)}.forEach(function(item) {{
+                            phases.push([item[0], start, item[1], null]);
+                            start += item[1];
+                        }});
+                        document.getElementById('phase-summary').innerHTML = renderWaterfall(phases);
+                    }})();
+                </script>
+                
+                {DataDrivenTestReporter._html_load_table(summary["负载分类"])}
+                
                 <p><strong>总耗时:</strong> {all_results['total_duration']:.2f}秒</p>
+                {DataDrivenTestReporter._html_prediction(all_results.get("耗时预测"))}
                 <p><strong>开始时间:</strong> {all_results['start_time']}</p>
                 <p><strong>结束时间:</strong> {all_results['end_time']}</p>
             </div>
             
+            {DataDrivenTestReporter._html_regression_section(all_results.get("回归检测"))}
+            {DataDrivenTestReporter._html_quality_section(all_results.get("点云质量"))}
+            
             <h2>📋 测试用例详情</h2>
             <table>
                 <tr>
@@ -809,98 +2237,215 @@ class DataDrivenTestReporter:
                 </tr>
         """
         
-        for test_case in all_results["test_cases"]:
-            # 获取状态对应的颜色
-            status_color = status_colors.get(test_case['状态'], "#6c757d")
-            details_id = test_case["用例ID"].replace(" ", "_").replace(".", "_")
+        # 逐个用例写入文件，不在内存中拼接整个报告
+        with open(output_file, 'w', encoding='utf-8') as f:
+            f.write(html_content)
             
-            # 格式化转换时间
-            conversion_time = f"{test_case['转换耗时']:.1f}" if test_case.get("转换耗时") else "N/A"
+            for index, test_case in enumerate(iter_case_results(all_results)):
+                f.write(DataDrivenTestReporter._html_case_chunk(test_case, status_colors, index))
             
-            html_content += f"""
+            f.write("""
+                </table>
+            </body>
+            </html>
+            """)
+        
+        return output_file
+
+    @staticmethod
+    def _html_regression_section(regression: Optional[Dict[str, Any]]) -> str:
+        """与基线比较的结果，回归的配置排在最前"""
+        if not regression:
+            return ""
+        baseline = regression["基线"]
+        recorded = regression["本次运行"]
+        record_text = (f"本次运行已存为版本 {html.escape(recorded['build'])} 的基线（运行#{recorded['id']}）。"
+                       if recorded["id"] else f"本次运行未存入基线: {html.escape(recorded['未存入原因'])}。")
+        if not baseline:
+            reason = (f"基线数据库中没有版本 {html.escape(regression['基线版本'])} 的运行" if regression["基线版本"]
+                      else "未指定基线版本（--baseline或baseline_build）")
+            return f"""
+            <div class="summary">
+                <h2>📉 性能回归检测</h2>
+                <p>{reason}，没有比较。{record_text}</p>
+            </div>
+            """
+        
+        state_colors = {"回归": "#dc3545", "无法判定": "#fd7e14", "改善": "#28a745", "持平": "#6c757d",
+                        "新增": "#17a2b8"}
+        order = {"回归": 0, "无法判定": 1, "改善": 2, "新增": 3, "持平": 4}
+        rows = []
+        for entry in sorted(regression["比较"], key=lambda entry: order[entry["状态"]]):
+            change = f"{entry['变化'] * 100:+.1f}%" if entry["变化"] is not None else "N/A"
+            base = f"{entry['基线中位数']:.2f}" if entry["基线中位数"] is not None else "N/A"
+            p_value = f"{entry['p值']:.3f}" if entry["p值"] is not None else (entry["检验"] or "N/A")
+            rows.append(f"""
+                    <tr>
+                        <td>{html.escape(config_label(entry['配置']))}</td>
+                        <td style="color: {state_colors[entry['状态']]}; font-weight: bold;">{entry['状态']}</td>
+                        <td class="time-cell">{base} (n={entry['基线次数']})</td>
+                        <td class="time-cell">{entry['当前中位数']:.2f} (n={entry['次数']})</td>
+                        <td class="time-cell">{change}</td>
+                        <td class="time-cell">{p_value}</td>
+                    </tr>""")
+        
+        return f"""
+            <div class="summary">
+                <h2>📉 性能回归检测</h2>
+                <p>基线: 运行#{baseline['id']} {html.escape(baseline['build'] or '')} ({baseline['created']})，
+                   阈值: 中位数变慢超过{regression['阈值'] * 100:.0f}%且置换检验显著，
+                   <strong style="color: {'#dc3545' if regression['回归数'] else '#28a745'};">回归配置: {regression['回归数']}</strong>，
+                   无法判定（样本不足以检验）: {regression['无法判定数']}。{record_text}</p>
+                <table>
+                    <tr><th>配置</th><th>状态</th><th>基线中位数(秒)</th><th>本次中位数(秒)</th><th>变化</th><th>p值</th></tr>
+                    {''.join(rows)}
+                </table>
+            </div>
+            """
+
+    @staticmethod
+    def _html_prediction(prediction: Optional[Dict[str, Any]]) -> str:
+        """运行前预测的总耗时与实际耗时，以及超出历史上限的用例数"""
+        if not prediction or prediction["预计"] is None:
+            return ""
+        return f"<p><strong>耗时预测:</strong> {format_prediction(prediction)}</p>"
+
+    @staticmethod
+    def _html_load_table(loads: Dict[str, Dict[str, Any]]) -> str:
+        """按输出格式统计CPU密集/IO密集的用例数"""
+        if not loads:
+            return ""
+        rows = "".join(f"""
+                    <tr>
+                        <td>{html.escape(str(fmt))}</td>
+                        <td class="time-cell">{load['用例数']}</td>
+                        <td class="time-cell">{load['CPU密集']}</td>
+                        <td class="time-cell">{load['IO密集']}</td>
+                        <td class="time-cell">{load['未饱和']}</td>
+                        <td class="time-cell">{load['写入MB/s']:.2f}</td>
+                        <td class="time-cell">{load['CPU核数']:.2f}</td>
+                    </tr>""" for fmt, load in sorted(loads.items()))
+        return f"""
+                <h4>转换负载分类</h4>
+                <table>
+                    <tr><th>输出格式</th><th>用例数</th><th>CPU密集</th><th>IO密集</th><th>未饱和</th>
+                        <th>平均写入(MB/s)</th><th>平均占用核数</th></tr>
+                    {rows}
+                </table>"""
+
+    @staticmethod
+    def _html_quality_section(quality: Optional[List[Dict[str, Any]]]) -> str:
+        """各配置的点云质量指标与转换耗时"""
+        if not quality:
+            return ""
+        
+        def number(value, scale=1.0, digits=2, suffix=""):
+            return "N/A" if value is None else f"{value * scale:.{digits}f}{suffix}"
+        
+        rows = "".join(f"""
+                    <tr>
+                        <td>{html.escape(config_label(entry['配置']))}</td>
+                        <td class="time-cell">{entry['次数']}</td>
+                        <td class="time-cell">{number(entry['点数'], digits=0)}</td>
+                        <td class="time-cell">{number(entry['缩减比例'], 100, 1, '%')}</td>
+                        <td class="time-cell">{number(entry['点间距'], 1000, 1)}</td>
+                        <td class="time-cell">{number(entry['离群比例'], 100, 2, '%')}</td>
+                        <td class="time-cell">{number(entry['厚度'], 1000, 2)}</td>
+                        <td class="time-cell">{number(entry['转换耗时'])}</td>
+                    </tr>""" for entry in quality)
+        return f"""
+            <div class="summary">
+                <h2>🔬 点云质量</h2>
+                <p>各配置通过用例的中位数；缩减比例相对关闭抽稀、其余设置相同的配置。</p>
+                <table>
+                    <tr><th>配置</th><th>次数</th><th>点数</th><th>缩减比例</th><th>点间距(毫米)</th>
+                        <th>离群比例</th><th>厚度(毫米)</th><th>转换耗时(秒)</th></tr>
+                    {rows}
+                </table>
+            </div>
+            """
+
+    @staticmethod
+    def _html_case_chunk(test_case: Dict[str, Any], status_colors: Dict[str, str], index: int) -> str:
+        """第index行用例的表格行，详情和步骤以JSON嵌入，由页面脚本按需渲染"""
+        # 获取状态对应的颜色
+        status_color = status_colors.get(test_case['状态'], "#6c757d")
+        # DOM id和toggleDetails参数只保留字母数字和下划线（试验的用例ID含"#"），单元格文本转义；
+        # 替换后不同的用例ID可能相同（"TC1#1"和"TC1_1"），末尾加行号保证唯一
+        details_id = re.sub(r'\W', '_', test_case["用例ID"]) + f"_{index}"
+        config = test_case['配置']
+        cell = {key: html.escape(str(config.get(key, 'N/A'))) for key in CONFIG_PARAMETERS}
+        texture = config['贴图选择']
+        
+        # 格式化转换时间
+        conversion_time = f"{test_case['转换耗时']:.1f}" if test_case.get("转换耗时") else "N/A"
+        
+        detection = test_case.get('完成检测', {})
+        clicks = test_case.get('配置点击', {})
+        cache = test_case.get('控件缓存', {})
+        details = [
+            ("用例ID", test_case['用例ID']),
+            ("输出格式", config['输出格式']),
+            ("点云抽稀", config['点云抽稀']),
+            ("体素抽稀", config.get('体素抽稀', 'N/A')),
+            ("随机抽稀", config.get('随机抽稀', 'N/A')),
+            ("输出类型", config['输出类型']),
+            ("贴图选择", config['贴图选择']),
+            ("点云降噪", config['点云降噪']),
+            ("点云厚度优化", config['点云厚度优化']),
+            ("预期结果", config.get('预期结果', 'N/A')),
+            ("备注", config.get('备注', 'N/A')),
+            ("输出文件夹", test_case.get('输出文件夹', 'N/A')),
+            ("转换开始时间", test_case.get('转换开始时间', 'N/A')),
+            ("转换结束时间", test_case.get('转换结束时间', 'N/A')),
+            ("转换耗时", f"{conversion_time}秒"),
+            ("步骤耗时", ', '.join(f'{k}={v:.2f}秒' for k, v in test_case.get('步骤耗时', {}).items()) or 'N/A'),
+            ("完成检测", f"{detection.get('方式', 'N/A')}, 检测延迟 {detection.get('检测延迟') or 0:.3f}秒"),
+            ("等待节省", ', '.join(f'{k}={v:.2f}秒' for k, v in test_case.get('等待节省', {}).items()) or 'N/A'),
+            ("配置点击", f"{clicks.get('点击', 'N/A')}次, 节省 {clicks.get('节省', 0)}次"),
+            ("控件缓存", f"命中 {cache.get('命中', 0)}, 未命中 {cache.get('未命中', 0)}, 失效 {cache.get('失效', 0)}"),
+            ("执行实例", test_case.get('执行实例') or 'N/A'),
+            ("会话节省耗时", f"{test_case.get('会话', {}).get('节省耗时', 0):.2f}秒"),
+            ("资源占用", format_resource_usage(test_case.get('资源占用', {})) or 'N/A'),
+            ("输出校验", format_output_check(test_case.get('输出校验', {})) or 'N/A'),
+            ("点云质量", format_point_metrics(test_case.get('点云指标', {})) or 'N/A'),
+            ("输出监视", format_output_watch(test_case.get('输出监视', {})) or 'N/A'),
+            ("IO统计", format_io_accounting(test_case.get('IO统计', {})) or 'N/A'),
+            ("耗时预测", format_timeout_bounds(test_case) or 'N/A'),
+        ]
+        data = {
+            "details": details,
+            "steps": [(step['步骤'], step['状态'], step.get('详情', ''), step['时间'])
+                      for step in test_case.get("步骤", [])],
+            "phases": [(phase['阶段'], phase['开始'], phase['耗时'], phase['不确定度'])
+                       for phase in test_case.get("阶段", [])],
+            "error": test_case.get("错误信息")
+        }
+        # JSON中的"<"写成\u003c，"</script>"或"<!--"都不会改变脚本块的解析，JSON.parse后还原
+        data_json = json.dumps(data, ensure_ascii=False, default=str).replace("<", "\\u003c")
+        
+        return f"""
                 <tr class="test-case-row">
-                    <td>{test_case['用例ID']}</td>
-                    <td class="config-cell">{test_case['配置']['输出格式']}</td>
-                    <td class="config-cell">{test_case['配置']['点云抽稀']}</td>
-                    <td class="config-cell">{test_case['配置'].get('体素抽稀', 'N/A')}</td>
-                    <td class="config-cell">{test_case['配置'].get('随机抽稀', 'N/A')}</td>
-                    <td class="config-cell">{test_case['配置']['输出类型']}</td>
-                    <td class="config-cell" title="{test_case['配置']['贴图选择']}">{test_case['配置']['贴图选择'][:10]}{'...' if len(test_case['配置']['贴图选择']) > 10 else ''}</td>
-                    <td class="config-cell">{test_case['配置']['点云降噪']}</td>
-                    <td class="config-cell">{test_case['配置']['点云厚度优化']}</td>
-                    <td style="color: {status_color}; font-weight: bold;">{test_case['状态']}</td>
+                    <td>{html.escape(test_case['用例ID'])}</td>
+                    <td class="config-cell">{cell['输出格式']}</td>
+                    <td class="config-cell">{cell['点云抽稀']}</td>
+                    <td class="config-cell">{cell['体素抽稀']}</td>
+                    <td class="config-cell">{cell['随机抽稀']}</td>
+                    <td class="config-cell">{cell['输出类型']}</td>
+                    <td class="config-cell" title="{cell['贴图选择']}">{html.escape(texture[:10])}{'...' if len(texture) > 10 else ''}</td>
+                    <td class="config-cell">{cell['点云降噪']}</td>
+                    <td class="config-cell">{cell['点云厚度优化']}</td>
+                    <td style="color: {status_color}; font-weight: bold;">{html.escape(test_case['状态'])}</td>
                     <td class="time-cell">{conversion_time}</td>
                     <td><button id="button-{details_id}" class="toggle-details" onclick="toggleDetails('{details_id}')">查看详情</button></td>
                 </tr>
                 <tr>
                     <td colspan="12">
-                        <div class="test-details" id="details-{details_id}">
-                            <h4>测试配置详情:</h4>
-                            <ul>
-                                <li><strong>用例ID:</strong> {test_case['用例ID']}</li>
-                                <li><strong>输出格式:</strong> {test_case['配置']['输出格式']}</li>
-                                <li><strong>点云抽稀:</strong> {test_case['配置']['点云抽稀']}</li>
-                                <li><strong>体素抽稀:</strong> {test_case['配置'].get('体素抽稀', 'N/A')}</li>
-                                <li><strong>随机抽稀:</strong> {test_case['配置'].get('随机抽稀', 'N/A')}</li>
-                                <li><strong>输出类型:</strong> {test_case['配置']['输出类型']}</li>
-                                <li><strong>贴图选择:</strong> {test_case['配置']['贴图选择']}</li>
-                                <li><strong>点云降噪:</strong> {test_case['配置']['点云降噪']}</li>
-                                <li><strong>点云厚度优化:</strong> {test_case['配置']['点云厚度优化']}</li>
-                                <li><strong>预期结果:</strong> {test_case['配置'].get('预期结果', 'N/A')}</li>
-                                <li><strong>备注:</strong> {test_case['配置'].get('备注', 'N/A')}</li>
-                                <li><strong>输出文件夹:</strong> {test_case.get('输出文件夹', 'N/A')}</li>
-                                <li><strong>转换开始时间:</strong> {test_case.get('转换开始时间', 'N/A')}</li>
-                                <li><strong>转换结束时间:</strong> {test_case.get('转换结束时间', 'N/A')}</li>
-                                <li><strong>转换耗时:</strong> {conversion_time}秒</li>
-                            </ul>
-                            
-                            <h4>测试步骤:</h4>
-                            <table>
-                                <tr>
-                                    <th>步骤</th>
-                                    <th>状态</th>
-                                    <th>详情</th>
-                                    <th>时间</th>
-                                </tr>
-            """
-            
-            for step in test_case.get("步骤", []):
-                step_color = status_colors.get(step['状态'], "#6c757d")
-                html_content += f"""
-                                <tr>
-                                    <td>{step['步骤']}</td>
-                                    <td style="color: {step_color}; font-weight: bold;">{step['状态']}</td>
-                                    <td>{step.get('详情', '')}</td>
-                                    <td>{step['时间']}</td>
-                                </tr>
-                """
-            
-            if test_case.get("错误信息"):
-                html_content += f"""
-                                <tr>
-                                    <td colspan="4" style="color: #dc3545;">
-                                        <strong>错误信息:</strong> {test_case['错误信息']}
-                                    </td>
-                                </tr>
-                """
-            
-            html_content += """
-                            </table>
-                        </div>
+                        <div class="test-details" id="details-{details_id}"></div>
+                        <script type="application/json" id="data-{details_id}">{data_json}</script>
                     </td>
                 </tr>
             """
-        
-        html_content += """
-            </table>
-        </body>
-        </html>
-        """
-        
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write(html_content)
-        
-        return output_file
 
     @staticmethod
     def generate_csv_summary(all_results: Dict[str, Any]):
@@ -915,10 +2460,18 @@ class DataDrivenTestReporter:
             writer.writerow(['用例ID', '输出格式', '点云抽稀', '体素抽稀', '随机抽稀', 
                            '输出类型', '贴图选择', '点云降噪', '点云厚度优化', 
                            '状态', '转换耗时(秒)', '转换开始时间', '转换结束时间',
-                           '总耗时(秒)', '开始时间', '结束时间', '输出文件夹', '备注'])
+                           '总耗时(秒)', '开始时间', '结束时间', '输出文件夹', '备注',
+                           '会话节省耗时(秒)', '检测延迟(秒)', '等待节省(秒)'] + RESOURCE_CSV_COLUMNS +
+                           [f'{phase}(秒)' for phase in PHASE_COLORS] +
+                           ['输出点数', '输出字节数', '写入速率(点/秒)'] +
+                           ['点间距中位数(米)', '离群比例', '厚度(米)', '抽稀缩减比例'] +
+                           ['首字节(秒)', '写完(秒)', '窗口滞后(秒)', '平均写入(MB/s)', '峰值写入(MB/s)'] +
+                           [column for column, _ in IO_COLUMNS] + ['预测耗时(秒)', '超出上限'])
+            
+            reductions = {tuple(entry["配置"]): entry["缩减比例"] for entry in all_results.get("点云质量") or []}
             
             # 写入数据
-            for test_case in all_results["test_cases"]:
+            for test_case in iter_case_results(all_results):
                 writer.writerow([
                     test_case["用例ID"],
                     test_case["配置"]["输出格式"],
@@ -937,17 +2490,363 @@ class DataDrivenTestReporter:
                     test_case["开始时间"],
                     test_case["结束时间"],
                     test_case.get("输出文件夹", ""),
-                    test_case["配置"].get("备注", "")
-                ])
+                    test_case["配置"].get("备注", ""),
+                    f"{test_case.get('会话', {}).get('节省耗时', 0):.2f}",
+                    test_case.get("完成检测", {}).get("检测延迟", ""),
+                    f"{sum(test_case.get('等待节省', {}).values()):.2f}"
+                ] + resource_csv_values(test_case.get("资源占用", {})) +
+                    [test_case.get("阶段耗时", {}).get(phase, "") for phase in PHASE_COLORS] +
+                    [test_case.get("输出校验", {}).get(key, "") for key in ("点数", "字节数", "写入速率")] +
+                    point_metrics_csv_values(test_case.get("点云指标", {}),
+                                             reductions.get(config_key(test_case["配置"]))) +
+                    [test_case.get("输出监视", {}).get(key, "")
+                     for key in ("首字节", "完成", "窗口滞后", "平均MB/s", "峰值MB/s")] +
+                    [test_case.get("IO统计", {}).get(key, "") for _, key in IO_COLUMNS] +
+                    [test_case.get("预测耗时") or "", "; ".join(test_case.get("超出上限") or [])])
+        
+        return output_file
+
+    @staticmethod
+    def generate_trial_summary(stats: List[Dict[str, Any]], confidence: float) -> str:
+        """生成重复试验统计CSV"""
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        output_file = f"reports/trial_summary_{timestamp}.csv"
+        level = f"{confidence * 100:g}%"
+        
+        def number(value):
+            return "" if value is None else f"{value:.3f}"
+        
+        with open(output_file, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(['用例ID', '预热次数', '试验次数', '平均(秒)', '中位数(秒)', 'P90(秒)', '标准差(秒)',
+                             f'中位数{level}置信下限(秒)', f'中位数{level}置信上限(秒)', '区间重叠的用例'])
+            for entry in stats:
+                low, high = entry["置信区间"]
+                writer.writerow([entry["用例ID"], entry["预热"], entry["次数"], number(entry["平均"]),
+                                 number(entry["中位数"]), number(entry["P90"]), number(entry["标准差"]),
+                                 number(low), number(high), ' '.join(entry["区间重叠"])])
         
         return output_file
 
 # ==================== 主执行流程 ====================
-def main():
+def run_test_cases(test_manager: DataDrivenPointCloudTest, test_cases: List[Dict[str, Any]],
+                   journal_path: Optional[str] = None, checkpoint: Optional[RunCheckpoint] = None):
+    """
+    执行测试用例，结果记录到test_manager.all_results
+    
+    Args:
+        journal_path: 续写的结果日志，为空时新建；续跑/重跑时结果追加到之前的日志中，报告合并所有结果
+        checkpoint: 续跑时读取的断点，为空时新建
+    """
+    # 4. 初始化结果
+    test_manager.all_results["total_cases"] = len(test_cases)
+    test_manager.all_results["start_time"] = datetime.now().isoformat()
+    
+    # 按配置差异或预测转换耗时重排用例，并估算配置点击数
+    persistent = test_manager.config["persist_dialog_state"]
+    clicks = {"原始点击": sequence_clicks(test_cases, persistent=False)}
+    if test_manager.config["reorder_test_cases"]:
+        test_cases = schedule_test_cases(test_cases)
+        test_manager.logger.info(f"用例已按配置差异重排: {', '.join(tc['用例ID'] for tc in test_cases)}")
+    if test_manager.config["runtime_order"]:
+        test_cases = order_by_predicted_runtime(test_cases, test_manager.logger)
+    clicks["预计点击"] = sequence_clicks(test_cases, persistent)
+    clicks["预计节省"] = clicks["原始点击"] - clicks["预计点击"]
+    
+    # 自适应超时：从之前的运行拟合每个配置和步骤的超时上限，执行前给出整套用例的预计耗时
+    config = test_manager.config
+    if config["adaptive_timeouts"]:
+        test_manager.timeout_model = load_timeout_model(config, test_manager.logger)
+        test_manager.logger.info(f"超时模型: 历史用例 {test_manager.timeout_model.cases} 个")
+    
+    # 每个用例结束即写入结果日志，中途崩溃也不丢失已完成的结果
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    test_manager.journal = ResultJournal(
+        journal_path or os.path.join(config["journal_dir"], f"results_{timestamp}.jsonl"),
+        fsync_every=config["journal_fsync_every"],
+        fsync_interval=config["journal_fsync_interval"]
+    )
+    test_manager.all_results["journal"] = test_manager.journal.path
+    test_manager.logger.info(f"结果日志: {test_manager.journal.path}")
+    
+    # 每个用例结束后更新断点，崩溃后可用--resume跳过已完成的用例
+    test_manager.checkpoint = checkpoint or RunCheckpoint(config["checkpoint_file"])
+    test_manager.checkpoint.journal = test_manager.journal.path
+    test_manager.checkpoint.csv_file = config["csv_file"]
+    test_manager.checkpoint.save()
+    
+    # 可选的本地进度看板（asyncio执行核心在事件循环中运行看板）
+    progress_server = None
+    if config["progress_server"] and not config["async_engine"]:
+        try:
+            progress_server = ProgressServer(test_manager.progress, config["progress_host"],
+                                             config["progress_port"]).start()
+        except OSError as e:
+            test_manager.logger.warning(f"进度看板启动失败: {e}")
+    
+    # 5. 执行所有测试用例（找到多个VORTEX实例时并行执行）
+    try:
+        handles = find_worker_windows(test_manager)
+        test_manager.progress.start_run(len(test_cases), workers=max(len(handles), 1))
+        predicted = test_manager.timeout_model.predict_suite([config_key(tc) for tc in test_cases],
+                                                             workers=max(len(handles), 1))
+        if predicted["预计"] is not None:
+            test_manager.logger.info(f"预计总耗时: {predicted['预计']:.1f}秒"
+                                     f"（{predicted['有历史']}/{predicted['用例数']}个用例有历史耗时）")
+        if config["async_engine"]:
+            sessions = run_async(test_manager, test_cases, handles)
+        elif len(handles) > 1:
+            sessions = run_parallel(test_manager, test_cases, handles)
+        else:
+            sessions = [test_manager.session]
+            run_sequential(test_manager, test_cases)
+    finally:
+        test_manager.journal.close()
+        if progress_server is not None:
+            progress_server.stop()
+    
+    # 6. 完成统计
+    test_manager.all_results["end_time"] = datetime.now().isoformat()
+    session_stats = {key: 0 for key in test_manager.session.stats}
+    for session in sessions:
+        for key, value in session.stats.items():
+            session_stats[key] += value
+        session.invalidate()
+    test_manager.all_results["会话统计"] = session_stats
+    
+    clicks.update(summarize_results(iter_case_results(test_manager.all_results))["配置点击"])
+    test_manager.all_results["配置点击"] = clicks
+    
+    # 续跑/重跑时结果日志包含之前的结果，按合并后的结果重新计数
+    if journal_path:
+        count_results(test_manager.all_results)
+    
+    if test_manager.all_results["start_time"] and test_manager.all_results["end_time"]:
+        start = datetime.fromisoformat(test_manager.all_results["start_time"])
+        end = datetime.fromisoformat(test_manager.all_results["end_time"])
+        test_manager.all_results["total_duration"] = (end - start).total_seconds()
+    
+    if config["adaptive_timeouts"]:
+        test_manager.all_results["耗时预测"] = prediction_summary(test_manager.all_results, predicted)
+
+
+def count_results(all_results: Dict[str, Any]):
+    """按结果日志中每个用例的最终结果重新统计用例数"""
+    counts = {"total_cases": 0, "passed_cases": 0, "failed_cases": 0, "error_cases": 0}
+    for result in iter_case_results(all_results):
+        counts["total_cases"] += 1
+        if result["状态"] == "通过":
+            counts["passed_cases"] += 1
+        elif result["状态"] == "失败":
+            counts["failed_cases"] += 1
+        else:
+            counts["error_cases"] += 1
+    all_results.update(counts)
+
+
+def find_worker_windows(test_manager: DataDrivenPointCloudTest) -> List[int]:
+    """
+    按parallel_workers配置确定并行使用的VORTEX实例
+
+    parallel_workers为1时串行执行；为0时每个实例一个工作线程；为N时最多使用N个实例。
+    """
+    workers = test_manager.config["parallel_workers"]
+    if workers == 1:
+        return []
+    
+    handles = test_manager.driver.find_windows(test_manager.config["vortex_window_title"])
+    if workers:
+        handles = handles[:workers]
+    test_manager.logger.info(f"找到 {len(handles)} 个VORTEX实例: {', '.join(hex(h) for h in handles)}")
+    return handles
+
+
+def record_result(test_manager: DataDrivenPointCloudTest, executor: TestCaseExecutor, success: bool):
+    """把用例结果写入结果日志并更新计数（可在工作线程中调用）"""
+    results = test_manager.all_results
+    test_manager.journal.append(executor.result)
+    test_manager.progress.finish_case(executor.result)
+    with test_manager.results_lock:
+        # 断点每个用例都fsync；先同步结果日志，崩溃后断点不会把日志中丢失的用例记为已完成
+        test_manager.journal.sync()
+        test_manager.checkpoint.record(executor.result)
+        if success:
+            results["passed_cases"] += 1
+        elif executor.result["状态"] == "失败":
+            results["failed_cases"] += 1
+        else:
+            results["error_cases"] += 1
+
+
+def wait_between_cases(test_manager: DataDrivenPointCloudTest, session: VortexSession, executor: TestCaseExecutor):
+    """等待前一个用例的弹窗全部关闭，避免过快执行"""
+    ceiling = test_manager.config["wait_ceilings"].get("用例间隔", FIXED_DELAYS["用例间隔"])
+    idle_wait = session.wait_until_idle(ceiling)
+    executor.result["等待节省"]["用例间隔"] = round(max(FIXED_DELAYS["用例间隔"] - idle_wait, 0.0), 3)
+
+
+def run_sequential(test_manager: DataDrivenPointCloudTest, test_cases: List[Dict[str, Any]]):
+    """在单个VORTEX实例上依次执行测试用例"""
+    for i, test_case in enumerate(test_cases):
+        test_manager.logger.info(f"\n{'='*60}")
+        test_manager.logger.info(f"执行测试用例 {i+1}/{len(test_cases)}: {test_case['用例ID']}")
+        
+        # 创建执行器并执行测试用例
+        executor = TestCaseExecutor(test_manager, test_case)
+        success = executor.execute()
+        
+        if i < len(test_cases) - 1:  # 如果不是最后一个用例
+            wait_between_cases(test_manager, test_manager.session, executor)
+        
+        # 记录结果
+        record_result(test_manager, executor, success)
+
+
+def run_parallel(test_manager: DataDrivenPointCloudTest, test_cases: List[Dict[str, Any]],
+                 handles: List[int]) -> List[VortexSession]:
+    """
+    每个VORTEX实例一个工作线程，从共享队列中领取用例
+
+    Returns:
+        各工作线程的会话，用于汇总连接统计
+    """
+    case_queue = queue.Queue()
+    for i, test_case in enumerate(test_cases):
+        case_queue.put((i, test_case))
+    
+    sessions = [VortexSession(test_manager, hwnd=hwnd) for hwnd in handles]
+    
+    def worker(session: VortexSession):
+        test_manager.driver.init_thread()
+        while True:
+            try:
+                i, test_case = case_queue.get_nowait()
+            except queue.Empty:
+                break
+            test_manager.logger.info(f"执行测试用例 {i+1}/{len(test_cases)}: {test_case['用例ID']} "
+                                     f"(实例 {hex(session.bound_hwnd)})")
+            
+            executor = TestCaseExecutor(test_manager, test_case, session=session)
+            success = executor.execute()
+            
+            if not case_queue.empty():
+                wait_between_cases(test_manager, session, executor)
+            
+            record_result(test_manager, executor, success)
+    
+    threads = [threading.Thread(target=worker, args=(session,), name=f"VORTEX-{n+1}", daemon=True)
+               for n, session in enumerate(sessions)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    # 结果日志按完成顺序记录，报告中的用例顺序与完成顺序一致
+    return sessions
+
+
+def run_async(test_manager: DataDrivenPointCloudTest, test_cases: List[Dict[str, Any]],
+              handles: List[int]) -> List[VortexSession]:
+    """
+    asyncio执行核心：一个事件循环驱动所有VORTEX实例（只有一个实例时即串行执行）
+
+    每个实例一个协程从共享队列领取用例，界面调用在实例专用的线程中执行；
+    等待成功窗口、进度看板、资源采样和输出监视都是事件循环中的任务，
+    运行结束、出错或被中断（Ctrl+C）时统一取消并等待退出。
+
+    Returns:
+        各实例的会话，用于汇总连接统计
+    """
+    return asyncio.run(_run_async(test_manager, test_cases, handles))
+
+
+async def _run_async(test_manager: DataDrivenPointCloudTest, test_cases: List[Dict[str, Any]],
+                     handles: List[int]) -> List[VortexSession]:
+    config = test_manager.config
+    sessions = [VortexSession(test_manager, hwnd=hwnd) for hwnd in handles] if len(handles) > 1 \
+        else [test_manager.session]
+    names = [f"VORTEX-{n+1}" for n in range(len(sessions))]
+    threads = [InstanceThread(name, initializer=test_manager.driver.init_thread) for name in names]
+    # 只在事件循环线程中领取，不需要加锁
+    case_queue = deque(enumerate(test_cases))
+    
+    async def worker(name: str, session: VortexSession, ui: InstanceThread, tasks: TaskScope):
+        current_worker.set(name)
+        while case_queue:
+            i, test_case = case_queue.popleft()
+            test_manager.logger.info(f"执行测试用例 {i+1}/{len(test_cases)}: {test_case['用例ID']} (实例 {name})")
+            
+            executor = TestCaseExecutor(test_manager, test_case, session=session, tasks=tasks)
+            success = await executor.execute_async(ui)
+            
+            if case_queue:
+                await ui(wait_between_cases, test_manager, session, executor)
+            
+            await ui(record_result, test_manager, executor, success)
+    
+    try:
+        async with TaskScope() as tasks:
+            if config["progress_server"]:
+                try:
+                    await AsyncProgressServer(test_manager.progress, config["progress_host"],
+                                              config["progress_port"]).start(tasks)
+                except OSError as e:
+                    test_manager.logger.warning(f"进度看板启动失败: {e}")
+            await run_all([worker(name, session, thread, tasks)
+                           for name, session, thread in zip(names, sessions, threads)], names)
+    finally:
+        for thread in threads:
+            thread.close()
+    return sessions
+
+def parse_args(argv=None):
+    """命令行参数"""
+    parser = argparse.ArgumentParser(description="点云格式转换数据驱动测试")
+    parser.add_argument("--config", default="test_config.json", help="配置文件路径")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--resume", nargs="?", const="", metavar="CHECKPOINT",
+                      help="从断点文件续跑，跳过已完成的用例（默认使用配置中的checkpoint_file）")
+    mode.add_argument("--rerun-failed", metavar="SOURCE",
+                      help="只重跑之前结果日志(.jsonl)或test_summary_*.csv中失败/错误的用例")
+    parser.add_argument("--repeat", type=int, default=1, metavar="K",
+                        help="基准模式：每个配置执行K次，统计转换耗时的中位数、P90、标准差和置信区间")
+    parser.add_argument("--warmup", type=int, default=0, metavar="W",
+                        help="基准模式下每个配置先执行W次预热，结果不计入统计")
+    parser.add_argument("--build", help="被测VORTEX Client的版本标识；完整且没有回归的运行按该版本存入基线数据库")
+    parser.add_argument("--baseline", metavar="BUILD",
+                        help="与指定版本的最近一次运行比较（默认为配置中的baseline_build，都未指定时不比较）")
+    parser.add_argument("--promote", action="store_true",
+                        help="存在回归或无法判定的配置时仍把本次运行存为--build的基线（确认变慢是预期的）")
+    args = parser.parse_args(argv)
+    if args.promote and not args.build:
+        parser.error("--promote需要同时指定--build")
+    return args
+
+def main(argv=None):
     """主执行函数"""
+    args = parse_args(argv)
     
     # 1. 初始化测试管理器
-    test_manager = DataDrivenPointCloudTest()
+    test_manager = DataDrivenPointCloudTest(args.config)
+    try:
+        output_drive(test_manager.config)
+    except ValueError as e:
+        test_manager.logger.error(f"输出路径配置无效: {e}")
+        return 2
+
+    # 续跑：沿用断点中的结果日志和用例文件
+    journal_path, checkpoint = None, None
+    if args.resume is not None:
+        checkpoint_file = args.resume or test_manager.config["checkpoint_file"]
+        try:
+            checkpoint = RunCheckpoint.load(checkpoint_file)
+        except Exception as e:
+            test_manager.logger.error(f"读取断点文件失败: {e}")
+            return 2
+        journal_path = checkpoint.journal
+        if checkpoint.csv_file:
+            test_manager.config["csv_file"] = checkpoint.csv_file
+        test_manager.config["checkpoint_file"] = checkpoint_file
     
     # 2. 检查是否有测试用例文件，如果没有则生成
     csv_file = test_manager.config["csv_file"]
@@ -965,44 +2864,48 @@ def main():
         test_manager.logger.info(f"从 {csv_file} 读取到 {len(test_cases)} 个测试用例")
     except Exception as e:
         test_manager.logger.error(f"读取测试用例失败: {e}")
-        return
+        return 2
     
-    # 4. 初始化结果
-    test_manager.all_results["total_cases"] = len(test_cases)
-    test_manager.all_results["start_time"] = datetime.now().isoformat()
+    # 基准模式：展开为重复试验（续跑时用相同的--repeat/--warmup，已完成的试验会被跳过）
+    trial_mode = args.repeat > 1 or args.warmup > 0
+    if trial_mode:
+        test_cases = expand_trials(test_cases, args.repeat, args.warmup)
+        test_manager.logger.info(f"基准模式: 每个配置预热{args.warmup}次、试验{args.repeat}次，共{len(test_cases)}次执行")
     
-    # 5. 执行所有测试用例
-    for i, test_case in enumerate(test_cases):
-        test_manager.logger.info(f"\n{'='*60}")
-        test_manager.logger.info(f"执行测试用例 {i+1}/{len(test_cases)}: {test_case['用例ID']}")
-        
-        # 创建执行器
-        executor = TestCaseExecutor(test_manager, test_case)
-        
-        # 执行测试用例
-        success = executor.execute()
-        
-        # 记录结果
-        test_manager.all_results["test_cases"].append(executor.result)
+    if checkpoint is not None:
+        test_cases = [tc for tc in test_cases if tc["用例ID"] not in checkpoint.cases]
+        test_manager.logger.info(f"续跑: 跳过已完成的 {len(checkpoint.cases)} 个用例，剩余 {len(test_cases)} 个")
+    elif args.rerun_failed:
+        try:
+            statuses = load_previous_statuses(args.rerun_failed)
+        except Exception as e:
+            test_manager.logger.error(f"读取之前的结果失败: {e}")
+            return 2
+        failed = {case_id for case_id, status in statuses.items() if status in ("失败", "错误")}
+        test_cases = [tc for tc in test_cases if tc["用例ID"] in failed]
+        test_manager.logger.info(f"重跑失败/错误的 {len(test_cases)} 个用例: {', '.join(sorted(failed))}")
         
-        if success:
-            test_manager.all_results["passed_cases"] += 1
-        elif executor.result["状态"] == "失败":
-            test_manager.all_results["failed_cases"] += 1
+        if args.rerun_failed.endswith(".jsonl"):
+            # 重跑结果追加到原日志，报告中以最后一次结果为准
+            journal_path = args.rerun_failed
         else:
-            test_manager.all_results["error_cases"] += 1
-        
-        # 短暂暂停，避免过快执行
-        if i < len(test_cases) - 1:  # 如果不是最后一个用例
-            time.sleep(3)  # 等待3秒，确保前一个用例完全结束
+            # 汇总CSV中的结果先写入新日志，与重跑结果合并成一份报告
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            journal_path = os.path.join(test_manager.config["journal_dir"], f"results_{timestamp}.jsonl")
+            with ResultJournal(journal_path) as journal:
+                for result in CSVDataReader.read_summary(args.rerun_failed):
+                    journal.append(result)
     
-    # 6. 完成统计
-    test_manager.all_results["end_time"] = datetime.now().isoformat()
+    # 4-6. 执行所有测试用例并完成统计
+    run_test_cases(test_manager, test_cases, journal_path=journal_path, checkpoint=checkpoint)
     
-    if test_manager.all_results["start_time"] and test_manager.all_results["end_time"]:
-        start = datetime.fromisoformat(test_manager.all_results["start_time"])
-        end = datetime.fromisoformat(test_manager.all_results["end_time"])
-        test_manager.all_results["total_duration"] = (end - start).total_seconds()
+    # 与性能基线比较
+    if args.baseline:
+        test_manager.config["baseline_build"] = args.baseline
+    regression = check_regressions(test_manager, build=args.build,
+                                   partial=args.resume is not None or bool(args.rerun_failed), promote=args.promote)
+    if test_manager.config["point_metrics"]:
+        test_manager.all_results["点云质量"] = summarize_point_quality(iter_case_results(test_manager.all_results))
     
     # 7. 生成报告
     reporter = DataDrivenTestReporter()
@@ -1014,6 +2917,7 @@ def main():
     test_manager.logger.info("🎉 所有测试用例执行完成！")
     test_manager.logger.info(f"📊 HTML报告: {html_report}")
     test_manager.logger.info(f"📊 CSV汇总: {csv_summary}")
+    test_manager.logger.info(f"📊 结果日志: {test_manager.all_results['journal']}")
     
     # 8. 控制台总结
     print("\n" + "="*60)
@@ -1028,20 +2932,81 @@ def main():
     print(f"通过率: {pass_rate:.2f}%")
     print(f"总耗时: {test_manager.all_results['total_duration']:.2f}秒")
     
-    # 计算转换时间统计
-    conversion_times = []
-    for test_case in test_manager.all_results["test_cases"]:
-        if test_case.get("转换耗时"):
-            conversion_times.append(test_case["转换耗时"])
+    session_stats = test_manager.all_results["会话统计"]
+    print(f"\n🔗 会话复用: 新建={session_stats['新建']}, 复用={session_stats['复用']}, "
+          f"重连={session_stats['重连']}, 节省耗时={session_stats['节省耗时']:.2f}秒")
+    summary = summarize_results(iter_case_results(test_manager.all_results))
+    print(f"⏳ 条件等待相对固定延迟节省: {summary['等待节省']:.2f}秒")
+    clicks = test_manager.all_results["配置点击"]
+    print(f"🖱️ 配置点击: 原始={clicks['原始点击']}, 预计={clicks['预计点击']}(节省{clicks['预计节省']}), "
+          f"实际={clicks['实际点击']}(节省{clicks['实际节省']})")
     
-    if conversion_times:
-        avg_time = sum(conversion_times) / len(conversion_times)
-        min_time = min(conversion_times)
-        max_time = max(conversion_times)
+    # 计算转换时间统计
+    conversion = summary["转换耗时"]
+    if conversion["次数"]:
         print(f"\n⏱️ 转换时间统计:")
-        print(f"  平均转换时间: {avg_time:.2f}秒")
-        print(f"  最短转换时间: {min_time:.2f}秒")
-        print(f"  最长转换时间: {max_time:.2f}秒")
+        print(f"  平均转换时间: {conversion['平均']:.2f}秒")
+        print(f"  最短转换时间: {conversion['最短']:.2f}秒")
+        print(f"  最长转换时间: {conversion['最长']:.2f}秒")
+    if summary["阶段耗时"]:
+        print("  平均阶段耗时: " + ", ".join(f"{phase}={seconds:.3f}秒" for phase, seconds in summary["阶段耗时"].items()))
+    for fmt, load in sorted(summary["负载分类"].items()):
+        print(f"  {fmt}: CPU密集={load['CPU密集']}, IO密集={load['IO密集']}, 未饱和={load['未饱和']}, "
+              f"平均写入{load['写入MB/s']:.2f}MB/s, 平均占用{load['CPU核数']:.2f}核")
+    
+    if trial_mode:
+        print_trial_summary(test_manager)
+    
+    prediction = test_manager.all_results.get("耗时预测")
+    if prediction and prediction["预计"] is not None:
+        print(f"\n🔮 {format_prediction(prediction)}")
+    
+    print_regressions(regression)
+    # 有性能回归时返回1，供构建流水线判断（读取断点、用例或之前的结果失败时返回2）
+    return 1 if regression["回归数"] else 0
+
+
+def print_regressions(regression: Dict[str, Any]):
+    """控制台输出与基线比较的结果"""
+    baseline = regression["基线"]
+    recorded = regression["本次运行"]
+    record_text = (f"本次运行已存为版本 {recorded['build']} 的基线" if recorded["id"]
+                   else f"本次运行未存入基线: {recorded['未存入原因']}")
+    if not baseline:
+        reason = (f"基线数据库中没有版本 {regression['基线版本']} 的运行" if regression["基线版本"]
+                  else "未指定基线版本")
+        print(f"\n📉 性能基线: {reason}，没有比较；{record_text}")
+        return
+    counts: Dict[str, int] = {}
+    for entry in regression["比较"]:
+        counts[entry["状态"]] = counts.get(entry["状态"], 0) + 1
+    print(f"\n📉 与基线运行#{baseline['id']} {baseline['build'] or ''} 比较: "
+          + ", ".join(f"{state}={count}" for state, count in counts.items()))
+    for entry in regression["比较"]:
+        if entry["状态"] in ("回归", "无法判定"):
+            p_value = f"p={entry['p值']:.3f}" if entry["p值"] is not None else entry["检验"]
+            print(f"  {'❌' if entry['状态'] == '回归' else '❔'} {config_label(entry['配置'])}: "
+                  f"{entry['基线中位数']:.2f}秒 -> {entry['当前中位数']:.2f}秒 ({entry['变化'] * 100:+.1f}%, {p_value})")
+    print(f"  {record_text}")
+
+
+def print_trial_summary(test_manager: DataDrivenPointCloudTest):
+    """基准模式：统计每个配置的转换耗时分布，写入CSV并在控制台输出"""
+    confidence = test_manager.config["trial_confidence"]
+    stats = summarize_trials(iter_case_results(test_manager.all_results), confidence,
+                             test_manager.config["trial_bootstrap_resamples"])
+    trial_file = DataDrivenTestReporter.generate_trial_summary(stats, confidence)
+    test_manager.logger.info(f"📊 重复试验统计: {trial_file}")
+    
+    print(f"\n🔁 重复试验统计（中位数{confidence * 100:g}%置信区间）:")
+    for entry in stats:
+        if not entry["次数"]:
+            print(f"  {entry['用例ID']}: 没有成功的试验")
+            continue
+        low, high = entry["置信区间"]
+        overlap = f", 与 {', '.join(entry['区间重叠'])} 区间重叠" if entry["区间重叠"] else ""
+        print(f"  {entry['用例ID']}: n={entry['次数']}, 中位数={entry['中位数']:.2f}秒, P90={entry['P90']:.2f}秒, "
+              f"标准差={entry['标准差']:.2f}秒, 置信区间=[{low:.2f}, {high:.2f}]秒{overlap}")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file
@@ -1,98 +1,69 @@
 # generate_all_test_cases.py
+import argparse
+import random
 import pandas as pd
 import itertools
 
-def generate_all_test_cases():
-    """生成所有可能的测试用例组合"""
-    
-    # 定义所有参数选项
-    parameters = {
-        "输出格式": ["pts", "e57", "las"],
-        "点云抽稀": ["启用", "不启用"],
-        "体素抽稀": ["启用", ""],  # 空字符串表示不启用
-        "随机抽稀": ["启用", ""],  # 空字符串表示不启用
-        "输出类型": ["单站", "合并", "单站+合并"],
-        "贴图选择": ["彩图", "反射率", "反射率+彩图"],
-        "点云降噪": ["启用", "不启用"],
-        "点云厚度优化": ["启用", "不启用"]
-    }
-    
-    # 生成所有组合
-    test_cases = []
-    case_id = 1
-    
-    # 遍历所有参数组合
-    for output_format in parameters["输出格式"]:
-        for thinning_enabled in parameters["点云抽稀"]:
-            for output_type in parameters["输出类型"]:
-                for texture in parameters["贴图选择"]:
-                    for denoise in parameters["点云降噪"]:
-                        for thickness in parameters["点云厚度优化"]:
-                            
-                            if thinning_enabled == "启用":
-                                # 启用点云抽稀时，有3种抽稀组合
-                                thinning_combinations = [
-                                    {"体素抽稀": "启用", "随机抽稀": ""},  # 只启用体素抽稀
-                                    {"体素抽稀": "", "随机抽稀": "启用"},  # 只启用随机抽稀
-                                    {"体素抽稀": "启用", "随机抽稀": "启用"},  # 同时启用两种抽稀
-                                ]
-                                
-                                for thinning_combo in thinning_combinations:
-                                    test_case = {
-                                        "用例ID": f"TC{case_id:04d}",
-                                        "输出格式": output_format,
-                                        "点云抽稀": thinning_enabled,
-                                        "体素抽稀": thinning_combo["体素抽稀"],
-                                        "随机抽稀": thinning_combo["随机抽稀"],
-                                        "输出类型": output_type,
-                                        "贴图选择": texture,
-                                        "点云降噪": denoise,
-                                        "点云厚度优化": thickness,
-                                        "预期结果": "成功",
-                                        "备注": f"组合{case_id}"
-                                    }
-                                    test_cases.append(test_case)
-                                    case_id += 1
-                            else:
-                                # 不启用点云抽稀时，抽稀方式为空
-                                test_case = {
-                                    "用例ID": f"TC{case_id:04d}",
-                                    "输出格式": output_format,
-                                    "点云抽稀": thinning_enabled,
-                                    "体素抽稀": "",
-                                    "随机抽稀": "",
-                                    "输出类型": output_type,
-                                    "贴图选择": texture,
-                                    "点云降噪": denoise,
-                                    "点云厚度优化": thickness,
-                                    "预期结果": "成功",
-                                    "备注": f"组合{case_id}"
-                                }
-                                test_cases.append(test_case)
-                                case_id += 1
-    
-    # 保存到CSV
-    df = pd.DataFrame(test_cases)
-    output_file = "test_cases/all_test_cases_complete.csv"
-    df.to_csv(output_file, index=False, encoding='utf-8')
+# 点云抽稀及其抽稀方式合并为一个因子，覆盖表中的每个取值天然满足
+# "启用点云抽稀时至少指定一种抽稀方式、不启用时不指定"的约束
+THINNING_MODES = {
+    "不启用抽稀": {"点云抽稀": "不启用", "体素抽稀": "", "随机抽稀": ""},
+    "只启用体素抽稀": {"点云抽稀": "启用", "体素抽稀": "启用", "随机抽稀": ""},
+    "只启用随机抽稀": {"点云抽稀": "启用", "体素抽稀": "", "随机抽稀": "启用"},
+    "同时启用两种抽稀": {"点云抽稀": "启用", "体素抽稀": "启用", "随机抽稀": "启用"},
+}
+
+# 覆盖表的因子及取值
+FACTORS = {
+    "输出格式": ["pts", "e57", "las"],
+    "抽稀组合": list(THINNING_MODES),
+    "输出类型": ["单站", "合并", "单站+合并"],
+    "贴图选择": ["彩图", "反射率", "反射率+彩图"],
+    "点云降噪": ["启用", "不启用"],
+    "点云厚度优化": ["启用", "不启用"],
+}
+
+def full_product_rows():
+    """
+    FACTORS的完整笛卡尔积，按原嵌套循环的顺序排列：输出格式、点云抽稀（启用在前）、输出类型、
+    贴图选择、点云降噪、点云厚度优化，启用抽稀时最内层为三种抽稀方式。
+    用例ID按这个顺序编号，重新生成不改变已有用例ID对应的配置，断点、重跑和历史结果仍然对得上。
+    """
+    enabled = [mode for mode, values in THINNING_MODES.items() if values["点云抽稀"] == "启用"]
+    disabled = [mode for mode in THINNING_MODES if mode not in enabled]
+    for output_format, modes, output_type, texture, denoise, thickness in itertools.product(
+            FACTORS["输出格式"], [enabled, disabled], FACTORS["输出类型"], FACTORS["贴图选择"],
+            FACTORS["点云降噪"], FACTORS["点云厚度优化"]):
+        for mode in modes:
+            yield (output_format, mode, output_type, texture, denoise, thickness)
+
+def generate_all_test_cases(output_file="test_cases/all_test_cases_complete.csv"):
+    """生成所有可能的测试用例组合（FACTORS的完整笛卡尔积，即强度为因子数的覆盖表），只写入output_file"""
+    test_cases = [make_test_case(case_id, row, f"组合{case_id}")
+                  for case_id, row in enumerate(full_product_rows(), start=1)]
     
-    # 计算统计信息
-    total_cases = len(test_cases)
+    output_file = save_test_cases(test_cases, output_file)
     
     print("="*60)
     print("✅ 测试用例生成完成！")
-    print(f"总测试用例数: {total_cases}")
+    print(f"总测试用例数: {len(test_cases)}")
+    print_statistics(test_cases)
+    print(f"\n📁 已保存到: {output_file}")
     
-    # 统计各类配置数量
+    return test_cases
+
+def save_test_cases(test_cases, output_file):
+    """保存到CSV"""
+    df = pd.DataFrame(test_cases)
+    df.to_csv(output_file, index=False, encoding='utf-8')
+    return output_file
+
+def print_statistics(test_cases):
+    """统计各类配置数量"""
     stats = {
         "输出格式": {"pts": 0, "e57": 0, "las": 0},
         "点云抽稀": {"启用": 0, "不启用": 0},
-        "抽稀组合": {
-            "只启用体素抽稀": 0,
-            "只启用随机抽稀": 0,
-            "同时启用两种抽稀": 0,
-            "不启用抽稀": 0
-        }
+        "抽稀组合": {mode: 0 for mode in THINNING_MODES}
     }
     
     for test_case in test_cases:
@@ -103,28 +74,152 @@ def generate_all_test_cases():
         stats["点云抽稀"][test_case["点云抽稀"]] += 1
         
         # 统计抽稀组合
-        if test_case["点云抽稀"] == "启用":
-            if test_case["体素抽稀"] == "启用" and test_case["随机抽稀"] == "":
-                stats["抽稀组合"]["只启用体素抽稀"] += 1
-            elif test_case["体素抽稀"] == "" and test_case["随机抽稀"] == "启用":
-                stats["抽稀组合"]["只启用随机抽稀"] += 1
-            elif test_case["体素抽稀"] == "启用" and test_case["随机抽稀"] == "启用":
-                stats["抽稀组合"]["同时启用两种抽稀"] += 1
-        else:
-            stats["抽稀组合"]["不启用抽稀"] += 1
+        stats["抽稀组合"][thinning_mode(test_case)] += 1
     
     print("\n📊 配置统计:")
     print(f"  输出格式: pts={stats['输出格式']['pts']}, e57={stats['输出格式']['e57']}, las={stats['输出格式']['las']}")
     print(f"  点云抽稀: 启用={stats['点云抽稀']['启用']}, 不启用={stats['点云抽稀']['不启用']}")
     print(f"  抽稀组合:")
-    print(f"    只启用体素抽稀: {stats['抽稀组合']['只启用体素抽稀']}")
-    print(f"    只启用随机抽稀: {stats['抽稀组合']['只启用随机抽稀']}")
-    print(f"    同时启用两种抽稀: {stats['抽稀组合']['同时启用两种抽稀']}")
-    print(f"    不启用抽稀: {stats['抽稀组合']['不启用抽稀']}")
+    for mode, count in stats["抽稀组合"].items():
+        print(f"    {mode}: {count}")
+
+def thinning_mode(test_case):
+    """用例对应的抽稀组合名称"""
+    for mode, values in THINNING_MODES.items():
+        if all(test_case[key] == value for key, value in values.items()):
+            return mode
+    raise ValueError(f"用例 {test_case['用例ID']} 的抽稀配置无效")
+
+def factor_values(test_case):
+    """用例在各覆盖因子上的取值"""
+    return tuple(thinning_mode(test_case) if factor == "抽稀组合" else test_case[factor]
+                 for factor in FACTORS)
+
+def make_test_case(case_id, row, note):
+    """由各因子的取值构造一条CSV用例"""
+    values = dict(zip(FACTORS, row))
+    return {
+        "用例ID": f"TC{case_id:04d}",
+        "输出格式": values["输出格式"],
+        **THINNING_MODES[values["抽稀组合"]],
+        "输出类型": values["输出类型"],
+        "贴图选择": values["贴图选择"],
+        "点云降噪": values["点云降噪"],
+        "点云厚度优化": values["点云厚度优化"],
+        "预期结果": "成功",
+        "备注": note
+    }
+
+def all_interactions(strength):
+    """全部t元组合：((因子下标...), (取值...))"""
+    levels = list(FACTORS.values())
+    interactions = set()
+    for factors in itertools.combinations(range(len(levels)), strength):
+        for values in itertools.product(*(levels[f] for f in factors)):
+            interactions.add((factors, values))
+    return interactions
+
+def row_interactions(row, strength):
+    """一行用例覆盖的t元组合"""
+    return {(factors, tuple(row[f] for f in factors))
+            for factors in itertools.combinations(range(len(row)), strength)}
+
+def coverage(test_cases, strength):
+    """用例集覆盖的t元组合数和全部t元组合数"""
+    required = all_interactions(strength)
+    covered = set()
+    for test_case in test_cases:
+        covered |= row_interactions(factor_values(test_case), strength)
+    return len(covered & required), len(required)
+
+def generate_covering_test_cases(strength=2, candidates=50, seed=0):
+    """
+    生成t元覆盖表用例（默认两两组合）
     
-    print(f"\n📁 已保存到: {output_file}")
+    贪心构造（AETG）：每轮随机生成若干候选行，每个候选按随机的因子顺序逐个选取
+    能覆盖最多未覆盖组合的取值，保留覆盖最多的候选，直到全部t元组合被覆盖。
+    
+    Args:
+        strength: 覆盖强度t，取值为因子数时等价于完整笛卡尔积
+        candidates: 每轮候选行数，越多用例越少但生成越慢
+        seed: 随机种子，相同参数生成相同的用例集
+    """
+    factor_count = len(FACTORS)
+    if not 1 <= strength <= factor_count:
+        raise ValueError(f"覆盖强度必须在1到{factor_count}之间: {strength}")
+    
+    rng = random.Random(seed)
+    levels = list(FACTORS.values())
+    uncovered = all_interactions(strength)
+    rows = []
+    
+    while uncovered:
+        # 从一个未覆盖的组合出发，保证每轮至少覆盖一个新组合
+        seed_factors, seed_values = min(uncovered)
+        best_row, best_gain = None, -1
+        for _ in range(candidates):
+            row = [None] * factor_count
+            for f, value in zip(seed_factors, seed_values):
+                row[f] = value
+            order = [f for f in range(factor_count) if row[f] is None]
+            rng.shuffle(order)
+            for f in order:
+                row[f] = max(levels[f], key=lambda value: (
+                    _gain(row, f, value, strength, uncovered), rng.random()))
+            gain = len(row_interactions(row, strength) & uncovered)
+            if gain > best_gain:
+                best_row, best_gain = tuple(row), gain
+        rows.append(best_row)
+        uncovered -= row_interactions(best_row, strength)
+    
+    return [make_test_case(i + 1, row, f"{strength}元覆盖{i + 1}") for i, row in enumerate(rows)]
+
+def _gain(row, f, value, strength, uncovered):
+    """在已赋值的因子上，把第f个因子取为value能新覆盖的组合数"""
+    assigned = [g for g in range(len(row)) if row[g] is not None and g != f]
+    gain = 0
+    for others in itertools.combinations(assigned, strength - 1):
+        factors = tuple(sorted(others + (f,)))
+        values = tuple(value if g == f else row[g] for g in factors)
+        if (factors, values) in uncovered:
+            gain += 1
+    return gain
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="生成点云导出测试用例CSV")
+    parser.add_argument("--mode", choices=["full", "covering"], default="full",
+                        help="full: 完整笛卡尔积; covering: t元覆盖表")
+    parser.add_argument("--strength", type=int, default=2, help="覆盖强度t（默认两两组合）")
+    parser.add_argument("--seed", type=int, default=0, help="覆盖表随机种子")
+    parser.add_argument("--output", help="输出CSV文件")
+    parser.add_argument("--seconds-per-case", type=float, default=80, help="单个用例预计耗时（秒）")
+    args = parser.parse_args(argv)
+    if args.mode == "covering" and not 1 <= args.strength <= len(FACTORS):
+        parser.error(f"--strength 必须在1到{len(FACTORS)}之间: {args.strength}")
+    
+    if args.mode == "full":
+        test_cases = generate_all_test_cases(args.output or "test_cases/all_test_cases_complete.csv")
+    else:
+        test_cases = generate_covering_test_cases(args.strength, seed=args.seed)
+        output_file = save_test_cases(
+            test_cases, args.output or f"test_cases/covering_test_cases_t{args.strength}.csv")
+        
+        full_count = len(list(itertools.product(*FACTORS.values())))
+        covered, required = coverage(test_cases, args.strength)
+        print("="*60)
+        print(f"✅ {args.strength}元覆盖表生成完成！")
+        print(f"测试用例数: {len(test_cases)}（完整组合 {full_count} 个）")
+        print(f"{args.strength}元组合覆盖率: {covered}/{required} = {covered / required:.1%}")
+        for t in range(1, len(FACTORS) + 1):
+            if t != args.strength:
+                covered_t, required_t = coverage(test_cases, t)
+                print(f"  {t}元组合覆盖率: {covered_t}/{required_t} = {covered_t / required_t:.1%}")
+        print_statistics(test_cases)
+        print(f"\n📁 已保存到: {output_file}")
     
+    hours = len(test_cases) * args.seconds_per_case / 3600
+    print(f"⏱️ 预计执行时间: {hours:.2f}小时（按每个用例{args.seconds_per_case:.0f}秒）")
     return test_cases
 
 if __name__ == "__main__":
-    generate_all_test_cases()
\ No newline at end of file
+    main()
\ No newline at end of file
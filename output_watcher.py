@@ -0,0 +1,381 @@
+"""
+输出文件夹监视
+
+转换开始后在后台线程（或asyncio执行核心的事件循环任务）中监视输出文件夹，独立于成功窗口记录：
+    首字节时间   文件夹中第一次出现非空文件
+    写入速率     平均和滑动窗口内的峰值MB/s
+    完成时间     大小不再变化且写入句柄已关闭时，以最后一次写入（或关闭）的时刻为准
+    停止增长     已开始写入但长时间没有增长，用于发现成功窗口一直不出现的挂起
+
+Linux上用inotify（ctypes调用libc）接收写入和关闭事件，其他平台按间隔轮询文件大小；
+事件循环中运行时inotify描述符注册到事件循环（add_reader），有事件时才处理；
+轮询时如果给出了写入进程号且安装了psutil，用进程打开的文件判断句柄是否已关闭。
+时间均为time.perf_counter()读数。
+"""
+import asyncio
+import ctypes
+import ctypes.util
+import errno
+import logging
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Optional, Set
+
+try:
+    import psutil
+except ImportError:  # 没有psutil时轮询方式只按大小稳定判断完成
+    psutil = None
+
+logger = logging.getLogger(__name__)
+
+# inotify事件掩码（linux/inotify.h）
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE
+EVENT_HEADER = struct.Struct("iIII")
+
+
+def folder_size(folder: str) -> int:
+    """文件夹（含子文件夹）中所有文件的总字节数，文件夹不存在时为0"""
+    total = 0
+    for root, _dirs, files in os.walk(folder):
+        for name in files:
+            try:
+                total += os.stat(os.path.join(root, name)).st_size
+            except OSError:
+                continue
+    return total
+
+
+class Inotify:
+    """最小的inotify封装：添加监视、按超时读取事件"""
+    def __init__(self):
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1失败")
+        self.paths: Dict[int, str] = {}
+
+    @staticmethod
+    def available() -> bool:
+        return sys.platform.startswith("linux") and ctypes.util.find_library("c") is not None
+
+    def add_watch(self, path: str, mask: int = WATCH_MASK) -> int:
+        wd = self._add_watch(self.fd, os.fsencode(path), mask)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch失败: {path}")
+        self.paths[wd] = path
+        return wd
+
+    def read(self, timeout: float):
+        """等待至多timeout秒，返回[(目录, 文件名, 掩码), ...]"""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except OSError as e:
+            if e.errno == errno.EAGAIN:
+                return []
+            raise
+        events, offset = [], 0
+        while offset < len(data):
+            wd, mask, _cookie, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b"\0"))
+            offset += length
+            if wd in self.paths:
+                events.append((self.paths[wd], name, mask))
+        return events
+
+    def close(self):
+        os.close(self.fd)
+
+
+class OutputWatcher:
+    """
+    输出文件夹监视器
+
+    用法:
+        watcher = OutputWatcher(folder, pid=vortex_pid).start()
+        ...
+        watcher.stalled(300)        # 已开始写入但超过300秒没有增长
+        watcher.wait_final(5)       # 等待文件写完
+        summary = watcher.stop()
+
+    Args:
+        folder: 输出文件夹（可以还不存在，出现后再开始监视）
+        interval: 轮询间隔；inotify方式下为没有事件时的最长等待
+        stable_time: 大小保持不变多少秒视为稳定
+        pid: 写入文件的进程号，轮询方式下用于判断句柄是否关闭
+        use_inotify: 是否优先使用inotify
+        rate_window: 计算峰值写入速率的滑动窗口（秒）
+
+    start(tasks)给出TaskScope时在事件循环中以任务方式监视，不另起线程。
+    """
+    def __init__(self, folder: str, interval: float = 0.2, stable_time: float = 2.0, pid: Optional[int] = None,
+                 use_inotify: bool = True, rate_window: float = 1.0):
+        self.folder = folder
+        self.interval = interval
+        self.stable_time = stable_time
+        self.pid = pid
+        self.rate_window = rate_window
+        self.method = "inotify" if use_inotify and Inotify.available() else "轮询"
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._final = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._tasks = None
+        self._task = None
+        self._inotify: Optional[Inotify] = None
+        self._sizes: Dict[str, int] = {}
+        self._open: Set[str] = set()
+        self._history: deque = deque()
+        self.started: Optional[float] = None
+        self.bytes = 0
+        self.first_byte: Optional[float] = None
+        self.last_write: Optional[float] = None
+        self.last_close: Optional[float] = None
+        self.final_at: Optional[float] = None
+        self.peak_rate = 0.0
+
+    def start(self, tasks=None) -> "OutputWatcher":
+        """开始监视，tasks为TaskScope时在事件循环中监视"""
+        self.started = time.perf_counter()
+        if tasks is not None:
+            self._tasks = tasks
+            self._task = tasks.spawn_threadsafe(self._run_async(), "输出监视")
+            return self
+        self._thread = threading.Thread(target=self._run, name="输出监视", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, origin: Optional[float] = None) -> Dict[str, Any]:
+        """停止监视，返回汇总结果"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._task is not None:
+            self._tasks.cancel_threadsafe(self._task)
+            self._task = None
+        return self.summary(origin)
+
+    def wait_final(self, timeout: float) -> bool:
+        """等待文件写完（大小稳定且句柄关闭），返回是否已写完"""
+        return self._final.wait(timeout)
+
+    def stalled(self, timeout: float) -> bool:
+        """已开始写入、尚未写完，且超过timeout秒没有增长"""
+        with self._lock:
+            return (self.last_write is not None and self.final_at is None
+                    and time.perf_counter() - self.last_write > timeout)
+
+    def live(self) -> Dict[str, Any]:
+        """当前输出大小和最近rate_window秒内的写入速率"""
+        now = time.perf_counter()
+        with self._lock:
+            # 以窗口起点之前最后一次记录（没有时为最早的记录）为基准
+            base_time, base_bytes = self._history[0] if self._history else (now, self.bytes)
+            for moment, size in self._history:
+                if now - moment <= self.rate_window:
+                    break
+                base_time, base_bytes = moment, size
+            rate = (self.bytes - base_bytes) / 1e6 / max(now - base_time, 1e-6)
+            return {"MB": round(self.bytes / 1e6, 2), "MB/s": round(rate, 2)}
+
+    def summary(self, origin: Optional[float] = None) -> Dict[str, Any]:
+        """监视结果：时间为相对origin（默认为开始监视的时刻）的秒数"""
+        origin = self.started if origin is None else origin
+        with self._lock:
+            def offset(moment):
+                return None if moment is None else round(moment - origin, 4)
+            writing = (self.last_write - self.first_byte) if self.first_byte is not None else None
+            average = self.bytes / 1e6 / writing if writing else None
+            return {
+                "方式": self.method,
+                "文件数": len([size for size in self._sizes.values() if size]),
+                "字节数": self.bytes,
+                "首字节": offset(self.first_byte),
+                "最后写入": offset(self.last_write),
+                "关闭": offset(self.last_close),
+                "完成": offset(self.final_at),
+                "平均MB/s": round(average, 3) if average is not None else None,
+                "峰值MB/s": round(max(self.peak_rate, average or 0.0), 3),
+            }
+
+    # ---------- 后台线程 / 事件循环任务 ----------
+    def _run(self):
+        try:
+            if self.method == "inotify":
+                self._run_inotify()
+            else:
+                self._run_polling()
+        except Exception as e:
+            logger.warning(f"输出文件夹监视出错: {e}")
+        finally:
+            if self._inotify is not None:
+                self._inotify.close()
+                self._inotify = None
+
+    def _wait_for_folder(self) -> bool:
+        """等待输出文件夹出现，停止监视时返回False"""
+        while not os.path.isdir(self.folder):
+            if self._stop.wait(self.interval):
+                return False
+        return True
+
+    def _run_inotify(self):
+        self._inotify = Inotify()
+        if not self._wait_for_folder():
+            return
+        self._inotify.add_watch(self.folder)
+        # 添加监视之前已经写入的文件
+        self._scan()
+        while not self._stop.is_set():
+            events = self._inotify.read(self.interval)
+            self._apply_events(events, time.perf_counter())
+
+    def _run_polling(self):
+        if not self._wait_for_folder():
+            return
+        while True:
+            self._poll(time.perf_counter())
+            if self._stop.wait(self.interval):
+                return
+
+    async def _run_async(self):
+        """_run的协程版本，取消任务即停止"""
+        try:
+            while not os.path.isdir(self.folder):
+                await asyncio.sleep(self.interval)
+            if self.method == "inotify":
+                await self._run_inotify_async()
+            else:
+                while True:
+                    self._poll(time.perf_counter())
+                    await asyncio.sleep(self.interval)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"输出文件夹监视出错: {e}")
+        finally:
+            if self._inotify is not None:
+                self._inotify.close()
+                self._inotify = None
+
+    async def _run_inotify_async(self):
+        loop = asyncio.get_running_loop()
+        self._inotify = Inotify()
+        self._inotify.add_watch(self.folder)
+        self._scan()
+        readable = asyncio.Event()
+        loop.add_reader(self._inotify.fd, readable.set)
+        try:
+            while True:
+                # 没有事件时也按interval记录一次，大小稳定后才能判定写完
+                try:
+                    await asyncio.wait_for(readable.wait(), self.interval)
+                except asyncio.TimeoutError:
+                    pass
+                readable.clear()
+                self._apply_events(self._inotify.read(0), time.perf_counter())
+        finally:
+            loop.remove_reader(self._inotify.fd)
+
+    def _apply_events(self, events, now: float):
+        """处理一批inotify事件：更新打开的文件和变化文件的大小"""
+        changed = set()
+        for directory, name, mask in events:
+            path = os.path.join(directory, name)
+            if mask & IN_ISDIR:
+                if mask & IN_CREATE:
+                    self._inotify.add_watch(path)
+                continue
+            if mask & (IN_CREATE | IN_MODIFY | IN_MOVED_TO):
+                self._open.add(path)
+                changed.add(path)
+            if mask & (IN_CLOSE_WRITE | IN_MOVED_TO):
+                self._open.discard(path)
+                changed.add(path)
+                with self._lock:
+                    self.last_close = now
+            if mask & IN_DELETE:
+                self._open.discard(path)
+                self._sizes.pop(path, None)
+        for path in changed:
+            self._update_size(path)
+        self._record(now)
+
+    def _poll(self, now: float):
+        """轮询一次：重新遍历文件夹，有写入进程号时顺便查询打开的文件"""
+        self._scan()
+        if self.pid and psutil is not None:
+            self._open = self._open_by_writer()
+        self._record(now)
+
+    def _scan(self):
+        """遍历文件夹（含子文件夹）更新文件大小"""
+        sizes = {}
+        for root, _dirs, files in os.walk(self.folder):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    sizes[path] = os.stat(path).st_size
+                except OSError:
+                    continue
+        self._sizes = sizes
+
+    def _update_size(self, path: str):
+        try:
+            self._sizes[path] = os.stat(path).st_size
+        except OSError:
+            self._sizes.pop(path, None)
+
+    def _open_by_writer(self) -> Set[str]:
+        """写入进程当前打开的、位于输出文件夹中的文件"""
+        try:
+            folder = os.path.normcase(os.path.abspath(self.folder))
+            return {f.path for f in psutil.Process(self.pid).open_files()
+                    if os.path.normcase(f.path).startswith(folder)}
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            return set()
+
+    def _record(self, now: float):
+        """根据当前总大小更新首字节、最后写入、速率和完成状态"""
+        total = sum(self._sizes.values())
+        with self._lock:
+            if not self._history:
+                self._history.append((now, self.bytes))
+            if total != self.bytes:
+                if total and self.first_byte is None:
+                    self.first_byte = now
+                self.last_write = now
+                self.bytes = total
+                self.final_at = None
+                self._final.clear()
+                self._history.append((now, total))
+                while len(self._history) > 2 and now - self._history[0][0] > self.rate_window:
+                    self._history.popleft()
+                (t0, b0), (t1, b1) = self._history[0], self._history[-1]
+                # 跨度太短的窗口（例如刚开始写入的两个相邻事件）不计入峰值
+                if t1 - t0 >= self.rate_window / 2:
+                    self.peak_rate = max(self.peak_rate, (b1 - b0) / 1e6 / (t1 - t0))
+            if (self.final_at is None and total and not self._open
+                    and now - self.last_write >= self.stable_time):
+                # 以最后一次写入或关闭的时刻为完成时间，而不是判定稳定的时刻
+                self.final_at = max(self.last_write, self.last_close or self.last_write)
+                self._final.set()
@@ -0,0 +1,96 @@
+"""
+阶段计时
+
+基于time.perf_counter_ns的单调计时，不受系统时间调整影响。一个用例按顺序划分为若干命名阶段
+（连接、打开窗口、配置、选择路径、转换、检测、关闭、校验、分析），开始下一阶段时上一阶段自动结束，
+结果中记录每个阶段相对用例开始的偏移、耗时和不确定度，用于报告中的阶段瀑布图。
+"""
+import time
+from typing import Any, Dict, List, Optional
+
+# 阶段名称及在报告瀑布图中的颜色
+PHASE_COLORS = {
+    "连接": "#6c757d",
+    "打开窗口": "#17a2b8",
+    "配置": "#007bff",
+    "选择路径": "#6610f2",
+    "转换": "#28a745",
+    "检测": "#ffc107",
+    "关闭": "#fd7e14",
+    "校验": "#20c997",
+    "分析": "#e83e8c",
+}
+
+
+def perf_ns(seconds: float) -> int:
+    """time.perf_counter()读数换算为perf_counter_ns时间轴（两者使用同一时钟）"""
+    return int(round(seconds * 1e9))
+
+
+class PhaseTimer:
+    """
+    顺序阶段计时器
+
+    用法:
+        timer = PhaseTimer()
+        timer.begin("连接")
+        ...
+        timer.begin("转换")               # 结束"连接"
+        timer.begin("检测", at_ns=appear)  # 以外部确定的时刻切换阶段
+        timer.end()
+        timer.phases()  # [{"阶段", "开始", "耗时", "不确定度"}, ...]，时间单位为秒
+    """
+    def __init__(self):
+        self.origin_ns = time.perf_counter_ns()
+        self._phases: List[Dict[str, Any]] = []
+        self._current: Optional[Dict[str, Any]] = None
+
+    @property
+    def current(self) -> Optional[str]:
+        return self._current["阶段"] if self._current else None
+
+    def begin(self, name: str, at_ns: Optional[int] = None) -> int:
+        """结束当前阶段并开始name阶段，返回切换时刻（perf_counter_ns）"""
+        at_ns = time.perf_counter_ns() if at_ns is None else at_ns
+        self.end(at_ns)
+        self._current = {"阶段": name, "开始": at_ns, "结束": None, "不确定度": None}
+        self._phases.append(self._current)
+        return at_ns
+
+    def end(self, at_ns: Optional[int] = None) -> Optional[int]:
+        """结束当前阶段"""
+        if self._current is None:
+            return None
+        at_ns = time.perf_counter_ns() if at_ns is None else at_ns
+        self._current["结束"] = max(at_ns, self._current["开始"])
+        self._current = None
+        return at_ns
+
+    def set_uncertainty(self, name: str, seconds: Optional[float]):
+        """记录name阶段（最近一次）结束时刻的不确定度，例如轮询检测的间隔"""
+        for phase in reversed(self._phases):
+            if phase["阶段"] == name:
+                phase["不确定度"] = seconds
+                return
+
+    def duration(self, name: str) -> Optional[float]:
+        """name阶段的总耗时（秒），没有该阶段时返回None"""
+        total = [phase["结束"] - phase["开始"] for phase in self._phases
+                 if phase["阶段"] == name and phase["结束"] is not None]
+        return sum(total) / 1e9 if total else None
+
+    def phases(self) -> List[Dict[str, Any]]:
+        """已结束的阶段，时间为相对计时器创建时刻的秒数"""
+        return [{
+            "阶段": phase["阶段"],
+            "开始": round((phase["开始"] - self.origin_ns) / 1e9, 6),
+            "耗时": round((phase["结束"] - phase["开始"]) / 1e9, 6),
+            "不确定度": None if phase["不确定度"] is None else round(phase["不确定度"], 6),
+        } for phase in self._phases if phase["结束"] is not None]
+
+    def durations(self) -> Dict[str, float]:
+        """各阶段耗时（同名阶段累加）"""
+        result: Dict[str, float] = {}
+        for phase in self.phases():
+            result[phase["阶段"]] = round(result.get(phase["阶段"], 0.0) + phase["耗时"], 6)
+        return result
@@ -0,0 +1,307 @@
+"""
+点云质量指标
+
+对导出的点云按块（N×3的numpy数组）做两遍流式统计，内存占用只与占用体素数和样本数有关：
+    第一遍  点数；体素占用直方图（每个体素中的点数分布）；厚度体素内的一、二阶矩（局部平面拟合）；
+            按随机优先级保留固定大小的均匀样本
+    第二遍  样本点在整个点云中的最近邻距离（点间距分布），据此估计离群点（噪声）比例；
+            去掉离第一遍平面过远的点后重新统计残差，得到不受离群点影响的表面厚度
+
+最近邻查询优先用scipy的cKDTree（每块建树），没有scipy时用numpy的网格哈希查找相邻27个格子。
+"""
+import time
+from typing import Any, Callable, Dict, Iterable, Optional
+
+import numpy as np
+
+try:
+    from scipy.spatial import cKDTree
+except ImportError:  # 没有scipy时用网格哈希查找最近邻
+    cKDTree = None
+
+# 体素坐标编码为int64键：每轴21位，坐标原点附近±2^20个体素
+_KEY_BITS = 21
+_KEY_BIAS = 1 << (_KEY_BITS - 1)
+_NEIGHBOR_OFFSETS = np.array([(dx, dy, dz) for dx in (-1, 0, 1) for dy in (-1, 0, 1) for dz in (-1, 0, 1)])
+
+
+def voxel_keys(cells: np.ndarray) -> np.ndarray:
+    """整数体素坐标（N×3）编码为int64键（超出范围的坐标归入边缘体素）"""
+    cells = np.clip(cells, 1 - _KEY_BIAS, _KEY_BIAS - 2) + _KEY_BIAS
+    return (cells[:, 0] << (2 * _KEY_BITS)) | (cells[:, 1] << _KEY_BITS) | cells[:, 2]
+
+
+class VoxelAccumulator:
+    """
+    按体素累加点数（以及可选的一、二阶矩）
+
+    每块用np.unique归并后追加，待合并的行数超过当前体素数时再整体归并一次，
+    内存与占用体素数成正比。
+    """
+    def __init__(self, size: float, origin: np.ndarray, moments: bool = False):
+        self.size = size
+        self.origin = origin
+        self.moments = moments
+        self._keys = np.empty(0, dtype=np.int64)
+        self._values = np.empty((0, 10 if moments else 1))
+        self._pending = []
+        self._pending_rows = 0
+
+    def add(self, points: np.ndarray):
+        local = points - self.origin
+        keys = voxel_keys(np.floor(local / self.size).astype(np.int64))
+        if self.moments:
+            x, y, z = local[:, 0], local[:, 1], local[:, 2]
+            values = np.column_stack([np.ones(len(local)), x, y, z, x * x, y * y, z * z, x * y, x * z, y * z])
+        else:
+            values = np.ones((len(local), 1))
+        self._pending.append(self._reduce(keys, values))
+        self._pending_rows += len(self._pending[-1][0])
+        if self._pending_rows > max(len(self._keys), 1 << 20):
+            self._merge()
+
+    @staticmethod
+    def _reduce(keys: np.ndarray, values: np.ndarray):
+        unique, inverse = np.unique(keys, return_inverse=True)
+        sums = np.zeros((len(unique), values.shape[1]))
+        np.add.at(sums, inverse, values)
+        return unique, sums
+
+    def _merge(self):
+        if not self._pending:
+            return
+        keys = np.concatenate([self._keys] + [keys for keys, _ in self._pending])
+        values = np.concatenate([self._values] + [values for _, values in self._pending])
+        self._keys, self._values = self._reduce(keys, values)
+        self._pending, self._pending_rows = [], 0
+
+    def result(self):
+        """(体素键, 累加值)，累加值第一列为点数"""
+        self._merge()
+        return self._keys, self._values
+
+
+def occupancy_histogram(counts: np.ndarray) -> Dict[str, int]:
+    """每体素点数按2的幂分组：{"1": 体素数, "2": .., "3-4": .., "5-8": .., ...}"""
+    if not len(counts):
+        return {}
+    bins = np.ceil(np.log2(counts)).astype(int)
+    histogram = {}
+    for bin_index, number in zip(*np.unique(bins, return_counts=True)):
+        high = 1 << int(bin_index)
+        low = high // 2 + 1 if high > 1 else 1
+        histogram[str(high) if low == high else f"{low}-{high}"] = int(number)
+    return histogram
+
+
+def fit_planes(keys: np.ndarray, moments: np.ndarray, min_points: int = 10):
+    """
+    各体素的最小二乘平面，点数不足的体素跳过
+
+    Returns:
+        (体素键, 质心, 单位法向, 残差标准差)，法向为协方差矩阵最小特征值对应的特征向量
+    """
+    selected = moments[:, 0] >= min_points
+    keys, moments = keys[selected], moments[selected]
+    n = moments[:, :1]
+    mean = moments[:, 1:4] / n
+    xx, yy, zz, xy, xz, yz = (moments[:, 4:] / n).T
+    mx, my, mz = mean.T
+    cov = np.empty((len(moments), 3, 3))
+    cov[:, 0, 0], cov[:, 1, 1], cov[:, 2, 2] = xx - mx * mx, yy - my * my, zz - mz * mz
+    cov[:, 0, 1] = cov[:, 1, 0] = xy - mx * my
+    cov[:, 0, 2] = cov[:, 2, 0] = xz - mx * mz
+    cov[:, 1, 2] = cov[:, 2, 1] = yz - my * mz
+    eigenvalues, eigenvectors = np.linalg.eigh(cov)
+    return keys, mean, eigenvectors[:, :, 0], np.sqrt(np.clip(eigenvalues[:, 0], 0.0, None))
+
+
+class TrimmedThickness:
+    """
+    去除离群点后的表面厚度
+
+    第一遍拟合的平面受离群点影响，第二遍只统计到该平面距离不超过trim倍残差标准差的点，
+    得到各体素沿法向的残差标准差。
+    """
+    def __init__(self, planes, size: float, origin: np.ndarray, trim: float = 2.5, min_points: int = 10):
+        self.keys, self.centroids, self.normals, sigma = planes
+        self.limits = trim * sigma
+        self.size = size
+        self.origin = origin
+        self.min_points = min_points
+        # 每个体素: 点数, 残差和, 残差平方和
+        self._sums = np.zeros((len(self.keys), 3))
+
+    def add(self, points: np.ndarray):
+        if not len(self.keys):
+            return
+        local = points - self.origin
+        keys = voxel_keys(np.floor(local / self.size).astype(np.int64))
+        index = np.minimum(np.searchsorted(self.keys, keys), len(self.keys) - 1)
+        residual = np.einsum("ij,ij->i", local - self.centroids[index], self.normals[index])
+        keep = (self.keys[index] == keys) & (np.abs(residual) <= self.limits[index])
+        index, residual = index[keep], residual[keep]
+        for column, weights in enumerate((None, residual, residual * residual)):
+            self._sums[:, column] += np.bincount(index, weights=weights, minlength=len(self.keys))
+
+    def result(self) -> np.ndarray:
+        """各体素去除离群点后的残差标准差"""
+        sums = self._sums[self._sums[:, 0] >= self.min_points]
+        mean = sums[:, 1] / sums[:, 0]
+        return np.sqrt(np.clip(sums[:, 2] / sums[:, 0] - mean * mean, 0.0, None))
+
+
+def _grid_nearest(queries: np.ndarray, query_ids: np.ndarray, points: np.ndarray, point_ids: np.ndarray,
+                  cell: float) -> np.ndarray:
+    """
+    网格哈希最近邻：在查询点所在及相邻的27个格子中查找
+
+    距离不超过cell的最近邻一定能找到，更远的记为inf（由调用方用更大的格子重查）。
+    """
+    origin = queries.min(axis=0)
+    point_keys = voxel_keys(np.floor((points - origin) / cell).astype(np.int64))
+    order = np.argsort(point_keys, kind="stable")
+    sorted_keys = point_keys[order]
+    query_cells = np.floor((queries - origin) / cell).astype(np.int64)
+    best = np.full(len(queries), np.inf)
+    for offset in _NEIGHBOR_OFFSETS:
+        keys = voxel_keys(query_cells + offset)
+        low = np.searchsorted(sorted_keys, keys, "left")
+        counts = np.searchsorted(sorted_keys, keys, "right") - low
+        total = int(counts.sum())
+        if not total:
+            continue
+        # 展开每个查询点对应的候选区间
+        query_index = np.repeat(np.arange(len(queries)), counts)
+        starts = np.repeat(low - np.cumsum(counts) + counts, counts)
+        candidates = order[starts + np.arange(total)]
+        distances = np.linalg.norm(points[candidates] - queries[query_index], axis=1)
+        distances[point_ids[candidates] == query_ids[query_index]] = np.inf
+        np.minimum.at(best, query_index, distances)
+    best[best > cell] = np.inf
+    return best
+
+
+def _tree_nearest(queries: np.ndarray, query_ids: np.ndarray, points: np.ndarray,
+                  point_ids: np.ndarray) -> np.ndarray:
+    """cKDTree最近邻（k=2，排除查询点自身）"""
+    distances, indices = cKDTree(points).query(queries, k=2)
+    own = point_ids[np.minimum(indices, len(points) - 1)] == query_ids[:, None]
+    distances = np.where(own | np.isinf(distances), np.inf, distances)
+    return distances.min(axis=1)
+
+
+def analyze_points(read_chunks: Callable[[], Iterable[np.ndarray]], voxel_size: float = 0.05,
+                   thickness_voxel: float = 0.5, sample_size: int = 2000, outlier_factor: float = 3.0,
+                   seed: int = 0) -> Dict[str, Any]:
+    """
+    计算点云质量指标
+
+    Args:
+        read_chunks: 每次调用返回一个新的点坐标块迭代器（需要读两遍）
+        voxel_size: 体素占用统计的体素边长（米）
+        thickness_voxel: 局部平面拟合的体素边长（米）
+        sample_size: 最近邻间距的样本点数
+        outlier_factor: 最近邻距离超过间距中位数的该倍数视为离群点
+
+    Returns:
+        {"点数", "占用体素", "每体素点数", "体素占用直方图", "点间距", "离群比例", "厚度", "最近邻方法", "分析耗时"}
+    """
+    start = time.perf_counter()
+    rng = np.random.default_rng(seed)
+    total = 0
+    occupancy = thickness = None
+    # 保留随机优先级最小的sample_size个点，即整个点云的均匀样本
+    sample = np.empty((0, 3))
+    sample_ids = np.empty(0, dtype=np.int64)
+    sample_priority = np.empty(0)
+    for chunk in read_chunks():
+        if not len(chunk):
+            continue
+        if occupancy is None:
+            # 网格原点随机偏移不到一个体素，避免体素边界系统性地落在坐标面（如z=0的地面）上把平面切开
+            origin = chunk.min(axis=0) - rng.uniform(0.0, thickness_voxel, size=3)
+            occupancy = VoxelAccumulator(voxel_size, origin)
+            thickness = VoxelAccumulator(thickness_voxel, origin, moments=True)
+        occupancy.add(chunk)
+        thickness.add(chunk)
+        priority = np.concatenate([sample_priority, rng.random(len(chunk))])
+        sample = np.concatenate([sample, chunk])
+        sample_ids = np.concatenate([sample_ids, np.arange(total, total + len(chunk))])
+        if len(priority) > sample_size:
+            keep = np.argpartition(priority, sample_size)[:sample_size]
+            sample, sample_ids, priority = sample[keep], sample_ids[keep], priority[keep]
+        sample_priority = priority
+        total += len(chunk)
+
+    metrics: Dict[str, Any] = {"点数": total, "体素大小": voxel_size, "占用体素": 0, "每体素点数": None,
+                               "体素占用直方图": {}, "点间距": None, "离群比例": None, "厚度": None,
+                               "最近邻方法": "cKDTree" if cKDTree is not None else "网格哈希"}
+    if total < 2:
+        metrics["分析耗时"] = round(time.perf_counter() - start, 3)
+        return metrics
+
+    _, counts = occupancy.result()
+    counts = counts[:, 0]
+    metrics.update({
+        "占用体素": int(len(counts)),
+        "每体素点数": round(float(counts.mean()), 3),
+        "体素占用直方图": occupancy_histogram(counts),
+    })
+    trimmed = TrimmedThickness(fit_planes(*thickness.result()), thickness_voxel, thickness.origin)
+
+    # 第二遍：最近邻间距，同时统计去除离群点后的平面残差
+    spacing = _nearest_spacing(read_chunks, sample, sample_ids, voxel_size, on_chunk=trimmed.add)
+    residuals = trimmed.result()
+    if len(residuals):
+        metrics["厚度"] = {
+            "体素大小": thickness_voxel,
+            "体素数": int(len(residuals)),
+            "中位数": round(float(np.median(residuals)), 6),
+            "P90": round(float(np.percentile(residuals, 90)), 6),
+        }
+    if len(spacing):
+        median = float(np.median(spacing))
+        metrics["点间距"] = {
+            "样本数": int(len(spacing)),
+            "中位数": round(median, 6),
+            "P10": round(float(np.percentile(spacing, 10)), 6),
+            "P90": round(float(np.percentile(spacing, 90)), 6),
+            "均值": round(float(spacing.mean()), 6),
+        }
+        metrics["离群比例"] = round(float(np.mean(spacing > outlier_factor * median)), 6)
+    metrics["分析耗时"] = round(time.perf_counter() - start, 3)
+    return metrics
+
+
+def _nearest_spacing(read_chunks: Callable[[], Iterable[np.ndarray]], sample: np.ndarray, sample_ids: np.ndarray,
+                     cell: float, on_chunk: Optional[Callable[[np.ndarray], None]] = None) -> np.ndarray:
+    """第二遍：样本点在整个点云中的最近邻距离（逐块取最小值），第一次读取时每块还会传给on_chunk"""
+    best = np.full(len(sample), np.inf)
+    unresolved = np.arange(len(sample))
+    while len(unresolved):
+        offset = 0
+        found = np.full(len(unresolved), np.inf)
+        queries, query_ids = sample[unresolved], sample_ids[unresolved]
+        for chunk in read_chunks():
+            if not len(chunk):
+                continue
+            if on_chunk is not None:
+                on_chunk(chunk)
+            ids = np.arange(offset, offset + len(chunk))
+            if cKDTree is not None:
+                distances = _tree_nearest(queries, query_ids, chunk, ids)
+            else:
+                distances = _grid_nearest(queries, query_ids, chunk, ids, cell)
+            np.minimum(found, distances, out=found)
+            offset += len(chunk)
+        best[unresolved] = found
+        on_chunk = None
+        if cKDTree is not None:
+            break
+        # 网格半径内没有邻居的样本点（稀疏区域或离群点）用放大4倍的格子重查
+        unresolved = unresolved[np.isinf(found)]
+        cell *= 4
+        if cell > 1e3:
+            break
+    return best[np.isfinite(best)]
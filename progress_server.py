@@ -0,0 +1,375 @@
+"""
+运行进度看板
+
+执行线程只更新RunProgress中的几个字段（加锁赋值，开销可以忽略），
+本地HTTP服务在后台线程（asyncio执行核心中为事件循环任务，见AsyncProgressServer）中读取进度快照：
+    /             自动刷新的进度页面
+    /status.json  当前用例、步骤、已转换时间、通过/失败计数、预计剩余时间、资源占用和输出写入速率
+"""
+import asyncio
+import contextvars
+import json
+import logging
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional, Tuple
+
+try:
+    import psutil
+except ImportError:  # 没有psutil时看板不显示资源占用
+    psutil = None
+
+logger = logging.getLogger(__name__)
+
+# asyncio执行核心中一个实例的步骤分别在事件循环和实例线程中运行，用上下文变量标识工作者；
+# 未设置时按线程名区分
+current_worker: contextvars.ContextVar = contextvars.ContextVar("进度工作者", default=None)
+
+
+def worker_name() -> str:
+    """当前工作者的名称"""
+    return current_worker.get() or threading.current_thread().name
+
+
+class RunProgress:
+    """
+    执行进度的共享快照
+
+    每个工作线程（串行执行时为主线程）一条记录，按线程名（asyncio执行核心中为current_worker）区分；
+    转换已耗时在读取快照时根据转换开始时刻计算，执行线程等待转换期间不需要更新。
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.total = 0
+        self.worker_count = 1
+        self.counts = {"完成": 0, "通过": 0, "失败": 0, "错误": 0}
+        self.started = None
+        self.started_perf = None
+        self._conversion_total = 0.0
+        self._conversion_count = 0
+        self._workers: Dict[str, Dict[str, Any]] = {}
+
+    def start_run(self, total: int, workers: int = 1):
+        """开始一轮执行"""
+        with self._lock:
+            self.total = total
+            self.worker_count = max(workers, 1)
+            self.started = datetime.now().isoformat()
+            self.started_perf = time.perf_counter()
+
+    def start_case(self, case_id: str):
+        """当前线程开始执行一个用例"""
+        with self._lock:
+            self._workers[worker_name()] = {
+                "用例ID": case_id, "步骤": None, "转换开始": None, "进程": None, "资源": {}, "输出": None
+            }
+
+    def update(self, **fields):
+        """更新当前线程的步骤、转换开始时刻(perf_counter)、VORTEX进程号等"""
+        with self._lock:
+            worker = self._workers.setdefault(worker_name(), {"资源": {}})
+            worker.update(fields)
+
+    def finish_case(self, result: Dict[str, Any]):
+        """记录一个用例的结果"""
+        with self._lock:
+            self.counts["完成"] += 1
+            if result["状态"] in self.counts:
+                self.counts[result["状态"]] += 1
+            else:
+                self.counts["错误"] += 1
+            if result.get("转换耗时"):
+                self._conversion_total += result["转换耗时"]
+                self._conversion_count += 1
+            worker = self._workers.get(worker_name())
+            if worker is not None:
+                worker.update({"用例ID": None, "步骤": None, "转换开始": None, "输出": None})
+
+    def processes(self) -> Dict[str, int]:
+        """各工作线程对应的VORTEX进程号"""
+        with self._lock:
+            return {name: worker["进程"] for name, worker in self._workers.items() if worker.get("进程")}
+
+    def set_resources(self, name: str, resources: Dict[str, Any]):
+        """更新工作线程对应进程的资源占用"""
+        with self._lock:
+            if name in self._workers:
+                self._workers[name]["资源"] = resources
+
+    def snapshot(self) -> Dict[str, Any]:
+        """当前进度（可JSON序列化）"""
+        now = time.perf_counter()
+        with self._lock:
+            counts = dict(self.counts)
+            mean = self._conversion_total / self._conversion_count if self._conversion_count else None
+            workers = {}
+            for name, worker in self._workers.items():
+                start = worker.get("转换开始")
+                workers[name] = {
+                    "用例ID": worker.get("用例ID"),
+                    "步骤": worker.get("步骤"),
+                    "转换已耗时": round(now - start, 1) if start else None,
+                    "进程": worker.get("进程"),
+                    "资源": dict(worker.get("资源") or {}),
+                    "输出": worker.get("输出"),
+                }
+            total, started, started_perf = self.total, self.started, self.started_perf
+            worker_count = self.worker_count
+
+        running = sum(1 for worker in workers.values() if worker["用例ID"])
+        remaining = max(total - counts["完成"] - running, 0)
+        eta = None
+        if mean is not None:
+            # 未开始的用例按平均转换耗时计，进行中的用例扣除已转换的时间，再按并行实例数分摊
+            in_progress = sum(max(mean - (worker["转换已耗时"] or 0.0), 0.0)
+                              for worker in workers.values() if worker["用例ID"])
+            eta = round((remaining * mean + in_progress) / worker_count, 1)
+
+        return {
+            "总用例": total,
+            "计数": counts,
+            "开始时间": started,
+            "已运行": round(now - started_perf, 1) if started_perf else None,
+            "平均转换耗时": round(mean, 2) if mean is not None else None,
+            "预计剩余": eta,
+            "实例": workers,
+        }
+
+
+DASHBOARD_PAGE = """<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="UTF-8">
+    <title>点云格式转换测试进度</title>
+    <style>
+        body { font-family: Arial, sans-serif; margin: 20px; }
+        .summary span { display: inline-block; margin-right: 20px; font-size: 18px; }
+        table { border-collapse: collapse; width: 100%; margin-top: 15px; }
+        th, td { border: 1px solid #ddd; padding: 6px; text-align: left; }
+        th { background-color: #f2f2f2; }
+        .passed { color: #28a745; } .failed { color: #dc3545; } .error { color: #ffc107; }
+    </style>
+</head>
+<body>
+    <h1>点云格式转换测试进度</h1>
+    <div class="summary" id="summary">加载中...</div>
+    <table>
+        <tr><th>实例</th><th>用例ID</th><th>步骤</th><th>转换已耗时(秒)</th><th>CPU(%)</th><th>内存(MB)</th><th>线程</th><th>输出(MB)</th><th>写入(MB/s)</th></tr>
+        <tbody id="workers"></tbody>
+    </table>
+    <script>
+        function show(value, suffix) {
+            return value === null || value === undefined ? '-' : value + (suffix || '');
+        }
+        function refresh() {
+            fetch('status.json').then(function(response) { return response.json(); }).then(function(data) {
+                var counts = data['计数'];
+                document.getElementById('summary').innerHTML =
+                    '<span>进度: ' + counts['完成'] + '/' + data['总用例'] + '</span>' +
+                    '<span class="passed">通过: ' + counts['通过'] + '</span>' +
+                    '<span class="failed">失败: ' + counts['失败'] + '</span>' +
+                    '<span class="error">错误: ' + counts['错误'] + '</span>' +
+                    '<span>已运行: ' + show(data['已运行'], '秒') + '</span>' +
+                    '<span>平均转换: ' + show(data['平均转换耗时'], '秒') + '</span>' +
+                    '<span>预计剩余: ' + show(data['预计剩余'], '秒') + '</span>';
+                // 实例名、用例ID和步骤来自配置和CSV，只作为文本写入单元格
+                var rows = Object.keys(data['实例']).map(function(name) {
+                    var worker = data['实例'][name], resources = worker['资源'] || {}, output = worker['输出'] || {};
+                    var row = document.createElement('tr');
+                    [name, show(worker['用例ID']), show(worker['步骤']), show(worker['转换已耗时']),
+                     show(resources['CPU']), show(resources['内存MB']), show(resources['线程']),
+                     show(output['MB']), show(output['MB/s'])].forEach(function(text) {
+                        var cell = document.createElement('td');
+                        cell.textContent = text;
+                        row.appendChild(cell);
+                    });
+                    return row;
+                });
+                var workers = document.getElementById('workers');
+                workers.replaceChildren.apply(workers, rows);
+            }).catch(function() {
+                document.getElementById('summary').textContent = '测试已结束或看板已关闭';
+            });
+        }
+        refresh();
+        setInterval(refresh, 1000);
+    </script>
+</body>
+</html>
+"""
+
+
+def render(progress: RunProgress, path: str) -> Optional[Tuple[str, bytes]]:
+    """看板请求的响应（Content-Type, 内容），未知路径返回None"""
+    path = path.split("?", 1)[0]
+    if path == "/status.json":
+        return ("application/json; charset=utf-8",
+                json.dumps(progress.snapshot(), ensure_ascii=False).encode("utf-8"))
+    if path in ("/", "/index.html"):
+        return "text/html; charset=utf-8", DASHBOARD_PAGE.encode("utf-8")
+    return None
+
+
+class ProcessProbe:
+    """按进程号采样CPU、内存和线程数，缓存Process对象使cpu_percent的两次调用之间有间隔"""
+    def __init__(self):
+        self._processes: Dict[int, Any] = {}
+
+    def update(self, progress: RunProgress):
+        """采样各工作者对应的VORTEX进程并写入进度"""
+        for name, pid in progress.processes().items():
+            resources = self.sample(pid)
+            if resources is not None:
+                progress.set_resources(name, resources)
+
+    def sample(self, pid: int) -> Optional[Dict[str, Any]]:
+        try:
+            process = self._processes.get(pid)
+            if process is None:
+                # 第一次调用cpu_percent只建立基准，同一Process对象的后续调用才有意义
+                process = self._processes[pid] = psutil.Process(pid)
+                process.cpu_percent(None)
+            with process.oneshot():
+                return {
+                    "CPU": round(process.cpu_percent(None), 1),
+                    "内存MB": round(process.memory_info().rss / 1e6, 1),
+                    "线程": process.num_threads(),
+                }
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            self._processes.pop(pid, None)
+            return None
+
+
+class ProgressServer:
+    """
+    在后台线程中运行的进度看板HTTP服务
+
+    另起一个线程按resource_interval秒采样各VORTEX进程的CPU、内存和线程数（需要psutil），
+    请求处理只读取RunProgress的快照，不访问界面也不阻塞执行线程。
+    """
+    def __init__(self, progress: RunProgress, host: str = "127.0.0.1", port: int = 8765,
+                 resource_interval: float = 1.0):
+        self.progress = progress
+        self.resource_interval = resource_interval
+        self._stop = threading.Event()
+        self._probe = ProcessProbe()
+
+        progress_ref = progress
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                response = render(progress_ref, self.path)
+                if response is None:
+                    self.send_error(404)
+                    return
+                content_type, body = response
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header("Cache-Control", "no-store")
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                # 页面每秒刷新，不写入测试日志
+                pass
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self._threads = [
+            threading.Thread(target=self.httpd.serve_forever, name="进度看板", daemon=True),
+            threading.Thread(target=self._sample_resources, name="进度看板-资源", daemon=True),
+        ]
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def start(self) -> "ProgressServer":
+        for thread in self._threads:
+            thread.start()
+        logger.info(f"进度看板: {self.url}")
+        return self
+
+    def stop(self):
+        """关闭HTTP服务和采样线程"""
+        self._stop.set()
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        for thread in self._threads:
+            thread.join(timeout=2)
+
+    def _sample_resources(self):
+        if psutil is None:
+            return
+        while not self._stop.wait(self.resource_interval):
+            self._probe.update(self.progress)
+
+
+class AsyncProgressServer:
+    """
+    asyncio执行核心使用的进度看板
+
+    HTTP服务和资源采样都是TaskScope中的任务，运行结束时随作用域一起取消并关闭端口。
+    只处理GET请求，每个连接一个请求。
+    """
+    def __init__(self, progress: RunProgress, host: str = "127.0.0.1", port: int = 8765,
+                 resource_interval: float = 1.0):
+        self.progress = progress
+        self.host = host
+        self.port = port
+        self.resource_interval = resource_interval
+        self._probe = ProcessProbe()
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.sockets[0].getsockname()[:2] if self._server else (self.host, self.port)
+        return f"http://{host}:{port}/"
+
+    async def start(self, tasks) -> "AsyncProgressServer":
+        """绑定端口（失败时抛出OSError），在tasks中启动服务和采样任务"""
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        tasks.spawn(self._serve(), "进度看板")
+        if psutil is not None:
+            tasks.spawn(self._sample_resources(), "进度看板-资源")
+        logger.info(f"进度看板: {self.url}")
+        return self
+
+    async def _serve(self):
+        try:
+            await self._server.serve_forever()
+        finally:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def _sample_resources(self):
+        # psutil调用会阻塞，每次采样在默认线程池中执行，不占用事件循环
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(self.resource_interval)
+            await loop.run_in_executor(None, self._probe.update, self.progress)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            request = await reader.readline()
+            # 丢弃请求头
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass
+            parts = request.decode("latin-1").split()
+            response = render(self.progress, parts[1]) if len(parts) >= 2 and parts[0] == "GET" else None
+            if response is None:
+                status, content_type, body = "404 Not Found", "text/plain; charset=utf-8", b"Not Found"
+            else:
+                status, (content_type, body) = "200 OK", response
+            writer.write((f"HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\n"
+                          f"Content-Length: {len(body)}\r\nCache-Control: no-store\r\n"
+                          f"Connection: close\r\n\r\n").encode("latin-1") + body)
+            await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
@@ -0,0 +1,339 @@
+"""
+进程资源采样
+
+在后台线程（或asyncio执行核心的事件循环任务，采样本身在线程池中执行）中按固定间隔
+采样指定进程的CPU、内存、IO读写量、线程数和句柄数，
+停止时汇总为每项指标的峰值和平均值，以及采样期间的IO读写量和CPU时间。
+需要psutil，没有安装时采样器不做任何事。
+
+采样值存放在预分配的numpy数组中（SampleBuffer），容量固定，长时间运行时内存占用不变。
+"""
+import asyncio
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+try:
+    import psutil
+except ImportError:  # 没有psutil时不采样资源
+    psutil = None
+
+logger = logging.getLogger(__name__)
+
+# 汇总峰值和平均值的指标
+GAUGE_METRICS = ["CPU%", "内存MB", "线程", "句柄"]
+
+
+class SampleBuffer:
+    """
+    固定容量的采样缓冲区
+
+    每个桶记录起止时间、样本数以及各指标的最小/最大/累加值，全部存放在预分配的数组中。
+        mode="compact": 桶用完时相邻两桶合并、每桶样本数翻倍，保留整个运行期间的（降采样）曲线
+        mode="ring":    桶用完时覆盖最早的桶，只保留最近capacity个样本
+    缺失的指标值记为NaN。
+    """
+    def __init__(self, metrics: Sequence[str], capacity: int = 4096, mode: str = "compact"):
+        if mode not in ("compact", "ring"):
+            raise ValueError(f"未知的缓冲模式: {mode}")
+        if mode == "compact" and capacity % 2:
+            raise ValueError("compact模式的容量必须为偶数")
+        self.metrics = list(metrics)
+        self.capacity = capacity
+        self.mode = mode
+        self.start_time = datetime.now()
+        self.start_perf = time.perf_counter()
+        # 已追加的原始样本数、每桶样本数（compact模式合并后翻倍）、已使用的桶数
+        self.total = 0
+        self.bucket_size = 1
+        self._size = 0
+        self._head = 0  # ring模式下最早的桶
+
+        width = len(self.metrics)
+        self._t_first = np.zeros(capacity)
+        self._t_last = np.zeros(capacity)
+        self._count = np.zeros(capacity, dtype=np.int64)
+        self._min = np.full((capacity, width), np.nan)
+        self._max = np.full((capacity, width), np.nan)
+        self._sum = np.zeros((capacity, width))
+
+    @property
+    def nbytes(self) -> int:
+        """缓冲区数组占用的字节数（与样本数无关）"""
+        return sum(a.nbytes for a in (self._t_first, self._t_last, self._count, self._min, self._max, self._sum))
+
+    def __len__(self) -> int:
+        return self._size
+
+    def append(self, values: Sequence[Optional[float]], timestamp: Optional[float] = None):
+        """追加一个样本，values按metrics的顺序给出，timestamp为perf_counter时刻"""
+        t = (time.perf_counter() if timestamp is None else timestamp) - self.start_perf
+        row = np.array([np.nan if v is None else v for v in values], dtype=float)
+        self.total += 1
+
+        if self.mode == "ring":
+            if self._size < self.capacity:
+                index = self._size
+                self._size += 1
+            else:
+                index = self._head
+                self._head = (self._head + 1) % self.capacity
+            self._set(index, t, row)
+            return
+
+        last = self._size - 1
+        if self._size and self._count[last] < self.bucket_size:
+            # 并入当前桶
+            self._t_last[last] = t
+            self._count[last] += 1
+            self._min[last] = np.fmin(self._min[last], row)
+            self._max[last] = np.fmax(self._max[last], row)
+            self._sum[last] += row
+            return
+        if self._size == self.capacity:
+            self._compact()
+        self._set(self._size, t, row)
+        self._size += 1
+
+    def _set(self, index: int, t: float, row: np.ndarray):
+        self._t_first[index] = self._t_last[index] = t
+        self._count[index] = 1
+        self._min[index] = row
+        self._max[index] = row
+        self._sum[index] = row
+
+    def _compact(self):
+        """相邻两桶合并，腾出一半容量"""
+        half = self.capacity // 2
+        self._t_first[:half] = self._t_first[0::2]
+        self._t_last[:half] = self._t_last[1::2]
+        self._count[:half] = self._count[0::2] + self._count[1::2]
+        self._min[:half] = np.fmin(self._min[0::2], self._min[1::2])
+        self._max[:half] = np.fmax(self._max[0::2], self._max[1::2])
+        self._sum[:half] = self._sum[0::2] + self._sum[1::2]
+        self._min[half:] = np.nan
+        self._max[half:] = np.nan
+        self._sum[half:] = 0.0
+        self._size = half
+        self.bucket_size *= 2
+
+    def _ordered(self) -> np.ndarray:
+        """按时间顺序排列的桶下标"""
+        return (self._head + np.arange(self._size)) % self.capacity
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """各指标的峰值和平均值（全部缺失的指标不出现）"""
+        index = self._ordered()
+        result = {}
+        for column, metric in enumerate(self.metrics):
+            maxima = self._max[index, column]
+            valid = ~np.isnan(maxima)
+            if not valid.any():
+                continue
+            result[metric] = {
+                "峰值": round(float(maxima[valid].max()), 2),
+                "平均": round(float(self._sum[index, column][valid].sum() / self._count[index][valid].sum()), 2),
+            }
+        return result
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        按桶导出为DataFrame（向量化构造）
+
+        列: timestamp, elapsed_time(s), samples, 每个指标的平均值，以及合并过的桶的 <指标>_min/<指标>_max
+        """
+        index = self._ordered()
+        elapsed = self._t_first[index]
+        count = self._count[index]
+        frame = pd.DataFrame({
+            "timestamp": (pd.Timestamp(self.start_time) + pd.to_timedelta(elapsed, unit="s"))
+                         .strftime("%Y-%m-%d %H:%M:%S.%f").str[:-3],
+            "elapsed_time(s)": np.round(elapsed, 3),
+            "samples": count,
+        })
+        means = self._sum[index] / count[:, None]
+        for column, metric in enumerate(self.metrics):
+            frame[metric] = np.round(means[:, column], 3)
+            if self.bucket_size > 1:
+                frame[f"{metric}_min"] = self._min[index, column]
+                frame[f"{metric}_max"] = self._max[index, column]
+        return frame
+
+    def export(self, path: str) -> str:
+        """按扩展名导出为CSV或Parquet（Parquet需要pyarrow或fastparquet）"""
+        frame = self.to_frame()
+        if path.lower().endswith(".parquet"):
+            frame.to_parquet(path, index=False)
+        else:
+            frame.to_csv(path, index=False, encoding="utf-8")
+        return path
+
+
+class ResourceSampler:
+    """
+    进程资源采样器
+
+    用法:
+        sampler = ResourceSampler(pid, interval=0.5).start()
+        ...  # 转换过程
+        summary = sampler.stop()  # {"CPU%": {"峰值": .., "平均": ..}, ..., "读取MB": .., "写入MB": ..}
+        sampler.buffer.export("samples.csv")  # 采样曲线
+
+    按截止时刻排程（而不是每次休眠interval），高采样率（如50Hz）下不会累积漂移。
+    start(tasks)给出TaskScope时在事件循环中以任务方式采样，不另起线程。
+    """
+    def __init__(self, pid: int, interval: float = 0.5, capacity: int = 4096):
+        self.pid = pid
+        self.interval = interval
+        self.buffer = SampleBuffer(GAUGE_METRICS, capacity)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._tasks = None
+        self._task = None
+        self._process = None
+        self._io_start = None
+        self._io_end = None
+        self._cpu_start = None
+        self._cpu_end = None
+
+    @staticmethod
+    def available() -> bool:
+        return psutil is not None
+
+    def start(self, tasks=None) -> "ResourceSampler":
+        """开始采样（进程不存在或没有psutil时只返回自身），tasks为TaskScope时在事件循环中采样"""
+        if psutil is None:
+            return self
+        try:
+            self._process = psutil.Process(self.pid)
+            # 第一次调用cpu_percent只建立基准
+            self._process.cpu_percent(None)
+            self._io_start = self._io_counters()
+            self._cpu_start = self._process.cpu_times()
+        except (psutil.NoSuchProcess, psutil.AccessDenied) as e:
+            logger.warning(f"无法采样进程 {self.pid} 的资源占用: {e}")
+            self._process = None
+            return self
+        if tasks is not None:
+            self._tasks = tasks
+            self._task = tasks.spawn_threadsafe(self._run_async(), f"资源采样-{self.pid}")
+            return self
+        self._thread = threading.Thread(target=self._run, name=f"资源采样-{self.pid}", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> Dict[str, Any]:
+        """停止采样，返回汇总结果"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._task is not None:
+            self._tasks.cancel_threadsafe(self._task)
+            self._task = None
+        if self._process is not None:
+            # 转换很快结束时可能还没有采样，至少记录停止时的一次
+            if not self.buffer.total:
+                self._sample()
+            self._io_end = self._io_counters() or self._io_end
+            try:
+                self._cpu_end = self._process.cpu_times()
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                pass
+        return self.summary()
+
+    def summary(self) -> Dict[str, Any]:
+        """各指标的峰值、平均值，采样期间的IO读写量、CPU时间（用户+内核）和IO等待时间（仅Linux）"""
+        result: Dict[str, Any] = {"采样次数": self.buffer.total}
+        result.update(self.buffer.summary())
+        if self._io_start is not None and self._io_end is not None:
+            # Linux的read_bytes/write_bytes只统计实际到达块设备的字节（写缓存未刷盘时为0），
+            # 有read_chars/write_chars时用它们，与Windows按读写调用统计的口径一致
+            read, write = ("read_chars", "write_chars") if hasattr(self._io_end, "read_chars") \
+                else ("read_bytes", "write_bytes")
+            result["读取MB"] = round((getattr(self._io_end, read) - getattr(self._io_start, read)) / 1e6, 3)
+            result["写入MB"] = round((getattr(self._io_end, write) - getattr(self._io_start, write)) / 1e6, 3)
+        if self._cpu_start is not None and self._cpu_end is not None:
+            result["CPU秒"] = round(self._cpu_end.user - self._cpu_start.user
+                                   + self._cpu_end.system - self._cpu_start.system, 3)
+            if hasattr(self._cpu_end, "iowait"):
+                result["IO等待秒"] = round(self._cpu_end.iowait - self._cpu_start.iowait, 3)
+        return result
+
+    def _run(self):
+        deadline = time.perf_counter()
+        while True:
+            deadline += self.interval
+            if self._stop.wait(max(deadline - time.perf_counter(), 0.0)):
+                break
+            if not self._sample():
+                break
+            # 采样本身超过间隔时跳过错过的时刻，不连续补采
+            now = time.perf_counter()
+            if now > deadline + self.interval:
+                deadline = now
+
+    async def _run_async(self):
+        """
+        _run的协程版本，取消任务即停止
+
+        psutil读取/proc或调用系统接口，会阻塞；每次采样在默认线程池中执行，不占用事件循环。
+        """
+        loop = asyncio.get_running_loop()
+        deadline = time.perf_counter()
+        while True:
+            deadline += self.interval
+            await asyncio.sleep(max(deadline - time.perf_counter(), 0.0))
+            sample = loop.run_in_executor(None, self._sample)
+            try:
+                alive = await asyncio.shield(sample)
+            except asyncio.CancelledError:
+                # 等进行中的采样写完缓冲区再退出，stop()汇总时不会与之同时访问
+                await asyncio.wait([sample])
+                raise
+            if not alive:
+                break
+            now = time.perf_counter()
+            if now > deadline + self.interval:
+                deadline = now
+
+    def _sample(self) -> bool:
+        """采样一次，进程已退出时返回False"""
+        try:
+            with self._process.oneshot():
+                # 顺序与GAUGE_METRICS一致
+                values = (
+                    self._process.cpu_percent(None),
+                    self._process.memory_info().rss / 1e6,
+                    self._process.num_threads(),
+                    self._handle_count(),
+                )
+                io = self._io_counters()
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            return False
+        if io is not None:
+            self._io_end = io
+        self.buffer.append(values)
+        return True
+
+    def _io_counters(self):
+        try:
+            return self._process.io_counters()
+        except (AttributeError, psutil.AccessDenied, psutil.NoSuchProcess):
+            # macOS等平台没有进程IO计数
+            return None
+
+    def _handle_count(self) -> Optional[int]:
+        """Windows上为句柄数，其他平台为打开的文件描述符数"""
+        try:
+            if os.name == "nt":
+                return self._process.num_handles()
+            return self._process.num_fds()
+        except (AttributeError, psutil.AccessDenied):
+            return None
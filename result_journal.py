@@ -0,0 +1,114 @@
+"""
+测试结果日志
+
+每个用例执行结束立即追加到JSONL文件（一行一个用例结果），
+报告通过逐行读取日志生成，内存占用与用例数无关；进程崩溃时已写入的结果不会丢失。
+"""
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+# 已经提示过的不完整记录（同一日志会被多次读取，只提示一次）
+_reported_torn_lines = set()
+
+
+class ResultJournal:
+    """
+    追加写入的JSONL结果日志
+
+    每条记录写入后立即flush到操作系统，每累计fsync_every条或距上次同步超过
+    fsync_interval秒时fsync到磁盘，崩溃时最多丢失最后一批未同步的记录。
+    可以在多个工作线程中同时调用append。
+    """
+    def __init__(self, path: str, fsync_every: int = 10, fsync_interval: float = 5.0):
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+
+        self.path = path
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self.count = 0
+        self._pending = 0
+        self._last_sync = time.monotonic()
+        self._lock = threading.Lock()
+        self._file = open(path, "a", encoding="utf-8")
+        # 续写崩溃时中断的日志：先结束写了一半的最后一行，避免与新记录连在一起
+        if self._file.tell() > 0:
+            with open(path, "rb") as f:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    self._file.write("\n")
+
+    def append(self, record: Dict[str, Any]):
+        """追加一条记录"""
+        line = json.dumps(record, ensure_ascii=False, default=str)
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+            self.count += 1
+            self._pending += 1
+            if (self._pending >= self.fsync_every or
+                    time.monotonic() - self._last_sync >= self.fsync_interval):
+                self._sync()
+
+    def sync(self):
+        """把已写入的记录同步到磁盘"""
+        with self._lock:
+            self._sync()
+
+    def _sync(self):
+        if self._pending:
+            os.fsync(self._file.fileno())
+        self._pending = 0
+        self._last_sync = time.monotonic()
+
+    def close(self):
+        """同步并关闭日志文件"""
+        with self._lock:
+            if self._file.closed:
+                return
+            self._file.flush()
+            self._sync()
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def read_journal(path: str) -> Iterator[Dict[str, Any]]:
+    """逐条读取日志中的记录；崩溃时只写了一半的行会被跳过"""
+    with open(path, "r", encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                if (path, line_number) not in _reported_torn_lines:
+                    _reported_torn_lines.add((path, line_number))
+                    logger.warning(f"跳过结果日志 {path} 第{line_number}行的不完整记录")
+
+
+def read_latest(path: str, key: str = "用例ID") -> Iterator[Dict[str, Any]]:
+    """
+    逐条读取每个key的最后一条记录（续跑和重跑的结果覆盖之前的结果）
+
+    第一遍只记录每个key最后出现的位置，第二遍输出这些记录，内存占用只与key的数量有关。
+    """
+    last_index: Dict[Optional[str], int] = {}
+    for index, record in enumerate(read_journal(path)):
+        last_index[record.get(key)] = index
+    keep = set(last_index.values())
+    for index, record in enumerate(read_journal(path)):
+        if index in keep:
+            yield record
@@ -0,0 +1,346 @@
+"""
+转换耗时模型
+
+从历史的test_summary_*.csv拟合转换耗时对导出参数的回归：
+    转换耗时 ≈ 截距 + Σ 参数取值的主效应 + Σ 两个参数取值组合的交互效应
+参数按generate_all_test_cases.FACTORS编码（点云抽稀和两种抽稀方式合并为"抽稀组合"，避免共线），
+每个取值一个哑变量（以第一个取值为参照），交互项为两个参数哑变量的乘积。用岭回归求解：
+历史中没有出现过的交互组合系数为0，预测时退化为主效应之和（记为外推）。
+
+同一配置的结果先按配置汇总（次数和耗时之和），正规方程只在不同配置上构造，
+数千次运行、数十万行结果的拟合时间主要花在读取CSV上。
+
+用途:
+    边际耗时    其余参数保持历史中的分布，把一个参数改为某个取值时的平均预测耗时，相对该参数最快的取值
+    未测配置    完整组合中历史上没有通过结果的配置的预测耗时
+    排序与分片  按预测耗时从长到短排序（并行执行时共享队列的LPT调度），或贪心分成耗时接近的若干份
+    异常结果    实际/预测耗时对数比的稳健z分数（按中位数绝对偏差）超过阈值的历史结果
+
+命令行:
+    python runtime_model.py --reports reports
+    python runtime_model.py --cases test_cases/all_test_cases_complete.csv --shards 4 --output-dir test_cases/shards
+"""
+import argparse
+import glob
+import heapq
+import itertools
+import os
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from generate_all_test_cases import FACTORS, THINNING_MODES
+
+# 用例CSV和汇总CSV中的参数列
+PARAMETERS = ["输出格式", "点云抽稀", "体素抽稀", "随机抽稀", "输出类型", "贴图选择", "点云降噪", "点云厚度优化"]
+THINNING_COLUMNS = ["点云抽稀", "体素抽稀", "随机抽稀"]
+SUMMARY_COLUMNS = ["用例ID"] + PARAMETERS + ["状态", "转换耗时(秒)", "开始时间"]
+
+# "点云抽稀|体素抽稀|随机抽稀" -> 抽稀组合
+THINNING_KEYS = {"|".join(values[column] for column in THINNING_COLUMNS): mode
+                 for mode, values in THINNING_MODES.items()}
+
+
+def find_summaries(reports_dir: str = "reports") -> List[str]:
+    """reports_dir下所有的汇总CSV，按修改时间排序"""
+    return sorted(glob.glob(os.path.join(reports_dir, "test_summary_*.csv")), key=os.path.getmtime)
+
+
+def load_summaries(paths: Iterable[str]) -> pd.DataFrame:
+    """
+    读取汇总CSV中通过的用例
+
+    Returns:
+        每行一个结果：参数列、"用例ID"、"开始时间"、"转换耗时"（秒）和"来源"；
+        同一结果出现在多份汇总中（例如重跑后合并的汇总）时按(用例ID, 开始时间)去重
+    """
+    frames = []
+    for path in paths:
+        frame = pd.read_csv(path, dtype=str, keep_default_na=False, encoding="utf-8-sig",
+                            usecols=lambda column: column in SUMMARY_COLUMNS)
+        frame["来源"] = path
+        frames.append(frame)
+    if not frames:
+        return pd.DataFrame(columns=["用例ID"] + PARAMETERS + ["开始时间", "转换耗时", "来源"])
+
+    frame = pd.concat(frames, ignore_index=True).reindex(columns=SUMMARY_COLUMNS + ["来源"], fill_value="")
+    frame["转换耗时"] = pd.to_numeric(frame.pop("转换耗时(秒)"), errors="coerce")
+    frame = frame[(frame["状态"] == "通过") & (frame["转换耗时"] > 0)].drop(columns="状态")
+    return frame.drop_duplicates(["用例ID", "开始时间"]).reset_index(drop=True)
+
+
+def factor_frame(frame: pd.DataFrame) -> pd.DataFrame:
+    """参数列换算为FACTORS中的因子，抽稀配置无效的行"抽稀组合"为空值"""
+    params = frame.reindex(columns=PARAMETERS).fillna("").astype(str)
+    factors = pd.DataFrame(index=frame.index)
+    for name in FACTORS:
+        if name == "抽稀组合":
+            keys = params[THINNING_COLUMNS[0]].str.cat(params[THINNING_COLUMNS[1:]], sep="|")
+            factors[name] = keys.map(THINNING_KEYS)
+        else:
+            factors[name] = params[name]
+    return factors
+
+
+def all_configurations() -> pd.DataFrame:
+    """完整组合（与generate_all_test_cases的full模式相同的配置）"""
+    rows = [{**dict(zip(FACTORS, row)), **THINNING_MODES[dict(zip(FACTORS, row))["抽稀组合"]]}
+            for row in itertools.product(*FACTORS.values())]
+    return pd.DataFrame(rows).reindex(columns=PARAMETERS)
+
+
+def robust_z(values: np.ndarray) -> np.ndarray:
+    """稳健z分数 0.6745·(x - 中位数) / 中位数绝对偏差；偏差为0时退化为按平均绝对偏差"""
+    deviation = values - np.median(values)
+    mad = np.median(np.abs(deviation))
+    if mad > 0:
+        return 0.6745 * deviation / mad
+    mean_abs = np.mean(np.abs(deviation))
+    return deviation / (1.2533 * mean_abs) if mean_abs > 0 else np.zeros_like(values)
+
+
+class RuntimeModel:
+    """
+    转换耗时对导出参数的回归
+
+    用法:
+        model = RuntimeModel().fit(load_summaries(find_summaries()))
+        model.marginal_costs()          # 各参数取值的边际耗时
+        model.predict(cases_frame)      # 预测耗时（秒），含未知取值的行为NaN
+        model.untested()                # 完整组合中未测配置的预测
+        model.anomalies()               # 残差异常的历史结果
+    """
+    def __init__(self, interactions: bool = True, ridge: float = 1e-3):
+        """
+        Args:
+            interactions: 是否包含两两参数的交互项
+            ridge: 岭回归系数（乘以样本数），使无法区分的交互项有唯一解
+        """
+        self.interactions = interactions
+        self.ridge = ridge
+        self.levels: Dict[str, List[str]] = {}
+        self.coef: Optional[np.ndarray] = None
+        self.results: Optional[pd.DataFrame] = None
+        self._configs: Optional[np.ndarray] = None
+        self._counts: Optional[np.ndarray] = None
+
+    def fit(self, frame: pd.DataFrame) -> "RuntimeModel":
+        """
+        按frame中的"转换耗时"拟合（抽稀配置无效的行忽略）
+
+        Raises:
+            ValueError: 没有可用的结果
+        """
+        factors = factor_frame(frame)
+        valid = factors.notna().all(axis=1).to_numpy() & np.isfinite(frame["转换耗时"].to_numpy(dtype=float))
+        if not valid.any():
+            raise ValueError("没有可用于拟合的转换耗时")
+        factors, results = factors[valid], frame[valid].copy()
+        # 历史中出现了FACTORS以外的取值（例如新的输出格式）时追加到末尾
+        self.levels = {name: list(levels) + sorted(set(factors[name].unique()) - set(levels))
+                       for name, levels in FACTORS.items()}
+
+        # 按配置汇总后求解正规方程 (XᵀWX + λI)β = Xᵀs，W为各配置的次数，s为耗时之和
+        seconds = results["转换耗时"].to_numpy(dtype=float)
+        # 配置编码为混合进制的一个整数再去重，比按行去重快一个数量级
+        widths = [len(levels) for levels in self.levels.values()]
+        keys, inverse = np.unique(np.ravel_multi_index(self._codes(factors).T, widths), return_inverse=True)
+        self._configs = np.column_stack(np.unravel_index(keys, widths)).astype(np.int64)
+        self._counts = np.bincount(inverse, minlength=len(self._configs)).astype(float)
+        sums = np.bincount(inverse, weights=seconds, minlength=len(self._configs))
+        X = self._design(self._configs)
+        penalty = self.ridge * len(seconds) * np.eye(X.shape[1])
+        penalty[0, 0] = 0.0
+        self.coef = np.linalg.solve(X.T @ (X * self._counts[:, None]) + penalty, X.T @ sums)
+
+        fitted = (X @ self.coef)[inverse]
+        results["预测耗时"] = fitted
+        results["残差"] = seconds - fitted
+        # 耗时的波动与耗时成正比，按实际/预测的对数比计算z分数，长配置不会因绝对残差大而被误判
+        results["稳健z"] = robust_z(np.log(seconds / np.maximum(fitted, 1e-3)))
+        self.results = results
+        return self
+
+    def score(self) -> Dict[str, Any]:
+        """拟合优度：结果数、配置数、R²和残差均方根"""
+        seconds = self.results["转换耗时"].to_numpy(dtype=float)
+        residuals = self.results["残差"].to_numpy(dtype=float)
+        total = np.sum((seconds - seconds.mean()) ** 2)
+        return {
+            "结果数": len(seconds),
+            "配置数": len(self._configs),
+            "R2": round(1.0 - np.sum(residuals ** 2) / total, 4) if total > 0 else None,
+            "RMSE": round(float(np.sqrt(np.mean(residuals ** 2))), 3),
+        }
+
+    def predict(self, frame: pd.DataFrame) -> np.ndarray:
+        """frame中每个配置的预测转换耗时（秒），抽稀配置无效或含未知取值的行为NaN"""
+        codes = self._codes(factor_frame(frame))
+        prediction = self._design(codes) @ self.coef
+        prediction[(codes < 0).any(axis=1)] = np.nan
+        return prediction
+
+    def extrapolated(self, frame: pd.DataFrame) -> np.ndarray:
+        """frame中每个配置包含的、历史中没有出现过的两两取值组合数"""
+        codes = self._codes(factor_frame(frame))
+        widths = [len(levels) for levels in self.levels.values()]
+        unseen = np.zeros(len(codes), dtype=int)
+        for i, j in itertools.combinations(range(codes.shape[1]), 2):
+            seen = self._configs[:, i] * widths[j] + self._configs[:, j]
+            unseen += ~np.isin(codes[:, i] * widths[j] + codes[:, j], seen)
+        return unseen
+
+    def marginal_costs(self) -> pd.DataFrame:
+        """
+        各参数取值的边际耗时
+
+        对每个参数的每个取值，把历史配置中的该参数都改为这个取值后求平均预测耗时（按次数加权），
+        边际耗时为与该参数平均预测最短的取值之差；包含交互项时即平均边际效应。
+        """
+        rows = []
+        for index, (name, levels) in enumerate(self.levels.items()):
+            shown = [level for level in levels if self._level_count(index, level)]
+            averages = []
+            for level in shown:
+                configs = self._configs.copy()
+                configs[:, index] = levels.index(level)
+                averages.append(np.average(self._design(configs) @ self.coef, weights=self._counts))
+            cheapest = min(averages)
+            for level, average in zip(shown, averages):
+                rows.append({"参数": name, "取值": level, "平均预测(秒)": round(float(average), 3),
+                             "边际耗时(秒)": round(float(average - cheapest), 3),
+                             "样本数": self._level_count(index, level)})
+        return pd.DataFrame(rows)
+
+    def untested(self, configurations: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+        """
+        configurations（默认完整组合）中历史上没有通过结果的配置，按预测耗时从长到短排列
+
+        Returns:
+            参数列加"预测耗时"和"外推"（历史中未出现的两两组合数）
+        """
+        configurations = all_configurations() if configurations is None else configurations.copy()
+        tested = set(map(tuple, self.results[PARAMETERS].to_numpy()))
+        keys = configurations.reindex(columns=PARAMETERS).fillna("").astype(str).to_numpy()
+        untested = configurations[[tuple(key) not in tested for key in keys]].copy()
+        untested["预测耗时"] = self.predict(untested)
+        untested["外推"] = self.extrapolated(untested)
+        return untested.sort_values("预测耗时", ascending=False)
+
+    def anomalies(self, threshold: float = 3.5) -> pd.DataFrame:
+        """稳健z分数的绝对值不小于threshold的历史结果，按偏离程度排列"""
+        flagged = self.results[self.results["稳健z"].abs() >= threshold]
+        return flagged.reindex(flagged["稳健z"].abs().sort_values(ascending=False).index)
+
+    def _level_count(self, index: int, level: str) -> int:
+        code = self.levels[list(self.levels)[index]].index(level)
+        return int(self._counts[self._configs[:, index] == code].sum())
+
+    def _codes(self, factors: pd.DataFrame) -> np.ndarray:
+        """因子取值编码为(行数, 因子数)的整数矩阵，未知取值为-1"""
+        return np.column_stack([pd.Index(levels).get_indexer(factors[name])
+                                for name, levels in self.levels.items()]).astype(np.int64)
+
+    def _design(self, codes: np.ndarray) -> np.ndarray:
+        """设计矩阵：截距、各因子的哑变量（参照取值除外）、两两因子哑变量的乘积"""
+        dummies = [(codes[:, [index]] == np.arange(1, len(levels))).astype(float)
+                   for index, levels in enumerate(self.levels.values())]
+        blocks = [np.ones((len(codes), 1))] + dummies
+        if self.interactions:
+            blocks += [(a[:, :, None] * b[:, None, :]).reshape(len(codes), -1)
+                       for a, b in itertools.combinations(dummies, 2)]
+        return np.hstack(blocks)
+
+
+def longest_first(durations: Sequence[float]) -> List[int]:
+    """
+    按耗时从长到短排列的下标
+
+    多个实例从共享队列取用例时，先执行长用例可以避免最后剩一个长用例单独运行（LPT调度）。
+    耗时未知（NaN）的按已知耗时的最大值排在前面。
+    """
+    values = np.asarray(durations, dtype=float)
+    known = values[np.isfinite(values)]
+    values = np.where(np.isfinite(values), values, known.max() if len(known) else 0.0)
+    return list(np.argsort(-values, kind="stable"))
+
+
+def shard(durations: Sequence[float], shards: int) -> Tuple[List[List[int]], List[float]]:
+    """
+    贪心分片（LPT）：按耗时从长到短，依次分给当前总耗时最少的一份
+
+    Returns:
+        (每份的下标列表（份内从长到短）, 每份的预测总耗时)
+    """
+    values = np.asarray(durations, dtype=float)
+    known = values[np.isfinite(values)]
+    values = np.where(np.isfinite(values), values, known.max() if len(known) else 0.0)
+    heap = [(0.0, i) for i in range(shards)]
+    parts: List[List[int]] = [[] for _ in range(shards)]
+    totals = [0.0] * shards
+    for index in longest_first(values):
+        total, part = heapq.heappop(heap)
+        parts[part].append(int(index))
+        totals[part] = total + float(values[index])
+        heapq.heappush(heap, (totals[part], part))
+    return parts, [round(total, 3) for total in totals]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="根据历史汇总CSV拟合转换耗时模型")
+    parser.add_argument("--reports", default="reports", help="汇总CSV(test_summary_*.csv)所在目录")
+    parser.add_argument("--no-interactions", action="store_true", help="只拟合主效应")
+    parser.add_argument("--anomaly-z", type=float, default=3.5, help="异常结果的稳健z分数阈值")
+    parser.add_argument("--top", type=int, default=10, help="未测配置和异常结果各显示的条数")
+    parser.add_argument("--cases", help="用例CSV：按预测耗时从长到短排序，配合--shards分片")
+    parser.add_argument("--shards", type=int, default=1, help="把--cases中的用例分成耗时接近的份数")
+    parser.add_argument("--output-dir", help="排序/分片后的用例CSV写入的目录")
+    args = parser.parse_args(argv)
+
+    summaries = find_summaries(args.reports)
+    frame = load_summaries(summaries)
+    if frame.empty:
+        print(f"⚠️ {args.reports} 中没有可用的汇总CSV")
+        return None
+    model = RuntimeModel(interactions=not args.no_interactions).fit(frame)
+    score = model.score()
+
+    print("=" * 60)
+    print(f"⏱️ 转换耗时模型: 汇总CSV {len(summaries)} 份, 结果 {score['结果数']} 个, 配置 {score['配置数']} 个, "
+          f"R²={score['R2']}, RMSE={score['RMSE']}秒")
+    print("\n📊 边际耗时（相对该参数最快的取值）:")
+    for name, costs in model.marginal_costs().groupby("参数", sort=False):
+        print(f"  {name}: " + ", ".join(f"{row['取值']}=+{row['边际耗时(秒)']:.2f}秒({row['样本数']})"
+                                        for _, row in costs.iterrows()))
+
+    untested = model.untested()
+    print(f"\n🔮 未测配置 {len(untested)} 个，预测耗时最长的 {min(args.top, len(untested))} 个:")
+    for _, row in untested.head(args.top).iterrows():
+        config = "/".join(str(row[name]) or "-" for name in PARAMETERS)
+        print(f"  {config}: {row['预测耗时']:.2f}秒" + (f" (外推{row['外推']}项)" if row["外推"] else ""))
+
+    anomalies = model.anomalies(args.anomaly_z)
+    print(f"\n⚠️ 异常结果 {len(anomalies)} 个（|z|≥{args.anomaly_z}）:")
+    for _, row in anomalies.head(args.top).iterrows():
+        print(f"  {row['用例ID']} {row['开始时间']}: 实际{row['转换耗时']:.2f}秒, 预测{row['预测耗时']:.2f}秒, "
+              f"z={row['稳健z']:+.1f} ({os.path.basename(row['来源'])})")
+
+    if args.cases:
+        cases = pd.read_csv(args.cases, dtype=str, keep_default_na=False, encoding="utf-8-sig")
+        predicted = model.predict(cases)
+        parts, totals = shard(predicted, max(args.shards, 1))
+        print(f"\n🧩 {args.cases}: {len(cases)} 个用例, 预测总转换耗时 {np.nansum(predicted):.1f}秒")
+        for number, (part, total) in enumerate(zip(parts, totals), 1):
+            print(f"  分片{number}: {len(part)} 个用例, 预测 {total:.1f}秒")
+            if args.output_dir:
+                os.makedirs(args.output_dir, exist_ok=True)
+                stem = os.path.splitext(os.path.basename(args.cases))[0]
+                output_file = os.path.join(args.output_dir, f"{stem}_shard{number}.csv")
+                cases.iloc[part].to_csv(output_file, index=False, encoding="utf-8")
+                print(f"    📁 {output_file}")
+    return model
+
+
+if __name__ == "__main__":
+    main()
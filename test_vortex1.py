@@ -1,20 +1,44 @@
-from pywinauto import Application, ElementNotFoundError
-import win32gui
+import asyncio
+import json
+import os
 import time
 import psutil
 from datetime import datetime
-import threading
-import csv
-
-# ---------------- 全局变量（资源监控用） ----------------
-monitor_data = []  # 存储监控数据
-is_monitoring = False  # 监控线程开关
-vortex_pid = None  # VORTEX进程PID（用于精准监控）
-
-# ---------------- 资源监控函数（后台线程） ----------------
-def monitor_resource(interval=0.3):
-    """后台监控系统+VORTEX进程的资源占用"""
-    global monitor_data, is_monitoring, vortex_pid
+
+from async_engine import InstanceThread
+from resource_sampler import SampleBuffer
+from timeout_model import TimeoutModel
+from vortex_driver import create_driver, ElementNotFoundError, WaitTimeoutError
+
+# 监控指标（CSV列名）
+MONITOR_METRICS = ["sys_cpu(%)", "sys_mem(%)", "vortex_cpu(%)", "vortex_mem(%)", "vortex_mem(MB)"]
+
+# ---------------- 资源监控（事件循环中的任务） ----------------
+# 监控数据存放在调用方创建的缓冲区中：预分配数组，超过容量后相邻样本合并（保留min/max/mean），
+# 长时间等待时内存不增长；取消任务即停止监控，不需要全局开关
+def read_resources(vortex_process):
+    """读取一次系统和VORTEX进程的资源占用，顺序与MONITOR_METRICS一致"""
+    # 1. 系统级资源
+    sys_cpu = psutil.cpu_percent(interval=0)  # 系统CPU使用率(%)
+    sys_mem = psutil.virtual_memory().percent  # 系统内存使用率(%)
+    
+    # 2. VORTEX进程级资源
+    try:
+        proc_cpu = vortex_process.cpu_percent(interval=0)  # 进程CPU使用率(%)
+        proc_mem = vortex_process.memory_percent()  # 进程内存占比(%)
+        proc_mem_mb = vortex_process.memory_info().rss / 1024 / 1024  # 进程内存占用(MB)
+    except (psutil.NoSuchProcess, psutil.AccessDenied):
+        proc_cpu, proc_mem, proc_mem_mb = 0, 0, 0
+    return sys_cpu, sys_mem, proc_cpu, proc_mem, proc_mem_mb
+
+
+async def monitor_resource(monitor_data, vortex_pid, interval=0.3):
+    """
+    监控系统+VORTEX进程的资源占用，直到任务被取消
+
+    psutil读取/proc或调用系统接口，会阻塞；每次读取在默认线程池中执行，不占用事件循环，
+    结果回到事件循环中再写入缓冲区，取消时不会与保存数据同时访问缓冲区。
+    """
     if not vortex_pid:
         print("⚠️ 未获取到VORTEX进程PID，跳过资源监控")
         return
@@ -26,116 +50,133 @@ def monitor_resource(interval=0.3):
         print("⚠️ VORTEX进程不存在，跳过资源监控")
         return
     
-    start_time = time.perf_counter()  # 监控起始时间
-    while is_monitoring:
-        # 1. 系统级资源
-        sys_cpu = psutil.cpu_percent(interval=0)  # 系统CPU使用率(%)
-        sys_mem = psutil.virtual_memory().percent  # 系统内存使用率(%)
-        
-        # 2. VORTEX进程级资源
-        try:
-            proc_cpu = vortex_process.cpu_percent(interval=0)  # 进程CPU使用率(%)
-            proc_mem = vortex_process.memory_percent()  # 进程内存占比(%)
-            proc_mem_mb = round(vortex_process.memory_info().rss / 1024 / 1024, 2)  # 进程内存占用(MB)
-        except (psutil.NoSuchProcess, psutil.AccessDenied):
-            proc_cpu, proc_mem, proc_mem_mb = 0, 0, 0
-        
-        # 3. 记录数据（时间戳+耗时+资源指标）
-        elapsed_time = round(time.perf_counter() - start_time, 3)
-        monitor_data.append({
-            "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3],  # 毫秒级时间戳
-            "elapsed_time(s)": elapsed_time,
-            "sys_cpu(%)": sys_cpu,
-            "sys_mem(%)": sys_mem,
-            "vortex_cpu(%)": proc_cpu,
-            "vortex_mem(%)": proc_mem,
-            "vortex_mem(MB)": proc_mem_mb
-        })
-        time.sleep(interval)
+    loop = asyncio.get_running_loop()
+    while True:
+        sample = await loop.run_in_executor(None, read_resources, vortex_process)
+        # 记录数据（时间戳和耗时由缓冲区记录，导出时再格式化）
+        monitor_data.append(sample)
+        await asyncio.sleep(interval)
 
 # ---------------- 保存监控数据到CSV ----------------
-def save_monitor_data():
+def save_monitor_data(monitor_data):
     """将监控数据保存为CSV文件（按时间命名）"""
-    global monitor_data
-    if not monitor_data:
+    if not len(monitor_data):
         print("⚠️ 无监控数据可保存")
         return
     
-    # 生成带时间戳的文件名
+    # 生成带时间戳的文件名，向量化写入CSV（样本合并过时附带每段的min/max列）
     filename = f"精细识别监控报告_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-    # 写入CSV
-    with open(filename, "w", newline="", encoding="utf-8") as f:
-        fieldnames = ["timestamp", "elapsed_time(s)", "sys_cpu(%)", "sys_mem(%)",
-                     "vortex_cpu(%)", "vortex_mem(%)", "vortex_mem(MB)"]
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(monitor_data)
-    print(f"✅ 监控数据已保存至：{filename}")
+    monitor_data.export(filename)
+    print(f"✅ 监控数据已保存至：{filename}（{monitor_data.total}个样本，{len(monitor_data)}行）")
+
+# ---------------- 精细识别耗时历史（自适应超时） ----------------
+HISTORY_FILE = "精细识别耗时历史.json"
+DEFAULT_TIMEOUT = 10000  # 历史不足时的等待上限（秒）
+
+
+def load_fine_detect_model():
+    """按历史耗时拟合等待上限：P99×1.5（至少30秒），历史少于5次时没有上限"""
+    model = TimeoutModel(quantile=0.99, margin=1.5, min_samples=5, floor=30)
+    if os.path.exists(HISTORY_FILE):
+        with open(HISTORY_FILE, "r", encoding="utf-8") as f:
+            for seconds in json.load(f):
+                model.add("精细识别", (), seconds)
+    return model
+
+
+def save_fine_detect_duration(seconds):
+    """追加一次成功的精细识别耗时"""
+    history = []
+    if os.path.exists(HISTORY_FILE):
+        with open(HISTORY_FILE, "r", encoding="utf-8") as f:
+            history = json.load(f)
+    with open(HISTORY_FILE, "w", encoding="utf-8") as f:
+        json.dump(history + [seconds], f)
 
 # ---------------- 核心业务逻辑 ----------------
-if __name__ == "__main__":
+async def main():
+    # 界面驱动：默认pywinauto，设置环境变量 VORTEX_UI_DRIVER=simulated 可使用模拟后端
+    driver = create_driver({"ui_driver": os.environ.get("VORTEX_UI_DRIVER", "pywinauto"), "backend": "uia"})
+    # 界面调用都在同一个专用线程中执行（COM对象不跨线程），事件循环只负责等待和资源监控
+    ui = InstanceThread("VORTEX", initializer=driver.init_thread)
+    try:
+        await run_fine_detect(driver, ui)
+    finally:
+        ui.close()
+
+
+async def run_fine_detect(driver, ui):
     # ---------------- 1. 句柄连接VORTEX主窗口 ----------------
-    hwnd = win32gui.FindWindow(None, "VORTEX Client")
+    hwnd = await ui(driver.find_window, "VORTEX Client")
     if not hwnd:
         raise Exception("❌ 未找到标题为'VORTEX Client'的窗口，请确认程序已启动！")
 
     # 连接主窗口（UIA后端）
-    app = Application(backend="uia").connect(handle=hwnd)
-    dlg = app.window(handle=hwnd)
-    dlg.wait('visible enabled', timeout=10)
-    dlg.set_focus()
-    vortex_pid = dlg.process_id()  # 获取VORTEX进程PID（关键！）
-    print(f"✅ 成功连接VORTEX主窗口：句柄={hex(hwnd)}，标题={dlg.window_text()}，PID={vortex_pid}")
+    dlg = await ui(driver.connect, hwnd)
+    await ui(driver.wait, dlg, 'visible enabled', timeout=10)
+    await ui(driver.set_focus, dlg)
+    vortex_pid = await ui(driver.process_id, dlg)  # 获取VORTEX进程PID（关键！）
+    print(f"✅ 成功连接VORTEX主窗口：句柄={hex(hwnd)}，标题={await ui(driver.window_text, dlg)}，PID={vortex_pid}")
 
     # ---------------- 2. 定位目标子窗口 ----------------
     try:
-        vortex_window = dlg.window(
+        vortex_window = await ui(
+            driver.child,
+            dlg,
             title_re=".*3-0.6-(2)/站点识别.*",  # 模糊匹配子窗口标题
-            control_type="Window",             # 限定为窗口类型
-            parent=dlg                         # 限定父窗口
+            control_type="Window"              # 限定为窗口类型（父窗口为dlg）
         )
-        vortex_window.wait('visible', timeout=5)
-        print(f"✅ 定位到目标窗口：标题={vortex_window.window_text()}，句柄={hex(vortex_window.handle)}")
+        await ui(driver.wait, vortex_window, 'visible', timeout=5)
+        print(f"✅ 定位到目标窗口：标题={await ui(driver.window_text, vortex_window)}，"
+              f"句柄={hex(await ui(driver.handle_of, vortex_window))}")
     except ElementNotFoundError as e:
         print(f"❌ 目标子窗口定位失败：{e}")
-        exit(1)
+        return
 
     # ---------------- 3. 标靶识别功能操作 + 监控 ----------------
+    monitor_data = None
+    monitor_task = None
+    fine_detect_timeout = None
     try:
         # 3.1 定位并点击【站点识别】
-        site_detect_ctrl = dlg.child_window(
+        site_detect_ctrl = await ui(
+            driver.child,
+            dlg,
             auto_id="btnDetect",    # 控件唯一标识
             control_type="Pane",    # 控件类型
             title="站点识别"        
         )
-        site_detect_ctrl.wait('visible enabled', timeout=5)
-        site_detect_ctrl.click_input()
+        await ui(driver.wait, site_detect_ctrl, 'visible enabled', timeout=5)
+        await ui(driver.click, site_detect_ctrl)
         print(f"✅ 点击【站点识别】成功")
 
         # 3.2 定位并切换【站点1】复选框
-        site1_checkbox = dlg.child_window(
+        site1_checkbox = await ui(
+            driver.child,
+            dlg,
             control_type="CheckBox", # 复选框类型
             title="站点1"             # ✅ 修正：UIA控件用name而非title
         )
-        site1_checkbox.wait('visible enabled', timeout=5)
-        site1_checkbox.toggle()  # 切换勾选状态
+        await ui(driver.wait, site1_checkbox, 'visible enabled', timeout=5)
+        await ui(driver.toggle, site1_checkbox)  # 切换勾选状态
         print(f"✅ 切换【站点1】复选框状态成功")
 
         # ---------------- 4. 【精细识别】操作 + 耗时/资源监控 ----------------
-        # 4.1 启动后台资源监控
-        is_monitoring = True
-        monitor_thread = threading.Thread(target=monitor_resource, daemon=True)
-        monitor_thread.start()
+        # 4.1 启动资源监控任务（以监控开始作为起始时间）
+        monitor_data = SampleBuffer(MONITOR_METRICS, capacity=4096)
+        monitor_task = asyncio.create_task(monitor_resource(monitor_data, vortex_pid))
         print("📊 开始监控资源占用...")
 
 
         # 4.3 定位并操作【精细识别】
-        fine_detect_ctrl = dlg.child_window(
+        fine_detect_ctrl = await ui(
+            driver.child,
+            dlg,
             control_type="Pane",    # 控件类型
             title="精细识别"         # ✅ 修正：UIA控件用name而非title
         )
-        fine_detect_ctrl.wait('visible enabled', timeout=5)
-        fine_detect_ctrl.click_input()  # 执行精细识别操作
+        await ui(driver.wait, fine_detect_ctrl, 'visible enabled', timeout=5)
+        await ui(driver.click, fine_detect_ctrl)  # 执行精细识别操作
         print(f"✅ 点击【精细识别】成功，等待操作完成（监控标靶编辑按钮状态）...")
 
         # 4.2 记录【精细识别】操作开始时间
@@ -143,15 +184,26 @@ if __name__ == "__main__":
 
         # ---------------- 关键修改：等待【标靶编辑】按钮可点击（判断精细识别结束） ----------------
         # 定位【标靶编辑】控件（用AutoID最精准，避免重名）
-        target_edit_ctrl = dlg.child_window(
+        target_edit_ctrl = await ui(
+            driver.child,
+            dlg,
             auto_id="btn_edit",     # 唯一标识（优先用这个，比name更稳定）
             control_type="Pane",    # 控件类型：UIA_PaneControlTypeId
             title="标靶编辑"         # 双重验证，确保定位正确
         )
-        # 等待控件变为【可点击状态（IsEnabled=True）+ 可见】，超时30秒（可根据实际调整）
-        target_edit_ctrl.wait(
+        # 等待控件变为【可点击状态（IsEnabled=True）+ 可见】
+        # 超时按历史耗时确定（P99×余量），历史不足时为DEFAULT_TIMEOUT秒，防止卡死
+        # 等待在界面线程中进行，期间监控任务继续在事件循环中采样
+        model = load_fine_detect_model()
+        fine_detect_timeout = model.bound("精细识别", ()) or DEFAULT_TIMEOUT
+        predicted = model.predict("精细识别", ())
+        if predicted is not None:
+            print(f"🔮 预测耗时 {predicted} 秒，超过 {fine_detect_timeout} 秒判定为卡住")
+        await ui(
+            driver.wait,
+            target_edit_ctrl,
             'visible enabled',     # 等待条件：可见且可点击
-            timeout=10000             # 最大等待时间（秒），防止卡死
+            timeout=fine_detect_timeout
         )
         print(f"✅ 【标靶编辑】按钮已可点击，精细识别操作完成！")
 
@@ -159,15 +211,26 @@ if __name__ == "__main__":
         fine_detect_end = time.perf_counter()
         fine_detect_duration = round(fine_detect_end - fine_detect_start, 3)
         print(f"⏱️ 【精细识别】操作总耗时：{fine_detect_duration} 秒")
+        save_fine_detect_duration(fine_detect_duration)
 
+    except WaitTimeoutError as e:
+        if fine_detect_timeout is not None:
+            print(f"❌ 【精细识别】超过 {fine_detect_timeout} 秒未完成，判定为卡住：{e}")
+        else:
+            print(f"❌ 操作异常：{e}")
     except ElementNotFoundError as e:
         print(f"❌ 控件定位失败：{e}")
     except Exception as e:
         print(f"❌ 操作异常：{e}")
     finally:
-        # 停止监控并保存数据
-        is_monitoring = False
-        if 'monitor_thread' in locals():
-            monitor_thread.join(timeout=2)  # 等待监控线程结束
-        save_monitor_data()
-        print("🔚 监控结束")
\ No newline at end of file
+        # 取消监控任务并等待其退出，然后保存数据
+        if monitor_task is not None:
+            monitor_task.cancel()
+            await asyncio.gather(monitor_task, return_exceptions=True)
+        if monitor_data is not None:
+            save_monitor_data(monitor_data)
+        print("🔚 监控结束")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,47 @@
+"""
+测试公共夹具
+
+测试都在模拟后端和本地子进程上运行，不需要Windows桌面；依赖psutil的测试在没有安装时跳过。
+"""
+import os
+
+import pytest
+
+from benchmark_vortex import DEFAULT_CSV, REPO_DIR, load_harness, make_test_manager
+
+
+@pytest.fixture(scope="session")
+def harness():
+    """format2.0.py模块"""
+    return load_harness()
+
+
+@pytest.fixture
+def manager_factory(harness, tmp_path):
+    """在临时目录（给出name时为其中的子目录）中创建使用模拟后端的测试管理器，测试结束后回到仓库目录"""
+    def create(time_scale: float = 0.02, name: str = "", **overrides):
+        work_dir = tmp_path / name
+        work_dir.mkdir(exist_ok=True)
+        return make_test_manager(harness, str(work_dir), time_scale, **overrides)
+    yield create
+    os.chdir(REPO_DIR)
+
+
+@pytest.fixture
+def export_dialog(harness, manager_factory):
+    """
+    模拟后端上的执行器和打开点云导出窗口的函数
+
+    打开函数依次执行连接、点击导出、选择点云三个步骤，返回点云导出窗口的控件规格，可多次调用重新打开窗口。
+    """
+    test_manager = manager_factory()
+    test_case = harness.CSVDataReader.read_test_cases(DEFAULT_CSV)[0]
+    executor = harness.TestCaseExecutor(test_manager, test_case)
+
+    def open_dialog():
+        assert executor._connect_to_vortex() and executor._locate_target_window()
+        assert executor._click_export_button() and executor._select_point_cloud_option()
+        window = test_manager.driver.child(executor.dlg, title_re=".*点云导出.*", control_type="Window")
+        test_manager.driver.wait(window, "visible")
+        return window
+    return executor, open_dialog
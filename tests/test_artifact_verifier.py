@@ -0,0 +1,189 @@
+"""导出文件校验：模拟器写出的PTS/LAS/E57文件往返读取，以及截断、损坏的文件记为问题"""
+import struct
+
+import numpy as np
+import pytest
+
+from artifact_verifier import find_artifacts, read_points, verify_file, verify_output_folder
+from benchmark_vortex import DEFAULT_CSV, exports_to
+from vortex_sim import write_artifact
+
+COUNT = 5000
+# PTS保留4位小数，LAS按毫米缩放，E57存原始double
+TOLERANCE = {"pts": 1e-4, "las": 1e-3, "e57": 0.0}
+
+
+@pytest.fixture
+def points():
+    return np.random.default_rng(0).uniform([-5.0, 0.0, -1.0], [15.0, 20.0, 3.0], size=(COUNT, 3))
+
+
+def written(tmp_path, fmt, points):
+    path = str(tmp_path / "scan" / f"scan.{fmt}")
+    write_artifact(path, points)
+    return path
+
+
+@pytest.mark.parametrize("fmt", ["pts", "las", "e57"])
+def test_round_trip(tmp_path, points, fmt):
+    path = written(tmp_path, fmt, points)
+    info = verify_file(path)
+    assert info["问题"] == []
+    assert info["格式"] == fmt and info["点数"] == COUNT
+    bounds = list(points.min(axis=0)) + list(points.max(axis=0))
+    assert info["包围盒"] == pytest.approx(bounds, abs=TOLERANCE[fmt] + 1e-6)
+
+    # 分块大小与数据包、文本块边界错开，拼接后与写入的坐标一致
+    read = np.vstack(list(read_points([path], chunk_points=1500)))
+    assert read.shape == points.shape
+    assert read == pytest.approx(points, abs=TOLERANCE[fmt] / 2 + 1e-9)
+
+
+def test_output_folder_summary(tmp_path, points):
+    for fmt in ("pts", "las", "e57"):
+        written(tmp_path, fmt, points)
+    folder = str(tmp_path / "scan")
+    assert [path.rsplit(".", 1)[1] for path in find_artifacts(folder)] == ["e57", "las", "pts"]
+
+    summary = verify_output_folder(folder, "LAS", conversion_seconds=2.0)
+    assert summary["问题"] == [] and summary["点数"] == 3 * COUNT
+    assert summary["写入速率"] == 1.5 * COUNT
+    assert verify_output_folder(folder, "ply")["问题"] == ["没有ply格式的输出文件"]
+    assert verify_output_folder(str(tmp_path / "missing"))["问题"][0].startswith("输出文件夹不存在")
+    (tmp_path / "empty").mkdir()
+    assert verify_output_folder(str(tmp_path / "empty"))["问题"] == ["输出文件夹中没有点云文件"]
+
+
+def truncate(path, size):
+    with open(path, "r+b") as f:
+        f.truncate(size)
+
+
+def overwrite(path, offset, data):
+    with open(path, "r+b") as f:
+        f.seek(offset)
+        f.write(data)
+
+
+def test_truncated_pts(tmp_path, points):
+    path = written(tmp_path, "pts", points)
+    with open(path, "rb") as f:
+        lines = f.read().splitlines(keepends=True)
+    # 截在行边界：少了100个点
+    truncate(path, sum(len(line) for line in lines[:COUNT + 1 - 100]))
+    info = verify_file(path)
+    assert info["点数"] == COUNT - 100
+    assert info["问题"] == [f"点数行声明{COUNT}个点，实际{COUNT - 100}个"]
+
+    # 截在行中间：最后一行只剩部分坐标
+    truncate(path, sum(len(line) for line in lines[:COUNT + 1 - 200]) + 12)
+    assert verify_file(path)["问题"]
+
+
+def test_corrupted_pts(tmp_path, points):
+    path = written(tmp_path, "pts", points)
+    text = open(path, encoding="utf-8").read().splitlines()
+    # 缺少z坐标的行
+    text[10] = " ".join(text[10].split()[:2])
+    open(path, "w", encoding="utf-8").write("\n".join(text) + "\n")
+    info = verify_file(path)
+    assert "存在无法解析的坐标" in info["问题"]
+    assert f"点数行声明{COUNT}个点，实际{COUNT - 1}个" in info["问题"]
+
+    # 坐标中的乱码使整个文件无法按数值解析
+    text[20] = "1.0 x#2 3.0 100 128 128 128"
+    open(path, "w", encoding="utf-8").write("\n".join(text) + "\n")
+    assert verify_file(path)["问题"][0].startswith("解析失败")
+
+
+def test_truncated_las(tmp_path, points):
+    path = written(tmp_path, "las", points)
+    size = (tmp_path / "scan" / "scan.las").stat().st_size
+    # 点格式0每条记录20字节，截掉30字节后少两条完整记录
+    truncate(path, size - 30)
+    info = verify_file(path)
+    assert info["点数"] == COUNT - 2
+    assert f"文件头声明{COUNT}个点，文件中只有{COUNT - 2}条完整记录" in info["问题"]
+    # 只剩文件头的一部分时无法解析
+    truncate(path, 100)
+    assert verify_file(path)["问题"][0].startswith("解析失败")
+
+
+def test_corrupted_las(tmp_path, points):
+    path = written(tmp_path, "las", points)
+    # 第一条记录的X改为远超包围盒的值
+    overwrite(path, 227, struct.pack("<i", 10 ** 8))
+    info = verify_file(path)
+    assert info["点数"] == COUNT
+    assert len(info["问题"]) == 1 and info["问题"][0].startswith("文件头包围盒")
+
+    overwrite(path, 0, b"XXXX")
+    assert "缺少LASF签名" in verify_file(path)["问题"][0]
+
+
+def test_truncated_e57(tmp_path, points):
+    path = written(tmp_path, "e57", points)
+    size = (tmp_path / "scan" / "scan.e57").stat().st_size
+    # XML段在文件末尾，截断后无法读取
+    truncate(path, size - 1024)
+    info = verify_file(path)
+    assert info["点数"] == 0
+    assert info["问题"] == ["解析失败: E57文件被截断"]
+
+
+def test_corrupted_e57(tmp_path, points):
+    path = written(tmp_path, "e57", points)
+    # 文件末尾多出的字节
+    with open(path, "ab") as f:
+        f.write(b"\0" * 1024)
+    info = verify_file(path)
+    assert len(info["问题"]) == 1 and info["问题"][0].startswith("文件头记录长度")
+    assert info["点数"] == COUNT and info["数据包"] == -(-COUNT // 2000)
+
+    # 二进制段从逻辑偏移48开始，32字节段头之后是第一个数据包
+    path = written(tmp_path, "e57", points)
+    overwrite(path, 80, b"\x07")
+    info = verify_file(path)
+    assert info["问题"] == ["第1个扫描: 逻辑偏移80处的数据包类型7无效"]
+    # 有问题的扫描不计入点数
+    assert info["点数"] == 0 and info["声明点数"] == COUNT
+
+    overwrite(path, 48, b"\x02")
+    assert verify_file(path)["问题"] == ["第1个扫描: 二进制段类型2不是压缩向量"]
+
+
+def test_simulator_outputs_pass_verification(harness, manager_factory, tmp_path):
+    output_dir = str(tmp_path / "outputs")
+    test_manager = manager_factory(verify_outputs=True,
+                                   **exports_to(output_dir, time_scale=0.02, artifact_points=3000))
+    cases = harness.CSVDataReader.read_test_cases(DEFAULT_CSV)[:3]
+    harness.run_test_cases(test_manager, cases)
+    results = list(harness.iter_case_results(test_manager.all_results))
+
+    conversions = {conversion["文件夹"]: conversion for conversion in test_manager.driver.sim.instances[0].conversions}
+
+    assert test_manager.all_results["passed_cases"] == len(cases)
+    for test_case, result in zip(cases, results):
+        # 模拟后端写到执行器所点击的盘符下，校验的正是这个文件夹
+        conversion = conversions[result["输出文件夹"]]
+        assert conversion["盘符"] == "F"
+        assert conversion["输出路径"] == str(tmp_path / "outputs" / result["输出文件夹"])
+        summary = result["输出校验"]
+        assert summary["问题"] == []
+        assert [item["格式"] for item in summary["文件"]] == [test_case["输出格式"].lower()]
+        assert 0 < summary["点数"] <= 3000
+        assert any(step["步骤"] == "校验输出文件" and step["状态"] == "通过" for step in result["步骤"])
+
+
+def test_verification_follows_the_clicked_drive(harness, manager_factory, tmp_path):
+    # 执行器点击D盘，文件写到D盘映射的目录；output_base_dir指向F盘的目录时找不到输出
+    exports = exports_to(str(tmp_path / "f"), drive="D", time_scale=0.02, artifact_points=1000)
+    exports["simulation"]["drives"] = {"D": str(tmp_path / "d"), "F": str(tmp_path / "f")}
+    test_manager = manager_factory(verify_outputs=True, **exports)
+    harness.run_test_cases(test_manager, harness.CSVDataReader.read_test_cases(DEFAULT_CSV)[:1])
+    result = next(harness.iter_case_results(test_manager.all_results))
+
+    assert test_manager.driver.sim.instances[0].conversions[0]["盘符"] == "D"
+    assert (tmp_path / "d" / result["输出文件夹"]).is_dir()
+    assert result["状态"] == "失败"
+    assert any(step["步骤"] == "校验输出文件" and step["状态"] == "失败" for step in result["步骤"])
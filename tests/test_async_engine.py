@@ -0,0 +1,259 @@
+"""asyncio执行核心：任务作用域的取消、跨线程创建和取消任务、实例线程的上下文，以及在模拟后端上的完整运行"""
+import asyncio
+import contextvars
+import logging
+import os
+import threading
+import time
+
+import pytest
+
+from async_engine import InstanceThread, TaskScope, run_all
+from benchmark_vortex import DEFAULT_CSV
+from progress_server import AsyncProgressServer, ProcessProbe, RunProgress
+from resource_sampler import ResourceSampler, SampleBuffer
+
+marker = contextvars.ContextVar("测试标记", default=None)
+
+
+async def forever(events, name):
+    """一直等待，退出时记录被取消"""
+    try:
+        await asyncio.sleep(3600)
+    finally:
+        events.append(name)
+
+
+def test_scope_cancels_remaining_tasks_on_exit():
+    events = []
+
+    async def main():
+        async with TaskScope() as tasks:
+            first = tasks.spawn(forever(events, "a"), "a")
+            tasks.spawn(forever(events, "b"), "b")
+            await asyncio.sleep(0)
+        assert first.cancelled()
+        return tasks
+
+    tasks = asyncio.run(main())
+    # 离开作用域前已等待任务执行完finally
+    assert sorted(events) == ["a", "b"]
+    assert not tasks._tasks
+
+
+def test_scope_cancels_tasks_when_body_raises():
+    events = []
+
+    async def main():
+        async with TaskScope() as tasks:
+            tasks.spawn(forever(events, "a"))
+            await asyncio.sleep(0)
+            raise KeyError("出错")
+
+    with pytest.raises(KeyError):
+        asyncio.run(main())
+    assert events == ["a"]
+
+
+def test_background_task_error_is_logged(caplog):
+    async def fail():
+        raise ValueError("采样失败")
+
+    async def main():
+        async with TaskScope() as tasks:
+            tasks.spawn(fail(), "资源采样-1")
+            await asyncio.sleep(0.01)
+
+    with caplog.at_level(logging.WARNING, logger="async_engine"):
+        asyncio.run(main())
+    assert "资源采样-1" in caplog.text and "采样失败" in caplog.text
+
+
+def test_spawn_and_cancel_from_instance_thread():
+    events = []
+
+    async def main():
+        ui = InstanceThread("VORTEX-1")
+        try:
+            async with TaskScope() as tasks:
+                def in_thread():
+                    # 界面线程中创建任务，取消时等到任务执行完finally才返回
+                    task = tasks.spawn_threadsafe(forever(events, "采样"), "采样")
+                    time.sleep(0.05)
+                    assert not task.done()
+                    tasks.cancel_threadsafe(task, timeout=5)
+                    assert task.cancelled() and events == ["采样"]
+                    return threading.current_thread().name
+                return await ui(in_thread)
+        finally:
+            ui.close()
+
+    assert asyncio.run(main()).startswith("VORTEX-1")
+
+
+def test_cancel_threadsafe_in_loop_only_requests_cancel():
+    events = []
+
+    async def main():
+        async with TaskScope() as tasks:
+            task = tasks.spawn_threadsafe(forever(events, "a"))
+            await asyncio.sleep(0)
+            tasks.cancel_threadsafe(task)
+            # 事件循环线程中不能阻塞等待：请求已发出，任务尚未退出
+            assert events == []
+            await asyncio.gather(task, return_exceptions=True)
+            assert task.cancelled() and events == ["a"]
+
+    asyncio.run(main())
+
+
+def test_instance_thread_runs_calls_in_one_thread_with_caller_context():
+    initialized = []
+
+    async def main():
+        ui = InstanceThread("VORTEX-2", initializer=lambda: initialized.append(threading.get_ident()))
+        try:
+            async def worker(name):
+                marker.set(name)
+                return [await ui(lambda: (marker.get(), threading.get_ident())) for _ in range(3)]
+            return await asyncio.gather(worker("甲"), worker("乙"))
+        finally:
+            ui.close()
+
+    results = asyncio.run(main())
+    # 每个协程在实例线程中看到自己设置的上下文变量
+    assert [name for name, _ in results[0]] == ["甲"] * 3
+    assert [name for name, _ in results[1]] == ["乙"] * 3
+    # 所有调用在同一个线程中执行，initializer只调用一次
+    assert {ident for calls in results for _, ident in calls} == set(initialized)
+    assert len(initialized) == 1
+
+
+def test_run_all_returns_results_in_order():
+    async def value(seconds, result):
+        await asyncio.sleep(seconds)
+        return result
+
+    assert asyncio.run(run_all([value(0.03, 1), value(0.01, 2), value(0.02, 3)], ["a", "b", "c"])) == [1, 2, 3]
+
+
+def test_run_all_cancels_siblings_on_error():
+    events = []
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("实例出错")
+
+    with pytest.raises(RuntimeError, match="实例出错"):
+        asyncio.run(run_all([forever(events, "a"), fail(), forever(events, "b")]))
+    assert sorted(events) == ["a", "b"]
+
+
+def test_run_all_cancelled_waits_for_children():
+    events = []
+
+    async def main():
+        outer = asyncio.ensure_future(run_all([forever(events, "a"), forever(events, "b")]))
+        await asyncio.sleep(0.01)
+        outer.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await outer
+        assert sorted(events) == ["a", "b"]
+
+    asyncio.run(main())
+
+
+@pytest.mark.skipif(not ResourceSampler.available(), reason="需要psutil")
+def test_async_sampler_does_not_block_event_loop():
+    slow = 0.2
+
+    class SlowSampler(ResourceSampler):
+        def _sample(self):
+            # 模拟在负载很高的机器上psutil读取很慢
+            time.sleep(slow)
+            return super()._sample()
+
+    async def main():
+        async with TaskScope() as tasks:
+            sampler = SlowSampler(os.getpid(), interval=0.01).start(tasks)
+            # 事件循环在采样期间仍能及时调度其他协程
+            lags = []
+            for _ in range(20):
+                before = time.perf_counter()
+                await asyncio.sleep(0.01)
+                lags.append(time.perf_counter() - before - 0.01)
+            summary = await asyncio.to_thread(sampler.stop)
+        return max(lags), summary
+
+    lag, summary = asyncio.run(main())
+    assert lag < slow / 2
+    assert summary["采样次数"] >= 1
+
+
+async def max_loop_lag(steps=20, interval=0.01):
+    """连续短暂休眠，返回事件循环调度的最大延迟"""
+    lags = []
+    for _ in range(steps):
+        before = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(time.perf_counter() - before - interval)
+    return max(lags)
+
+
+@pytest.mark.skipif(not ResourceSampler.available(), reason="需要psutil")
+def test_dashboard_sampling_does_not_block_event_loop(monkeypatch):
+    slow = 0.2
+    probes = []
+
+    def slow_update(self, progress):
+        time.sleep(slow)
+        probes.append(threading.current_thread())
+    monkeypatch.setattr(ProcessProbe, "update", slow_update)
+
+    async def main():
+        async with TaskScope() as tasks:
+            await AsyncProgressServer(RunProgress(), port=0, resource_interval=0.01).start(tasks)
+            return await max_loop_lag()
+
+    assert asyncio.run(main()) < slow / 2
+    # 采样在线程池中进行，不在事件循环线程中
+    assert probes and threading.main_thread() not in probes
+
+
+@pytest.mark.skipif(not ResourceSampler.available(), reason="需要psutil")
+def test_fine_detection_monitor_does_not_block_event_loop(monkeypatch):
+    import test_vortex1
+    slow = 0.2
+    read_resources = test_vortex1.read_resources
+
+    def slow_read(process):
+        time.sleep(slow)
+        return read_resources(process)
+    monkeypatch.setattr(test_vortex1, "read_resources", slow_read)
+
+    async def main():
+        monitor_data = SampleBuffer(test_vortex1.MONITOR_METRICS, capacity=64)
+        task = asyncio.create_task(test_vortex1.monitor_resource(monitor_data, os.getpid(), interval=0.01))
+        lag = await max_loop_lag()
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        return lag, monitor_data
+
+    lag, monitor_data = asyncio.run(main())
+    assert lag < slow / 2
+    assert monitor_data.total >= 1
+
+
+def test_async_engine_runs_all_cases_on_simulator(harness, manager_factory):
+    test_manager = manager_factory(async_engine=True, parallel_workers=0,
+                                   simulation={"time_scale": 0.02, "instances": 2})
+    cases = harness.CSVDataReader.read_test_cases(DEFAULT_CSV)[:4]
+    threads_before = threading.active_count()
+    harness.run_test_cases(test_manager, cases)
+    results = list(harness.iter_case_results(test_manager.all_results))
+
+    assert sorted(result["用例ID"] for result in results) == [test_case["用例ID"] for test_case in cases]
+    assert test_manager.all_results["passed_cases"] == len(cases)
+    # 两个实例都领到了用例；运行结束后实例线程全部关闭
+    assert len({result["执行实例"] for result in results}) == 2
+    assert threading.active_count() <= threads_before + 1
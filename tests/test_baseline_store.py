@@ -0,0 +1,135 @@
+"""性能基线：置换检验、逐配置比较、基线存取和存入条件"""
+import numpy as np
+import pytest
+
+from baseline_store import BaselineStore, compare_runs, permutation_test, smallest_p_value
+from benchmark_vortex import DEFAULT_CSV
+
+KEY = ("pts", "启用", "", "启用", "单站", "彩图", "启用", "启用")
+OTHER = ("las", "不启用", "", "", "单站", "彩图", "启用", "启用")
+
+
+def noisy(median, count, seed, spread=0.02):
+    return list(median * (1 + np.random.default_rng(seed).normal(0, spread, count)))
+
+
+def test_permutation_test_separates_shifted_groups():
+    baseline = noisy(10.0, 8, seed=1)
+    assert permutation_test(noisy(13.0, 8, seed=2), baseline) < 0.01
+    # 同一分布时p值不小
+    assert permutation_test(noisy(10.0, 8, seed=3), baseline) > 0.1
+    # 当前组更快时单侧检验不显著
+    assert permutation_test(noisy(7.0, 8, seed=4), baseline) > 0.9
+
+
+def test_permutation_test_is_deterministic_and_bounded():
+    current, baseline = noisy(11.0, 5, seed=5), noisy(10.0, 5, seed=6)
+    p = permutation_test(current, baseline)
+    assert p == permutation_test(current, baseline)
+    assert 0 < p <= 1
+
+
+def test_smallest_p_value_depends_on_sample_counts():
+    # 中位数统计量在3对3时并列太多，最小p值约0.10，不可能小于0.05
+    assert smallest_p_value(3, 3) == pytest.approx(0.10, abs=0.02)
+    assert smallest_p_value(4, 4) == pytest.approx(0.03, abs=0.01)
+    assert smallest_p_value(1, 1) > 0.4
+    assert smallest_p_value(8, 8) < smallest_p_value(5, 5) < 0.05
+
+
+def test_compare_runs_states():
+    baseline = {KEY: noisy(10.0, 6, seed=1), OTHER: noisy(20.0, 6, seed=2)}
+    slower = {KEY: noisy(13.0, 6, seed=3), OTHER: noisy(20.0, 6, seed=4)}
+    by_config = {tuple(entry["配置"]): entry for entry in compare_runs(slower, baseline)}
+    assert by_config[KEY]["状态"] == "回归"
+    assert by_config[KEY]["检验"] == "置换检验" and by_config[KEY]["p值"] < 0.05
+    assert by_config[KEY]["变化"] == pytest.approx(0.3, abs=0.05)
+    assert by_config[OTHER]["状态"] == "持平"
+
+    faster = compare_runs({KEY: noisy(7.0, 6, seed=5)}, baseline)[0]
+    assert faster["状态"] == "改善"
+
+    new = compare_runs({("e57",) + KEY[1:]: [10.0]}, baseline)[0]
+    assert new["状态"] == "新增" and new["基线次数"] == 0
+
+
+@pytest.mark.parametrize("count", [1, 3])
+def test_compare_runs_reports_untestable_slowdown_as_inconclusive(count):
+    # 1对1和3对3时置换检验不可能显著：超过阈值的变化只报告无法判定，不计为回归
+    baseline = {KEY: noisy(10.0, count, seed=1)}
+    entry = compare_runs({KEY: noisy(13.0, count, seed=2)}, baseline)[0]
+    assert entry["状态"] == "无法判定"
+    assert entry["检验"] == "样本不足" and entry["p值"] is None
+    assert compare_runs({KEY: noisy(7.0, count, seed=3)}, baseline)[0]["状态"] == "无法判定"
+    # 阈值以内仍为持平
+    assert compare_runs({KEY: [baseline[KEY][0] * 1.05] * count}, baseline)[0]["状态"] == "持平"
+
+
+def test_compare_runs_not_significant_is_flat():
+    # 中位数变慢超过阈值，但波动很大、检验不显著
+    baseline = {KEY: [5.0, 20.0, 8.0, 15.0, 10.0]}
+    entry = compare_runs({KEY: [6.0, 21.0, 9.0, 16.0, 12.0]}, baseline)[0]
+    assert entry["变化"] > 0.1 and entry["p值"] >= 0.05
+    assert entry["状态"] == "持平"
+
+
+def test_store_round_trip_and_pinned_baseline(tmp_path):
+    with BaselineStore(str(tmp_path / "db" / "baseline.sqlite")) as store:
+        first = store.record_run({KEY: [("TC0001", 10.0), ("TC0002", 11.0)], OTHER: [("TC0003", 20.0)]},
+                                 build="2.3.1")
+        second = store.record_run({KEY: [("TC0001", 12.0)]}, build="2.3.1")
+        store.record_run({KEY: [("TC0001", 30.0)]}, build="2.3.2")
+
+        # 未指定版本时没有基线，不会退回到"最近一次运行"
+        assert store.baseline_run(None) is None
+        assert store.baseline_run("2.4.0") is None
+        # 同一版本取最近一次运行，之后存入的其他版本不影响
+        assert store.baseline_run("2.3.1")["id"] == second
+        assert store.durations(first) == {KEY: [10.0, 11.0], OTHER: [20.0]}
+
+
+def results(passed=4, failed=0, error=0):
+    return {"passed_cases": passed, "failed_cases": failed, "error_cases": error}
+
+
+CONFIG = {"ui_driver": "pywinauto", "baseline_record_simulated": False}
+
+
+def test_record_refusal(harness):
+    refusal = harness.baseline_record_refusal
+    flat = [{"状态": "持平"}, {"状态": "新增"}]
+    assert refusal(results(), CONFIG, "2.3.2", flat) is None
+    assert refusal(results(), CONFIG, None, flat) == "未指定--build"
+    assert "部分用例" in refusal(results(), CONFIG, "2.3.2", flat, partial=True)
+    assert "失败" in refusal(results(failed=1), CONFIG, "2.3.2", flat)
+    assert "失败" in refusal(results(error=1), CONFIG, "2.3.2", flat)
+    assert "失败" in refusal(results(passed=0), CONFIG, "2.3.2", [])
+    simulated = {**CONFIG, "ui_driver": "simulated"}
+    assert "模拟" in refusal(results(), simulated, "2.3.2", flat)
+    assert refusal(results(), {**simulated, "baseline_record_simulated": True}, "2.3.2", flat) is None
+
+    # 回归和无法判定都不会悄悄成为下一次的基线，promote只越过门禁，不越过不完整的运行
+    assert "回归" in refusal(results(), CONFIG, "2.3.2", flat + [{"状态": "回归"}])
+    assert "无法判定" in refusal(results(), CONFIG, "2.3.2", flat + [{"状态": "无法判定"}])
+    assert refusal(results(), CONFIG, "2.3.2", [{"状态": "回归"}], promote=True) is None
+    assert refusal(results(), CONFIG, "2.3.2", flat, partial=True, promote=True) is not None
+
+
+def test_check_regressions_compares_against_pinned_build(harness, manager_factory, tmp_path):
+    database = str(tmp_path / "baseline.sqlite")
+    test_manager = manager_factory(baseline_db=database, baseline_record_simulated=True)
+    harness.run_test_cases(test_manager, harness.CSVDataReader.read_test_cases(DEFAULT_CSV)[:2])
+
+    first = harness.check_regressions(test_manager, build="2.3.1")
+    assert first["基线"] is None and first["比较"] == []
+    assert first["本次运行"]["id"] is not None
+
+    # 未固定基线版本时不比较，也不会和刚存入的运行比较
+    assert harness.check_regressions(test_manager, build="2.3.2")["基线"] is None
+
+    test_manager.config["baseline_build"] = "2.3.1"
+    pinned = harness.check_regressions(test_manager, build="2.3.3", partial=True)
+    assert pinned["基线"]["id"] == first["本次运行"]["id"]
+    assert {entry["状态"] for entry in pinned["比较"]} == {"持平"}
+    assert pinned["回归数"] == 0 and pinned["无法判定数"] == 0
+    assert pinned["本次运行"]["id"] is None and "部分用例" in pinned["本次运行"]["未存入原因"]
@@ -0,0 +1,53 @@
+"""转换完成检测：自适应轮询的检查预算和模拟后端上的检测误差"""
+import statistics
+
+import pytest
+
+from benchmark_vortex import completion_durations, completion_trials
+from vortex_driver import PollSchedule
+from vortex_sim import SimulatedVortex
+
+
+def check_times(schedule, duration):
+    """检查本身不耗时时，等到duration所经过的各次检查时刻"""
+    times = [0.0]
+    while times[-1] < duration:
+        times.append(times[-1] + schedule.next_interval(times[-1]))
+    return times
+
+
+def test_without_expected_duration_polls_like_fixed():
+    schedule = PollSchedule(max_interval=0.5)
+    assert [schedule.next_interval(elapsed) for elapsed in (0.0, 0.5, 3.0)] == [0.5, 0.5, 0.5]
+    assert check_times(schedule, 2.2) == check_times(PollSchedule(max_interval=0.5, expected_duration=0), 2.2)
+
+
+@pytest.mark.parametrize("expected", [0.3, 1.0, 4.0, 20.0, 300.0])
+@pytest.mark.parametrize("ratio", [0.5, 0.85, 1.0, 1.15, 1.5])
+def test_checks_stay_within_fixed_budget(expected, ratio):
+    duration = expected * ratio
+    fixed = check_times(PollSchedule(max_interval=0.5), duration)
+    adaptive = check_times(PollSchedule(max_interval=0.5, expected_duration=expected), duration)
+    assert len(adaptive) <= len(fixed)
+
+
+def test_checks_are_dense_inside_band():
+    schedule = PollSchedule(max_interval=0.5, expected_duration=4.0)
+    times = check_times(schedule, 10.0)
+    inside = [t for t in times if 3.2 - 1e-9 <= t <= 4.8 + 1e-9]
+    # 区间起点和终点各检查一次，区间内间隔不超过max_interval·band_fraction
+    assert inside[0] == pytest.approx(3.2) and inside[-1] == pytest.approx(4.8)
+    assert max(b - a for a, b in zip(inside, inside[1:])) <= 0.2 + 1e-9
+    # 区间之后恢复固定间隔
+    assert schedule.next_interval(6.0) == 0.5
+
+
+def test_adaptive_polling_beats_fixed_on_simulator():
+    check_interval = 0.1
+    durations = completion_durations(0.8, 8, check_interval)
+    sim = SimulatedVortex(time_scale=1.0, latencies={"node_search": 0.0})
+    fixed = completion_trials(sim, "固定轮询", durations, check_interval, timeout=10)
+    adaptive = completion_trials(sim, "自适应轮询", durations, check_interval, timeout=10)
+
+    assert adaptive["控件树搜索"] <= fixed["控件树搜索"]
+    assert statistics.mean(adaptive["误差"]) < statistics.mean(fixed["误差"])
@@ -0,0 +1,93 @@
+"""控件缓存：命中时不再搜索控件树，窗口句柄变化时失效，缓存的控件失效时_use_control重新查找并重试"""
+import logging
+
+from vortex_driver import SelectorCache
+from vortex_sim import SimElement
+
+LAS = {"control_type": "RadioButton", "title": "las"}
+VOXEL = {"control_type": "RadioButton", "title": "体素抽稀"}
+
+
+def count_calls(driver, name):
+    """统计驱动某个方法的调用次数"""
+    calls = []
+    method = getattr(driver, name)
+
+    def counted(*args, **kwargs):
+        calls.append(args)
+        return method(*args, **kwargs)
+    setattr(driver, name, counted)
+    return calls
+
+
+def test_cache_hit_skips_lookup(export_dialog):
+    executor, open_dialog = export_dialog
+    window = open_dialog()
+    driver = executor.driver
+    cache = SelectorCache(driver)
+    snapshots, lookups = count_calls(driver, "snapshot"), count_calls(driver, "resolve_all")
+
+    # 抽稀方式在启用点云抽稀之前不在窗口中，快照里没有
+    assert cache.prefetch(window, [LAS, VOXEL]) == [VOXEL]
+    las = cache.get(**LAS)
+    assert las is not None and las.title == "las"
+
+    # 同一窗口再次绑定不重新拍快照；快照之后单独查找的控件也只查找一次
+    driver.toggle(cache.get(control_type="CheckBox", title="启用"))
+    driver.wait(driver.child(window, **VOXEL), "visible")
+    assert cache.get(**VOXEL) is None
+    voxel = cache.lookup(window, **VOXEL)
+    assert cache.prefetch(window, [LAS, VOXEL]) == []
+    assert cache.get(**VOXEL) is voxel and cache.get(**LAS) is las
+    assert len(snapshots) == 1 and len(lookups) == 1
+    assert cache.stats == {"命中": 4, "未命中": 1, "遍历": 1, "失效": 0}
+
+
+def test_new_window_handle_invalidates_entries(export_dialog):
+    executor, open_dialog = export_dialog
+    driver = executor.driver
+    cache = SelectorCache(driver)
+    first = open_dialog()
+    first_handle = driver.handle_of(first)
+    cache.prefetch(first, [LAS])
+    old = cache.get(**LAS)
+    driver.toggle(cache.get(control_type="CheckBox", title="启用"))
+    driver.wait(driver.child(first, **VOXEL), "visible")
+    cache.lookup(first, **VOXEL)
+
+    # 关闭后重新打开的导出窗口是新句柄：旧窗口的快照和单独查找的控件都不再使用
+    driver.click(cache.get(control_type="Pane", title="导出", auto_id="uiButton3"))
+    browser = driver.child(executor.dlg, title_re=".*浏览文件夹.*", control_type="Window")
+    driver.click(driver.child(browser, control_type="Button", title="取消"))
+    second = open_dialog()
+    assert driver.handle_of(second) != first_handle
+    assert cache.prefetch(second, [LAS]) == []
+    assert cache.stats["遍历"] == 2
+    new = cache.get(**LAS)
+    assert new is not old and new.parent.handle == driver.handle_of(second)
+    assert cache.get(**VOXEL) is None
+
+
+def test_stale_control_is_resolved_again(export_dialog, caplog):
+    executor, open_dialog = export_dialog
+    window = open_dialog()
+    controls = executor.session.controls
+    controls.prefetch(window, [LAS])
+    stale = controls.get(**LAS)
+
+    # 窗口句柄不变，但控件被程序重新创建：缓存的旧控件已失效
+    replacement = SimElement(stale.sim, "RadioButton", "las", group=stale.group)
+    clicks = []
+    replacement.on_click = lambda: clicks.append(replacement)
+    stale.parent.add(replacement)
+    stale.close()
+
+    with caplog.at_level(logging.WARNING):
+        executor._use_control(window, executor._wait_and_click, **LAS)
+    assert "缓存的控件已失效，重新查找" in caplog.text
+    assert controls.stats["失效"] == 1 and controls.stats["未命中"] == 1
+    # 点击落在新控件上；缓存已清空，下次绑定窗口时重新拍快照，缓存的是新控件
+    assert clicks == [replacement]
+    assert controls.get(**LAS) is None
+    assert controls.prefetch(window, [LAS]) == []
+    assert controls.get(**LAS) is replacement and controls.stats["遍历"] == 2
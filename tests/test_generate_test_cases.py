@@ -0,0 +1,80 @@
+"""测试用例生成：t元覆盖表的覆盖率、抽稀约束和命令行参数检查"""
+import itertools
+
+import pandas as pd
+import pytest
+
+from generate_all_test_cases import (FACTORS, coverage, factor_values, generate_all_test_cases,
+                                     generate_covering_test_cases, main)
+
+
+def assert_thinning_constraint(test_cases):
+    """启用点云抽稀时至少指定一种抽稀方式，不启用时不指定"""
+    for test_case in test_cases:
+        methods = [test_case["体素抽稀"], test_case["随机抽稀"]]
+        if test_case["点云抽稀"] == "启用":
+            assert "启用" in methods, test_case
+        else:
+            assert test_case["点云抽稀"] == "不启用" and methods == ["", ""], test_case
+
+
+@pytest.mark.parametrize("strength", [2, 3])
+def test_covering_table_covers_all_interactions(strength):
+    test_cases = generate_covering_test_cases(strength)
+    covered, required = coverage(test_cases, strength)
+    assert covered == required
+    # 覆盖表比完整笛卡尔积小得多
+    assert len(test_cases) < len(list(itertools.product(*FACTORS.values()))) / 4
+    assert_thinning_constraint(test_cases)
+    assert len({test_case["用例ID"] for test_case in test_cases}) == len(test_cases)
+
+
+def test_covering_table_is_reproducible():
+    assert generate_covering_test_cases(2, seed=3) == generate_covering_test_cases(2, seed=3)
+
+
+def test_full_product_satisfies_constraint(tmp_path):
+    output = tmp_path / "all.csv"
+    test_cases = generate_all_test_cases(str(output))
+    assert len(test_cases) == len(list(itertools.product(*FACTORS.values())))
+    assert_thinning_constraint(test_cases)
+    assert coverage(test_cases, len(FACTORS))[0] == len(test_cases)
+    assert len(pd.read_csv(output)) == len(test_cases)
+    # 完整笛卡尔积由FACTORS生成，与强度为因子数的覆盖表是同一组配置
+    rows = [factor_values(test_case) for test_case in test_cases]
+    assert sorted(rows) == sorted(itertools.product(*FACTORS.values()))
+    assert set(rows) == {factor_values(test_case) for test_case in generate_covering_test_cases(len(FACTORS))}
+
+
+def legacy_configurations():
+    """原生成器嵌套循环的顺序：启用抽稀时最内层依次为只体素、只随机、两种都启用"""
+    thinning = [("启用", "启用", ""), ("启用", "", "启用"), ("启用", "启用", "启用")]
+    for output_format, enabled, output_type, texture, denoise, thickness in itertools.product(
+            ["pts", "e57", "las"], ["启用", "不启用"], ["单站", "合并", "单站+合并"],
+            ["彩图", "反射率", "反射率+彩图"], ["启用", "不启用"], ["启用", "不启用"]):
+        for combo in (thinning if enabled == "启用" else [("不启用", "", "")]):
+            yield (output_format, *combo, output_type, texture, denoise, thickness)
+
+
+def test_full_product_keeps_legacy_case_ids(tmp_path):
+    test_cases = generate_all_test_cases(str(tmp_path / "all.csv"))
+    keys = ["输出格式", "点云抽稀", "体素抽稀", "随机抽稀", "输出类型", "贴图选择", "点云降噪", "点云厚度优化"]
+    # 重新生成不改变用例ID对应的配置，续跑断点和按用例ID对比的历史结果仍然有效
+    assert [tuple(test_case[key] for key in keys) for test_case in test_cases] == list(legacy_configurations())
+    assert [test_case["用例ID"] for test_case in test_cases] == [f"TC{i:04d}" for i in range(1, 433)]
+    committed = pd.read_csv("test_cases/all_test_cases_complete.csv", dtype=str, keep_default_na=False)
+    assert committed.to_dict("records") == test_cases[:len(committed)]
+
+
+@pytest.mark.parametrize("strength", ["0", "7"])
+def test_invalid_strength_is_a_usage_error(strength, capsys):
+    with pytest.raises(SystemExit) as exit_info:
+        main(["--mode", "covering", "--strength", strength])
+    assert exit_info.value.code == 2
+    assert "--strength" in capsys.readouterr().err
+
+
+def test_covering_command_writes_csv(tmp_path):
+    output = tmp_path / "covering.csv"
+    test_cases = main(["--mode", "covering", "--strength", "2", "--output", str(output)])
+    assert len(pd.read_csv(output)) == len(test_cases)
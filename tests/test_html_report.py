@@ -0,0 +1,177 @@
+"""HTML报告：用例详情以JSON嵌入页面，解析后与结果一致，特殊字符不会提前结束脚本块"""
+import json
+import re
+from html.parser import HTMLParser
+
+import pytest
+
+from benchmark_vortex import synthetic_result
+from result_journal import ResultJournal
+
+HOSTILE = '</script><script>alert("x")</script><!--<script> & </SCRIPT >'
+
+
+class EmbeddedData(HTMLParser):
+    """按id收集type="application/json"的脚本块内容，以及页面中的元素id、onclick处理器、元素和单元格文本"""
+    def __init__(self):
+        super().__init__()
+        self.blocks = {}
+        self.ids = set()
+        self.handlers = []
+        self.tags = []
+        self.cells = []
+        self._current = None
+        self._cell = None
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        self.tags.append(tag)
+        if "id" in attrs:
+            self.ids.add(attrs["id"])
+        if "onclick" in attrs:
+            self.handlers.append(attrs["onclick"])
+        if tag == "script" and attrs.get("type") == "application/json":
+            self._current = attrs["id"]
+            self.blocks[self._current] = ""
+        if tag == "td":
+            self._cell = ""
+
+    def handle_data(self, data):
+        if self._current:
+            self.blocks[self._current] += data
+        elif self._cell is not None:
+            self._cell += data
+
+    def handle_endtag(self, tag):
+        if tag == "script":
+            self._current = None
+        if tag == "td" and self._cell is not None:
+            self.cells.append(self._cell)
+            self._cell = None
+
+
+@pytest.fixture
+def report(harness, tmp_path, monkeypatch):
+    """把结果写入日志并生成HTML报告，返回(结果, 嵌入的数据)"""
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "reports").mkdir()
+
+    def generate(results):
+        with ResultJournal("reports/results.jsonl") as journal:
+            for result in results:
+                journal.append(result)
+        all_results = {"total_cases": len(results), "passed_cases": len(results), "failed_cases": 0,
+                       "error_cases": 0, "start_time": "2026-01-01T00:00:00", "end_time": "2026-01-01T01:00:00",
+                       "total_duration": 3600.0, "journal": journal.path}
+        path = harness.DataDrivenTestReporter.generate_html_report(all_results)
+        parser = EmbeddedData()
+        with open(path, encoding="utf-8") as f:
+            html = f.read()
+        parser.feed(html)
+        return html, parser
+    return generate
+
+
+def test_embedded_json_round_trips(report):
+    results = [synthetic_result(i) for i in range(5)]
+    html, parser = report(results)
+    assert len(parser.blocks) == len(results)
+    for index, result in enumerate(results):
+        case_id = result["用例ID"]
+        details_id = f"{case_id}_{index}"
+        data = json.loads(parser.blocks[f"data-{details_id}"])
+        # 展开时渲染的容器和按钮都在页面中，详情内容不在初始DOM中
+        assert {f"details-{details_id}", f"button-{details_id}"} <= parser.ids
+        assert dict(data["details"])["用例ID"] == case_id
+        assert dict(data["details"])["备注"] == result["配置"]["备注"]
+        assert data["steps"] == [[step["步骤"], step["状态"], step["详情"], step["时间"]] for step in result["步骤"]]
+        assert data["phases"] == [[phase["阶段"], phase["开始"], phase["耗时"], phase["不确定度"]]
+                                  for phase in result["阶段"]]
+        assert data["error"] is None
+    assert "<li><strong>" not in html.split("<body>", 1)[1]
+
+
+def test_script_terminators_are_escaped(report):
+    result = synthetic_result(0)
+    result["配置"]["备注"] = HOSTILE
+    result["错误信息"] = HOSTILE
+    result["步骤"][0]["详情"] = HOSTILE
+    result["用例ID"] = result["配置"]["用例ID"] = "TC 1.2"
+    html, parser = report([result, synthetic_result(1)])
+
+    # 两个数据块都完整解析：恶意内容没有提前结束第一个脚本块，也没有开启新的脚本
+    assert set(parser.blocks) == {"data-TC_1_2_0", "data-TC00002_1"}
+    raw = parser.blocks["data-TC_1_2_0"]
+    assert "<" not in raw
+    data = json.loads(raw)
+    assert data["error"] == HOSTILE
+    assert data["steps"][0][2] == HOSTILE
+    assert dict(data["details"])["备注"] == HOSTILE
+    assert json.loads(parser.blocks["data-TC00002_1"])["details"][0] == ["用例ID", "TC00002"]
+    assert 'alert("x")' not in html.replace(raw, "")
+
+
+def test_case_cells_and_handlers_are_escaped(report):
+    hostile_id = "TC1#2');alert('x');//"
+    markup = '<img src=x onerror="alert(1)">'
+    result = synthetic_result(0)
+    result["用例ID"] = result["配置"]["用例ID"] = hostile_id
+    result["配置"]["输出类型"] = markup
+    result["配置"]["贴图选择"] = markup
+    html, parser = report([result, synthetic_result(1)])
+
+    # 用例ID和配置值作为文本出现在单元格中，没有变成元素
+    assert "img" not in parser.tags
+    assert hostile_id in parser.cells and markup in parser.cells
+    assert markup[:10] + "..." in parser.cells
+    # DOM id和onclick参数只含字母数字和下划线
+    case_id = re.sub(r"\W", "_", hostile_id) + "_0"
+    assert {f"details-{case_id}", f"button-{case_id}", f"data-{case_id}"} <= parser.ids
+    assert f"toggleDetails('{case_id}')" in parser.handlers
+    assert all(re.fullmatch(r"toggleDetails\('\w+'\)", handler) for handler in parser.handlers
+               if handler.startswith("toggleDetails"))
+    assert dict(json.loads(parser.blocks[f"data-{case_id}"])["details"])["用例ID"] == hostile_id
+
+
+def test_details_ids_are_unique_when_sanitised_ids_collide(report):
+    results = [synthetic_result(0), synthetic_result(1)]
+    results[0]["用例ID"] = results[0]["配置"]["用例ID"] = "TC1#1"
+    results[1]["用例ID"] = results[1]["配置"]["用例ID"] = "TC1_1"
+    html, parser = report(results)
+
+    # 两个用例ID替换后都是TC1_1；每个按钮打开自己的数据块
+    handlers = [handler for handler in parser.handlers if handler.startswith("toggleDetails")]
+    assert len(set(handlers)) == 2
+    for handler, result in zip(handlers, results):
+        details_id = re.fullmatch(r"toggleDetails\('(\w+)'\)", handler).group(1)
+        assert dict(json.loads(parser.blocks[f"data-{details_id}"])["details"])["用例ID"] == result["用例ID"]
+
+
+def parse(page):
+    parser = EmbeddedData()
+    parser.feed(page)
+    return parser
+
+
+def test_summary_sections_escape_labels(harness):
+    markup = '<img src=x onerror="alert(1)">'
+    key = ("pts", "启用", markup, "", "单站", "彩图", "启用", "启用")
+    label = harness.config_label(key)
+    regression = {
+        "基线": {"id": 1, "build": markup, "created": "2026-01-01"}, "基线版本": markup,
+        "本次运行": {"id": None, "build": None, "未存入原因": "模拟后端的运行"},
+        "阈值": 0.1, "回归数": 1, "无法判定数": 0,
+        "比较": [{"配置": key, "状态": "回归", "变化": 0.5, "基线中位数": 10.0, "p值": 0.01, "检验": "置换",
+                  "基线次数": 3, "当前中位数": 15.0, "次数": 3}],
+    }
+    quality = [{"配置": key, "次数": 1, "点数": 1000, "缩减比例": 0.5, "点间距": 0.01, "离群比例": 0.001,
+                "厚度": 0.002, "转换耗时": 12.0}]
+    loads = {markup: {"用例数": 1, "CPU密集": 1, "IO密集": 0, "未饱和": 0, "写入MB/s": 1.0, "CPU核数": 1.0}}
+    reporter = harness.DataDrivenTestReporter
+    for section, text in [(reporter._html_regression_section(regression), label),
+                          (reporter._html_quality_section(quality), label),
+                          (reporter._html_load_table(loads), markup)]:
+        # CSV和命令行中的取值作为文本出现在单元格中，没有变成元素
+        parser = parse(section)
+        assert "img" not in parser.tags
+        assert text in parser.cells
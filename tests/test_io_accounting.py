@@ -0,0 +1,76 @@
+"""IO统计与负载分类：对写文件、计算和空等三种本地进程采样并检查分类"""
+import subprocess
+import sys
+import time
+
+import pytest
+
+from benchmark_vortex import DEFAULT_CSV, SYNTHETIC_LOAD, exports_to
+from output_watcher import folder_size
+from resource_sampler import ResourceSampler
+
+SIZE_MB = 200
+SECONDS = 1.5
+
+
+def run_load(harness, kind, folder):
+    """运行一个合成负载进程，返回IO统计（吞吐按进程开始到输出done的时间计算）"""
+    process = subprocess.Popen([sys.executable, "-c", SYNTHETIC_LOAD, kind, folder, str(SIZE_MB), str(SECONDS)],
+                               stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+    try:
+        sampler = ResourceSampler(process.pid, interval=0.05).start()
+        start = time.perf_counter()
+        assert process.stdout.readline().strip() == "done"
+        seconds = time.perf_counter() - start
+        usage = sampler.stop()
+    finally:
+        process.stdin.close()
+        process.wait(10)
+    return harness.io_accounting(usage, folder_size(folder), seconds)
+
+
+@pytest.mark.skipif(not ResourceSampler.available(), reason="需要psutil")
+def test_writer_process_is_io_bound(harness, tmp_path):
+    accounting = run_load(harness, "写文件", str(tmp_path))
+    assert accounting["负载类型"] == "IO密集", accounting
+    assert accounting["输出MB"] == pytest.approx(SIZE_MB * 1.048576, rel=0.01)
+    assert accounting["CPU核数"] < 0.75
+
+
+@pytest.mark.skipif(not ResourceSampler.available(), reason="需要psutil")
+def test_compute_process_is_cpu_bound(harness, tmp_path):
+    accounting = run_load(harness, "计算", str(tmp_path))
+    assert accounting["负载类型"] == "CPU密集", accounting
+    assert accounting["CPU核数"] >= 0.75
+    assert accounting["写入MB/s"] < 50
+
+
+@pytest.mark.skipif(not ResourceSampler.available(), reason="需要psutil")
+def test_idle_process_is_unsaturated(harness, tmp_path):
+    accounting = run_load(harness, "空等", str(tmp_path))
+    assert accounting["负载类型"] == "未饱和", accounting
+
+
+def test_classification_thresholds(harness):
+    # CPU优先于IO：同时满足时按CPU密集
+    assert harness.io_accounting({"CPU秒": 9.0, "写入MB": 900.0}, 0, 10.0)["负载类型"] == "CPU密集"
+    # IO等待占比和吞吐任一达到阈值即为IO密集
+    assert harness.io_accounting({"CPU秒": 1.0, "IO等待秒": 3.0}, 0, 10.0)["负载类型"] == "IO密集"
+    assert harness.io_accounting({"CPU秒": 1.0}, int(600e6), 10.0)["负载类型"] == "IO密集"
+    # 没有IO计数的平台（macOS）只按输出文件夹大小计算
+    accounting = harness.io_accounting({"CPU秒": 1.0}, int(100e6), 10.0)
+    assert accounting["负载类型"] == "未饱和"
+    assert accounting["读取MB"] is None and accounting["写入MB/s"] == 10.0
+
+
+@pytest.mark.skipif(not ResourceSampler.available(), reason="需要psutil")
+def test_executor_counts_the_folder_on_the_clicked_drive(harness, manager_factory, tmp_path):
+    # 不开启输出监视时，输出大小取自所点击盘符下的输出文件夹
+    test_manager = manager_factory(resource_sample_interval=0.02,
+                                   **exports_to(str(tmp_path / "outputs"), time_scale=0.02, artifact_points=3000))
+    harness.run_test_cases(test_manager, harness.CSVDataReader.read_test_cases(DEFAULT_CSV)[:2])
+
+    for result in harness.iter_case_results(test_manager.all_results):
+        written = folder_size(str(tmp_path / "outputs" / result["输出文件夹"]))
+        assert written > 0
+        assert result["IO统计"]["输出MB"] == round(written / 1e6, 3)
@@ -0,0 +1,109 @@
+"""输出文件夹监视：用写文件子进程的实际时刻和字节数检验inotify和轮询两种方式"""
+import json
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+from benchmark_vortex import DEFAULT_CSV, exports_to
+from output_watcher import Inotify, OutputWatcher
+
+# 分块写入，每块flush后记录时刻，最后一块写完立即关闭；输出各时刻（perf_counter，Linux上各进程共用同一时钟）和字节数
+WRITER = """
+import json, os, sys, time
+path, pieces, piece_bytes, gap = sys.argv[1], int(sys.argv[2]), int(sys.argv[3]), float(sys.argv[4])
+block = os.urandom(piece_bytes)
+times = {}
+with open(path, "wb") as f:
+    for index in range(pieces):
+        f.write(block)
+        f.flush()
+        now = time.perf_counter()
+        times.setdefault("首字节", now)
+        times["最后写入"] = now
+        if index < pieces - 1:
+            time.sleep(gap)
+times["关闭"] = time.perf_counter()
+times["字节数"] = os.path.getsize(path)
+print(json.dumps(times), flush=True)
+"""
+
+INTERVAL = 0.05
+STABLE_TIME = 0.3
+PIECES, PIECE_BYTES, GAP = 10, 256 * 1024, 0.05
+
+METHODS = [pytest.param(True, id="inotify",
+                        marks=pytest.mark.skipif(not Inotify.available(), reason="需要Linux inotify")),
+           pytest.param(False, id="轮询")]
+
+
+@pytest.mark.parametrize("use_inotify", METHODS)
+def test_watcher_matches_writer(tmp_path, use_inotify):
+    folder = str(tmp_path)
+    writer = subprocess.Popen([sys.executable, "-c", WRITER, os.path.join(folder, "out.bin"),
+                               str(PIECES), str(PIECE_BYTES), str(GAP)], stdout=subprocess.PIPE, text=True)
+    watcher = OutputWatcher(folder, interval=INTERVAL, stable_time=STABLE_TIME, pid=writer.pid,
+                            use_inotify=use_inotify).start()
+    try:
+        written = json.loads(writer.communicate(timeout=30)[0])
+        assert watcher.wait_final(STABLE_TIME + 5)
+    finally:
+        watch = watcher.stop()
+        if writer.poll() is None:
+            writer.kill()
+
+    def moment(key):
+        return watcher.started + watch[key]
+
+    # 轮询方式最多晚一个间隔发现；inotify在事件到达时记录。另留出调度延迟
+    slack = INTERVAL + 0.1
+    assert watch["方式"] == ("inotify" if use_inotify else "轮询")
+    assert watch["字节数"] == written["字节数"] == PIECES * PIECE_BYTES
+    assert watch["文件数"] == 1
+    assert written["首字节"] - 0.01 <= moment("首字节") <= written["首字节"] + slack
+    assert written["最后写入"] - 0.01 <= moment("最后写入") <= written["关闭"] + slack
+    # 完成时刻取最后一次写入或关闭，不是判定稳定的时刻（那要再晚stable_time）
+    assert written["最后写入"] - 0.01 <= moment("完成") <= written["关闭"] + slack
+    if use_inotify:
+        assert written["最后写入"] - 0.01 <= moment("关闭") <= written["关闭"] + slack
+    # 平均速率按首字节到最后写入计算
+    nominal = PIECES * PIECE_BYTES / 1e6 / (written["最后写入"] - written["首字节"])
+    assert watch["平均MB/s"] == pytest.approx(nominal, rel=0.5)
+
+
+@pytest.mark.parametrize("use_inotify", METHODS)
+def test_watcher_reports_stall_while_file_is_open(tmp_path, use_inotify):
+    path = tmp_path / "out.bin"
+    watcher = OutputWatcher(str(tmp_path), interval=INTERVAL, stable_time=STABLE_TIME, pid=os.getpid(),
+                            use_inotify=use_inotify).start()
+    # 等监视线程添加好inotify监视；之前已打开的文件只能靠扫描发现，看不到句柄
+    time.sleep(0.2)
+    try:
+        with open(path, "wb") as f:
+            f.write(b"x" * 1000)
+            f.flush()
+            time.sleep(0.6)
+            # 文件仍然打开，大小不再增长：判定停止增长，但没有写完
+            assert watcher.stalled(0.3)
+            assert not watcher.wait_final(0)
+    finally:
+        watch = watcher.stop()
+    assert watch["字节数"] == 1000
+
+
+def test_executor_watches_the_folder_on_the_clicked_drive(harness, manager_factory, tmp_path):
+    test_manager = manager_factory(output_watch=True, output_watch_interval=0.02, output_stable_time=0.1,
+                                   output_final_wait=2.0,
+                                   **exports_to(str(tmp_path / "outputs"), time_scale=0.02,
+                                                artifact_points=3000, stream_output=True))
+    harness.run_test_cases(test_manager, harness.CSVDataReader.read_test_cases(DEFAULT_CSV)[:2])
+
+    for result in harness.iter_case_results(test_manager.all_results):
+        folder = tmp_path / "outputs" / result["输出文件夹"]
+        watch = result["输出监视"]
+        # 监视的是模拟后端实际写出的文件夹：首字节、写完时刻和字节数都来自这次转换
+        assert watch["首字节"] is not None and watch["完成"] is not None
+        assert watch["字节数"] == sum(path.stat().st_size for path in folder.iterdir())
+        assert 0 <= watch["首字节"] <= watch["完成"] <= result["转换耗时"]
@@ -0,0 +1,111 @@
+"""阶段计时：按外部确定的时刻切换阶段，偏移、耗时和不确定度的记录，以及模拟后端上的阶段瀑布"""
+import time
+
+import pytest
+
+from benchmark_vortex import DEFAULT_CSV
+from phase_timer import PHASE_COLORS, PhaseTimer, perf_ns
+
+SECOND = 1_000_000_000
+
+
+def at(timer, seconds):
+    """相对计时器创建时刻的perf_counter_ns"""
+    return timer.origin_ns + int(seconds * SECOND)
+
+
+def test_phases_switch_at_given_instants():
+    timer = PhaseTimer()
+    assert timer.current is None and timer.end() is None
+
+    assert timer.begin("连接", at_ns=at(timer, 0.5)) == at(timer, 0.5)
+    timer.begin("转换", at_ns=at(timer, 1.25))
+    assert timer.current == "转换"
+    # 成功窗口出现时刻早于检测到的时刻：转换在出现时结束，检测阶段覆盖检测延迟
+    timer.begin("检测", at_ns=at(timer, 3.0))
+    timer.set_uncertainty("转换", 0.0125)
+    timer.begin("关闭", at_ns=at(timer, 3.0125))
+    assert timer.end(at(timer, 3.5)) == at(timer, 3.5)
+    assert timer.current is None
+
+    assert timer.phases() == [
+        {"阶段": "连接", "开始": 0.5, "耗时": 0.75, "不确定度": None},
+        {"阶段": "转换", "开始": 1.25, "耗时": 1.75, "不确定度": 0.0125},
+        {"阶段": "检测", "开始": 3.0, "耗时": 0.0125, "不确定度": None},
+        {"阶段": "关闭", "开始": 3.0125, "耗时": 0.4875, "不确定度": None},
+    ]
+    assert timer.duration("转换") == pytest.approx(1.75)
+    assert timer.duration("校验") is None
+
+
+def test_repeated_phases_and_uncertainty_bookkeeping():
+    timer = PhaseTimer()
+    timer.begin("配置", at_ns=at(timer, 0.0))
+    timer.begin("转换", at_ns=at(timer, 1.0))
+    timer.begin("配置", at_ns=at(timer, 2.0))
+    timer.set_uncertainty("配置", 0.1)
+    timer.begin("转换", at_ns=at(timer, 2.5))
+    # 未结束的阶段不出现在结果中，也不计入耗时
+    assert [phase["阶段"] for phase in timer.phases()] == ["配置", "转换", "配置"]
+    assert timer.duration("转换") == pytest.approx(1.0)
+
+    timer.end(at(timer, 4.0))
+    # 同名阶段分别列出，耗时累加；不确定度只记在最近一次
+    assert timer.durations() == {"配置": 1.5, "转换": 2.5}
+    assert [phase["不确定度"] for phase in timer.phases()] == [None, None, 0.1, None]
+    # 没有该阶段时忽略
+    timer.set_uncertainty("分析", 1.0)
+    assert all(phase["不确定度"] != 1.0 for phase in timer.phases())
+
+
+def test_end_before_start_is_clamped():
+    timer = PhaseTimer()
+    timer.begin("检测", at_ns=at(timer, 2.0))
+    # 外部时刻早于阶段开始（例如两个时钟读数的先后颠倒）时耗时记为0，不为负
+    timer.begin("关闭", at_ns=at(timer, 1.9))
+    timer.end(at(timer, 2.5))
+    assert [phase["耗时"] for phase in timer.phases()] == [0.0, 0.6]
+
+
+def test_default_instants_use_perf_counter():
+    before = time.perf_counter()
+    timer = PhaseTimer()
+    timer.begin("连接")
+    time.sleep(0.02)
+    timer.end()
+    after = time.perf_counter()
+    # perf_counter与perf_counter_ns是同一时钟，换算后可以混用
+    assert perf_ns(before) <= timer.origin_ns <= perf_ns(after)
+    (phase,) = timer.phases()
+    assert 0.02 <= phase["耗时"] <= after - before
+    assert phase["开始"] >= 0.0
+
+
+def test_simulator_phase_waterfall(harness, manager_factory):
+    test_manager = manager_factory()
+    cases = harness.CSVDataReader.read_test_cases(DEFAULT_CSV)[:3]
+    harness.run_test_cases(test_manager, cases)
+    results = list(harness.iter_case_results(test_manager.all_results))
+    conversions = {conversion["文件夹"]: conversion for conversion in test_manager.driver.sim.instances[0].conversions}
+
+    assert test_manager.all_results["passed_cases"] == len(cases)
+    for result in results:
+        phases = result["阶段"]
+        names = [phase["阶段"] for phase in phases]
+        assert names[-3:] == ["转换", "检测", "关闭"]
+        assert set(names) <= set(PHASE_COLORS)
+        # 阶段首尾相接
+        for previous, phase in zip(phases, phases[1:]):
+            assert phase["开始"] == pytest.approx(previous["开始"] + previous["耗时"], abs=1e-5)
+
+        by_name = {phase["阶段"]: phase for phase in phases}
+        conversion = conversions[result["输出文件夹"]]
+        # 转换阶段在成功窗口出现的时刻结束，与执行器记录的转换耗时一致
+        assert by_name["转换"]["耗时"] == pytest.approx(result["转换耗时"], abs=1e-5)
+        assert by_name["转换"]["耗时"] == pytest.approx(conversion["结束"] - conversion["开始"], abs=0.03)
+        # 检测阶段就是结束时刻的不确定度
+        delay = result["完成检测"]["检测延迟"]
+        assert by_name["转换"]["不确定度"] == pytest.approx(delay, abs=1e-4)
+        assert by_name["检测"]["耗时"] == pytest.approx(delay, abs=1e-4)
+        assert result["阶段耗时"] == {name: pytest.approx(sum(p["耗时"] for p in phases if p["阶段"] == name))
+                                  for name in names}
@@ -0,0 +1,143 @@
+"""点云质量指标：已知密度和噪声的合成点云上的点间距、体素占用、离群比例和表面厚度"""
+import numpy as np
+import pytest
+
+import point_metrics
+from point_metrics import VoxelAccumulator, analyze_points, fit_planes, occupancy_histogram
+from vortex_sim import scene_points
+
+SIDE = 4.0
+
+
+def plane(count, noise=0.0, outliers=0.0, seed=0):
+    """SIDE×SIDE米的z=0平面上均匀随机（泊松）分布的点，z方向正态噪声，outliers比例的点随机偏移±0.5米"""
+    rng = np.random.default_rng(seed)
+    points = np.column_stack([rng.uniform(0.0, SIDE, count), rng.uniform(0.0, SIDE, count),
+                              rng.normal(0.0, noise, count)])
+    moved = rng.random(count) < outliers
+    points[moved] += rng.uniform(-0.5, 0.5, size=(int(moved.sum()), 3))
+    return points
+
+
+def chunked(points, size=7000):
+    return lambda: (points[start:start + size] for start in range(0, len(points), size))
+
+
+def poisson_median_spacing(density):
+    """平面泊松点过程的最近邻距离分布 P(d>r) = exp(-πλr²)，中位数为 sqrt(ln2/(πλ))"""
+    return np.sqrt(np.log(2) / (np.pi * density))
+
+
+def occupied_mean(mean):
+    """泊松分布在非空体素上的平均点数：空体素不计入占用体素"""
+    return mean / (1 - np.exp(-mean))
+
+
+def test_spacing_and_occupancy_follow_density():
+    count = 40000
+    points = plane(count)
+    metrics = analyze_points(chunked(points))
+    density = count / SIDE ** 2
+    assert metrics["点数"] == count
+    assert metrics["点间距"]["中位数"] == pytest.approx(poisson_median_spacing(density), rel=0.05)
+    # 平面恰在一层体素内，每个5厘米体素中的点数服从均值λ·0.05²的泊松分布（边缘体素不满）
+    assert metrics["每体素点数"] == pytest.approx(occupied_mean(density * 0.05 ** 2), rel=0.05)
+    assert sum(metrics["体素占用直方图"].values()) == metrics["占用体素"]
+    # 没有离群点时只有泊松间距的尾部超过3倍中位数：P = exp(-9·ln2) = 2^-9
+    assert metrics["离群比例"] == pytest.approx(2.0 ** -9, abs=0.002)
+    assert metrics["厚度"]["中位数"] == pytest.approx(0.0, abs=1e-9)
+
+    # 随机抽稀一半：点间距增大为√2倍，密度减半
+    thinned = analyze_points(chunked(points[np.random.default_rng(1).random(count) < 0.5]))
+    assert thinned["点间距"]["中位数"] / metrics["点间距"]["中位数"] == pytest.approx(np.sqrt(2), rel=0.05)
+    assert thinned["每体素点数"] == pytest.approx(occupied_mean(density / 2 * 0.05 ** 2), rel=0.05)
+
+
+@pytest.mark.parametrize("noise", [0.002, 0.005])
+def test_thickness_measures_surface_noise(noise):
+    metrics = analyze_points(chunked(plane(40000, noise)))
+    assert metrics["厚度"]["中位数"] == pytest.approx(noise, rel=0.1)
+    assert metrics["离群比例"] < 0.003
+
+
+def test_outliers_are_counted_and_trimmed_from_thickness():
+    metrics = analyze_points(chunked(plane(40000, 0.005, outliers=0.02)))
+    # 偏移±0.5米的点远离平面，几乎全部被计为离群点
+    assert metrics["离群比例"] == pytest.approx(0.02, abs=0.006)
+    # 第二遍去除离群点后厚度仍接近表面噪声
+    assert metrics["厚度"]["中位数"] == pytest.approx(0.005, rel=0.2)
+
+
+def test_scene_settings_change_metrics():
+    count = 60000
+    base = analyze_points(chunked(scene_points(count, {})))
+    thin = analyze_points(chunked(scene_points(count, {"点云厚度优化": "启用"})))
+    denoised = analyze_points(chunked(scene_points(count, {"点云降噪": "启用"})))
+    random = scene_points(count, {"启用": "启用", "抽稀方式": "随机抽稀"})
+    thinned = analyze_points(chunked(random))
+
+    # 表面噪声5毫米 → 2毫米
+    assert base["厚度"]["中位数"] == pytest.approx(0.005, rel=0.15)
+    assert thin["厚度"]["中位数"] == pytest.approx(0.002, rel=0.15)
+    # 离群点2% → 0.2%（另有泊松间距尾部约0.2%）
+    assert base["离群比例"] > 3 * denoised["离群比例"]
+    assert denoised["离群比例"] < 0.006
+    assert thinned["点数"] == len(random) == pytest.approx(count / 2, rel=0.02)
+    assert thinned["点间距"]["中位数"] / base["点间距"]["中位数"] == pytest.approx(np.sqrt(2), rel=0.1)
+
+
+def test_grid_nearest_matches_brute_force(monkeypatch):
+    monkeypatch.setattr(point_metrics, "cKDTree", None)
+    rng = np.random.default_rng(3)
+    # 稠密的平面加上远离平面的孤立点：孤立点需要放大格子重查
+    points = np.concatenate([plane(3000, 0.002, seed=3), rng.uniform(5.0, 50.0, size=(20, 3))])
+    points = points[rng.permutation(len(points))]
+    sample_ids = rng.choice(len(points), 300, replace=False)
+    sample_ids = np.union1d(sample_ids, np.flatnonzero(points[:, 0] >= 5.0))
+
+    spacing = point_metrics._nearest_spacing(chunked(points, 700), points[sample_ids], sample_ids, 0.05)
+    distances = np.linalg.norm(points[sample_ids, None] - points[None], axis=2)
+    distances[np.arange(len(sample_ids)), sample_ids] = np.inf
+    assert np.sort(spacing) == pytest.approx(np.sort(distances.min(axis=1)))
+
+
+def test_voxel_accumulator_and_plane_fit():
+    rng = np.random.default_rng(4)
+    count, noise = 20000, 0.003
+    xy = rng.uniform(0.0, 1.0, size=(count, 2))
+    z = 0.2 + 0.3 * xy[:, 0] + 0.1 * xy[:, 1] + rng.normal(0.0, noise, count)
+    points = np.column_stack([xy, z])
+
+    accumulator = VoxelAccumulator(1.0, np.zeros(3), moments=True)
+    for start in range(0, count, 3000):
+        accumulator.add(points[start:start + 3000])
+    keys, moments = accumulator.result()
+    assert len(keys) == 1 and moments[0, 0] == count
+    assert moments[0, 1:4] == pytest.approx(points.sum(axis=0))
+
+    _, centroids, normals, sigma = fit_planes(keys, moments)
+    expected = np.array([-0.3, -0.1, 1.0]) / np.linalg.norm([-0.3, -0.1, 1.0])
+    assert abs(normals[0] @ expected) == pytest.approx(1.0, abs=1e-4)
+    # z方向的噪声沿法向投影
+    assert sigma[0] == pytest.approx(noise * expected[2], rel=0.05)
+    assert centroids[0] == pytest.approx(points.mean(axis=0))
+
+    # 分块累加的点数与一次统计相同
+    counts = VoxelAccumulator(0.1, np.zeros(3))
+    for start in range(0, count, 3000):
+        counts.add(points[start:start + 3000])
+    _, values = counts.result()
+    cells = np.unique(np.floor(points / 0.1).astype(np.int64), axis=0, return_counts=True)[1]
+    assert sorted(values[:, 0]) == sorted(cells)
+
+
+def test_occupancy_histogram():
+    assert occupancy_histogram(np.array([1, 2, 3, 4, 5, 8, 9, 1])) == {"1": 2, "2": 1, "3-4": 2, "5-8": 2, "9-16": 1}
+    assert occupancy_histogram(np.array([])) == {}
+
+
+def test_too_few_points():
+    for points in (np.empty((0, 3)), np.zeros((1, 3))):
+        metrics = analyze_points(lambda: iter([np.empty((0, 3)), points]))
+        assert metrics["点数"] == len(points)
+        assert metrics["点间距"] is None and metrics["厚度"] is None and metrics["离群比例"] is None
@@ -0,0 +1,150 @@
+"""进度看板：快照的计数和预计剩余时间，以及线程和asyncio两种服务在模拟运行中返回的实时状态"""
+import json
+import shutil
+import subprocess
+import time
+import urllib.error
+import urllib.request
+
+import pytest
+
+from benchmark_vortex import DEFAULT_CSV
+from progress_server import AsyncProgressServer, ProgressServer, RunProgress, current_worker, render
+
+
+def as_worker(name, action, *args, **kwargs):
+    """以name工作者的身份调用RunProgress的方法"""
+    token = current_worker.set(name)
+    try:
+        return action(*args, **kwargs)
+    finally:
+        current_worker.reset(token)
+
+
+def test_snapshot_counts_and_eta():
+    progress = RunProgress()
+    progress.start_run(10, workers=2)
+    for status, seconds in [("通过", 10.0), ("失败", 20.0), ("超时", None)]:
+        as_worker("w1", progress.start_case, "TC")
+        as_worker("w1", progress.finish_case, {"状态": status, "转换耗时": seconds})
+    as_worker("w2", progress.start_case, "TC0004")
+    as_worker("w2", progress.update, 步骤="监控转换过程", 转换开始=time.perf_counter() - 5.0, 进程=1234)
+
+    snapshot = progress.snapshot()
+    # 未知状态计为错误；没有转换耗时的结果不计入平均
+    assert snapshot["计数"] == {"完成": 3, "通过": 1, "失败": 1, "错误": 1}
+    assert snapshot["平均转换耗时"] == 15.0
+    running = snapshot["实例"]["w2"]
+    assert running["用例ID"] == "TC0004" and running["步骤"] == "监控转换过程" and running["进程"] == 1234
+    assert running["转换已耗时"] == pytest.approx(5.0, abs=0.2)
+    assert snapshot["实例"]["w1"]["用例ID"] is None
+    # 6个未开始的用例各15秒，进行中的还剩约10秒，由2个实例分摊
+    assert snapshot["预计剩余"] == pytest.approx((6 * 15.0 + 10.0) / 2, abs=0.2)
+    assert progress.processes() == {"w2": 1234}
+    json.dumps(snapshot, ensure_ascii=False)
+
+
+def test_render_routes():
+    progress = RunProgress()
+    content_type, body = render(progress, "/status.json?t=1")
+    assert content_type.startswith("application/json") and json.loads(body)["总用例"] == 0
+    assert render(progress, "/")[0].startswith("text/html")
+    assert b"status.json" in render(progress, "/index.html")[1]
+    assert render(progress, "/missing") is None
+
+
+def fetch(url):
+    with urllib.request.urlopen(url, timeout=5) as response:
+        assert response.headers["Cache-Control"] == "no-store"
+        return json.loads(response.read().decode("utf-8"))
+
+
+@pytest.fixture
+def server_urls(monkeypatch):
+    """运行中启动的看板地址"""
+    urls = []
+    original, original_async = ProgressServer.start, AsyncProgressServer.start
+
+    def start(self):
+        original(self)
+        urls.append(self.url)
+        return self
+
+    async def start_async(self, tasks):
+        await original_async(self, tasks)
+        urls.append(self.url)
+        return self
+    monkeypatch.setattr(ProgressServer, "start", start)
+    monkeypatch.setattr(AsyncProgressServer, "start", start_async)
+    return urls
+
+
+@pytest.mark.parametrize("async_engine", [False, True])
+def test_status_endpoint_reports_live_counts(harness, manager_factory, server_urls, monkeypatch, async_engine):
+    cases = harness.CSVDataReader.read_test_cases(DEFAULT_CSV)[:3]
+    test_manager = manager_factory(progress_server=True, progress_port=0, async_engine=async_engine)
+    snapshots = []
+    original = harness.record_result
+
+    def record(test_manager, executor, success):
+        # 在记录结果前后各请求一次/status.json
+        (url,) = server_urls
+        before = fetch(url + "status.json")
+        original(test_manager, executor, success)
+        snapshots.append((executor.result["用例ID"], before, fetch(url + "status.json")))
+    monkeypatch.setattr(harness, "record_result", record)
+
+    harness.run_test_cases(test_manager, cases)
+    assert test_manager.all_results["passed_cases"] == len(cases)
+    assert len(snapshots) == len(cases)
+    for done, (case_id, before, after) in enumerate(snapshots):
+        # 记录前当前用例仍在执行，记录后计数加一
+        assert case_id in [worker["用例ID"] for worker in before["实例"].values()]
+        assert before["计数"]["完成"] == done and after["计数"]["完成"] == done + 1
+        assert after["计数"]["通过"] == done + 1
+        assert after["总用例"] == len(cases)
+        assert after["平均转换耗时"] > 0 and after["预计剩余"] is not None
+    assert snapshots[-1][2]["预计剩余"] == 0
+
+    # 运行结束后看板关闭
+    with pytest.raises(urllib.error.URLError):
+        urllib.request.urlopen(server_urls[0] + "status.json", timeout=2)
+
+
+DOM_STUB = """
+function element(tag) {
+    return {tag: tag, children: [], textContent: '', innerHTML: '',
+            appendChild: function(child) { this.children.push(child); },
+            replaceChildren: function() { this.children = Array.prototype.slice.call(arguments); }};
+}
+var elements = {summary: element('div'), workers: element('tbody')};
+var document = {getElementById: function(id) { return elements[id]; }, createElement: element};
+var data = JSON.parse(process.argv[2]);
+function fetch() { return Promise.resolve({json: function() { return data; }}); }
+function setInterval() {}
+"""
+
+
+@pytest.mark.skipif(shutil.which("node") is None, reason="需要node执行看板脚本")
+def test_dashboard_writes_worker_fields_as_text(tmp_path):
+    progress = RunProgress()
+    progress.start_run(1)
+    name = "<img src=x onerror=alert(1)>"
+    as_worker(name, progress.start_case, "<b>TC0001</b>")
+    as_worker(name, progress.update, 步骤="</script><script>alert(1)</script>")
+    page = render(progress, "/")[1].decode("utf-8")
+    script = page.split("<script>")[1].split("</script>")[0]
+    (tmp_path / "dashboard.js").write_text(
+        DOM_STUB + script + "\nsetTimeout(function() { console.log(JSON.stringify(elements.workers)); }, 0);\n",
+        encoding="utf-8")
+    status = render(progress, "/status.json")[1].decode("utf-8")
+    output = subprocess.run(["node", str(tmp_path / "dashboard.js"), status],
+                            capture_output=True, text=True, timeout=10, check=True).stdout
+    workers = json.loads(output)
+
+    assert workers["innerHTML"] == ""
+    [row] = workers["children"]
+    # 实例名、用例ID和步骤原样作为单元格文本，不会被解析成标签
+    assert [cell["textContent"] for cell in row["children"][:3]] == [
+        name, "<b>TC0001</b>", "</script><script>alert(1)</script>"]
+    assert all(cell["tag"] == "td" and not cell["children"] for cell in row["children"])
@@ -0,0 +1,85 @@
+"""资源采样：对已知负载的本地进程采样，以及SampleBuffer的合并和环形覆盖"""
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+from resource_sampler import ResourceSampler, SampleBuffer
+
+# 先分配并写满MEMORY_MB的内存，输出一行后单线程空转SPIN秒，再等待标准输入关闭后退出
+MEMORY_MB = 200
+SPIN = 1.5
+WORKLOAD = f"""
+import sys, time
+block = bytearray({MEMORY_MB} * 1024 * 1024)
+for i in range(0, len(block), 4096):
+    block[i] = 1
+print("ready", flush=True)
+end = time.perf_counter() + {SPIN}
+while time.perf_counter() < end:
+    pass
+print("done", flush=True)
+sys.stdin.read()
+"""
+
+
+@pytest.mark.skipif(not ResourceSampler.available(), reason="需要psutil")
+def test_sampler_peak_and_mean_of_dummy_process():
+    process = subprocess.Popen([sys.executable, "-c", WORKLOAD],
+                               stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+    try:
+        assert process.stdout.readline().strip() == "ready"
+        sampler = ResourceSampler(process.pid, interval=0.05).start()
+        assert process.stdout.readline().strip() == "done"
+        summary = sampler.stop()
+    finally:
+        process.stdin.close()
+        process.wait(10)
+
+    # 内存：分配的块加解释器本身（几十MB以内）
+    assert MEMORY_MB <= summary["内存MB"]["峰值"] < MEMORY_MB + 80
+    assert MEMORY_MB <= summary["内存MB"]["平均"] <= summary["内存MB"]["峰值"]
+    # CPU：一个线程空转，平均接近一个核（单核机器上与采样线程分时，留出余量）
+    assert 60 <= summary["CPU%"]["平均"] <= 110
+    assert summary["CPU%"]["峰值"] >= summary["CPU%"]["平均"]
+    assert summary["CPU秒"] == pytest.approx(SPIN, rel=0.3)
+    # 按截止时刻排程，采样次数接近 空转时间/间隔
+    assert SPIN / 0.05 * 0.6 <= summary["采样次数"] <= SPIN / 0.05 * 1.2
+    assert summary["线程"]["峰值"] >= 1
+
+
+def test_compact_buffer_keeps_extremes_and_mean():
+    buffer = SampleBuffer(["值"], capacity=8, mode="compact")
+    for i in range(100):
+        buffer.append([float(i)], timestamp=buffer.start_perf + i)
+
+    assert buffer.total == 100
+    assert len(buffer) <= 8
+    # 每次合并容量减半、每桶样本数翻倍：8 -> 16 -> ... 直到100个样本能放进8个桶
+    assert buffer.bucket_size == 16
+    assert buffer.summary() == {"值": {"峰值": 99.0, "平均": 49.5}}
+
+    frame = buffer.to_frame()
+    assert frame["samples"].sum() == 100
+    assert frame["值_min"].min() == 0.0 and frame["值_max"].max() == 99.0
+    # 桶按时间顺序排列，桶内平均值等于对应区间的平均
+    assert np.all(np.diff(frame["elapsed_time(s)"]) > 0)
+    assert frame["值"].iloc[0] == pytest.approx(7.5)
+
+
+def test_ring_buffer_keeps_latest_samples():
+    buffer = SampleBuffer(["值"], capacity=8, mode="ring")
+    for i in range(100):
+        buffer.append([float(i)], timestamp=buffer.start_perf + i)
+
+    assert len(buffer) == 8
+    assert buffer.summary() == {"值": {"峰值": 99.0, "平均": 95.5}}
+    assert list(buffer.to_frame()["值"]) == [float(i) for i in range(92, 100)]
+
+
+def test_missing_metric_is_left_out_of_summary():
+    buffer = SampleBuffer(["CPU%", "句柄"], capacity=4)
+    buffer.append([10.0, None])
+    buffer.append([30.0, None])
+    assert buffer.summary() == {"CPU%": {"峰值": 30.0, "平均": 20.0}}
@@ -0,0 +1,123 @@
+"""结果日志：不完整的最后一行、fsync分批、按用例ID取最后一条，以及从日志流式生成报告"""
+import csv
+import types
+
+import pytest
+
+import result_journal
+from benchmark_vortex import synthetic_result
+from result_journal import ResultJournal, read_journal, read_latest
+
+
+@pytest.fixture
+def fsyncs(monkeypatch):
+    """记录fsync次数（不实际同步）"""
+    calls = []
+    monkeypatch.setattr(result_journal.os, "fsync", lambda fd: calls.append(fd))
+    return calls
+
+
+def test_torn_trailing_line_is_skipped_and_terminated(tmp_path, caplog):
+    path = str(tmp_path / "results.jsonl")
+    with ResultJournal(path) as journal:
+        journal.append({"用例ID": "TC0001"})
+        journal.append({"用例ID": "TC0002"})
+    # 崩溃时最后一条只写了一半
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"用例ID": "TC00')
+
+    assert [record["用例ID"] for record in read_journal(path)] == ["TC0001", "TC0002"]
+    assert "第3行" in caplog.text
+    # 同一日志再次读取时不重复提示
+    caplog.clear()
+    list(read_journal(path))
+    assert "第3行" not in caplog.text
+
+    # 续写时先结束半行，新记录不会与之连在一起
+    with ResultJournal(path) as journal:
+        journal.append({"用例ID": "TC0003"})
+    assert [record["用例ID"] for record in read_journal(path)] == ["TC0001", "TC0002", "TC0003"]
+
+
+def test_blank_lines_are_ignored(tmp_path):
+    path = tmp_path / "results.jsonl"
+    path.write_text('{"用例ID": "TC0001"}\n\n   \n{"用例ID": "TC0002"}\n', encoding="utf-8")
+    assert [record["用例ID"] for record in read_journal(str(path))] == ["TC0001", "TC0002"]
+
+
+def test_fsync_after_every_n_records(tmp_path, fsyncs):
+    journal = ResultJournal(str(tmp_path / "results.jsonl"), fsync_every=3, fsync_interval=3600)
+    for i in range(7):
+        journal.append({"用例ID": f"TC{i:04d}"})
+    assert len(fsyncs) == 2
+    # 关闭时同步剩下的一条；没有未同步的记录时不再fsync
+    journal.close()
+    assert len(fsyncs) == 3
+    assert journal.count == 7
+
+
+def test_fsync_after_interval(tmp_path, fsyncs, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(result_journal, "time", types.SimpleNamespace(monotonic=lambda: now[0]))
+    journal = ResultJournal(str(tmp_path / "results.jsonl"), fsync_every=100, fsync_interval=5.0)
+    journal.append({"用例ID": "TC0001"})
+    now[0] += 4.9
+    journal.append({"用例ID": "TC0002"})
+    assert fsyncs == []
+    now[0] += 0.2
+    journal.append({"用例ID": "TC0003"})
+    assert len(fsyncs) == 1
+    # 计时从上次同步重新开始
+    now[0] += 4.0
+    journal.append({"用例ID": "TC0004"})
+    assert len(fsyncs) == 1
+    journal.sync()
+    journal.sync()
+    assert len(fsyncs) == 2
+    journal.close()
+    assert len(fsyncs) == 2
+
+
+def test_read_latest_keeps_last_record_per_id(tmp_path):
+    path = str(tmp_path / "results.jsonl")
+    with ResultJournal(path) as journal:
+        for record in [{"用例ID": "TC0001", "状态": "失败"}, {"用例ID": "TC0002", "状态": "通过"},
+                       {"用例ID": "TC0003", "状态": "错误"}, {"用例ID": "TC0001", "状态": "通过"},
+                       {"用例ID": "TC0003", "状态": "失败"}]:
+            journal.append(record)
+
+    latest = list(read_latest(path))
+    # 续跑或重跑的结果覆盖之前的结果；输出按最后一次出现的位置排序
+    assert [(record["用例ID"], record["状态"]) for record in latest] == [
+        ("TC0002", "通过"), ("TC0001", "通过"), ("TC0003", "失败")]
+    assert [record["状态"] for record in read_latest(path, key="状态")] == ["错误", "通过", "失败"]
+
+
+def test_reports_stream_from_journal(harness, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "reports").mkdir()
+    count = 40
+    with ResultJournal("reports/results.jsonl") as journal:
+        for i in range(count):
+            journal.append(synthetic_result(i))
+        # 第一个用例重跑后通过
+        journal.append({**synthetic_result(0), "状态": "通过", "转换耗时": 12.5})
+    all_results = {"total_cases": count, "passed_cases": count, "failed_cases": 0, "error_cases": 0,
+                   "start_time": "2026-01-01T00:00:00", "end_time": "2026-01-01T01:00:00",
+                   "total_duration": 3600.0, "journal": journal.path}
+
+    # 结果逐条从日志读取，不一次载入内存
+    results = harness.iter_case_results(all_results)
+    assert not isinstance(results, list)
+    assert next(iter(results))["用例ID"] == "TC00002"
+
+    reporter = harness.DataDrivenTestReporter()
+    with open(reporter.generate_csv_summary(all_results), encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    assert len(rows) == count
+    first = next(row for row in rows if row["用例ID"] == "TC00001")
+    assert first["状态"] == "通过" and first["转换耗时(秒)"] == "12.50"
+
+    with open(reporter.generate_html_report(all_results), encoding="utf-8") as f:
+        html = f.read()
+    assert all(f"TC{i + 1:05d}" in html for i in range(count))
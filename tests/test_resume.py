@@ -0,0 +1,156 @@
+"""断点续跑和重跑失败用例：在模拟后端上通过main运行，检查跳过、重跑的用例和合并后的报告"""
+import csv
+import glob
+import json
+import os
+
+import pytest
+
+from benchmark_vortex import DEFAULT_CSV
+
+CASES = 4
+
+
+@pytest.fixture
+def run_dir(harness, tmp_path, monkeypatch):
+    """临时工作目录，其中有前CASES个用例的CSV"""
+    monkeypatch.chdir(tmp_path)
+    with open(DEFAULT_CSV, encoding="utf-8-sig", newline="") as f:
+        lines = f.read().splitlines()
+    (tmp_path / "cases.csv").write_text("\n".join(lines[:CASES + 1]) + "\n", encoding="utf-8")
+    return tmp_path
+
+
+def write_config(run_dir, **overrides):
+    config = {"ui_driver": "simulated", "simulation": {"time_scale": 0.02}, "check_interval": 0.01,
+              "csv_file": str(run_dir / "cases.csv"), **overrides}
+    (run_dir / "test_config.json").write_text(json.dumps(config, ensure_ascii=False), encoding="utf-8")
+
+
+@pytest.fixture
+def executed(harness, monkeypatch):
+    """每次main运行中执行过的用例ID"""
+    runs = []
+    original = harness.record_result
+
+    def record(test_manager, executor, success):
+        runs[-1].append(executor.result["用例ID"])
+        original(test_manager, executor, success)
+
+    monkeypatch.setattr(harness, "record_result", record)
+    return runs
+
+
+def main(harness, executed, *argv):
+    executed.append([])
+    return harness.main(["--config", "test_config.json", *argv])
+
+
+def latest_summary():
+    """最近生成的汇总CSV：{用例ID: 状态}"""
+    path = max(glob.glob(os.path.join("reports", "test_summary_*.csv")), key=os.path.getmtime)
+    with open(path, encoding="utf-8") as f:
+        return {row["用例ID"]: row["状态"] for row in csv.DictReader(f)}
+
+
+def case_ids(run_dir):
+    with open(run_dir / "cases.csv", encoding="utf-8") as f:
+        return [row["用例ID"] for row in csv.DictReader(f)]
+
+
+def test_resume_skips_finished_cases(harness, run_dir, executed, monkeypatch):
+    write_config(run_dir)
+    original = harness.record_result
+
+    def interrupt_after_two(test_manager, executor, success):
+        original(test_manager, executor, success)
+        if len(executed[-1]) == 2:
+            raise KeyboardInterrupt
+    monkeypatch.setattr(harness, "record_result", interrupt_after_two)
+
+    # 第一次运行在第2个用例记录后被中断，断点中只有这两个用例
+    with pytest.raises(KeyboardInterrupt):
+        main(harness, executed)
+    first = executed[0]
+    checkpoint = harness.RunCheckpoint.load(os.path.join("reports", "checkpoint.json"))
+    assert set(checkpoint.cases) == set(first) and len(first) == 2
+
+    monkeypatch.setattr(harness, "record_result", original)
+    assert main(harness, executed, "--resume") == 0
+    # 续跑只执行剩下的用例，结果追加到同一个日志，报告包含全部用例
+    assert sorted(first + executed[1]) == case_ids(run_dir)
+    assert not set(first) & set(executed[1])
+    assert latest_summary() == {case_id: "通过" for case_id in case_ids(run_dir)}
+    journal = list(harness.read_journal(checkpoint.journal))
+    assert len(journal) == CASES
+
+
+def test_checkpoint_never_gets_ahead_of_the_journal(harness, run_dir, executed, monkeypatch):
+    write_config(run_dir)
+    fsync, synced = os.fsync, {}
+
+    def record_fsync(fd):
+        fsync(fd)
+        status = os.fstat(fd)
+        synced[status.st_ino] = status.st_size
+
+    original = harness.RunCheckpoint.record
+    lagging = []
+
+    def record(checkpoint, result):
+        # 断点记下用例时，该用例的结果必须已经同步到磁盘上的日志
+        status = os.stat(checkpoint.journal)
+        if synced.get(status.st_ino) != status.st_size:
+            lagging.append(result["用例ID"])
+        original(checkpoint, result)
+
+    monkeypatch.setattr(os, "fsync", record_fsync)
+    monkeypatch.setattr(harness.RunCheckpoint, "record", record)
+    assert main(harness, executed) == 0
+    assert len(executed[0]) == CASES and lagging == []
+
+
+def run_with_failure(harness, run_dir, executed):
+    """第2个转换卡住、超时失败，其余通过"""
+    write_config(run_dir, timeout=1, simulation={"time_scale": 0.02, "hang_conversions": [2]})
+    assert main(harness, executed) == 0
+    statuses = latest_summary()
+    failed = [case_id for case_id, status in statuses.items() if status != "通过"]
+    assert len(failed) == 1
+    write_config(run_dir)
+    return failed
+
+
+def test_rerun_failed_from_journal(harness, run_dir, executed):
+    failed = run_with_failure(harness, run_dir, executed)
+    journal = glob.glob(os.path.join("reports", "results_*.jsonl"))[0]
+
+    assert main(harness, executed, "--rerun-failed", journal) == 0
+    # 只重跑失败的用例，重跑结果追加到原日志，报告以最后一次结果为准
+    assert executed[1] == failed
+    assert len(list(harness.read_journal(journal))) == CASES + 1
+    assert latest_summary() == {case_id: "通过" for case_id in case_ids(run_dir)}
+
+
+def test_rerun_failed_from_summary_csv(harness, run_dir, executed):
+    failed = run_with_failure(harness, run_dir, executed)
+    summary = max(glob.glob(os.path.join("reports", "test_summary_*.csv")), key=os.path.getmtime)
+    # 只有汇总CSV，没有之前的结果日志
+    for journal in glob.glob(os.path.join("reports", "results_*.jsonl")):
+        os.remove(journal)
+    os.rename(summary, "previous_summary.csv")
+
+    assert main(harness, executed, "--rerun-failed", "previous_summary.csv") == 0
+    assert executed[1] == failed
+    # 汇总CSV中的结果先写入新日志，与重跑结果合并成一份报告
+    journal = glob.glob(os.path.join("reports", "results_*.jsonl"))
+    assert len(journal) == 1
+    records = list(harness.read_journal(journal[0]))
+    assert len(records) == CASES + 1 and records[-1]["用例ID"] == failed[0]
+    assert latest_summary() == {case_id: "通过" for case_id in case_ids(run_dir)}
+
+
+def test_rerun_failed_with_unreadable_source(harness, run_dir, executed):
+    write_config(run_dir)
+    assert main(harness, executed, "--rerun-failed", "missing.jsonl") == 2
+    assert executed[0] == []
@@ -0,0 +1,147 @@
+"""转换耗时模型：在已知主效应和交互效应的合成数据上拟合，汇总CSV读取，以及含NaN的排序和LPT分片"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from runtime_model import RuntimeModel, all_configurations, load_summaries, longest_first, shard
+
+BASE = 60.0
+FORMAT = {"pts": 0.0, "e57": 20.0, "las": 8.0}
+THINNING = {"点云抽稀": {"不启用": 0.0, "启用": 5.0}}
+TEXTURE = {"彩图": 0.0, "反射率": 3.0, "反射率+彩图": 6.0}
+# e57且单站+合并时额外耗时
+INTERACTION = 15.0
+
+
+def true_seconds(frame):
+    seconds = BASE + frame["输出格式"].map(FORMAT) + frame["点云抽稀"].map(THINNING["点云抽稀"]) \
+        + frame["贴图选择"].map(TEXTURE)
+    return seconds + INTERACTION * ((frame["输出格式"] == "e57") & (frame["输出类型"] == "单站+合并"))
+
+
+def synthetic_results(repeats=3, noise=0.01, seed=0):
+    """完整组合每个配置repeats次，耗时带乘性噪声"""
+    configurations = all_configurations()
+    frame = pd.concat([configurations] * repeats, ignore_index=True)
+    rng = np.random.default_rng(seed)
+    frame["转换耗时"] = true_seconds(frame) * (1 + rng.normal(0, noise, len(frame)))
+    frame["用例ID"] = [f"TC{i:05d}" for i in range(len(frame))]
+    return frame
+
+
+def test_recovers_main_and_interaction_effects():
+    model = RuntimeModel().fit(synthetic_results())
+    configurations = all_configurations()
+    # 岭回归使系数略向0收缩
+    assert model.predict(configurations) == pytest.approx(true_seconds(configurations).to_numpy(), rel=0.03)
+    assert model.score()["R2"] > 0.99 and model.score()["配置数"] == len(configurations)
+
+    costs = model.marginal_costs().set_index(["参数", "取值"])["边际耗时(秒)"]
+    # 其余参数保持历史分布：e57的边际耗时包含三分之一概率的交互效应
+    assert costs["输出格式", "e57"] == pytest.approx(FORMAT["e57"] + INTERACTION / 3, abs=0.5)
+    assert costs["输出格式", "las"] == pytest.approx(FORMAT["las"], abs=0.5)
+    assert costs["贴图选择", "反射率+彩图"] == pytest.approx(TEXTURE["反射率+彩图"], abs=0.5)
+    assert costs["点云降噪"].max() == pytest.approx(0.0, abs=0.5)
+    assert costs["输出类型", "单站+合并"] == pytest.approx(INTERACTION / 3, abs=0.5)
+
+
+def test_main_effects_model_misses_interaction():
+    frame = synthetic_results()
+    additive = RuntimeModel(interactions=False).fit(frame)
+    full = RuntimeModel().fit(frame)
+    assert additive.score()["RMSE"] > 3 * full.score()["RMSE"]
+
+
+def test_untested_configurations_are_extrapolated():
+    frame = synthetic_results(repeats=2)
+    # 历史中没有las
+    model = RuntimeModel().fit(frame[frame["输出格式"] != "las"])
+    untested = model.untested()
+    assert set(untested["输出格式"]) == {"las"}
+    assert len(untested) == len(all_configurations()) // 3
+    # las的哑变量没有样本，系数为0：预测与参照取值pts相同，每个配置与其余5个参数的组合都是外推
+    assert (untested["外推"] == 5).all()
+    assert untested["预测耗时"].to_numpy() == pytest.approx(true_seconds(untested).to_numpy() - FORMAT["las"],
+                                                          rel=0.03)
+    # FACTORS以外的取值无法预测
+    assert np.isnan(model.predict(untested.assign(输出格式="ply"))).all()
+
+    # 缺少e57与单站+合并的组合：交互系数为0，预测退化为主效应之和
+    missing = (frame["输出格式"] == "e57") & (frame["输出类型"] == "单站+合并")
+    model = RuntimeModel().fit(frame[~missing])
+    untested = model.untested()
+    assert len(untested) == missing.sum() // 2
+    assert (untested["外推"] == 1).all()
+    assert untested["预测耗时"].to_numpy() == pytest.approx(true_seconds(untested).to_numpy() - INTERACTION,
+                                                          rel=0.03)
+
+
+def test_anomalies_flag_outlier():
+    frame = synthetic_results()
+    frame.loc[7, "转换耗时"] *= 3
+    model = RuntimeModel().fit(frame)
+    anomalies = model.anomalies()
+    # 异常结果排在最前，偏离远大于同配置其他结果受它牵连产生的残差
+    assert anomalies["用例ID"].iloc[0] == frame.loc[7, "用例ID"]
+    assert anomalies["稳健z"].iloc[0] > 5 * anomalies["稳健z"].iloc[1:].abs().max()
+    assert len(anomalies) < len(frame) * 0.05
+    # 没有异常结果时只有正态噪声的尾部接近阈值
+    assert RuntimeModel().fit(synthetic_results()).anomalies(threshold=5.0).empty
+
+
+def test_fit_ignores_invalid_rows():
+    frame = synthetic_results(repeats=1)
+    frame.loc[0, "体素抽稀"] = "启用"
+    frame.loc[0, "点云抽稀"] = "不启用"
+    frame.loc[1, "转换耗时"] = np.nan
+    model = RuntimeModel().fit(frame)
+    assert model.score()["结果数"] == len(frame) - 2
+    with pytest.raises(ValueError):
+        RuntimeModel().fit(frame.iloc[:2])
+
+
+def test_load_summaries_keeps_passed_unique_results(tmp_path):
+    configurations = all_configurations().iloc[:3]
+    rows = []
+    for i, (_, config) in enumerate(configurations.iterrows()):
+        rows.append({"用例ID": f"TC{i}", **config, "状态": "通过", "转换耗时(秒)": f"{10 + i:.2f}",
+                     "开始时间": f"2026-01-01T00:0{i}:00", "备注": "x"})
+    rows.append({**rows[0], "用例ID": "TC9", "状态": "失败", "转换耗时(秒)": "N/A"})
+    first = tmp_path / "test_summary_1.csv"
+    second = tmp_path / "test_summary_2.csv"
+    pd.DataFrame(rows).to_csv(first, index=False, encoding="utf-8")
+    # 重跑后合并的汇总包含相同的结果
+    pd.DataFrame(rows[:2]).to_csv(second, index=False, encoding="utf-8")
+
+    frame = load_summaries([str(first), str(second)])
+    assert sorted(frame["用例ID"]) == ["TC0", "TC1", "TC2"]
+    assert frame["转换耗时"].tolist() == [10.0, 11.0, 12.0]
+    assert load_summaries([]).empty
+
+
+def test_longest_first_puts_unknown_durations_first():
+    assert longest_first([5.0, np.nan, 9.0, 1.0]) == [1, 2, 0, 3]
+    assert longest_first([np.nan, np.nan]) == [0, 1]
+
+
+def test_shard_with_nan():
+    parts, totals = shard([10.0, np.nan, 5.0, 3.0, 2.0], 2)
+    # 未知耗时按已知最大值10计
+    assert sorted(index for part in parts for index in part) == [0, 1, 2, 3, 4]
+    assert sorted(totals) == [15.0, 15.0]
+    assert np.isfinite(totals).all()
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_lpt_shards_are_balanced(seed):
+    durations = np.random.default_rng(seed).lognormal(np.log(80), 0.5, 200)
+    shards = 4
+    parts, totals = shard(durations, shards)
+    assert sorted(index for part in parts for index in part) == list(range(len(durations)))
+    assert totals == pytest.approx([durations[part].sum() for part in parts], abs=1e-3)
+    # LPT：最长一份与平均值之差不超过最长的单个用例
+    assert max(totals) - durations.sum() / shards <= durations.max()
+    assert (max(totals) - min(totals)) / np.mean(totals) < 0.05
+    # 份内从长到短
+    for part in parts:
+        assert list(durations[part]) == sorted(durations[part], reverse=True)
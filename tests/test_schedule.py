@@ -0,0 +1,91 @@
+"""用例重排与导出设置复用：需要操作的设置、重排是排列且不增加点击，以及记住设置时只点击变化的控件"""
+import itertools
+import random
+
+import pytest
+
+from benchmark_vortex import expected_export_settings
+from generate_all_test_cases import FACTORS, make_test_case
+
+
+@pytest.fixture(scope="module")
+def test_cases():
+    """完整笛卡尔积的全部用例"""
+    return [make_test_case(i + 1, row, "") for i, row in enumerate(itertools.product(*FACTORS.values()))]
+
+
+def case(**values):
+    base = {"用例ID": "TC", "输出格式": "pts", "点云抽稀": "不启用", "体素抽稀": "", "随机抽稀": "",
+            "输出类型": "单站", "贴图选择": "彩图", "点云降噪": "不启用", "点云厚度优化": "不启用"}
+    return {**base, **values}
+
+
+def test_changed_settings(harness):
+    plain = harness.dialog_settings(case())
+    thinned = harness.dialog_settings(case(点云抽稀="启用", 体素抽稀="启用", 随机抽稀="启用", 点云降噪="启用"))
+
+    # 新窗口：单选每次都点，复选框只勾选需要启用的
+    assert harness.changed_settings(plain, None) == ["输出格式", "输出类型", "贴图选择"]
+    assert harness.changed_settings(thinned, None) == ["输出格式", "输出类型", "贴图选择",
+                                                        "点云抽稀", "点云降噪", "抽稀方式"]
+    assert harness.settings_clicks(thinned) == 3 + 2 + 2
+    # 设置相同时不操作任何控件
+    assert harness.changed_settings(thinned, thinned) == []
+    # 只切换变化的控件；关闭抽稀时不再点击抽稀方式
+    assert harness.changed_settings(plain, thinned) == ["点云抽稀", "点云降噪"]
+    voxel = harness.dialog_settings(case(点云抽稀="启用", 体素抽稀="启用", 点云降噪="启用"))
+    assert harness.changed_settings(voxel, thinned) == ["抽稀方式"]
+    assert harness.settings_clicks(voxel, thinned) == 1
+
+
+def test_schedule_is_a_permutation(harness, test_cases):
+    ordered = harness.schedule_test_cases(test_cases)
+    assert len(ordered) == len(test_cases)
+    assert sorted(id(test_case) for test_case in ordered) == sorted(id(test_case) for test_case in test_cases)
+    assert harness.schedule_test_cases(test_cases) == ordered
+    assert harness.schedule_test_cases([]) == []
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_schedule_does_not_increase_clicks(harness, test_cases, seed):
+    shuffled = random.Random(seed).sample(test_cases, 40)
+    ordered = harness.schedule_test_cases(shuffled)
+    assert harness.sequence_clicks(ordered, persistent=True) <= harness.sequence_clicks(shuffled, persistent=True)
+    # 不记住设置时每个用例都从新窗口开始，顺序不影响点击数
+    assert harness.sequence_clicks(ordered, persistent=False) == harness.sequence_clicks(shuffled, persistent=False)
+
+
+def record_config_clicks(driver):
+    """记录点击和切换的单选按钮/复选框"""
+    clicked = []
+    for name in ("click", "toggle"):
+        method = getattr(driver, name)
+
+        def recorded(element, method=method):
+            control = driver._resolve(element)
+            if control.control_type in ("RadioButton", "CheckBox"):
+                clicked.append(control.title)
+            return method(element)
+        setattr(driver, name, recorded)
+    return clicked
+
+
+@pytest.mark.parametrize("persistent", [False, True])
+def test_persisted_dialog_clicks_only_changed_controls(harness, manager_factory, test_cases, persistent):
+    cases = harness.schedule_test_cases(random.Random(0).sample(test_cases, 12))
+    test_manager = manager_factory(persist_dialog_state=persistent,
+                                   simulation={"time_scale": 0.02, "persist_dialog_state": persistent})
+    clicked = record_config_clicks(test_manager.driver)
+    harness.run_test_cases(test_manager, cases)
+    results = list(harness.iter_case_results(test_manager.all_results))
+
+    assert test_manager.all_results["passed_cases"] == len(cases)
+    # 实际点击的控件数等于按设置差异计算的点击数，记住设置时明显更少
+    expected = harness.sequence_clicks(cases, persistent)
+    assert len(clicked) == expected == sum(result["配置点击"]["点击"] for result in results)
+    if persistent:
+        assert expected < harness.sequence_clicks(cases, persistent=False)
+    # 少点击不影响导出设置
+    conversions = test_manager.driver.sim.instances[0].conversions
+    for test_case, conversion in zip(cases, conversions):
+        assert conversion["设置"] == expected_export_settings(test_case)
@@ -0,0 +1,159 @@
+"""在模拟后端上运行完整流程：导出设置和转换耗时、会话复用、多实例并行"""
+import time
+
+import pytest
+
+from benchmark_vortex import DEFAULT_CSV, expected_export_settings, exports_to
+
+
+def read_cases(harness, count):
+    return harness.CSVDataReader.read_test_cases(DEFAULT_CSV)[:count]
+
+
+def count_calls(driver, name):
+    """统计驱动某个方法的调用次数"""
+    calls = []
+    method = getattr(driver, name)
+
+    def counted(*args, **kwargs):
+        calls.append(args)
+        return method(*args, **kwargs)
+    setattr(driver, name, counted)
+    return calls
+
+
+def test_simulated_pipeline_applies_case_settings(harness, manager_factory):
+    test_manager = manager_factory()
+    cases = read_cases(harness, 6)
+    harness.run_test_cases(test_manager, cases)
+    results = list(harness.iter_case_results(test_manager.all_results))
+    sim = test_manager.driver.sim
+    conversions = {conversion["文件夹"]: conversion for conversion in sim.instances[0].conversions}
+
+    assert test_manager.all_results["passed_cases"] == len(cases)
+    for test_case, result in zip(cases, results):
+        assert result["用例ID"] == test_case["用例ID"]
+        conversion = conversions[result["输出文件夹"]]
+        # 模拟窗口中最终的控件状态就是用例要求的导出设置
+        assert conversion["设置"] == expected_export_settings(test_case)
+        # 转换耗时由设置决定（没有随机波动），执行器测得的耗时与之相符
+        expected = sim.conversion_time(conversion["设置"])
+        assert conversion["结束"] - conversion["开始"] == pytest.approx(expected)
+        assert result["转换耗时"] == pytest.approx(expected, abs=0.03)
+        assert set(result["步骤耗时"]) >= {"连接VORTEX", "配置导出设置", "监控转换过程"}
+
+
+@pytest.mark.parametrize("base, letter", [("F:\\", "F"), ("D:\\", "D"), ("d:/", "D")])
+def test_output_drive_follows_output_base_dir(harness, manager_factory, base, letter):
+    test_manager = manager_factory(output_base_dir=base)
+    assert harness.output_drive(test_manager.config) == letter
+    harness.run_test_cases(test_manager, read_cases(harness, 1))
+
+    # 浏览文件夹窗口中点击的是output_base_dir所在的盘符
+    assert test_manager.all_results["passed_cases"] == 1
+    assert test_manager.driver.sim.instances[0].conversions[0]["盘符"] == letter
+
+
+@pytest.mark.parametrize("overrides, message", [
+    ({"output_base_dir": "F:\\exports"}, "盘符根目录"),
+    ({"output_base_dir": "F:\\", "output_drive": "D"}, "不一致"),
+    ({"output_base_dir": "/tmp/exports"}, "output_drive"),
+])
+def test_output_drive_rejects_unreachable_paths(harness, overrides, message):
+    with pytest.raises(ValueError, match=message):
+        harness.output_drive(overrides)
+
+
+def test_output_drive_names_the_drive_of_a_local_directory(harness):
+    # 本地目录（模拟后端映射的盘）由output_drive指明代表的盘符
+    assert harness.output_drive({"output_base_dir": "/tmp/exports", "output_drive": "f:"}) == "F"
+
+
+def test_session_is_reused_across_cases(harness, manager_factory):
+    test_manager = manager_factory()
+    connects = count_calls(test_manager.driver, "connect")
+    harness.run_test_cases(test_manager, read_cases(harness, 5))
+    results = list(harness.iter_case_results(test_manager.all_results))
+
+    assert [result["状态"] for result in results] == ["通过"] * 5
+    # 整个运行只连接一次主窗口；之后每个用例只做存活检查
+    assert len(connects) == 1
+    assert test_manager.all_results["会话统计"]["新建"] == 2
+    assert test_manager.all_results["会话统计"]["复用"] == 2 * 4
+    assert test_manager.all_results["会话统计"]["重连"] == 0
+    for index, result in enumerate(results):
+        expected = "新建" if index == 0 else "复用"
+        assert result["会话"]["主窗口"]["模式"] == expected
+        assert result["会话"]["目标窗口"]["模式"] == expected
+
+
+def test_session_reconnects_only_when_window_is_lost(manager_factory):
+    session = manager_factory().session
+    connects = count_calls(session.driver, "connect")
+    assert session.ensure_main_window()["模式"] == "新建"
+    assert session.ensure_target_window()["模式"] == "新建"
+    assert session.ensure_main_window()["模式"] == "复用"
+    assert len(connects) == 1
+
+    # 缓存的主窗口句柄失效（例如VORTEX重启）时重新连接，目标窗口随之重新定位
+    session.hwnd = 0xDEAD
+    assert session.ensure_main_window()["模式"] == "重连"
+    assert session.ensure_target_window()["模式"] == "重连"
+    assert len(connects) == 2
+    assert session.stats["复用"] == 1 and session.stats["重连"] == 2
+
+
+def test_parallel_instances_keep_their_own_outputs(harness, manager_factory, tmp_path):
+    output_dir = str(tmp_path / "outputs")
+    test_manager = manager_factory(parallel_workers=0, **exports_to(output_dir, time_scale=0.02, instances=4))
+    cases = read_cases(harness, 8)
+    harness.run_test_cases(test_manager, cases)
+    results = list(harness.iter_case_results(test_manager.all_results))
+
+    # 结果按完成顺序合并，每个用例恰好一条
+    assert sorted(result["用例ID"] for result in results) == [test_case["用例ID"] for test_case in cases]
+    assert test_manager.all_results["passed_cases"] == len(cases)
+    folders = [result["输出文件夹"] for result in results]
+    assert len(set(folders)) == len(folders)
+    for instance in test_manager.driver.sim.instances:
+        handled = {result["输出文件夹"] for result in results if result["执行实例"] == hex(instance.main.handle)}
+        # 每个实例都领到了用例，结果中记录的实例就是实际执行转换的实例
+        assert handled
+        assert handled == {conversion["文件夹"] for conversion in instance.conversions}
+    for result in results:
+        files = sorted((tmp_path / "outputs" / result["输出文件夹"]).iterdir())
+        assert [path.suffix for path in files] == [f".{result['配置']['输出格式']}"]
+    # 每个实例一个会话，各自只新建一次
+    assert test_manager.all_results["会话统计"]["新建"] == 2 * 4
+
+
+def run_suite(harness, manager_factory, name, instances, **overrides):
+    """运行同一批用例，返回总耗时和各用例结果"""
+    test_manager = manager_factory(name=name, parallel_workers=0,
+                                   simulation={"time_scale": 0.02, "instances": instances}, **overrides)
+    cases = read_cases(harness, 8)
+    start = time.perf_counter()
+    harness.run_test_cases(test_manager, cases)
+    elapsed = time.perf_counter() - start
+    assert test_manager.all_results["passed_cases"] == len(cases)
+    return elapsed, list(harness.iter_case_results(test_manager.all_results))
+
+
+def test_parallel_speedup(harness, manager_factory):
+    instances = 4
+    serial, results = run_suite(harness, manager_factory, "serial", 1)
+    serialized, _ = run_suite(harness, manager_factory, "serialized", instances)
+    free, _ = run_suite(harness, manager_factory, "free", instances, serialize_ui_input=False)
+
+    # 界面输入串行（serialize_ui_input，默认开启）时只有转换等待并行，
+    # 总耗时不低于全部界面操作耗时之和，加速比上限为 串行总耗时/max(界面操作耗时, 串行总耗时/N)
+    ui_seconds = sum(seconds for result in results for step, seconds in result["步骤耗时"].items()
+                     if step not in harness.BACKGROUND_STEPS)
+    limit = serial / max(ui_seconds, serial / instances)
+    speedup = serial / serialized
+    assert speedup >= 0.75 * limit, (
+        f"{instances}个实例加速比{speedup:.2f}x，界面操作串行时上限约{limit:.2f}x，要求至少达到上限的75%")
+    # 界面输入不串行时各实例完全并行，加速比接近实例数
+    free_speedup = serial / free
+    assert free_speedup >= 0.6 * instances, (
+        f"界面输入不串行时{instances}个实例加速比{free_speedup:.2f}x，要求至少{0.6 * instances:.1f}x")
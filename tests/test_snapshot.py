@@ -0,0 +1,69 @@
+"""控件树快照：索引查找与逐个子控件查找结果一致，窗口变化之前的快照不会在变化之后被使用"""
+from vortex_driver import ControlRecord, UISnapshot
+
+
+def resolve(driver, window, **selector):
+    """按选择器逐个查找子控件（模拟后端解析为界面元素本身）"""
+    return driver._resolve(driver.child(window, **selector), timeout=0)
+
+
+def test_index_lookup_matches_child(export_dialog):
+    executor, open_dialog = export_dialog
+    driver = executor.driver
+    window = open_dialog()
+    snapshot = driver.snapshot(window)
+    assert snapshot.handle == driver.handle_of(window)
+
+    selectors = ([{"control_type": record.control_type, "title": record.title} for record in snapshot.records] +
+                 [{"control_type": "Pane", "auto_id": "uiButton3"},
+                  {"control_type": "Pane", "title": "导出", "auto_id": "uiButton3"},
+                  {"title_re": "反射率.*"}])
+    for selector in selectors:
+        record = snapshot.find(**selector)
+        assert record is not None and record.matches(selector)
+        assert record.element is resolve(driver, window, **selector), selector
+
+    # 索引命中但其余条件不符时不返回；不存在的控件返回None
+    assert snapshot.find(control_type="Pane", title="导出", auto_id="uiButton4") is None
+    assert snapshot.find(control_type="RadioButton", title="体素抽稀") is None
+    assert snapshot.missing([{"control_type": "CheckBox", "title": "启用"},
+                             {"control_type": "RadioButton", "title": "体素抽稀"}]) == [
+        {"control_type": "RadioButton", "title": "体素抽稀"}]
+
+
+def test_duplicate_titles_resolve_to_first_in_traversal_order():
+    records = [ControlRecord("Button", "确定", "", True, True, (0, 0, 1, 1), "first"),
+               ControlRecord("Button", "确定", "ok", True, True, (0, 0, 1, 1), "second"),
+               ControlRecord("Pane", "确定", "ok", True, True, (0, 0, 1, 1), "pane")]
+    snapshot = UISnapshot(None, records)
+    assert len(snapshot) == 3
+    assert snapshot.find(control_type="Button", title="确定").element == "first"
+    assert snapshot.find(control_type="Button", auto_id="ok").element == "second"
+    # 同时给出title和auto_id时按(类型, 名称)取第一个，再核对auto_id
+    assert snapshot.find(control_type="Button", title="确定", auto_id="ok") is None
+    assert snapshot.find(title="确定", auto_id="ok").element == "second"
+
+
+def test_snapshot_is_not_reused_after_dialog_changes(export_dialog):
+    executor, open_dialog = export_dialog
+    driver = executor.driver
+    controls = executor.session.controls
+    window = open_dialog()
+    voxel = {"control_type": "RadioButton", "title": "体素抽稀"}
+    before = driver.snapshot(window)
+
+    # 窗口内容变化：启用点云抽稀后抽稀方式才出现，之前的快照里没有，需要重新查找
+    driver.toggle(before.find(control_type="CheckBox", title="启用").element)
+    driver.wait(driver.child(window, **voxel), "visible")
+    assert before.find(**voxel) is None
+    assert driver.snapshot(window).find(**voxel).element is resolve(driver, window, **voxel)
+    assert controls.prefetch(window, [voxel]) == []
+
+    # 窗口关闭后重新打开：旧快照中的控件已失效，缓存按新句柄重新拍快照，不再认为抽稀方式存在
+    driver.close(window)
+    reopened = open_dialog()
+    las = before.find(control_type="RadioButton", title="las")
+    assert not driver.exists(las.element)
+    assert controls.prefetch(reopened, [voxel]) == [voxel]
+    fresh = controls.get(control_type="RadioButton", title="las")
+    assert fresh is not las.element and fresh is resolve(driver, reopened, control_type="RadioButton", title="las")
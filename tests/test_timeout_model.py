@@ -0,0 +1,127 @@
+"""自适应超时：按配置拟合的上限和预测、整套预计耗时、运行结束后的预测对比"""
+import numpy as np
+import pytest
+
+from benchmark_vortex import DEFAULT_CSV
+from timeout_model import CASE, CONVERSION, TimeoutModel
+
+FAST = ("pts", "启用", "", "启用", "单站", "彩图", "启用", "启用")
+SLOW = ("e57", "启用", "", "启用", "单站+合并", "彩图", "启用", "启用")
+
+
+def model_with(samples, **kwargs):
+    model = TimeoutModel(**kwargs)
+    for key, values in samples.items():
+        for seconds in values:
+            model.add(CONVERSION, key, seconds)
+    return model
+
+
+def test_estimate_same_configuration():
+    values = list(np.linspace(10.0, 20.0, 11))
+    model = model_with({FAST: values}, quantile=0.9, margin=1.5, min_samples=5, floor=1.0)
+    estimate = model.estimate(CONVERSION, FAST)
+    assert estimate == {"上限": round(np.quantile(values, 0.9) * 1.5, 3), "预测": 15.0,
+                        "样本数": 11, "范围": "同配置"}
+    assert model.bound(CONVERSION, FAST) == estimate["上限"]
+    # 下限
+    assert model_with({FAST: [0.1] * 5}, floor=1.0).bound(CONVERSION, FAST) == 1.0
+
+
+def test_pooled_samples_only_predict():
+    # SLOW只有2个样本：预测合并所有配置，但其他配置的耗时不能作为它的超时上限
+    model = model_with({FAST: [10.0] * 6, SLOW: [40.0, 42.0]}, min_samples=5)
+    estimate = model.estimate(CONVERSION, SLOW)
+    assert estimate["范围"] == "全部" and estimate["样本数"] == 8
+    assert estimate["上限"] is None
+    assert model.bound(CONVERSION, SLOW) is None
+    assert model.predict(CONVERSION, SLOW) == 10.0
+    # 合并后仍不足
+    assert model_with({FAST: [10.0, 11.0]}).estimate(CONVERSION, SLOW) is None
+
+
+def test_add_filters_samples_and_refits():
+    model = TimeoutModel(min_samples=2)
+    model.add(CONVERSION, FAST, None)
+    model.add(CONVERSION, FAST, 0.0)
+    model.add(CONVERSION, FAST, 5.0)
+    assert model.estimate(CONVERSION, FAST) is None
+    # 加入新样本后缓存失效
+    model.add(CONVERSION, FAST, 7.0)
+    assert model.predict(CONVERSION, FAST) == 6.0
+
+    passed = {"状态": "通过", "步骤耗时": {"配置导出设置": 2.0}, "转换耗时": 9.0, "持续时间": 15.0}
+    assert model.add_result(SLOW, passed)
+    assert not model.add_result(SLOW, {**passed, "状态": "失败"})
+    assert not model.add_result(SLOW, {**passed, "试验": {"预热": True}})
+    assert model.cases == 1
+
+
+def test_predict_suite():
+    model = TimeoutModel(min_samples=3)
+    for seconds in [30.0, 30.0, 40.0]:
+        model.add(CASE, FAST, seconds)
+    model.add(CASE, SLOW, 100.0)
+    # SLOW只有1个样本，按合并后的中位数预测；并行时按实例数分摊
+    assert model.predict(CASE, SLOW) == 35.0
+    assert model.predict_suite([FAST, SLOW, FAST], workers=1) == {"预计": 95.0, "有历史": 3, "用例数": 3}
+    assert model.predict_suite([FAST, SLOW, FAST], workers=2) == {"预计": 47.5, "有历史": 3, "用例数": 3}
+
+
+def test_predict_suite_without_history():
+    model = TimeoutModel(min_samples=3)
+    model.add(CASE, FAST, 30.0)
+    assert model.predict_suite([FAST, SLOW]) == {"预计": None, "有历史": 0, "用例数": 2}
+
+
+def summary_of(harness, cases, total):
+    all_results = {"journal": None, "test_cases": cases, "total_duration": total}
+    return harness.prediction_summary(all_results, {"预计": None, "有历史": 0, "用例数": len(cases)})
+
+
+def test_prediction_summary_compares_cases_with_history(harness):
+    cases = [
+        {"状态": "通过", "预测耗时": 10.0, "持续时间": 12.0},
+        {"状态": "通过", "预测耗时": 10.0, "持续时间": 13.0},
+        # 没有历史的用例不计入误差
+        {"状态": "通过", "预测耗时": None, "持续时间": 100.0},
+        {"状态": "失败", "预测耗时": 20.0, "持续时间": 1.0, "超时上限": {CONVERSION: 5.0}, "转换耗时": None,
+         "超出上限": ["配置导出设置"]},
+    ]
+    summary = summary_of(harness, cases, total=126.0)
+    assert summary["有历史预测"] == 40.0 and summary["有历史实际"] == 26.0
+    assert summary["误差"] == pytest.approx(26.0 / 40.0 - 1)
+    assert summary["实际"] == 126.0
+    assert summary["判定卡住"] == 1 and summary["超出上限"] == 1
+
+
+def test_prediction_summary_without_usable_prediction(harness):
+    # 预测耗时很短时预计总耗时四舍五入为0.0，误差为None，描述中不输出百分比
+    summary = summary_of(harness, [{"状态": "通过", "预测耗时": 0.0, "持续时间": 0.04}], total=0.04)
+    assert summary["误差"] is None
+    text = harness.format_prediction({**summary, "预计": 0.0, "有历史": 1})
+    assert "%" not in text
+    assert harness.DataDrivenTestReporter._html_prediction({**summary, "预计": 0.0, "有历史": 1})
+
+
+def test_pooled_bound_does_not_shorten_conversion_timeout(harness, manager_factory):
+    test_case = harness.CSVDataReader.read_test_cases(DEFAULT_CSV)[0]
+    key = harness.config_key(test_case)
+    other = ("e57",) + key[1:]
+    fast = [0.001] * 10
+
+    # 只有其他配置的极短历史：不缩短超时，用例正常通过
+    test_manager = manager_factory(timeout=30)
+    test_manager.timeout_model = model_with({other: fast}, floor=0.01)
+    harness.run_test_cases(test_manager, [test_case])
+    result = next(harness.iter_case_results(test_manager.all_results))
+    assert result["状态"] == "通过"
+    assert CONVERSION not in result["超时上限"]
+
+    # 同配置的上限仍然生效：超过即判定为卡住
+    test_manager = manager_factory(name="same", timeout=30)
+    test_manager.timeout_model = model_with({key: fast}, floor=0.01)
+    harness.run_test_cases(test_manager, [test_case])
+    result = next(harness.iter_case_results(test_manager.all_results))
+    assert result["状态"] != "通过"
+    assert result["超时上限"][CONVERSION] == 0.01
@@ -0,0 +1,95 @@
+"""重复试验：交替的执行顺序、预热不计入统计，以及中位数bootstrap置信区间的覆盖率"""
+import numpy as np
+import pytest
+
+from benchmark_vortex import DEFAULT_CSV
+
+
+def trial(case_id, label, seconds, warmup=False, status="通过"):
+    return {"用例ID": f"{case_id}#{label}", "状态": status, "转换耗时": seconds,
+            "试验": {"用例": case_id, "轮次": label, "预热": warmup}}
+
+
+def test_expand_trials_interleaves_rounds(harness):
+    cases = [{"用例ID": "TC0001", "输出格式": "pts"}, {"用例ID": "TC0002", "输出格式": "las"}]
+    trials = harness.expand_trials(cases, repeat=2, warmup=1)
+    # 先全部预热轮，再逐轮交替执行各配置
+    assert [t["用例ID"] for t in trials] == ["TC0001#w1", "TC0002#w1", "TC0001#1", "TC0002#1",
+                                             "TC0001#2", "TC0002#2"]
+    assert trials[0]["试验"] == {"用例": "TC0001", "轮次": "w1", "预热": True}
+    assert trials[-1]["试验"] == {"用例": "TC0002", "轮次": "2", "预热": False}
+    assert trials[-1]["输出格式"] == "las"
+    # 原用例不被修改
+    assert cases[0] == {"用例ID": "TC0001", "输出格式": "pts"}
+    assert harness.expand_trials(cases, repeat=1) == [
+        {**case, "用例ID": f"{case['用例ID']}#1", "试验": {"用例": case["用例ID"], "轮次": "1", "预热": False}}
+        for case in cases]
+
+
+def test_summarize_trials_excludes_warmups(harness):
+    results = [trial("A", "w1", 100.0, warmup=True), trial("A", "1", 10.0), trial("A", "2", 12.0),
+               trial("A", "3", 11.0), trial("A", "4", None, status="失败"),
+               trial("B", "w1", 50.0, warmup=True), trial("B", "1", 30.0), trial("B", "2", 31.0),
+               trial("C", "w1", 5.0, warmup=True),
+               # 不属于重复试验的结果不计入
+               {"用例ID": "TC0009", "状态": "通过", "转换耗时": 1.0}]
+    stats = {entry["用例ID"]: entry for entry in harness.summarize_trials(results, resamples=200)}
+
+    assert set(stats) == {"A", "B", "C"}
+    a = stats["A"]
+    assert a["预热"] == 1 and a["次数"] == 3
+    assert a["中位数"] == 11.0 and a["平均"] == pytest.approx(11.0) and a["标准差"] == pytest.approx(1.0)
+    assert a["P90"] == pytest.approx(np.percentile([10.0, 12.0, 11.0], 90))
+    low, high = a["置信区间"]
+    assert 10.0 <= low <= 11.0 <= high <= 12.0
+    # 区间不重叠的用例快慢可信
+    assert a["区间重叠"] == [] and stats["B"]["区间重叠"] == []
+    # 只有预热的用例没有统计值
+    assert stats["C"]["次数"] == 0 and stats["C"]["中位数"] is None and stats["C"]["置信区间"] == (None, None)
+
+
+def test_overlapping_intervals_are_listed(harness):
+    results = [trial("A", str(n), seconds) for n, seconds in enumerate([10.0, 10.5, 11.0, 10.2, 10.8])] + \
+              [trial("B", str(n), seconds) for n, seconds in enumerate([10.4, 10.9, 10.1, 10.6, 11.2])]
+    stats = {entry["用例ID"]: entry for entry in harness.summarize_trials(results, resamples=500)}
+    assert stats["A"]["区间重叠"] == ["B"] and stats["B"]["区间重叠"] == ["A"]
+
+
+def test_bootstrap_ci_edge_cases(harness):
+    assert harness.bootstrap_ci([]) == (None, None)
+    assert harness.bootstrap_ci([3.0]) == (3.0, 3.0)
+    assert harness.bootstrap_ci([1.0, 2.0, 3.0], seed=1) == harness.bootstrap_ci([1.0, 2.0, 3.0], seed=1)
+
+
+def test_bootstrap_ci_covers_true_median(harness):
+    # 对数正态分布的中位数为exp(mu)；重复抽样检查95%置信区间包含真实中位数的比例
+    rng = np.random.default_rng(42)
+    mu, sigma, count, datasets = np.log(60.0), 0.1, 15, 300
+    covered = 0
+    widths = []
+    for seed in range(datasets):
+        values = rng.lognormal(mu, sigma, count)
+        low, high = harness.bootstrap_ci(values, 0.95, resamples=400, seed=seed)
+        covered += low <= 60.0 <= high
+        widths.append(high - low)
+    # 百分位bootstrap对小样本中位数略偏窄，覆盖率在名义值附近
+    assert 0.88 <= covered / datasets <= 0.99
+    # 置信水平越低区间越窄
+    narrow = harness.bootstrap_ci(values, 0.5, resamples=400)
+    assert narrow[1] - narrow[0] < widths[-1]
+
+
+def test_trials_on_simulator(harness, manager_factory):
+    cases = harness.CSVDataReader.read_test_cases(DEFAULT_CSV)[:2]
+    test_manager = manager_factory(simulation={"time_scale": 0.02, "conversion_jitter": 0.05})
+    trials = harness.expand_trials(cases, repeat=3, warmup=1)
+    harness.run_test_cases(test_manager, trials)
+    results = list(harness.iter_case_results(test_manager.all_results))
+
+    # 按交替的顺序执行
+    assert [result["用例ID"] for result in results] == [t["用例ID"] for t in trials]
+    stats = harness.summarize_trials(results, resamples=200)
+    assert [entry["用例ID"] for entry in stats] == [case["用例ID"] for case in cases]
+    for entry in stats:
+        assert entry["预热"] == 1 and entry["次数"] == 3
+        assert entry["置信区间"][0] <= entry["中位数"] <= entry["置信区间"][1]
@@ -0,0 +1,107 @@
+"""条件等待：wait_until和_wait_condition在条件满足时立即返回，不满足时到上限返回False，以及模拟流程中的盘符选择等待"""
+import logging
+import threading
+import time
+
+import pytest
+
+from benchmark_vortex import DEFAULT_CSV
+from vortex_driver import wait_until
+
+
+def flag_after(delay):
+    """delay秒后置位的标志"""
+    flag = threading.Event()
+    timer = threading.Timer(delay, flag.set)
+    timer.daemon = True
+    timer.start()
+    return flag
+
+
+def test_wait_until_returns_when_condition_becomes_true():
+    flag = flag_after(0.1)
+    start = time.perf_counter()
+    assert wait_until(flag.is_set, timeout=2.0, interval=0.01)
+    assert 0.1 <= time.perf_counter() - start < 0.2
+
+
+def test_wait_until_times_out_and_treats_exceptions_as_unsatisfied():
+    def broken():
+        raise RuntimeError("控件正在销毁")
+
+    for condition in (lambda: False, broken):
+        start = time.perf_counter()
+        assert not wait_until(condition, timeout=0.1, interval=0.01)
+        assert 0.1 <= time.perf_counter() - start < 0.2
+
+
+@pytest.fixture
+def executor(harness, manager_factory):
+    test_manager = manager_factory(wait_ceilings={"新建文件夹": 0.3}, condition_poll_interval=0.01)
+    test_case = harness.CSVDataReader.read_test_cases(DEFAULT_CSV)[0]
+    return harness.TestCaseExecutor(test_manager, test_case)
+
+
+def test_wait_condition_records_time_saved_against_fixed_delay(executor):
+    flag = flag_after(0.1)
+    assert executor._wait_condition("新建文件夹", flag.is_set)
+    # 原固定延迟2秒，条件约0.1秒后满足
+    assert 1.8 < executor.result["等待节省"]["新建文件夹"] <= 1.9
+
+
+def test_wait_condition_gives_up_at_ceiling(executor, caplog):
+    start = time.perf_counter()
+    with caplog.at_level(logging.WARNING):
+        assert not executor._wait_condition("新建文件夹", lambda: False)
+    # 上限取wait_ceilings中的0.3秒，而不是原固定延迟
+    assert 0.3 <= time.perf_counter() - start < 0.45
+    assert "等待条件[新建文件夹]在0.3秒内未满足" in caplog.text
+    assert executor.result["等待节省"]["新建文件夹"] == pytest.approx(1.7, abs=0.15)
+
+
+def test_wait_condition_falls_back_to_fixed_delay(harness, executor, monkeypatch):
+    # wait_ceilings中没有的等待以FIXED_DELAYS中的原固定延迟为上限
+    monkeypatch.setitem(harness.FIXED_DELAYS, "选择盘符", 0.2)
+    start = time.perf_counter()
+    assert not executor._wait_condition("选择盘符", lambda: False)
+    assert 0.2 <= time.perf_counter() - start < 0.35
+    assert executor.result["等待节省"]["选择盘符"] == 0.0
+
+
+def run_case(harness, manager_factory, drive_select, **overrides):
+    """以drive_select（已缩放，秒）的盘符选择延迟运行一个用例"""
+    time_scale = 0.02
+    test_manager = manager_factory(
+        time_scale, condition_poll_interval=0.01,
+        simulation={"time_scale": time_scale, "latencies": {"drive_select": drive_select / time_scale}},
+        **overrides)
+    harness.run_test_cases(test_manager, harness.CSVDataReader.read_test_cases(DEFAULT_CSV)[:1])
+    return next(harness.iter_case_results(test_manager.all_results))
+
+
+def test_drive_wait_lasts_until_new_folder_is_enabled(harness, manager_factory):
+    result = run_case(harness, manager_factory, drive_select=0.2)
+    assert result["状态"] == "通过"
+    # 点击盘符后新建文件夹按钮约0.2秒后才可用，等待不会在点击后立即返回
+    waited = harness.FIXED_DELAYS["选择盘符"] - result["等待节省"]["选择盘符"]
+    assert 0.2 <= waited < 0.35
+
+
+def test_drive_wait_timeout_fails_the_step(harness, manager_factory, caplog):
+    with caplog.at_level(logging.WARNING):
+        result = run_case(harness, manager_factory, drive_select=1.0, wait_ceilings={"选择盘符": 0.1})
+
+    # 上限内按钮仍不可用：记录警告后继续，点击灰色的新建文件夹按钮失败
+    assert "等待条件[选择盘符]在0.1秒内未满足" in caplog.text
+    assert result["状态"] == "失败"
+    step = next(step for step in result["步骤"] if step["步骤"] == "选择输出路径")
+    assert step["状态"] == "失败" and "控件不可用" in step["详情"]
+
+
+def test_partial_wait_ceilings_fall_back_between_cases(harness, manager_factory):
+    # 配置文件中的wait_ceilings整体替换默认值；没有给出的用例间隔仍以原固定延迟为上限
+    test_manager = manager_factory(wait_ceilings={"新建文件夹": 0.5}, condition_poll_interval=0.01)
+    harness.run_test_cases(test_manager, harness.CSVDataReader.read_test_cases(DEFAULT_CSV)[:2])
+    results = list(harness.iter_case_results(test_manager.all_results))
+    assert [result["状态"] for result in results] == ["通过", "通过"]
+    assert 0.0 <= results[0]["等待节省"]["用例间隔"] <= harness.FIXED_DELAYS["用例间隔"]
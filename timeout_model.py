@@ -0,0 +1,115 @@
+"""
+自适应超时
+
+按（配置, 步骤）收集历史上通过的用例耗时，拟合每一步的超时上限和预测耗时：
+    上限 = max(分位数(默认P99) × 余量, 下限)
+    预测 = 中位数
+上限只按同配置的样本拟合（不少于min_samples个），样本不足时没有上限，调用方使用固定超时——
+其他配置的耗时不能说明这个配置多久算卡住。预测在同配置样本不足时合并所有配置中该步骤的样本。
+
+步骤名沿用结果中"步骤耗时"的键，另有两个汇总项：
+    "转换"  转换耗时（点击确定到成功窗口出现）
+    "用例"  整个用例的持续时间，用于预测整套用例的耗时
+"""
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+CONVERSION = "转换"
+CASE = "用例"
+
+
+class TimeoutModel:
+    """
+    按配置和步骤拟合的超时模型
+
+    用法:
+        model = TimeoutModel(quantile=0.99, margin=1.5)
+        for result in history:
+            model.add_result(config_key(result["配置"]), result)
+        model.bound("转换", key)     # 超时上限（秒），样本不足时为None
+        model.predict("用例", key)   # 预测耗时（中位数）
+        model.estimate("转换", key)  # {"上限", "预测", "样本数", "范围"}
+
+    拟合结果按（步骤, 配置）缓存，加入新样本时清空；执行期间只读，可在多个工作线程中使用。
+    """
+    def __init__(self, quantile: float = 0.99, margin: float = 1.5, min_samples: int = 5, floor: float = 1.0):
+        self.quantile = quantile
+        self.margin = margin
+        self.min_samples = min_samples
+        self.floor = floor
+        self._samples: Dict[str, Dict[tuple, List[float]]] = {}
+        self._cache: Dict[Tuple[str, tuple], Optional[Dict[str, Any]]] = {}
+
+    @property
+    def cases(self) -> int:
+        """已加入的用例数"""
+        return sum(len(values) for values in self._samples.get(CASE, {}).values())
+
+    def add(self, step: str, key: tuple, seconds: Optional[float]):
+        """加入一个耗时样本（空值和非正数忽略）"""
+        if seconds is None or not seconds > 0:
+            return
+        self._samples.setdefault(step, {}).setdefault(key, []).append(float(seconds))
+        self._cache.clear()
+
+    def add_result(self, key: tuple, result: Dict[str, Any]) -> bool:
+        """加入一个用例结果的步骤耗时、转换耗时和持续时间；失败和预热的结果不计入，返回是否加入"""
+        if result.get("状态") != "通过" or (result.get("试验") or {}).get("预热"):
+            return False
+        for step, seconds in (result.get("步骤耗时") or {}).items():
+            self.add(step, key, seconds)
+        self.add(CONVERSION, key, result.get("转换耗时"))
+        self.add(CASE, key, result.get("持续时间"))
+        return True
+
+    def estimate(self, step: str, key: tuple) -> Optional[Dict[str, Any]]:
+        """
+        step在配置key下的上限和预测
+
+        Returns:
+            {"上限", "预测", "样本数", "范围"}，范围为"同配置"或"全部"（此时上限为None，只有预测）；
+            合并后样本仍不足时返回None
+        """
+        cache_key = (step, key)
+        if cache_key not in self._cache:
+            self._cache[cache_key] = self._fit(step, key)
+        return self._cache[cache_key]
+
+    def bound(self, step: str, key: tuple) -> Optional[float]:
+        estimate = self.estimate(step, key)
+        return estimate["上限"] if estimate else None
+
+    def predict(self, step: str, key: tuple) -> Optional[float]:
+        estimate = self.estimate(step, key)
+        return estimate["预测"] if estimate else None
+
+    def predict_suite(self, keys: Sequence[tuple], workers: int = 1) -> Dict[str, Any]:
+        """
+        按每个用例的预测持续时间估计整套用例的耗时（并行时按实例数分摊）
+
+        没有历史的用例不计入预计耗时，单独计数。
+        """
+        predictions = [self.predict(CASE, key) for key in keys]
+        known = [seconds for seconds in predictions if seconds is not None]
+        return {
+            "预计": round(sum(known) / max(workers, 1), 1) if known else None,
+            "有历史": len(known),
+            "用例数": len(keys),
+        }
+
+    def _fit(self, step: str, key: tuple) -> Optional[Dict[str, Any]]:
+        per_key = self._samples.get(step, {})
+        values, scope = per_key.get(key, []), "同配置"
+        if len(values) < self.min_samples:
+            values, scope = [value for samples in per_key.values() for value in samples], "全部"
+        if len(values) < self.min_samples:
+            return None
+        values = np.asarray(values)
+        upper = float(np.quantile(values, self.quantile)) * self.margin
+        return {
+            "上限": round(max(upper, self.floor), 3) if scope == "同配置" else None,
+            "预测": round(float(np.median(values)), 3),
+            "样本数": len(values),
+            "范围": scope,
+        }
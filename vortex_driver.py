@@ -0,0 +1,710 @@
+"""
+VORTEX界面驱动层
+
+执行器只通过UIDriver访问界面，不直接调用pywinauto/win32gui。
+- PywinautoDriver: 真实的Windows桌面后端（pywinauto + win32gui）
+- SimulatedDriver: 进程内模拟的VORTEX后端（见 vortex_sim.py），可在Linux/CI上运行
+
+控件选择器沿用pywinauto的关键字: title / title_re / control_type / auto_id / handle。
+"""
+import asyncio
+import math
+import re
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+try:
+    from pywinauto import ElementNotFoundError
+    from pywinauto.timings import TimeoutError as WaitTimeoutError
+except ImportError:
+    class ElementNotFoundError(Exception):
+        """未找到控件（未安装pywinauto时的替代定义）"""
+
+    class WaitTimeoutError(TimeoutError):
+        """等待控件状态超时（未安装pywinauto时的替代定义）"""
+
+
+# ==================== 驱动接口 ====================
+class UIDriver:
+    """界面驱动接口，element既可以是控件规格，也可以是已解析的控件"""
+    name = "base"
+
+    def find_window(self, title: str) -> Optional[int]:
+        """按标题查找顶层窗口，返回句柄，未找到返回None"""
+        raise NotImplementedError
+
+    def find_windows(self, title: str) -> List[int]:
+        """按标题查找所有可见的顶层窗口，返回句柄列表（每个VORTEX实例一个）"""
+        raise NotImplementedError
+
+    def init_thread(self):
+        """在工作线程中首次使用驱动前调用"""
+
+    def connect(self, handle: int) -> Any:
+        """连接顶层窗口，返回主窗口元素"""
+        raise NotImplementedError
+
+    def child(self, parent: Any, **selector) -> Any:
+        """在parent下按选择器查找子控件（延迟解析）"""
+        raise NotImplementedError
+
+    def window_from_handle(self, parent: Any, handle: int) -> Any:
+        """按句柄构造窗口元素，无需搜索控件树"""
+        raise NotImplementedError
+
+    def resolve_all(self, parent: Any, selectors: Dict[Any, Dict[str, Any]]) -> Dict[Any, Any]:
+        """
+        一次遍历parent的后代，解析多个选择器
+
+        Args:
+            selectors: 键 -> 选择器
+        Returns:
+            键 -> 已解析的控件，未找到的键不在结果中
+        """
+        raise NotImplementedError
+
+    def snapshot(self, window: Any) -> "UISnapshot":
+        """一次遍历window的子树，返回可按(control_type, title/auto_id)索引的快照"""
+        raise NotImplementedError
+
+    def click(self, element: Any):
+        """点击控件"""
+        raise NotImplementedError
+
+    def toggle(self, element: Any):
+        """切换复选框状态"""
+        raise NotImplementedError
+
+    def get_toggle_state(self, element: Any) -> Optional[int]:
+        """获取复选框状态，1表示选中，无法获取时返回None"""
+        raise NotImplementedError
+
+    def set_text(self, element: Any, text: str):
+        """设置编辑框文本"""
+        raise NotImplementedError
+
+    def type_keys(self, element: Any, keys: str):
+        """向控件发送按键"""
+        raise NotImplementedError
+
+    def close(self, element: Any):
+        """关闭窗口"""
+        raise NotImplementedError
+
+    def set_focus(self, element: Any):
+        """将窗口切到前台"""
+        raise NotImplementedError
+
+    def wait(self, element: Any, state: str = "visible", timeout: float = 5):
+        """等待控件达到指定状态（'visible'/'enabled'/'exists'，空格分隔），超时抛出WaitTimeoutError"""
+        raise NotImplementedError
+
+    def exists(self, element: Any, timeout: float = 0) -> bool:
+        """控件是否存在"""
+        raise NotImplementedError
+
+    def is_visible(self, element: Any) -> bool:
+        """控件是否可见"""
+        raise NotImplementedError
+
+    def is_enabled(self, element: Any) -> bool:
+        """控件是否存在且可用"""
+        raise NotImplementedError
+
+    def window_text(self, element: Any) -> str:
+        """控件文本/标题"""
+        raise NotImplementedError
+
+    def handle_of(self, element: Any) -> Optional[int]:
+        """控件的原生句柄，没有句柄时返回None"""
+        raise NotImplementedError
+
+    def process_id(self, element: Any) -> int:
+        """控件所属进程的PID"""
+        raise NotImplementedError
+
+    def is_window_alive(self, handle: int) -> bool:
+        """句柄对应的窗口是否仍然存在、可见且可用"""
+        raise NotImplementedError
+
+    def window_title(self, handle: int) -> str:
+        """句柄对应窗口的标题"""
+        raise NotImplementedError
+
+    # ---------- 窗口出现等待 ----------
+    supports_window_events = False
+
+    def subscribe_window_opened(self, parent: Any, callback: Callable[[], None]) -> Callable[[], None]:
+        """订阅parent下的窗口打开事件，返回取消订阅函数；后端不支持时抛出NotImplementedError"""
+        raise NotImplementedError
+
+    def wait_for_window(self, parent: Any, timeout: float, schedule: Optional["PollSchedule"] = None,
+                        use_events: bool = True, event_safety_interval: float = 5.0,
+                        on_wait: Optional[Callable[[float], None]] = None,
+                        should_stop: Optional[Callable[[], bool]] = None, **selector) -> Dict[str, Any]:
+        """
+        等待parent下出现匹配selector的窗口
+
+        后端支持窗口打开事件时，只在事件到达（或每隔event_safety_interval秒兜底）时检查一次；
+        否则按schedule自适应轮询。控件规格只构造一次。
+        每次未命中后调用should_stop，返回True时提前结束等待（例如输出文件已停止增长）。
+
+        Returns:
+            {"元素", "方式", "检查次数", "出现时间", "检测时间", "检测延迟", "中止"}，
+            时间均为time.perf_counter()读数，检测延迟为出现时间的不确定度上界（秒）；
+            超时或中止时"元素"为None
+        """
+        spec = self.child(parent, **selector)
+        wait = WindowWait(timeout, schedule, event_safety_interval, on_wait, should_stop)
+        opened = threading.Event()
+
+        def on_opened():
+            wait.opened()
+            opened.set()
+
+        unsubscribe = None
+        if use_events and self.supports_window_events:
+            try:
+                unsubscribe = self.subscribe_window_opened(parent, on_opened)
+                wait.result["方式"] = "事件"
+            except Exception:
+                unsubscribe = None
+
+        try:
+            while True:
+                wait.result["检查次数"] += 1
+                if self.exists(spec) and self.is_visible(spec):
+                    return wait.found(spec)
+                delay = wait.missed(events=unsubscribe is not None)
+                if delay is None:
+                    return wait.result
+                if unsubscribe:
+                    opened.wait(delay)
+                    opened.clear()
+                else:
+                    time.sleep(delay)
+        finally:
+            if unsubscribe:
+                unsubscribe()
+
+    async def wait_for_window_async(self, parent: Any, timeout: float,
+                                    run: Callable[..., Awaitable[Any]],
+                                    schedule: Optional["PollSchedule"] = None,
+                                    use_events: bool = True, event_safety_interval: float = 5.0,
+                                    on_wait: Optional[Callable[[float], None]] = None,
+                                    should_stop: Optional[Callable[[], bool]] = None, **selector) -> Dict[str, Any]:
+        """
+        wait_for_window的协程版本，供asyncio执行核心使用
+
+        每次检查和订阅/取消订阅通过run(func, *args)在实例线程中执行，两次检查之间在事件循环中等待，
+        不占用线程；窗口打开事件从界面线程转交给事件循环。返回值与wait_for_window相同。
+        """
+        loop = asyncio.get_running_loop()
+        spec = await run(self.child, parent, **selector)
+        wait = WindowWait(timeout, schedule, event_safety_interval, on_wait, should_stop)
+        opened = asyncio.Event()
+
+        def on_opened():
+            wait.opened()
+            loop.call_soon_threadsafe(opened.set)
+
+        def visible() -> bool:
+            return self.exists(spec) and self.is_visible(spec)
+
+        unsubscribe = None
+        if use_events and self.supports_window_events:
+            try:
+                unsubscribe = await run(self.subscribe_window_opened, parent, on_opened)
+                wait.result["方式"] = "事件"
+            except Exception:
+                unsubscribe = None
+
+        try:
+            while True:
+                wait.result["检查次数"] += 1
+                if await run(visible):
+                    return wait.found(spec)
+                delay = wait.missed(events=unsubscribe is not None)
+                if delay is None:
+                    return wait.result
+                if unsubscribe:
+                    try:
+                        await asyncio.wait_for(opened.wait(), delay)
+                    except asyncio.TimeoutError:
+                        pass
+                    opened.clear()
+                else:
+                    await asyncio.sleep(delay)
+        finally:
+            if unsubscribe:
+                await run(unsubscribe)
+
+
+# ==================== 条件等待 ====================
+def wait_until(condition: Callable[[], bool], timeout: float, interval: float = 0.05) -> bool:
+    """
+    在timeout秒内轮询condition，满足时立即返回True，超时返回False
+
+    condition抛出的异常视为条件未满足（例如控件正在销毁）。
+    """
+    deadline = time.perf_counter() + timeout
+    while True:
+        try:
+            if condition():
+                return True
+        except Exception:
+            pass
+        remaining = deadline - time.perf_counter()
+        if remaining <= 0:
+            return False
+        time.sleep(min(interval, remaining))
+
+
+# ==================== 控件树快照 ====================
+class ControlRecord:
+    """快照中的一个控件"""
+    __slots__ = ("control_type", "title", "auto_id", "enabled", "visible", "rect", "element")
+
+    def __init__(self, control_type: str, title: str, auto_id: str, enabled: bool, visible: bool,
+                 rect: Tuple[int, int, int, int], element: Any):
+        self.control_type = control_type
+        self.title = title
+        self.auto_id = auto_id
+        self.enabled = enabled
+        self.visible = visible
+        self.rect = rect
+        self.element = element
+
+    def matches(self, selector: Dict[str, Any]) -> bool:
+        if "control_type" in selector and self.control_type != selector["control_type"]:
+            return False
+        if "title" in selector and self.title != selector["title"]:
+            return False
+        if "auto_id" in selector and self.auto_id != selector["auto_id"]:
+            return False
+        if "title_re" in selector and not re.match(selector["title_re"], self.title):
+            return False
+        return True
+
+    def __repr__(self):
+        return f"<ControlRecord {self.control_type} title={self.title!r} auto_id={self.auto_id!r}>"
+
+
+class UISnapshot:
+    """
+    窗口子树快照
+
+    记录每个控件的类型、名称、auto_id、可用/可见状态和矩形，并按(control_type, title)
+    和(control_type, auto_id)建立字典索引；同名控件取遍历顺序中的第一个，与子控件搜索一致。
+    """
+    def __init__(self, handle: Optional[int], records: List[ControlRecord]):
+        self.handle = handle
+        self.records = records
+        self._by_title: Dict[tuple, ControlRecord] = {}
+        self._by_auto_id: Dict[tuple, ControlRecord] = {}
+        for record in records:
+            self._by_title.setdefault((record.control_type, record.title), record)
+            if record.auto_id:
+                self._by_auto_id.setdefault((record.control_type, record.auto_id), record)
+
+    def __len__(self):
+        return len(self.records)
+
+    def find(self, **selector) -> Optional[ControlRecord]:
+        """按选择器查找控件；给出control_type和title或auto_id时为O(1)索引查找，否则顺序扫描"""
+        control_type = selector.get("control_type")
+        record = None
+        if control_type is not None and "title" in selector:
+            record = self._by_title.get((control_type, selector["title"]))
+        elif control_type is not None and "auto_id" in selector:
+            record = self._by_auto_id.get((control_type, selector["auto_id"]))
+        else:
+            return next((r for r in self.records if r.matches(selector)), None)
+        return record if record is not None and record.matches(selector) else None
+
+    def missing(self, selectors: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """快照中找不到的选择器，用于校验窗口布局"""
+        return [selector for selector in selectors if self.find(**selector) is None]
+
+
+# ==================== 控件缓存 ====================
+class SelectorCache:
+    """
+    按窗口句柄缓存已解析的控件
+
+    prefetch对窗口拍一次快照，之后按选择器从快照索引中直接取用控件；
+    快照之后才出现的控件在首次使用时单独查找并缓存。
+    窗口句柄变化或控件失效（调用方invalidate）时清空缓存。
+    """
+    def __init__(self, driver: UIDriver):
+        self.driver = driver
+        self.handle = None
+        self.snapshot: Optional[UISnapshot] = None
+        self.elements: Dict[tuple, Any] = {}
+        self.stats = {"命中": 0, "未命中": 0, "遍历": 0, "失效": 0}
+
+    @staticmethod
+    def key(selector: Dict[str, Any]) -> tuple:
+        return tuple(sorted(selector.items()))
+
+    def prefetch(self, window: Any, selectors: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        绑定窗口，句柄变化时重新拍快照
+
+        Returns:
+            selectors中当前窗口里找不到的选择器
+        """
+        handle = self.driver.handle_of(window)
+        if handle is None or handle != self.handle or self.snapshot is None:
+            self.elements = {}
+            self.snapshot = self.driver.snapshot(window)
+            self.handle = handle
+            self.stats["遍历"] += 1
+        return [selector for selector in selectors
+                if self.snapshot.find(**selector) is None and self.key(selector) not in self.elements]
+
+    def get(self, **selector) -> Optional[Any]:
+        """取缓存的控件，未缓存时返回None"""
+        element = self.elements.get(self.key(selector))
+        if element is None and self.snapshot is not None:
+            record = self.snapshot.find(**selector)
+            element = record.element if record is not None else None
+        if element is not None:
+            self.stats["命中"] += 1
+        return element
+
+    def lookup(self, window: Any, **selector) -> Any:
+        """未命中时查找控件；当前已出现则缓存，否则返回延迟解析的控件规格"""
+        self.stats["未命中"] += 1
+        key = self.key(selector)
+        found = self.driver.resolve_all(window, {key: selector}) if self.handle is not None else {}
+        if key in found:
+            self.elements[key] = found[key]
+            return found[key]
+        return self.driver.child(window, **selector)
+
+    def invalidate(self):
+        """控件失效时清空缓存"""
+        self.stats["失效"] += 1
+        self.elements = {}
+        self.snapshot = None
+        self.handle = None
+
+
+# ==================== 自适应轮询 ====================
+class PollSchedule:
+    """
+    自适应轮询间隔，控件树搜索次数不超过固定间隔轮询
+
+    预期耗时未知时与固定轮询相同，每max_interval秒检查一次。
+    已知预期耗时E时，把E ± expected_spread·E视为可能出现的区间，
+    固定轮询到区间终点为止的检查次数作为预算：
+        区间之内   按max_interval·band_fraction等间隔检查，区间终点检查一次
+        区间之前   预算剩下的次数均匀分布，最后一次正好落在区间起点；
+                   间隔不小于E·early_fraction，长时间转换的检查更少
+        区间之后   每max_interval秒检查一次
+    转换落在区间内时平均检测误差约为固定轮询的band_fraction倍；
+    提前结束时误差可能大于固定轮询，搜索次数仍不超过固定轮询。
+    """
+    def __init__(self, max_interval: float = 0.5, expected_duration: Optional[float] = None,
+                 expected_spread: float = 0.2, band_fraction: float = 0.4,
+                 early_fraction: float = 0.05, min_interval: float = 0.01):
+        self.max_interval = max_interval
+        self.expected_duration = expected_duration
+        self.expected_spread = expected_spread
+        self.band_fraction = band_fraction
+        self.early_fraction = early_fraction
+        self.min_interval = min_interval
+
+    def _plan(self) -> Tuple[float, float, int, int]:
+        """区间起点、终点，以及区间之前和区间之内的检查次数"""
+        expected = self.expected_duration
+        band_start = max(expected * (1 - self.expected_spread), 0.0)
+        band_end = expected * (1 + self.expected_spread)
+        budget = int(band_end / self.max_interval)
+        band_checks = min(math.ceil((band_end - band_start) / (self.max_interval * self.band_fraction)),
+                          budget - 1)
+        early_checks = budget - band_checks
+        if not band_checks:
+            # 区间终点早于第二次固定检查：只在区间终点检查一次
+            band_start = band_end
+        if self.early_fraction > 0:
+            early_checks = min(early_checks, max(int(band_start / (expected * self.early_fraction)), 1))
+        return band_start, band_end, early_checks, band_checks
+
+    @staticmethod
+    def _spread(remaining: float, step: float) -> float:
+        """把剩余时间按约step的间隔均分，每次按实际已等待时间重新均分，检查本身的耗时不会累积"""
+        return remaining / max(round(remaining / step), 1)
+
+    def next_interval(self, elapsed: float) -> float:
+        """根据已等待时间返回下一次轮询前的休眠时间"""
+        expected = self.expected_duration
+        if not expected or expected * (1 + self.expected_spread) < self.max_interval:
+            # 预期未知，或区间终点早于第一次固定检查：与固定轮询相同
+            return self.max_interval
+        band_start, band_end, early_checks, band_checks = self._plan()
+        if elapsed < band_start:
+            interval = self._spread(band_start - elapsed, band_start / early_checks)
+        elif elapsed < band_end and band_checks:
+            interval = self._spread(band_end - elapsed, (band_end - band_start) / band_checks)
+        else:
+            interval = self.max_interval
+        return max(interval, self.min_interval)
+
+
+# ==================== 窗口出现等待 ====================
+class WindowWait:
+    """
+    wait_for_window和wait_for_window_async共用的状态：计时、检查次数、出现时间和结束判断
+
+    两者只在如何检查、如何订阅事件和如何休眠上不同（阻塞调用或协程）。
+    """
+    def __init__(self, timeout: float, schedule: Optional[PollSchedule] = None,
+                 event_safety_interval: float = 5.0, on_wait: Optional[Callable[[float], None]] = None,
+                 should_stop: Optional[Callable[[], bool]] = None):
+        self.schedule = schedule or PollSchedule()
+        self.event_safety_interval = event_safety_interval
+        self.on_wait = on_wait
+        self.should_stop = should_stop
+        self.start = time.perf_counter()
+        self.deadline = self.start + timeout
+        self.last_miss = self.start
+        self.event_times: List[float] = []
+        self.result = {"元素": None, "方式": "轮询", "检查次数": 0,
+                       "出现时间": None, "检测时间": None, "检测延迟": None, "中止": False}
+
+    def opened(self):
+        """窗口打开事件到达（可在任意线程中调用）"""
+        self.event_times.append(time.perf_counter())
+
+    def found(self, spec: Any) -> Dict[str, Any]:
+        """检查命中，记录出现时间和检测延迟"""
+        found_at = time.perf_counter()
+        # 事件方式以事件到达时刻为出现时间，轮询方式只能确定在上次未命中之后；
+        # 上次未命中之前的事件（子树中其他窗口打开，或窗口由兜底检查发现）不能作为出现时间
+        appeared_at = max(self.event_times[-1], self.last_miss) if self.event_times else self.last_miss
+        self.result.update({"元素": spec, "出现时间": appeared_at, "检测时间": found_at,
+                            "检测延迟": found_at - appeared_at})
+        return self.result
+
+    def missed(self, events: bool) -> Optional[float]:
+        """检查未命中，返回下一次检查前最多等待的秒数；超时或should_stop要求中止时返回None"""
+        self.last_miss = time.perf_counter()
+        remaining = self.deadline - self.last_miss
+        if remaining <= 0:
+            return None
+        if self.on_wait:
+            self.on_wait(self.last_miss - self.start)
+        if self.should_stop and self.should_stop():
+            self.result["中止"] = True
+            return None
+        if events:
+            return min(self.event_safety_interval, remaining)
+        return min(self.schedule.next_interval(self.last_miss - self.start), remaining)
+
+
+# ==================== pywinauto后端 ====================
+class PywinautoDriver(UIDriver):
+    """基于pywinauto + win32gui的真实桌面后端"""
+    name = "pywinauto"
+
+    def __init__(self, backend: str = "uia"):
+        from pywinauto import Application
+        from pywinauto.application import WindowSpecification
+        import win32gui
+
+        self._application_class = Application
+        self._spec_class = WindowSpecification
+        self._win32gui = win32gui
+        self.backend = backend
+
+    def find_window(self, title: str) -> Optional[int]:
+        return self._win32gui.FindWindow(None, title) or None
+
+    def find_windows(self, title: str) -> List[int]:
+        handles = []
+
+        def collect(hwnd, _):
+            if self._win32gui.IsWindowVisible(hwnd) and self._win32gui.GetWindowText(hwnd) == title:
+                handles.append(hwnd)
+            return True
+
+        self._win32gui.EnumWindows(collect, None)
+        return handles
+
+    def init_thread(self):
+        # UIA后端通过COM访问，每个线程都需要初始化COM
+        import comtypes
+        try:
+            comtypes.CoInitializeEx(comtypes.COINIT_MULTITHREADED)
+        except OSError:
+            # 线程已按其他并发模型初始化过COM
+            pass
+
+    def connect(self, handle: int) -> Any:
+        app = self._application_class(backend=self.backend).connect(handle=handle)
+        return app.window(handle=handle)
+
+    def child(self, parent: Any, **selector) -> Any:
+        return parent.child_window(**selector)
+
+    def window_from_handle(self, parent: Any, handle: int) -> Any:
+        return parent.child_window(handle=handle)
+
+    def resolve_all(self, parent: Any, selectors: Dict[Any, Dict[str, Any]]) -> Dict[Any, Any]:
+        wrapper = parent.wrapper_object() if isinstance(parent, self._spec_class) else parent
+        found = {}
+        for descendant in wrapper.descendants():
+            info = descendant.element_info
+            for key, selector in selectors.items():
+                if key not in found and self._matches(info, selector):
+                    found[key] = descendant
+            if len(found) == len(selectors):
+                break
+        return found
+
+    def snapshot(self, window: Any) -> UISnapshot:
+        wrapper = window.wrapper_object() if isinstance(window, self._spec_class) else window
+        records = []
+        for descendant in wrapper.descendants():
+            info = descendant.element_info
+            rect = info.rectangle
+            records.append(ControlRecord(info.control_type, info.name, info.automation_id,
+                                         info.enabled, info.visible,
+                                         (rect.left, rect.top, rect.right, rect.bottom), descendant))
+        return UISnapshot(wrapper.handle, records)
+
+    @staticmethod
+    def _matches(info: Any, selector: Dict[str, Any]) -> bool:
+        if "control_type" in selector and info.control_type != selector["control_type"]:
+            return False
+        if "title" in selector and info.name != selector["title"]:
+            return False
+        if "auto_id" in selector and info.automation_id != selector["auto_id"]:
+            return False
+        if "title_re" in selector and not re.match(selector["title_re"], info.name):
+            return False
+        if "handle" in selector and info.handle != selector["handle"]:
+            return False
+        return True
+
+    def click(self, element: Any):
+        element.click_input()
+
+    def toggle(self, element: Any):
+        element.toggle()
+
+    def get_toggle_state(self, element: Any) -> Optional[int]:
+        try:
+            return element.get_toggle_state()
+        except Exception:
+            return None
+
+    def set_text(self, element: Any, text: str):
+        element.set_text(text)
+
+    def type_keys(self, element: Any, keys: str):
+        element.type_keys(keys)
+
+    def close(self, element: Any):
+        element.close()
+
+    def set_focus(self, element: Any):
+        element.set_focus()
+
+    def wait(self, element: Any, state: str = "visible", timeout: float = 5):
+        if isinstance(element, self._spec_class):
+            element.wait(state, timeout=timeout)
+            return
+        # 已解析的控件（来自resolve_all）：失效时直接抛出异常，由调用方重新查找
+        checks = {"exists": lambda: True, "visible": element.is_visible,
+                  "enabled": element.is_enabled, "ready": lambda: element.is_visible() and element.is_enabled()}
+        element.is_visible()
+        if not wait_until(lambda: all(checks[s]() for s in state.split()), timeout):
+            raise WaitTimeoutError(f"等待控件状态 '{state}' 超时")
+
+    def exists(self, element: Any, timeout: float = 0) -> bool:
+        if isinstance(element, self._spec_class):
+            return element.exists(timeout=timeout)
+        try:
+            element.is_visible()
+            return True
+        except Exception:
+            return False
+
+    def is_visible(self, element: Any) -> bool:
+        return element.is_visible()
+
+    def is_enabled(self, element: Any) -> bool:
+        return element.is_enabled()
+
+    def window_text(self, element: Any) -> str:
+        return element.window_text()
+
+    def handle_of(self, element: Any) -> Optional[int]:
+        if isinstance(element, self._spec_class):
+            element = element.wrapper_object()
+        return element.handle
+
+    def process_id(self, element: Any) -> int:
+        return element.process_id()
+
+    def is_window_alive(self, handle: int) -> bool:
+        try:
+            return bool(self._win32gui.IsWindow(handle) and
+                        self._win32gui.IsWindowVisible(handle) and
+                        self._win32gui.IsWindowEnabled(handle))
+        except Exception:
+            return False
+
+    def window_title(self, handle: int) -> str:
+        return self._win32gui.GetWindowText(handle)
+
+    @property
+    def supports_window_events(self) -> bool:
+        return self.backend == "uia"
+
+    def subscribe_window_opened(self, parent: Any, callback: Callable[[], None]) -> Callable[[], None]:
+        """通过UIA WindowOpened事件订阅parent子树中的新窗口"""
+        import comtypes
+        from pywinauto.uia_defines import IUIA
+
+        uia = IUIA()
+        uia_dll = uia.UIA_dll
+
+        class WindowOpenedHandler(comtypes.COMObject):
+            _com_interfaces_ = [uia_dll.IUIAutomationEventHandler]
+
+            def HandleAutomationEvent(self, sender, event_id):
+                callback()
+
+        handler = WindowOpenedHandler()
+        root = parent.wrapper_object().element_info.element
+        event_id = uia_dll.UIA_Window_WindowOpenedEventId
+        uia.iuia.AddAutomationEventHandler(event_id, root, uia_dll.TreeScope_Subtree, None, handler)
+        return lambda: uia.iuia.RemoveAutomationEventHandler(event_id, root, handler)
+
+
+# ==================== 驱动工厂 ====================
+def create_driver(config: Dict[str, Any], simulator: Any = None) -> UIDriver:
+    """
+    根据配置创建界面驱动
+
+    Args:
+        config: 配置字典，ui_driver 取 "pywinauto"（默认）或 "simulated"
+        simulator: 模拟后端共享的SimulatedVortex实例，为空时按配置新建
+    """
+    driver_name = config.get("ui_driver", "pywinauto")
+
+    if driver_name == "pywinauto":
+        return PywinautoDriver(backend=config.get("backend", "uia"))
+
+    if driver_name == "simulated":
+        from vortex_sim import SimulatedDriver, SimulatedVortex
+        if simulator is None:
+            simulator = SimulatedVortex.from_config(config.get("simulation", {}))
+        return SimulatedDriver(simulator)
+
+    raise ValueError(f"未知的界面驱动: {driver_name}")
@@ -0,0 +1,811 @@
+"""
+进程内模拟的VORTEX Client
+
+模拟 导出 → 选项 → 点云导出 → 浏览文件夹 → MessageForm 的完整导出流程，
+各环节的延迟可配置，并可通过time_scale整体缩放，用于在Linux/CI上运行和测量测试流程。
+模拟是确定性的：控件在固定的延迟之后出现，转换耗时由所选参数决定。
+"""
+import itertools
+import os
+import random
+import re
+import struct
+import tempfile
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+from vortex_driver import UIDriver, ControlRecord, UISnapshot, ElementNotFoundError, WaitTimeoutError
+
+# 各环节延迟（秒，未缩放）
+DEFAULT_LATENCIES = {
+    "connect": 0.3,            # Application.connect
+    "node_search": 0.002,      # 搜索控件树时每访问一个节点的耗时
+    "click": 0.05,             # 一次点击/切换
+    "dialog_open": 0.5,        # 点击后弹出下一个窗口
+    "thinning_options": 0.5,   # 启用点云抽稀后抽稀方式出现
+    "tree_expand": 0.8,        # 文件夹树节点展开
+    "drive_select": 0.3,       # 选中盘符后新建文件夹按钮变为可用
+    "new_folder_edit": 1.5,    # 新建文件夹后编辑框出现
+    "conversion": 10.0,        # 格式转换基础耗时
+    "window_close": 0.2,       # 窗口关闭
+}
+
+# 选中某个选项时额外增加的转换耗时（秒，未缩放）
+DEFAULT_CONVERSION_EXTRA = {
+    "随机抽稀": 10.0,
+    "e57": 4.0,
+    "las": 2.0,
+    "单站+合并": 5.0,
+    "点云降噪": 1.0,
+    "点云厚度优化": 1.0,
+}
+
+# 浏览文件夹窗口中此电脑下的盘符及卷标，树节点标题为 "卷标 (盘符:)"
+DRIVE_LABELS = {"D": "Data", "F": "新加卷"}
+
+# pywinauto 默认的查找超时和重试间隔（秒）
+FIND_TIMEOUT = 5.0
+RETRY_INTERVAL = 0.09
+
+NEVER = float("inf")
+
+
+# ==================== 模拟界面元素 ====================
+class SimElement:
+    """模拟的界面元素"""
+    def __init__(self, sim: "SimulatedVortex", control_type: str, title: str = "",
+                 auto_id: str = "", group: Optional[str] = None, has_handle: bool = False):
+        self.sim = sim
+        self.control_type = control_type
+        self.title = title
+        self.auto_id = auto_id
+        self.group = group
+        self.parent = None
+        self.children: List["SimElement"] = []
+        self.appear_at = 0.0
+        self.close_at = NEVER
+        self._enabled = True
+        self.enable_at = 0.0
+        self.checked = False
+        self.text = ""
+        self.on_click: Optional[Callable[[], None]] = None
+        self.on_toggle: Optional[Callable[[], None]] = None
+        self.on_enter: Optional[Callable[[], None]] = None
+        self.handle = sim.register(self) if has_handle else None
+
+    def add(self, child: "SimElement") -> "SimElement":
+        """添加子元素"""
+        child.parent = self
+        self.children.append(child)
+        return child
+
+    @property
+    def alive(self) -> bool:
+        """元素当前是否存在于界面树中"""
+        now = self.sim.now()
+        if not (self.appear_at <= now < self.close_at):
+            return False
+        return self.parent is None or self.parent.alive
+
+    @property
+    def enabled(self) -> bool:
+        """元素当前是否可用"""
+        return self._enabled and self.sim.now() >= self.enable_at
+
+    @enabled.setter
+    def enabled(self, value: bool):
+        self._enabled = value
+        self.enable_at = 0.0
+
+    def enable(self, delay_key: Optional[str] = None):
+        """在指定延迟后变为可用"""
+        self._enabled = True
+        self.enable_at = self.sim.now() + (self.sim.delay(delay_key) if delay_key else 0.0)
+
+    def show(self, delay_key: Optional[str] = None):
+        """在指定延迟后出现"""
+        self.appear_at = self.sim.now() + (self.sim.delay(delay_key) if delay_key else 0.0)
+        self.close_at = NEVER
+
+    def hide(self):
+        """立即从界面树中移除"""
+        self.appear_at = NEVER
+
+    def close(self, delay_key: Optional[str] = None):
+        """在指定延迟后关闭"""
+        self.close_at = min(self.close_at, self.sim.now() + (self.sim.delay(delay_key) if delay_key else 0.0))
+
+    def __repr__(self):
+        return f"<SimElement {self.control_type} title={self.title!r} auto_id={self.auto_id!r}>"
+
+
+class SimSpec:
+    """延迟解析的控件规格，与pywinauto的WindowSpecification对应"""
+    def __init__(self, parent: Any, selector: Dict[str, Any]):
+        self.parent = parent
+        self.selector = selector
+
+    def __repr__(self):
+        return f"<SimSpec {self.selector}>"
+
+
+# ==================== 模拟的VORTEX实例 ====================
+class SimVortexInstance:
+    """单个VORTEX Client进程：主窗口、目标窗口和导出流程状态"""
+    def __init__(self, sim: "SimulatedVortex", index: int):
+        self.sim = sim
+        self.index = index
+        self.main = SimElement(sim, "Window", sim.main_title, has_handle=True)
+        self.conversions: List[Dict[str, Any]] = []
+        self.export_settings: Dict[str, str] = {}
+        # persist_dialog_state时记住的导出窗口控件状态（标题 -> 是否选中）
+        self.dialog_state: Dict[str, bool] = {}
+
+        target = self.main.add(SimElement(sim, "Window", f"VORTEX - {sim.target_title}", has_handle=True))
+        for i in range(sim.filler_controls):
+            target.add(SimElement(sim, "Pane", f"工具{i}"))
+        export_button = target.add(SimElement(sim, "Button", "导出"))
+        export_button.on_click = self._open_options
+
+    # ---------- 选项窗口 ----------
+    def _open_options(self):
+        window = self._new_window("选项")
+        for title in ["三角网", "影像", "全景"]:
+            window.add(SimElement(self.sim, "Pane", title))
+        point_cloud = window.add(SimElement(self.sim, "Pane", "点云"))
+        point_cloud.on_click = lambda: self._open_export(window)
+
+    # ---------- 点云导出窗口 ----------
+    def _open_export(self, option_window: SimElement):
+        option_window.close()
+        window = self._new_window("点云导出")
+
+        def radio_group(group: str, titles: List[str], default: Optional[str]) -> List[SimElement]:
+            radios = []
+            for title in titles:
+                radio = window.add(SimElement(self.sim, "RadioButton", title, group=group))
+                radio.checked = title == default
+                radio.on_click = lambda r=radio: self._select_radio(window, r)
+                radios.append(radio)
+            return radios
+
+        def checkbox(title: str) -> SimElement:
+            return window.add(SimElement(self.sim, "CheckBox", title))
+
+        for i in range(self.sim.filler_controls // 3):
+            window.add(SimElement(self.sim, "Text", f"标签{i}"))
+
+        radio_group("输出格式", ["pts", "e57", "las"], "e57")
+        thinning = checkbox("启用")
+        thinning_radios = radio_group("抽稀方式", ["体素抽稀", "随机抽稀"], "体素抽稀")
+        for radio in thinning_radios:
+            radio.hide()
+
+        def on_thinning_toggle():
+            for radio in thinning_radios:
+                if thinning.checked:
+                    radio.show("thinning_options")
+                else:
+                    radio.hide()
+        thinning.on_toggle = on_thinning_toggle
+
+        radio_group("输出类型", ["单站", "合并", "单站+合并"], "合并")
+        radio_group("贴图选择", ["灰阶图", "反射率", "彩图", "反射率+彩图", "反射率+灰阶图"], "反射率")
+        checkbox("点云降噪")
+        checkbox("点云厚度优化")
+
+        # 与真实程序一样恢复上次导出时的设置
+        for control in window.children:
+            if control.title in self.dialog_state:
+                control.checked = self.dialog_state[control.title]
+        if thinning.checked:
+            for radio in thinning_radios:
+                radio.show()
+
+        export_button = window.add(SimElement(self.sim, "Pane", "导出", auto_id="uiButton3"))
+        export_button.on_click = lambda: self._open_browser(window)
+
+    def _select_radio(self, window: SimElement, radio: SimElement):
+        for other in window.children:
+            if other.group == radio.group:
+                other.checked = other is radio
+
+    def _collect_settings(self, window: SimElement) -> Dict[str, str]:
+        """读取导出窗口中已选中的单选按钮和复选框"""
+        settings = {}
+        thinning_on = any(c.title == "启用" and c.checked for c in window.children)
+        for control in window.children:
+            if control.control_type == "RadioButton" and control.checked:
+                if control.group == "抽稀方式" and not thinning_on:
+                    continue
+                settings[control.group] = control.title
+            elif control.control_type == "CheckBox":
+                settings[control.title] = "启用" if control.checked else "不启用"
+        return settings
+
+    # ---------- 浏览文件夹窗口 ----------
+    def _open_browser(self, export_window: SimElement):
+        self.export_settings = self._collect_settings(export_window)
+        if self.sim.persist_dialog_state:
+            self.dialog_state = {control.title: control.checked for control in export_window.children
+                                 if control.control_type in ("RadioButton", "CheckBox")}
+        export_window.close()
+        window = self._new_window("浏览文件夹")
+
+        # 新建文件夹建在选中的盘符下；选中盘符之前新建文件夹按钮不可用
+        selected = {"盘符": None}
+
+        def select(letter: str):
+            selected["盘符"] = letter
+            new_folder.enable("drive_select")
+
+        this_pc = window.add(SimElement(self.sim, "TreeItem", "此电脑"))
+        drives = []
+        for letter in self.sim.drive_letters():
+            drive = this_pc.add(SimElement(self.sim, "TreeItem", f"{DRIVE_LABELS.get(letter, '本地磁盘')} ({letter}:)"))
+            drive.on_click = lambda letter=letter: select(letter)
+            drive.hide()
+            drives.append(drive)
+
+        def expand():
+            for drive in drives:
+                drive.show("tree_expand")
+        this_pc.on_click = expand
+
+        edit = window.add(SimElement(self.sim, "Edit", "", auto_id="1"))
+        edit.hide()
+        new_folder = window.add(SimElement(self.sim, "Button", "新建文件夹(M)"))
+        new_folder.enabled = False
+        new_folder.on_click = lambda: edit.show("new_folder_edit")
+
+        ok_button = window.add(SimElement(self.sim, "Button", "确定"))
+        ok_button.on_click = lambda: self._start_conversion(window, edit, selected["盘符"])
+        window.add(SimElement(self.sim, "Button", "取消")).on_click = window.close
+
+    # ---------- 格式转换与提示窗口 ----------
+    def _start_conversion(self, browser_window: SimElement, edit: SimElement, drive: Optional[str]):
+        browser_window.close()
+        self.start_conversion(edit.text, self.export_settings, drive)
+
+    def start_conversion(self, folder: str, settings: Dict[str, str], drive: Optional[str] = None) -> Dict[str, Any]:
+        """
+        开始一次格式转换，转换结束时弹出MessageForm，返回转换记录
+
+        输出文件写到drive盘对应目录（drives[drive]）下的folder中，该盘没有对应目录时不写文件。
+        """
+        staged = None
+        root = self.sim.drives.get(drive)
+        path = None
+        if root:
+            fmt = settings.get("输出格式", "pts")
+            points = scene_points(self.sim.artifact_points, settings, seed=len(self.conversions) + 1)
+            path = os.path.join(root, folder, f"{folder}.{fmt}")
+            if self.sim.stream_output:
+                # 先写到临时文件，转换期间再逐块复制到输出文件夹
+                staged = tempfile.NamedTemporaryFile(suffix=f".{fmt}", delete=False).name
+                write_artifact(staged, points)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+            else:
+                write_artifact(path, points)
+        # 写文件在点击处理中同步完成，转换耗时从写完之后开始计，不被写文件的时间吃掉
+        duration = self.sim.conversion_time(settings)
+        hung = next(self.sim.conversion_numbers) in self.sim.hang_conversions
+        start = self.sim.now()
+        if staged:
+            threading.Thread(target=stream_file, args=(staged, path, duration * 0.9),
+                             name="模拟写出", daemon=True).start()
+        conversion = {
+            "文件夹": folder,
+            "盘符": drive,
+            "输出路径": os.path.dirname(path) if path else None,
+            "设置": dict(settings),
+            "开始": start,
+            "结束": None if hung else start + duration,
+        }
+        self.conversions.append(conversion)
+
+        message = SimElement(self.sim, "Window", "提示", auto_id="MessageForm", has_handle=True)
+        self.main.add(message)
+        message.appear_at = NEVER if hung else start + duration
+        ok_button = message.add(SimElement(self.sim, "Button", "确定"))
+        ok_button.on_click = lambda: message.close("window_close")
+        message.on_enter = ok_button.on_click
+        if not hung:
+            self.sim.announce_window(message)
+        return conversion
+
+    def _new_window(self, title: str) -> SimElement:
+        # 移除已关闭的弹窗，避免控件树随用例数增长
+        now = self.sim.now()
+        for closed in [c for c in self.main.children if c.close_at <= now]:
+            self.main.children.remove(closed)
+            self.sim.handles.pop(closed.handle, None)
+        window = self.main.add(SimElement(self.sim, "Window", title, has_handle=True))
+        window.show("dialog_open")
+        self.sim.announce_window(window)
+        return window
+
+
+# ==================== 模拟导出文件 ====================
+def sample_points(count: int, seed: int = 0) -> np.ndarray:
+    """count个随机点，x/y在[-50, 50]米，z在[0, 10]米"""
+    rng = np.random.default_rng(seed)
+    return rng.uniform([-50.0, -50.0, 0.0], [50.0, 50.0, 10.0], size=(count, 3))
+
+
+def scene_points(count: int, settings: Dict[str, str], seed: int = 0) -> np.ndarray:
+    """
+    按导出设置生成模拟的扫描场景：20×20米地面和两面3米高的墙，count为抽稀前的点数
+
+    点云厚度优化使表面噪声从5毫米降到2毫米，点云降噪使离群点从2%降到0.2%，
+    体素抽稀每个5厘米体素保留一个点，随机抽稀保留一半的点。
+    """
+    rng = np.random.default_rng(seed)
+    # 按面积分配点数，三个面的点密度相同
+    surface = rng.choice(3, size=count, p=np.array([400.0, 60.0, 60.0]) / 520.0)
+    u, v = rng.uniform(0.0, 20.0, size=count), rng.uniform(0.0, 20.0, size=count)
+    w = rng.normal(0.0, 0.002 if settings.get("点云厚度优化") == "启用" else 0.005, size=count)
+    points = np.where((surface == 0)[:, None], np.column_stack([u, v, w]),
+                      np.where((surface == 1)[:, None], np.column_stack([w, u, v * 0.15]),
+                               np.column_stack([u, w, v * 0.15])))
+    outliers = rng.random(count) < (0.002 if settings.get("点云降噪") == "启用" else 0.02)
+    points[outliers] += rng.uniform(-0.5, 0.5, size=(int(outliers.sum()), 3))
+
+    if settings.get("启用") == "启用":
+        if settings.get("抽稀方式") == "随机抽稀":
+            points = points[rng.random(len(points)) < 0.5]
+        else:
+            _, first = np.unique(np.floor(points / 0.05).astype(np.int64), axis=0, return_index=True)
+            points = points[np.sort(first)]
+    return points
+
+
+def write_pts(path: str, points: np.ndarray):
+    """PTS文本：点数行 + 每行 x y z 强度 r g b"""
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(f"{len(points)}\n")
+        extra = np.tile([100, 128, 128, 128], (len(points), 1))
+        np.savetxt(f, np.hstack([points, extra]), fmt=["%.4f"] * 3 + ["%d"] * 4)
+
+
+def write_las(path: str, points: np.ndarray, scale: float = 0.001):
+    """LAS 1.2，点格式0（20字节记录）"""
+    records = np.zeros(len(points), dtype=np.dtype([("X", "<i4"), ("Y", "<i4"), ("Z", "<i4"), ("intensity", "<u2"),
+                                                   ("flags", "u1"), ("classification", "u1"), ("angle", "i1"),
+                                                   ("user", "u1"), ("source", "<u2")]))
+    scaled = np.round(points / scale).astype(np.int32)
+    records["X"], records["Y"], records["Z"] = scaled[:, 0], scaled[:, 1], scaled[:, 2]
+    mins, maxs = scaled.min(axis=0) * scale, scaled.max(axis=0) * scale
+    header = struct.pack("<4sHH16sBB32s32sHHHIIBHI20s3d3d6d", b"LASF", 0, 0, b"\0" * 16, 1, 2,
+                         b"VORTEX SIM", b"vortex_sim", 1, 2026, 227, 227, 0, 0, 20, len(points),
+                         struct.pack("<5I", len(points), 0, 0, 0, 0), scale, scale, scale, 0.0, 0.0, 0.0,
+                         maxs[0], mins[0], maxs[1], mins[1], maxs[2], mins[2])
+    with open(path, "wb") as f:
+        f.write(header)
+        records.tofile(f)
+
+
+E57_PAGE_SIZE = 1024
+
+
+def write_e57(path: str, points: np.ndarray, points_per_packet: int = 2000):
+    """
+    最小的E57文件：文件头、一个压缩向量二进制段（x/y/z三个double字节流）、XML段
+
+    按1024字节分页，每页最后4字节为CRC（这里写0，校验器不检查CRC）。
+    """
+    payload = E57_PAGE_SIZE - 4
+
+    def physical(logical: int) -> int:
+        return logical // payload * E57_PAGE_SIZE + logical % payload
+
+    packets = []
+    for start in range(0, len(points), points_per_packet):
+        block = points[start:start + points_per_packet]
+        streams = [np.ascontiguousarray(block[:, axis]).astype("<f8").tobytes() for axis in range(3)]
+        body = struct.pack("<3H", *(len(stream) for stream in streams)) + b"".join(streams)
+        length = 4 + 2 + len(body)
+        padding = -length % 4
+        packets.append(struct.pack("<BBHH", 1, 0, length + padding - 1, len(streams)) + body + b"\0" * padding)
+
+    section_start = 48
+    data_start = section_start + 32
+    section_length = 32 + sum(len(packet) for packet in packets)
+    section = struct.pack("<B7xQQQ", 1, section_length, physical(data_start), 0) + b"".join(packets)
+
+    mins, maxs = points.min(axis=0), points.max(axis=0)
+    bounds = "".join(f'<{axis}{edge} type="Float">{value!r}</{axis}{edge}>'
+                     for edge, values in (("Minimum", mins), ("Maximum", maxs))
+                     for axis, value in zip("xyz", values.tolist()))
+    xml = (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<e57Root type="Structure" xmlns="http://www.astm.org/COMMIT/E57/2010-e57-v1.0">'
+        '<formatName type="String"><![CDATA[ASTM E57 3D Imaging Data File]]></formatName>'
+        '<data3D type="Vector" allowHeterogeneousChildren="1"><vectorChild type="Structure">'
+        f'<cartesianBounds type="Structure">{bounds}</cartesianBounds>'
+        f'<points type="CompressedVector" fileOffset="{physical(section_start)}" recordCount="{len(points)}">'
+        '<prototype type="Structure"><cartesianX type="Float"/><cartesianY type="Float"/>'
+        '<cartesianZ type="Float"/></prototype><codecs type="Vector" allowHeterogeneousChildren="1"/>'
+        '</points></vectorChild></data3D></e57Root>'
+    ).encode("utf-8")
+
+    xml_start = section_start + len(section)
+    logical_length = xml_start + len(xml)
+    pages = -(-logical_length // payload)
+    header = struct.pack("<8sIIQQQQ", b"ASTM-E57", 1, 0, pages * E57_PAGE_SIZE,
+                         physical(xml_start), len(xml), E57_PAGE_SIZE)
+    logical = header + section + xml
+    with open(path, "wb") as f:
+        for page in range(pages):
+            f.write(logical[page * payload:(page + 1) * payload].ljust(payload, b"\0") + b"\0\0\0\0")
+
+
+def stream_file(source: str, target: str, duration: float, pieces: int = 20):
+    """在duration秒内把source分pieces块均匀地写入target，写完后关闭并删除source"""
+    with open(source, "rb") as f:
+        data = f.read()
+    os.remove(source)
+    step = -(-len(data) // pieces)
+    start = time.perf_counter()
+    with open(target, "wb") as out:
+        for index in range(pieces):
+            out.write(data[index * step:(index + 1) * step])
+            out.flush()
+            delay = start + duration * (index + 1) / pieces - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+
+
+ARTIFACT_WRITERS = {"pts": write_pts, "las": write_las, "e57": write_e57}
+
+
+def write_artifact(path: str, points: np.ndarray):
+    """按扩展名写入点云文件"""
+    directory = os.path.dirname(path)
+    if directory and not os.path.exists(directory):
+        os.makedirs(directory)
+    ARTIFACT_WRITERS[os.path.splitext(path)[1].lstrip(".").lower()](path, points)
+
+# ==================== 模拟后端 ====================
+class SimulatedVortex:
+    """
+    模拟的VORTEX Client（可包含多个实例）
+
+    Args:
+        latencies: 覆盖DEFAULT_LATENCIES中的延迟
+        conversion_extra: 覆盖DEFAULT_CONVERSION_EXTRA中的额外转换耗时
+        time_scale: 所有延迟的缩放系数，例如0.01表示以百分之一的时间运行
+        instances: 模拟的VORTEX实例数
+        target_title: 目标项目窗口标题
+        main_title: 主窗口标题
+        filler_controls: 每个窗口中填充的无关控件数，用于模拟控件树规模
+        pid: process_id()返回的进程号，默认为当前进程
+        persist_dialog_state: 点云导出窗口是否记住上次导出的设置
+        conversion_jitter: 转换耗时的相对随机波动（正态分布标准差，0表示固定耗时）
+        seed: 随机波动的种子
+        drives: 盘符 -> 本地目录，转换开始时在浏览文件夹窗口所选盘符对应目录下的输出文件夹中
+                写入对应格式的点云文件；所选盘符没有对应目录时不写文件。
+                浏览文件夹窗口列出DRIVE_LABELS和drives中的全部盘符
+        artifact_points: 写入文件的点数（抽稀前），点云由scene_points按导出设置生成
+        stream_output: 在转换期间分块逐步写出文件（写完后关闭），而不是点击确定时一次写完
+        hang_conversions: 卡住不结束的转换序号（所有实例按点击确定的先后从1开始计），成功窗口永不出现
+    """
+    def __init__(self, latencies: Optional[Dict[str, float]] = None,
+                 conversion_extra: Optional[Dict[str, float]] = None,
+                 time_scale: float = 1.0, instances: int = 1,
+                 target_title: str = "建模_20251231025100",
+                 main_title: str = "VORTEX Client",
+                 filler_controls: int = 30, pid: Optional[int] = None,
+                 persist_dialog_state: bool = False, conversion_jitter: float = 0.0, seed: int = 0,
+                 drives: Optional[Dict[str, str]] = None, artifact_points: int = 10000, stream_output: bool = False,
+                 hang_conversions: Optional[List[int]] = None):
+        self.latencies = {**DEFAULT_LATENCIES, **(latencies or {})}
+        self.conversion_extra = {**DEFAULT_CONVERSION_EXTRA, **(conversion_extra or {})}
+        self.time_scale = time_scale
+        self.target_title = target_title
+        self.main_title = main_title
+        self.filler_controls = filler_controls
+        self.pid = pid or os.getpid()
+        self.persist_dialog_state = persist_dialog_state
+        self.conversion_jitter = conversion_jitter
+        self._random = random.Random(seed)
+        self.drives = {letter.upper(): directory for letter, directory in (drives or {}).items()}
+        self.artifact_points = artifact_points
+        self.stream_output = stream_output
+        self.hang_conversions = set(hang_conversions or [])
+        self.conversion_numbers = itertools.count(1)
+
+        self.lock = threading.RLock()
+        self.handles: Dict[int, SimElement] = {}
+        self._handle_counter = itertools.count(0x10000, 0x10)
+        self.stats = {"tree_searches": 0, "nodes_visited": 0, "clicks": 0}
+        self._window_listeners: List[tuple] = []
+        self.instances = [SimVortexInstance(self, i) for i in range(instances)]
+
+    @classmethod
+    def from_config(cls, sim_config: Dict[str, Any]) -> "SimulatedVortex":
+        """从配置字典（config["simulation"]）创建"""
+        return cls(**sim_config)
+
+    def now(self) -> float:
+        # 与执行器计时使用同一时钟，便于直接比较出现时间和检测时间
+        return time.perf_counter()
+
+    def delay(self, key: str) -> float:
+        """缩放后的延迟（秒）"""
+        return self.latencies[key] * self.time_scale
+
+    def drive_letters(self) -> List[str]:
+        """浏览文件夹窗口中列出的盘符"""
+        return sorted(set(DRIVE_LABELS) | set(self.drives))
+
+    def conversion_time(self, settings: Dict[str, str]) -> float:
+        """根据导出设置计算缩放后的转换耗时"""
+        seconds = self.latencies["conversion"]
+        for key, value in settings.items():
+            if value == "启用":
+                seconds += self.conversion_extra.get(key, 0.0)
+            else:
+                seconds += self.conversion_extra.get(value, 0.0)
+        if self.conversion_jitter:
+            with self.lock:
+                seconds *= max(1.0 + self._random.gauss(0.0, self.conversion_jitter), 0.1)
+        return seconds * self.time_scale
+
+    def register(self, element: SimElement) -> int:
+        """为窗口分配句柄"""
+        with self.lock:
+            handle = next(self._handle_counter)
+            self.handles[handle] = element
+        return handle
+
+    def subscribe_window_opened(self, root: SimElement, callback: Callable[[], None]) -> Callable[[], None]:
+        """订阅root下的窗口打开事件，返回取消订阅函数"""
+        listener = (root, callback)
+        with self.lock:
+            self._window_listeners.append(listener)
+
+        def unsubscribe():
+            with self.lock:
+                if listener in self._window_listeners:
+                    self._window_listeners.remove(listener)
+        return unsubscribe
+
+    def announce_window(self, window: SimElement):
+        """在窗口出现的时刻向订阅者发送窗口打开事件"""
+        def fire():
+            # Timer可能略早于出现时刻唤醒
+            early = window.appear_at - self.now()
+            if early > 0:
+                time.sleep(early)
+            with self.lock:
+                listeners = list(self._window_listeners)
+            for root, callback in listeners:
+                ancestor = window.parent
+                while ancestor is not None and ancestor is not root:
+                    ancestor = ancestor.parent
+                if ancestor is root:
+                    callback()
+
+        timer = threading.Timer(max(window.appear_at - self.now(), 0.0), fire)
+        timer.daemon = True
+        timer.start()
+
+    def count(self, key: str, amount: int = 1):
+        with self.lock:
+            self.stats[key] = self.stats.get(key, 0) + amount
+
+    def search(self, root: SimElement, selector: Dict[str, Any]) -> Optional[SimElement]:
+        """在root的后代中深度优先查找第一个匹配的元素，并按访问节点数计入耗时"""
+        if "handle" in selector:
+            element = self.handles.get(selector["handle"])
+            return element if element is not None and element.alive else None
+        return self.search_all(root, {None: selector}).get(None)
+
+    def search_all(self, root: SimElement, selectors: Dict[Any, Dict[str, Any]]) -> Dict[Any, SimElement]:
+        """一次深度优先遍历查找多个选择器，全部找到后提前结束"""
+        patterns = {key: re.compile(selector["title_re"]) if "title_re" in selector else None
+                    for key, selector in selectors.items()}
+        visited = 0
+        found = {}
+        stack = list(reversed(root.children))
+        while stack and len(found) < len(selectors):
+            element = stack.pop()
+            if not element.alive:
+                continue
+            visited += 1
+            for key, selector in selectors.items():
+                if key not in found and self._matches(element, selector, patterns[key]):
+                    found[key] = element
+            stack.extend(reversed(element.children))
+
+        self.count("tree_searches")
+        self.count("nodes_visited", visited)
+        time.sleep(visited * self.delay("node_search"))
+        return found
+
+    def snapshot(self, root: SimElement) -> List[SimElement]:
+        """按遍历顺序列出root下所有存在的元素，耗时与一次完整搜索相同"""
+        elements = []
+        stack = list(reversed(root.children))
+        while stack:
+            element = stack.pop()
+            if not element.alive:
+                continue
+            elements.append(element)
+            stack.extend(reversed(element.children))
+
+        self.count("tree_searches")
+        self.count("nodes_visited", len(elements))
+        time.sleep(len(elements) * self.delay("node_search"))
+        return elements
+
+    @staticmethod
+    def _matches(element: SimElement, selector: Dict[str, Any], title_re) -> bool:
+        if "control_type" in selector and element.control_type != selector["control_type"]:
+            return False
+        if "title" in selector and element.title != selector["title"]:
+            return False
+        if "auto_id" in selector and element.auto_id != selector["auto_id"]:
+            return False
+        if title_re is not None and not title_re.match(element.title):
+            return False
+        return True
+
+
+class SimulatedDriver(UIDriver):
+    """基于SimulatedVortex的界面驱动，接口与PywinautoDriver一致"""
+    name = "simulated"
+    supports_window_events = True
+
+    def __init__(self, sim: SimulatedVortex):
+        self.sim = sim
+
+    # ---------- 元素解析 ----------
+    def _try_resolve(self, element: Any) -> Optional[SimElement]:
+        if isinstance(element, SimElement):
+            return element if element.alive else None
+        parent = self._try_resolve(element.parent)
+        if parent is None:
+            return None
+        return self.sim.search(parent, element.selector)
+
+    def _resolve(self, element: Any, timeout: float = FIND_TIMEOUT) -> SimElement:
+        """解析元素，与pywinauto一样在超时内重试；已关闭的已解析元素立即失败"""
+        if isinstance(element, SimElement) and element.appear_at <= self.sim.now() and not element.alive:
+            raise ElementNotFoundError(f"控件已失效: {element!r}")
+        deadline = time.monotonic() + timeout
+        while True:
+            resolved = self._try_resolve(element)
+            if resolved is not None:
+                return resolved
+            if time.monotonic() >= deadline:
+                raise ElementNotFoundError(repr(element))
+            time.sleep(self._retry_interval())
+
+    def _retry_interval(self) -> float:
+        return max(RETRY_INTERVAL * self.sim.time_scale, 0.001)
+
+    def _ready(self, element: SimElement):
+        if not element.enabled:
+            raise RuntimeError(f"控件不可用: {element!r}")
+        time.sleep(self.sim.delay("click"))
+        self.sim.count("clicks")
+
+    # ---------- 接口实现 ----------
+    def find_window(self, title: str) -> Optional[int]:
+        for instance in self.sim.instances:
+            if instance.main.alive and instance.main.title == title:
+                return instance.main.handle
+        return None
+
+    def find_windows(self, title: str) -> List[int]:
+        return [instance.main.handle for instance in self.sim.instances
+                if instance.main.alive and instance.main.title == title]
+
+    def connect(self, handle: int) -> Any:
+        element = self.sim.handles.get(handle)
+        if element is None or not element.alive:
+            raise ElementNotFoundError(f"句柄无效: {hex(handle)}")
+        time.sleep(self.sim.delay("connect"))
+        return element
+
+    def child(self, parent: Any, **selector) -> Any:
+        return SimSpec(parent, selector)
+
+    def window_from_handle(self, parent: Any, handle: int) -> Any:
+        return SimSpec(parent, {"handle": handle})
+
+    def resolve_all(self, parent: Any, selectors: Dict[Any, Dict[str, Any]]) -> Dict[Any, Any]:
+        return self.sim.search_all(self._resolve(parent), selectors)
+
+    def snapshot(self, window: Any) -> UISnapshot:
+        root = self._resolve(window)
+        # 模拟控件没有真实坐标，按遍历顺序纵向排列
+        records = [ControlRecord(element.control_type, element.title, element.auto_id,
+                                 element.enabled, True, (0, 20 * i, 200, 20 * i + 18), element)
+                   for i, element in enumerate(self.sim.snapshot(root))]
+        return UISnapshot(root.handle, records)
+
+    def click(self, element: Any):
+        resolved = self._resolve(element)
+        self._ready(resolved)
+        if resolved.on_click:
+            resolved.on_click()
+
+    def toggle(self, element: Any):
+        resolved = self._resolve(element)
+        self._ready(resolved)
+        resolved.checked = not resolved.checked
+        if resolved.on_toggle:
+            resolved.on_toggle()
+
+    def get_toggle_state(self, element: Any) -> Optional[int]:
+        return 1 if self._resolve(element).checked else 0
+
+    def set_text(self, element: Any, text: str):
+        self._resolve(element).text = text
+
+    def type_keys(self, element: Any, keys: str):
+        resolved = self._resolve(element)
+        if keys in ("{ENTER}", " ") and resolved.on_enter:
+            resolved.on_enter()
+        elif keys == "%{F4}":
+            resolved.close("window_close")
+
+    def close(self, element: Any):
+        self._resolve(element).close("window_close")
+
+    def set_focus(self, element: Any):
+        self._resolve(element)
+
+    def wait(self, element: Any, state: str = "visible", timeout: float = 5):
+        if isinstance(element, SimElement) and element.appear_at <= self.sim.now() and not element.alive:
+            raise ElementNotFoundError(f"控件已失效: {element!r}")
+        states = state.split()
+        deadline = time.monotonic() + timeout
+        while True:
+            resolved = self._try_resolve(element)
+            if resolved is not None and ("enabled" not in states or resolved.enabled):
+                return
+            if time.monotonic() >= deadline:
+                raise WaitTimeoutError(f"等待 {element!r} 状态 '{state}' 超时")
+            time.sleep(self._retry_interval())
+
+    def exists(self, element: Any, timeout: float = 0) -> bool:
+        try:
+            self._resolve(element, timeout=timeout)
+            return True
+        except ElementNotFoundError:
+            return False
+
+    def is_visible(self, element: Any) -> bool:
+        return self._try_resolve(element) is not None
+
+    def is_enabled(self, element: Any) -> bool:
+        resolved = self._try_resolve(element)
+        return resolved is not None and resolved.enabled
+
+    def window_text(self, element: Any) -> str:
+        resolved = self._resolve(element)
+        return resolved.text if resolved.control_type == "Edit" else resolved.title
+
+    def handle_of(self, element: Any) -> Optional[int]:
+        return self._resolve(element).handle
+
+    def process_id(self, element: Any) -> int:
+        return self.sim.pid
+
+    def is_window_alive(self, handle: int) -> bool:
+        element = self.sim.handles.get(handle)
+        return element is not None and element.alive and element.enabled
+
+    def window_title(self, handle: int) -> str:
+        element = self.sim.handles.get(handle)
+        return element.title if element is not None else ""
+
+    def subscribe_window_opened(self, parent: Any, callback: Callable[[], None]) -> Callable[[], None]:
+        return self.sim.subscribe_window_opened(self._resolve(parent), callback)